@@ -0,0 +1,29 @@
+"""add_variant_embedding_hash
+
+Revision ID: a3d8f1c6e2b9
+Revises: f5c1d9a7b3e8
+Create Date: 2026-10-17 13:05:42.118364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8f1c6e2b9'
+down_revision: Union[str, Sequence[str], None] = 'f5c1d9a7b3e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Embed qilingan matn xeshi - o'zgarmagan variantlar qayta embed qilinmaydi
+    op.add_column('product_variants', sa.Column('embedding_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('product_variants', 'embedding_hash')
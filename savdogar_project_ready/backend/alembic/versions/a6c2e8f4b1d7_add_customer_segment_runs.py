@@ -0,0 +1,52 @@
+"""add_customer_segment_runs
+
+Revision ID: a6c2e8f4b1d7
+Revises: f9d4b2e7c3a1
+Create Date: 2026-10-18 13:40:19.275806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e8f4b1d7'
+down_revision: Union[str, Sequence[str], None] = 'f9d4b2e7c3a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_segment_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='segmentationstatus'), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=True),
+    sa.Column('segments', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('clv_total', sa.Float(), nullable=True),
+    sa.Column('as_of', sa.DateTime(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_customer_segment_runs_id'), 'customer_segment_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_customer_segment_runs_tenant_id'), 'customer_segment_runs', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_customer_segment_runs_tenant_id'), table_name='customer_segment_runs')
+    op.drop_index(op.f('ix_customer_segment_runs_id'), table_name='customer_segment_runs')
+    op.drop_table('customer_segment_runs')
+    sa.Enum(name='segmentationstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,67 @@
+"""add_balance_checkpoints
+
+Revision ID: a8e2c6f4d1b9
+Revises: f7d3b9e2a5c8
+Create Date: 2026-10-17 19:12:08.304518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e2c6f4d1b9'
+down_revision: Union[str, Sequence[str], None] = 'f7d3b9e2a5c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('customers_v2', sa.Column('ledger_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE customers_v2 SET ledger_count = counts.n
+        FROM (SELECT customer_id, count(*) AS n FROM customer_ledger GROUP BY customer_id) AS counts
+        WHERE customers_v2.id = counts.customer_id
+    """)
+
+    op.create_table('customer_balance_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('ledger_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('as_of', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers_v2.id'], ),
+    sa.ForeignKeyConstraint(['ledger_id'], ['customer_ledger.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_customer_balance_checkpoints_id'), 'customer_balance_checkpoints', ['id'], unique=False)
+    op.create_index('idx_balance_checkpoints_customer', 'customer_balance_checkpoints', ['customer_id', 'as_of'], unique=False)
+
+    # Qarz kitobi faqat qo'shiladi - UPDATE/DELETE bazada rad etiladi
+    op.execute("""
+        CREATE OR REPLACE FUNCTION customer_ledger_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'customer_ledger is append-only';
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER customer_ledger_append_only
+        BEFORE UPDATE OR DELETE ON customer_ledger
+        FOR EACH ROW EXECUTE FUNCTION customer_ledger_append_only()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS customer_ledger_append_only ON customer_ledger")
+    op.execute("DROP FUNCTION IF EXISTS customer_ledger_append_only()")
+    op.drop_index('idx_balance_checkpoints_customer', table_name='customer_balance_checkpoints')
+    op.drop_index(op.f('ix_customer_balance_checkpoints_id'), table_name='customer_balance_checkpoints')
+    op.drop_table('customer_balance_checkpoints')
+    op.drop_column('customers_v2', 'ledger_count')
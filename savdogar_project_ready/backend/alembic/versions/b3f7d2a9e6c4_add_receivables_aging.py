@@ -0,0 +1,70 @@
+"""add_receivables_aging
+
+Revision ID: b3f7d2a9e6c4
+Revises: a8e2c6f4d1b9
+Create Date: 2026-10-17 20:26:51.118042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7d2a9e6c4'
+down_revision: Union[str, Sequence[str], None] = 'a8e2c6f4d1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('receivable_lots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('ledger_id', sa.Integer(), nullable=False),
+    sa.Column('debit_at', sa.DateTime(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('remaining', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers_v2.id'], ),
+    sa.ForeignKeyConstraint(['ledger_id'], ['customer_ledger.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_receivable_lots_id'), 'receivable_lots', ['id'], unique=False)
+    op.create_index('idx_receivable_lots_customer', 'receivable_lots', ['customer_id', 'id'], unique=False)
+    op.create_index('idx_receivable_lots_tenant', 'receivable_lots', ['tenant_id'], unique=False)
+
+    op.create_table('customer_aging',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('current', sa.Float(), nullable=False),
+    sa.Column('days_31_60', sa.Float(), nullable=False),
+    sa.Column('days_61_90', sa.Float(), nullable=False),
+    sa.Column('days_over_90', sa.Float(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('oldest_debit_at', sa.DateTime(), nullable=True),
+    sa.Column('aged_on', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers_v2.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_id')
+    )
+    op.create_index(op.f('ix_customer_aging_id'), 'customer_aging', ['id'], unique=False)
+    op.create_index('idx_customer_aging_tenant_total', 'customer_aging', ['tenant_id', 'total'], unique=False)
+    op.create_index('idx_customer_aging_tenant_over_90', 'customer_aging', ['tenant_id', 'days_over_90'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_customer_aging_tenant_over_90', table_name='customer_aging')
+    op.drop_index('idx_customer_aging_tenant_total', table_name='customer_aging')
+    op.drop_index(op.f('ix_customer_aging_id'), table_name='customer_aging')
+    op.drop_table('customer_aging')
+    op.drop_index('idx_receivable_lots_tenant', table_name='receivable_lots')
+    op.drop_index('idx_receivable_lots_customer', table_name='receivable_lots')
+    op.drop_index(op.f('ix_receivable_lots_id'), table_name='receivable_lots')
+    op.drop_table('receivable_lots')
@@ -0,0 +1,44 @@
+"""add_catalog_change_feed
+
+Revision ID: b6e4c2a8d1f7
+Revises: a3d8f1c6e2b9
+Create Date: 2026-10-17 13:41:09.527713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e4c2a8d1f7'
+down_revision: Union[str, Sequence[str], None] = 'a3d8f1c6e2b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tenants', sa.Column('catalog_version', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('catalog_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_catalog_changes_id'), 'catalog_changes', ['id'], unique=False)
+    op.create_index('idx_catalog_changes_tenant_version', 'catalog_changes', ['tenant_id', 'version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_catalog_changes_tenant_version', table_name='catalog_changes')
+    op.drop_index(op.f('ix_catalog_changes_id'), table_name='catalog_changes')
+    op.drop_table('catalog_changes')
+    op.drop_column('tenants', 'catalog_version')
@@ -0,0 +1,29 @@
+"""add_tenant_cache_versions
+
+Revision ID: b8f3d6a2c4e9
+Revises: a6c2e8f4b1d7
+Create Date: 2026-10-19 10:12:47.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f3d6a2c4e9'
+down_revision: Union[str, Sequence[str], None] = 'a6c2e8f4b1d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tenants', sa.Column('cache_versions', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tenants', 'cache_versions')
@@ -0,0 +1,30 @@
+"""add_sale_idempotency_key
+
+Revision ID: c4e8a1f2b6d3
+Revises: 58d694ffff18
+Create Date: 2026-10-17 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f2b6d3'
+down_revision: Union[str, Sequence[str], None] = '58d694ffff18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sales_v2', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_index('idx_sales_tenant_idempotency', 'sales_v2', ['tenant_id', 'idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_sales_tenant_idempotency', table_name='sales_v2')
+    op.drop_column('sales_v2', 'idempotency_key')
@@ -0,0 +1,53 @@
+"""seed_balance_checkpoints
+
+Revision ID: c5e9a3d7b2f4
+Revises: b8f3d6a2c4e9
+Create Date: 2026-10-19 11:03:52.184960
+
+Mavjud qarz kitobi uchun balans nazorat nuqtalarini to'ldirish
+(a8e2c6f4d1b9 faqat ledger_count ni to'ldirgan edi). Har bir mijozning
+yozuvlari ID tartibida sanaladi va har 500-yozuvda (CHECKPOINT_INTERVAL)
+shu yozuvgacha bo'lgan balans yoziladi - natija
+customer_ledger.backfill_checkpoints bilan bir xil. Keyin yozilgan
+(allaqachon mavjud) nuqtalar takrorlanmaydi.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e9a3d7b2f4'
+down_revision: Union[str, Sequence[str], None] = 'b8f3d6a2c4e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHECKPOINT_INTERVAL = 500
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text("""
+        INSERT INTO customer_balance_checkpoints (customer_id, ledger_id, balance, entries, as_of, created_at)
+        SELECT customer_id, id, balance, entries, created_at, now() AT TIME ZONE 'utc'
+        FROM (
+            SELECT l.customer_id, l.id, l.created_at,
+                   SUM(COALESCE(l.credit, 0) - COALESCE(l.debit, 0))
+                       OVER (PARTITION BY l.customer_id ORDER BY l.id) AS balance,
+                   ROW_NUMBER() OVER (PARTITION BY l.customer_id ORDER BY l.id) AS entries
+            FROM customer_ledger l
+        ) AS ledger
+        WHERE entries % :interval = 0
+          AND NOT EXISTS (
+              SELECT 1 FROM customer_balance_checkpoints c
+              WHERE c.customer_id = ledger.customer_id AND c.entries = ledger.entries
+          )
+        ORDER BY customer_id, id
+    """).bindparams(interval=CHECKPOINT_INTERVAL))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Nazorat nuqtalari qarz kitobidan hosil qilinadi - keyingi yozuvlar ularga tayanadi, qoldiriladi
+    pass
@@ -0,0 +1,51 @@
+"""add_exchange_rate_changes
+
+Revision ID: c9a5e3f7b2d4
+Revises: b6e4c2a8d1f7
+Create Date: 2026-10-17 14:22:51.390412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9a5e3f7b2d4'
+down_revision: Union[str, Sequence[str], None] = 'b6e4c2a8d1f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('exchange_rate_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('old_rate', sa.Float(), nullable=True),
+    sa.Column('new_rate', sa.Float(), nullable=False),
+    sa.Column('reverts_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='repricingstatus'), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['reverts_id'], ['exchange_rate_changes.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exchange_rate_changes_id'), 'exchange_rate_changes', ['id'], unique=False)
+    op.create_index('idx_rate_changes_tenant_created', 'exchange_rate_changes', ['tenant_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_rate_changes_tenant_created', table_name='exchange_rate_changes')
+    op.drop_index(op.f('ix_exchange_rate_changes_id'), table_name='exchange_rate_changes')
+    op.drop_table('exchange_rate_changes')
+    sa.Enum(name='repricingstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,59 @@
+"""add_customer_price_lists
+
+Revision ID: d2b7f4a9c6e1
+Revises: c9a5e3f7b2d4
+Create Date: 2026-10-17 15:08:12.504871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7f4a9c6e1'
+down_revision: Union[str, Sequence[str], None] = 'c9a5e3f7b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_price_lists',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('valid_from', sa.DateTime(), nullable=True),
+    sa.Column('valid_to', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers_v2.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_customer_price_lists_id'), 'customer_price_lists', ['id'], unique=False)
+    op.create_index('idx_price_lists_tenant_customer', 'customer_price_lists', ['tenant_id', 'customer_id'], unique=False)
+    op.create_table('customer_price_list_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('price_list_id', sa.Integer(), nullable=False),
+    sa.Column('variant_id', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['price_list_id'], ['customer_price_lists.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['variant_id'], ['product_variants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('price_list_id', 'variant_id', name='uq_price_list_items_variant')
+    )
+    op.create_index(op.f('ix_customer_price_list_items_id'), 'customer_price_list_items', ['id'], unique=False)
+    op.create_index('idx_price_list_items_variant', 'customer_price_list_items', ['variant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_price_list_items_variant', table_name='customer_price_list_items')
+    op.drop_index(op.f('ix_customer_price_list_items_id'), table_name='customer_price_list_items')
+    op.drop_table('customer_price_list_items')
+    op.drop_index('idx_price_lists_tenant_customer', table_name='customer_price_lists')
+    op.drop_index(op.f('ix_customer_price_lists_id'), table_name='customer_price_lists')
+    op.drop_table('customer_price_lists')
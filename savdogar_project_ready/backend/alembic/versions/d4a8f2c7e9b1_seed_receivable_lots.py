@@ -0,0 +1,72 @@
+"""seed_receivable_lots
+
+Revision ID: d4a8f2c7e9b1
+Revises: b3f7d2a9e6c4
+Create Date: 2026-10-18 09:41:27.530614
+
+Mavjud qarz kitobidan ochiq qismlar (receivable_lots) va customer_aging
+qatorlarini to'ldirish. FIFO: mijozning barcha to'lovlari eng eski qarz
+yozuvlaridan boshlab yopadi, ya'ni qism qoldig'i =
+min(qarz, shu yozuvgacha jami qarz - jami to'lov). Qismlar butun tarixdan
+qayta quriladi (b3f7d2a9e6c4 dan keyin yozilgan qismlar ham), natija
+receivables_aging.rebuild_customer bilan bir xil.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8f2c7e9b1'
+down_revision: Union[str, Sequence[str], None] = 'b3f7d2a9e6c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DELETE FROM customer_aging")
+    op.execute("DELETE FROM receivable_lots")
+    op.execute("""
+        INSERT INTO receivable_lots (tenant_id, customer_id, ledger_id, debit_at, amount, remaining)
+        SELECT tenant_id, customer_id, id, created_at, debit, LEAST(debit, owed_through - paid)
+        FROM (
+            SELECT c.tenant_id, l.customer_id, l.id, l.created_at,
+                   GREATEST(COALESCE(l.debit, 0) - COALESCE(l.credit, 0), 0) AS debit,
+                   SUM(GREATEST(COALESCE(l.debit, 0) - COALESCE(l.credit, 0), 0))
+                       OVER (PARTITION BY l.customer_id ORDER BY l.id) AS owed_through,
+                   SUM(GREATEST(COALESCE(l.credit, 0) - COALESCE(l.debit, 0), 0))
+                       OVER (PARTITION BY l.customer_id) AS paid
+            FROM customer_ledger l
+            JOIN customers_v2 c ON c.id = l.customer_id
+        ) AS ledger
+        WHERE debit > 0 AND owed_through - paid > 0.000001
+        ORDER BY customer_id, id
+    """)
+    op.execute("""
+        INSERT INTO customer_aging (
+            tenant_id, customer_id, "current", days_31_60, days_61_90, days_over_90,
+            total, oldest_debit_at, aged_on
+        )
+        SELECT tenant_id, customer_id,
+               COALESCE(SUM(remaining) FILTER (WHERE age <= 30), 0),
+               COALESCE(SUM(remaining) FILTER (WHERE age > 30 AND age <= 60), 0),
+               COALESCE(SUM(remaining) FILTER (WHERE age > 60 AND age <= 90), 0),
+               COALESCE(SUM(remaining) FILTER (WHERE age > 90), 0),
+               SUM(remaining), MIN(debit_at), today
+        FROM (
+            SELECT tenant_id, customer_id, remaining, debit_at,
+                   (now() AT TIME ZONE 'utc')::date AS today,
+                   (now() AT TIME ZONE 'utc')::date - debit_at::date AS age
+            FROM receivable_lots
+        ) AS lots
+        GROUP BY tenant_id, customer_id, today
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Qismlar qarz kitobidan qayta tiklanadi - ma'lumot yo'qolmaydi
+    op.execute("DELETE FROM customer_aging")
+    op.execute("DELETE FROM receivable_lots")
@@ -0,0 +1,31 @@
+"""extend_sales_tenant_date_index
+
+Revision ID: d7a3e5c9f1b4
+Revises: c4e8a1f2b6d3
+Create Date: 2026-10-17 11:02:47.905316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3e5c9f1b4'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f2b6d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset jurnal (created_at, id) tartibida indeksdan to'g'ridan-to'g'ri o'qiydi
+    op.drop_index('idx_sales_tenant_date', table_name='sales_v2')
+    op.create_index('idx_sales_tenant_date', 'sales_v2', ['tenant_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_sales_tenant_date', table_name='sales_v2')
+    op.create_index('idx_sales_tenant_date', 'sales_v2', ['tenant_id', 'created_at'], unique=False)
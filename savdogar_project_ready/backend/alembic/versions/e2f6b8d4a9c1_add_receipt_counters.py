@@ -0,0 +1,42 @@
+"""add_receipt_counters
+
+Revision ID: e2f6b8d4a9c1
+Revises: d7a3e5c9f1b4
+Create Date: 2026-10-17 11:40:05.163872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f6b8d4a9c1'
+down_revision: Union[str, Sequence[str], None] = 'd7a3e5c9f1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('receipt_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('next_value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_receipt_counters_id'), 'receipt_counters', ['id'], unique=False)
+    op.create_index('idx_receipt_counters_tenant_branch', 'receipt_counters', ['tenant_id', 'branch_id'], unique=True)
+    op.create_index('idx_sales_tenant_receipt', 'sales_v2', ['tenant_id', 'receipt_number'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_sales_tenant_receipt', table_name='sales_v2')
+    op.drop_index('idx_receipt_counters_tenant_branch', table_name='receipt_counters')
+    op.drop_index(op.f('ix_receipt_counters_id'), table_name='receipt_counters')
+    op.drop_table('receipt_counters')
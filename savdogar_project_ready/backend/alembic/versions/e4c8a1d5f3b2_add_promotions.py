@@ -0,0 +1,55 @@
+"""add_promotions
+
+Revision ID: e4c8a1d5f3b2
+Revises: d2b7f4a9c6e1
+Create Date: 2026-10-17 16:41:37.218095
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c8a1d5f3b2'
+down_revision: Union[str, Sequence[str], None] = 'd2b7f4a9c6e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('promotions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('promo_type', sa.Enum('PERCENT_OFF', 'BUY_X_GET_Y', name='promotiontype'), nullable=False),
+    sa.Column('variant_id', sa.Integer(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('percent', sa.Float(), nullable=True),
+    sa.Column('buy_quantity', sa.Integer(), nullable=True),
+    sa.Column('get_quantity', sa.Integer(), nullable=True),
+    sa.Column('starts_at', sa.DateTime(), nullable=True),
+    sa.Column('ends_at', sa.DateTime(), nullable=True),
+    sa.Column('daily_start', sa.Time(), nullable=True),
+    sa.Column('daily_end', sa.Time(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.ForeignKeyConstraint(['variant_id'], ['product_variants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_promotions_id'), 'promotions', ['id'], unique=False)
+    op.create_index('idx_promotions_tenant_active', 'promotions', ['tenant_id', 'is_active'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_promotions_tenant_active', table_name='promotions')
+    op.drop_index(op.f('ix_promotions_id'), table_name='promotions')
+    op.drop_table('promotions')
+    sa.Enum(name='promotiontype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,51 @@
+"""add_embedding_backfills
+
+Revision ID: e8b3c1f6a4d2
+Revises: d4a8f2c7e9b1
+Create Date: 2026-10-18 11:12:05.318244
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3c1f6a4d2'
+down_revision: Union[str, Sequence[str], None] = 'd4a8f2c7e9b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_backfills',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('force', sa.Boolean(), nullable=False),
+    # importstatus turi product_imports bilan umumiy (f7d3b9e2a5c8 da yaratilgan)
+    sa.Column('status', postgresql.ENUM('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='importstatus', create_type=False), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('scanned', sa.Integer(), nullable=True),
+    sa.Column('embedded', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_embedding_backfills_id'), 'embedding_backfills', ['id'], unique=False)
+    op.create_index(op.f('ix_embedding_backfills_tenant_id'), 'embedding_backfills', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_embedding_backfills_tenant_id'), table_name='embedding_backfills')
+    op.drop_index(op.f('ix_embedding_backfills_id'), table_name='embedding_backfills')
+    op.drop_table('embedding_backfills')
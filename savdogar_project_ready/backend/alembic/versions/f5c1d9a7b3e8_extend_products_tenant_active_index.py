@@ -0,0 +1,31 @@
+"""extend_products_tenant_active_index
+
+Revision ID: f5c1d9a7b3e8
+Revises: e2f6b8d4a9c1
+Create Date: 2026-10-17 12:31:18.442190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c1d9a7b3e8'
+down_revision: Union[str, Sequence[str], None] = 'e2f6b8d4a9c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset katalog id tartibida indeksdan to'g'ridan-to'g'ri o'qiydi
+    op.drop_index('idx_products_tenant_active', table_name='products_v2')
+    op.create_index('idx_products_tenant_active', 'products_v2', ['tenant_id', 'is_active', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_products_tenant_active', table_name='products_v2')
+    op.create_index('idx_products_tenant_active', 'products_v2', ['tenant_id', 'is_active'], unique=False)
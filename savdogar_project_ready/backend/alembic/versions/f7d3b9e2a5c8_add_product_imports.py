@@ -0,0 +1,53 @@
+"""add_product_imports
+
+Revision ID: f7d3b9e2a5c8
+Revises: e4c8a1d5f3b2
+Create Date: 2026-10-17 18:03:44.671920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d3b9e2a5c8'
+down_revision: Union[str, Sequence[str], None] = 'e4c8a1d5f3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_imports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('mode', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='importstatus'), nullable=False),
+    sa.Column('processed_rows', sa.Integer(), nullable=True),
+    sa.Column('created', sa.Integer(), nullable=True),
+    sa.Column('updated', sa.Integer(), nullable=True),
+    sa.Column('failed', sa.Integer(), nullable=True),
+    sa.Column('errors', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_product_imports_id'), 'product_imports', ['id'], unique=False)
+    op.create_index(op.f('ix_product_imports_tenant_id'), 'product_imports', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_imports_tenant_id'), table_name='product_imports')
+    op.drop_index(op.f('ix_product_imports_id'), table_name='product_imports')
+    op.drop_table('product_imports')
+    sa.Enum(name='importstatus').drop(op.get_bind(), checkfirst=True)
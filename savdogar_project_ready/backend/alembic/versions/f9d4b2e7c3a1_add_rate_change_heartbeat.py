@@ -0,0 +1,28 @@
+"""add_rate_change_heartbeat
+
+Revision ID: f9d4b2e7c3a1
+Revises: e8b3c1f6a4d2
+Create Date: 2026-10-18 12:26:48.904133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9d4b2e7c3a1'
+down_revision: Union[str, Sequence[str], None] = 'e8b3c1f6a4d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('exchange_rate_changes', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('exchange_rate_changes', 'heartbeat_at')
@@ -33,6 +33,7 @@ from app.api.v1.endpoints import (
     products_v2,
     sales_v2,
     customers_v2,
+    promotions,
     tenants,
     labels,
     settings
@@ -74,6 +75,7 @@ api_router.include_router(tenants.router, prefix="/tenants", tags=["tenants"])
 api_router.include_router(products_v2.router, prefix="/v2/products", tags=["products-v2"])
 api_router.include_router(sales_v2.router, prefix="/v2/sales", tags=["sales-v2"])
 api_router.include_router(customers_v2.router, prefix="/v2/customers", tags=["customers-v2"])
+api_router.include_router(promotions.router, prefix="/v2/promotions", tags=["promotions"])
 api_router.include_router(labels.router, prefix="/labels", tags=["labels"])
 api_router.include_router(settings.router, prefix="/settings", tags=["settings"])
 
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.services.ai_service import ai_service
-from app.services.inflation_service import InflationShieldService
+from app.services.inflation_service import InflationShieldService, RepricingInProgress
 from app.api.deps import get_current_user
 from app.models.user import User
+from app.models.pricing import ExchangeRateChange
+from app.models.product_v2 import EmbeddingBackfill
 
 router = APIRouter()
 
@@ -21,22 +23,103 @@ async def get_customer_habits(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _repricing_job(change: ExchangeRateChange) -> dict:
+    return {
+        "job_id": change.id,
+        "status": change.status,
+        "old_rate": change.old_rate,
+        "new_rate": change.new_rate,
+        "reverts_id": change.reverts_id,
+        "total": change.total,
+        "processed": change.processed,
+        "error": change.error,
+        "created_at": change.created_at,
+        "started_at": change.started_at,
+        "finished_at": change.finished_at,
+    }
+
+def _start_repricing(background_tasks: BackgroundTasks, db: Session, user: User, rate: float, reverts_id: int = None):
+    try:
+        change = InflationShieldService.start_repricing(db, user.tenant_id, rate, user.id, reverts_id)
+    except RepricingInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not change:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    background_tasks.add_task(InflationShieldService.run_repricing_job, change.id)
+    return _repricing_job(change)
+
+def _rate_change(db: Session, user: User, change_id: int) -> ExchangeRateChange:
+    change = db.query(ExchangeRateChange).filter(
+        ExchangeRateChange.id == change_id,
+        ExchangeRateChange.tenant_id == user.tenant_id
+    ).first()
+    if not change:
+        raise HTTPException(status_code=404, detail="Kurs o'zgarishi topilmadi")
+    return change
+
 @router.post("/inflation/update-usd-rate")
 async def update_usd_rate(
-    new_rate: float,
+    background_tasks: BackgroundTasks,
+    new_rate: float = Query(..., gt=0),
+    dry_run: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Dollar kursini yangilash va barcha narxlarni avtomatik qayta hisoblash"""
+    """
+    Dollar kursini yangilash va narxlarni fon ishida qayta hisoblash
+    dry_run=true - hech narsa yozilmaydi: o'zgaradigan variantlar soni va namunaviy farqlar
+    """
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="Tenant ID not found")
-        
-    updated_tenant = InflationShieldService.update_tenant_exchange_rate(
-        db, current_user.tenant_id, new_rate
-    )
     
-    if not updated_tenant:
-        raise HTTPException(status_code=404, detail="Tenant not found")
+    if dry_run:
+        return InflationShieldService.preview_repricing(db, current_user.tenant_id, new_rate)
+    return _start_repricing(background_tasks, db, current_user, new_rate)
+
+@router.get("/inflation/jobs/{job_id}")
+async def get_repricing_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Qayta narxlash ishi holati va progressi"""
+    return _repricing_job(_rate_change(db, current_user, job_id))
+
+@router.get("/inflation/rate-history")
+async def get_rate_history(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Dollar kursi o'zgarishlari tarixi (yangilari birinchi)"""
+    changes = db.query(ExchangeRateChange).filter(
+        ExchangeRateChange.tenant_id == current_user.tenant_id
+    ).order_by(ExchangeRateChange.id.desc()).limit(limit).all()
+    return [_repricing_job(change) for change in changes]
+
+@router.post("/inflation/rate-history/{change_id}/replay")
+async def replay_rate_change(
+    change_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Narxlarni shu o'zgarishdagi kurs bilan qayta hisoblash"""
+    change = _rate_change(db, current_user, change_id)
+    return _start_repricing(background_tasks, db, current_user, change.new_rate)
+
+@router.post("/inflation/rate-history/{change_id}/rollback")
+async def rollback_rate_change(
+    change_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """O'zgarishdan oldingi kursga qaytish (narxlar eski kurs bilan qayta hisoblanadi)"""
+    change = _rate_change(db, current_user, change_id)
+    if change.old_rate is None:
+        raise HTTPException(status_code=400, detail="Oldingi kurs noma'lum")
+    return _start_repricing(background_tasks, db, current_user, change.old_rate, reverts_id=change.id)
         
 from app.services.daily_strategy import DailyStrategyService
 from app.services.promo_generator import PromoGeneratorService
@@ -86,6 +169,54 @@ async def semantic_search(
         raise HTTPException(status_code=400, detail="Tenant topilmadi")
     return await ai_service.search_semantic(db, current_user.tenant_id, query)
 
+def _backfill_job(job: EmbeddingBackfill) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "force": job.force,
+        "total": job.total,
+        "scanned": job.scanned,
+        "embedded": job.embedded,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+@router.post("/ai/embeddings/backfill")
+async def backfill_embeddings(
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Variantlar embeddinglarini fon ishida to'ldirish (faqat matni o'zgarganlar)"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    from app.services import embedding_pipeline
+
+    try:
+        job = embedding_pipeline.start_backfill(db, current_user.tenant_id, force, current_user.id)
+    except embedding_pipeline.BackfillInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    background_tasks.add_task(embedding_pipeline.run_backfill_job, job.id)
+    return _backfill_job(job)
+
+@router.get("/ai/embeddings/backfill/{job_id}")
+async def get_backfill_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Embedding backfill ishi holati va progressi"""
+    job = db.query(EmbeddingBackfill).filter(
+        EmbeddingBackfill.id == job_id,
+        EmbeddingBackfill.tenant_id == current_user.tenant_id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Ish topilmadi")
+    return _backfill_job(job)
+
 @router.post("/ai/debt-reminder/{customer_id}")
 async def generate_debt_reminder(
     customer_id: int,
@@ -1,12 +1,20 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, tuple_
 
 from app.api import deps
 from app.models import User
-from app.models.customer_v2 import CustomerV2, CustomerLedger
+from app.models.customer_v2 import CustomerV2, CustomerLedger, CustomerAging, CustomerSegmentRun
+from app.models.pricing import CustomerPriceList, CustomerPriceListItem
+from app.models.product_v2 import ProductVariant
 from app.schemas import customer_v2 as schemas
+from app.services import customer_ledger, customer_segments, ledger_statement, receivables_aging
+from app.services.contract_prices import contract_price_index
+from app.services.customer_lookup import customer_lookup_index
+from app.services.pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
@@ -38,6 +46,9 @@ def create_customer(
     db.commit()
     db.refresh(customer_obj)
     
+    customer_lookup_index.upsert(current_user.tenant_id, customer_obj.id, customer_obj.name, customer_obj.phone)
+    customer_lookup_index.touch(db, current_user.tenant_id)
+    
     return customer_obj
 
 @router.get("/", response_model=List[schemas.Customer])
@@ -57,6 +68,128 @@ def read_customers(
     
     return customers
 
+@router.get("/lookup", response_model=List[schemas.CustomerLookupMatch])
+def lookup_customers(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, description="Telefon (+998 bilan yoki raqam boshi/oxiri) yoki ism"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Kassa uchun mijoz qidiruvi - telefon boshi/oxiri yoki ism bo'yicha
+    Indeks xotirada, balans va daraja topilganlar uchun bazadan olinadi
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    return customer_lookup_index.lookup(db, current_user.tenant_id, q, limit)
+
+@router.get("/aging", response_model=schemas.CustomerAgingPage)
+def read_receivables_aging(
+    db: Session = Depends(deps.get_db),
+    sort: str = Query("total", pattern="^(total|current|days_31_60|days_61_90|days_over_90)$"),
+    cursor: Optional[str] = Query(None, description="Oldingi sahifaning next_cursor qiymati"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Debitorlik qarzlari yosh bo'yicha - tanlangan guruh summasi bo'yicha kamayish
+    tartibida, keyset sahifalash (summa, customer_id). Faqat qarzdor mijozlar.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    receivables_aging.refresh(db, current_user.tenant_id)
+    
+    column = getattr(CustomerAging, sort)
+    query = db.query(CustomerAging, CustomerV2.name, CustomerV2.phone).join(
+        CustomerV2, CustomerV2.id == CustomerAging.customer_id
+    ).filter(CustomerAging.tenant_id == current_user.tenant_id)
+    
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, float, int)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.filter(tuple_(column, CustomerAging.customer_id) < tuple_(last_value, last_id))
+    
+    rows = query.order_by(column.desc(), CustomerAging.customer_id.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(getattr(last, sort), last.customer_id)
+    
+    return schemas.CustomerAgingPage(
+        items=[
+            schemas.CustomerAgingRow(
+                customer_id=aging.customer_id,
+                name=name,
+                phone=phone,
+                current=aging.current,
+                days_31_60=aging.days_31_60,
+                days_61_90=aging.days_61_90,
+                days_over_90=aging.days_over_90,
+                total=aging.total,
+                oldest_debit_at=aging.oldest_debit_at,
+            )
+            for aging, name, phone in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+@router.get("/aging/summary", response_model=schemas.CustomerAgingSummary)
+def read_receivables_aging_summary(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Tenant bo'yicha debitorlik: qarzdorlar soni va 30/60/90+ summalar"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    receivables_aging.refresh(db, current_user.tenant_id)
+    return receivables_aging.summary(db, current_user.tenant_id)
+
+@router.post("/segments", response_model=schemas.CustomerSegmentationRun)
+def run_customer_segmentation(
+    *,
+    db: Session = Depends(deps.get_db),
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Barcha mijozlarni RFM bo'yicha segmentlash va CLV hisoblash (LLM siz, fon ishi)
+    Natija har bir mijozning ai_preferences["rfm"] profiliga yoziladi
+    Progress: GET /segments/runs/{run_id}
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    try:
+        run = customer_segments.start_segmentation(db, current_user.tenant_id, current_user.id)
+    except customer_segments.SegmentationInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    background_tasks.add_task(customer_segments.run_segmentation_job, run.id)
+    return run
+
+@router.get("/segments/runs/{run_id}", response_model=schemas.CustomerSegmentationRun)
+def read_customer_segmentation_run(
+    *,
+    db: Session = Depends(deps.get_db),
+    run_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Segmentlash ishi holati, progress va natija"""
+    run = db.query(CustomerSegmentRun).filter(
+        CustomerSegmentRun.id == run_id,
+        CustomerSegmentRun.tenant_id == current_user.tenant_id
+    ).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Segmentlash ishi topilmadi")
+    
+    return run
+
 @router.get("/{customer_id}/ledger", response_model=List[schemas.CustomerLedgerEntry])
 def read_customer_ledger(
     *,
@@ -64,7 +197,7 @@ def read_customer_ledger(
     customer_id: int,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Mijoz qarz kitobini olish"""
+    """Mijoz qarz kitobini olish (katta tarix uchun /statement dan foydalaning)"""
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="Tenant topilmadi")
     
@@ -85,10 +218,260 @@ def read_customer_ledger(
     
     return ledger
 
+def _get_customer(db: Session, tenant_id: int, customer_id: int) -> CustomerV2:
+    customer = db.query(CustomerV2).filter(
+        and_(
+            CustomerV2.id == customer_id,
+            CustomerV2.tenant_id == tenant_id
+        )
+    ).first()
+    if not customer:
+        raise HTTPException(status_code=404, detail="Mijoz topilmadi")
+    return customer
 
+@router.get("/{customer_id}/statement", response_model=schemas.LedgerStatement)
+def read_customer_statement(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="Oldingi sahifaning next_cursor qiymati"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Hisob-kitob varaqasi - [date_from, date_to) oynasi, (created_at, id) bo'yicha
+    keyset sahifalash. Yig'ma balans, boshlang'ich/yakuniy balans va davr
+    jami SQL da hisoblanadi.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    _get_customer(db, current_user.tenant_id, customer_id)
+    
+    after = None
+    if cursor:
+        try:
+            after = tuple(decode_cursor(cursor, datetime, int, float))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    totals = ledger_statement.summary(db, customer_id, date_from, date_to)
+    rows, next_after = ledger_statement.page(
+        db, customer_id, date_from, date_to, totals["opening_balance"], after=after, limit=limit
+    )
+    
+    return schemas.LedgerStatement(
+        customer_id=customer_id,
+        date_from=date_from,
+        date_to=date_to,
+        items=rows,
+        next_cursor=encode_cursor(*next_after) if next_after else None,
+        **totals,
+    )
 
+@router.get("/{customer_id}/statement/csv")
+def export_customer_statement(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """To'liq hisob-kitob varaqasi CSV - oqim sifatida (buxgalteriya uchun)"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    _get_customer(db, current_user.tenant_id, customer_id)
+    totals = ledger_statement.summary(db, customer_id, date_from, date_to)
+    
+    return StreamingResponse(
+        ledger_statement.iter_csv(db, customer_id, date_from, date_to, totals),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="statement-{customer_id}.csv"'},
+    )
 
+@router.post("/{customer_id}/payments", response_model=schemas.CustomerLedgerEntry)
+def create_customer_payment(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    payment_in: schemas.CustomerPaymentCreate,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Mijoz to'lovini qabul qilish - qarz kitobiga kredit yozuvi"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    _get_customer(db, current_user.tenant_id, customer_id)
+    
+    (ledger_id,) = customer_ledger.post_entries(db, current_user.tenant_id, [dict(
+        customer_id=customer_id,
+        debit=0.0,
+        credit=payment_in.amount,
+        description=payment_in.description or f"To'lov ({payment_in.payment_method.value})",
+        reference_number=payment_in.reference_number,
+        created_by=current_user.id,
+    )])
+    db.commit()
+    
+    return db.get(CustomerLedger, ledger_id)
 
+@router.get("/{customer_id}/balance", response_model=schemas.CustomerBalance)
+def read_customer_balance(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    at: Optional[datetime] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Mijoz balansi - joriy yoki berilgan sanadagi (nazorat nuqtasi + dum)"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    customer = _get_customer(db, current_user.tenant_id, customer_id)
+    
+    if at is None:
+        return schemas.CustomerBalance(customer_id=customer_id, balance=customer.balance, at=datetime.utcnow())
+    return schemas.CustomerBalance(
+        customer_id=customer_id,
+        balance=customer_ledger.balance_as_of(db, customer_id, at),
+        at=at,
+    )
+
+@router.get("/{customer_id}/segment", response_model=schemas.CustomerSegment)
+async def read_customer_segment(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    narrative: bool = Query(False, description="AI xulosa matni (so'ralganda bir marta yoziladi)"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Mijozning RFM segmenti va CLV; narrative=true bo'lsa AI xulosasi bilan"""
+    customer = db.query(CustomerV2).filter(
+        CustomerV2.id == customer_id,
+        CustomerV2.tenant_id == current_user.tenant_id
+    ).first()
+    if not customer:
+        raise HTTPException(status_code=404, detail="Mijoz topilmadi")
+    
+    preferences = customer.ai_preferences or {}
+    profile = preferences.get(customer_segments.PROFILE_KEY)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Mijoz hali segmentlanmagan")
+    
+    if narrative and not profile.get("narrative"):
+        try:
+            text = await customer_segments.describe(customer.name, profile)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        profile = {**profile, "narrative": text}
+        customer_segments.set_narrative(db, customer.id, profile["as_of"], text)
+    
+    return schemas.CustomerSegment(customer_id=customer.id, **profile)
 
+@router.post("/{customer_id}/price-lists", response_model=schemas.ContractPriceList)
+def create_price_list(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    price_list_in: schemas.ContractPriceListCreate,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Mijoz bilan kelishilgan narxlar ro'yxatini yaratish"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    _get_customer(db, current_user.tenant_id, customer_id)
+    
+    if price_list_in.valid_from and price_list_in.valid_to and price_list_in.valid_to <= price_list_in.valid_from:
+        raise HTTPException(status_code=400, detail="valid_to valid_from dan keyin bo'lishi kerak")
+    
+    prices = {item.variant_id: item.price for item in price_list_in.items}
+    if len(prices) != len(price_list_in.items):
+        raise HTTPException(status_code=400, detail="Variantlar takrorlanmasligi kerak")
+    
+    # Variantlarni bitta so'rov bilan tekshirish
+    found = {
+        variant_id for (variant_id,) in db.query(ProductVariant.id).filter(
+            and_(
+                ProductVariant.id.in_(prices),
+                ProductVariant.tenant_id == current_user.tenant_id
+            )
+        )
+    }
+    missing = sorted(set(prices) - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Variantlar topilmadi: {missing}")
+    
+    price_list = CustomerPriceList(
+        tenant_id=current_user.tenant_id,
+        customer_id=customer_id,
+        name=price_list_in.name,
+        valid_from=price_list_in.valid_from,
+        valid_to=price_list_in.valid_to,
+        is_active=True,
+        items=[CustomerPriceListItem(variant_id=variant_id, price=price) for variant_id, price in prices.items()],
+    )
+    db.add(price_list)
+    db.commit()
+    db.refresh(price_list)
+    
+    # Shartnoma narxlari indeksini yangilash
+    contract_price_index.invalidate(db, current_user.tenant_id)
+    
+    return price_list
 
+@router.get("/{customer_id}/price-lists", response_model=List[schemas.ContractPriceList])
+def read_price_lists(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Mijozning shartnoma narxlari ro'yxatlari"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    _get_customer(db, current_user.tenant_id, customer_id)
+    
+    return db.query(CustomerPriceList).options(
+        selectinload(CustomerPriceList.items)
+    ).filter(
+        and_(
+            CustomerPriceList.customer_id == customer_id,
+            CustomerPriceList.tenant_id == current_user.tenant_id
+        )
+    ).order_by(CustomerPriceList.id.desc()).all()
 
+@router.delete("/{customer_id}/price-lists/{price_list_id}")
+def deactivate_price_list(
+    *,
+    db: Session = Depends(deps.get_db),
+    customer_id: int,
+    price_list_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Shartnoma narxlari ro'yxatini o'chirish (faolsizlantirish)"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    price_list = db.query(CustomerPriceList).filter(
+        and_(
+            CustomerPriceList.id == price_list_id,
+            CustomerPriceList.customer_id == customer_id,
+            CustomerPriceList.tenant_id == current_user.tenant_id
+        )
+    ).first()
+    
+    if not price_list:
+        raise HTTPException(status_code=404, detail="Narxlar ro'yxati topilmadi")
+    
+    price_list.is_active = False
+    db.commit()
+    
+    contract_price_index.invalidate(db, current_user.tenant_id)
+    
+    return {"message": "Narxlar ro'yxati o'chirildi"}
@@ -7,9 +7,13 @@ from app.api import deps
 from app.models import Product, Category, User
 from app.schemas import product as product_schema
 from app.services.ai_category_detector import detect_product_category
+from app.services.search_index import legacy_product_search_index
 
 router = APIRouter()
 
+# Kategoriya filtri bilan qidiruvda ko'rib chiqiladigan nomzodlar
+SEARCH_CANDIDATES = 1000
+
 @router.get("/", response_model=List[product_schema.Product])
 def read_products(
     db: Session = Depends(deps.get_db),
@@ -29,6 +33,16 @@ def read_products(
     
     if category_id:
         query = query.filter(Product.category_id == category_id)
+    if search and organization_id is not None:
+        # Trigram indeks bo'yicha tartiblangan natijalar (ILIKE '%...%' o'rniga)
+        ranked_limit = skip + limit if not category_id else max(skip + limit, SEARCH_CANDIDATES)
+        ranked_ids = [
+            product_id for product_id, _ in
+            legacy_product_search_index.search(db, organization_id, search, limit=ranked_limit)
+        ]
+        products = {product.id: product for product in query.filter(Product.id.in_(ranked_ids)).all()}
+        ordered = [products[product_id] for product_id in ranked_ids if product_id in products]
+        return ordered[skip:skip + limit]
     if search:
         query = query.filter(Product.name.ilike(f"%{search}%"))
     products = query.offset(skip).limit(limit).all()
@@ -49,6 +63,7 @@ def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    legacy_product_search_index.upsert(organization_id, product.id, product.name)
     return product
 
 @router.get("/{id}", response_model=product_schema.Product)
@@ -98,6 +113,7 @@ def update_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    legacy_product_search_index.upsert(product.organization_id, product.id, product.name)
     return product
 
 @router.delete("/{id}")
@@ -118,8 +134,10 @@ def delete_product(
     product = query.first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    product_organization_id = product.organization_id
     db.delete(product)
     db.commit()
+    legacy_product_search_index.remove(product_organization_id, id)
     return {"message": "Product deleted"}
 
 @router.post("/generate-barcode")
@@ -1,13 +1,28 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import heapq
+import os
+import shutil
+import uuid
+from typing import Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Header, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_
 
 from app.api import deps
+from app.core.config import settings
 from app.models import User
-from app.models.product_v2 import ProductV2, ProductVariant, ProductType
+from app.models.product_v2 import ProductV2, ProductVariant, ProductType, ProductImport, ImportStatus
 from app.models.pricing import PriceTier
 from app.schemas import product_v2 as schemas
+from app.services import catalog_service, catalog_snapshot, catalog_sync, product_import
+from app.services.barcode_index import barcode_index
+from app.services.facet_index import facet_index
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.price_tier_index import price_tier_index
+from app.services.recipe_compiler import compile_recipe_book, recipe_cache
+from app.services.search_index import product_search_index
+from app.services.tenant_cache import invalidate_caches
+from app.services.vector_index import vector_index
 
 router = APIRouter()
 
@@ -76,13 +91,31 @@ def create_product(
         )
         db.add(variant_obj)
     
+    db.flush()
+    variant_ids = [
+        variant_id for (variant_id,) in db.query(ProductVariant.id).filter(
+            ProductVariant.product_id == product_obj.id
+        ).all()
+    ]
+    catalog_sync.record_changes(db, current_user.tenant_id, [(catalog_sync.PRODUCT, product_obj.id, False)] + [
+        (catalog_sync.VARIANT, variant_id, False) for variant_id in variant_ids
+    ])
     db.commit()
     db.refresh(product_obj)
     
+    # Yangi variantlar boshqa retseptlarda ingredient bo'lishi mumkin
+    invalidate_caches(db, current_user.tenant_id, recipe_cache, barcode_index)
+    product_search_index.upsert(current_user.tenant_id, product_obj.id, product_obj.name)
+    product_search_index.touch(db, current_user.tenant_id)
+    
     # Variantlarni yuklash
     product_obj.variants = db.query(ProductVariant).filter(
         ProductVariant.product_id == product_obj.id
     ).all()
+    facet_index.upsert(current_user.tenant_id, [
+        (variant.id, variant.attributes) for variant in product_obj.variants if variant.is_active
+    ])
+    facet_index.touch(db, current_user.tenant_id)
     
     return product_obj
 
@@ -93,22 +126,317 @@ def read_products(
     limit: int = 100,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Mahsulotlarni olish"""
+    """Mahsulotlarni olish (kassalar uchun /catalog dan foydalaning)"""
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="Tenant topilmadi")
     
-    products = db.query(ProductV2).filter(
+    # Variantlar bitta IN so'rovi bilan yuklanadi
+    products = db.query(ProductV2).options(selectinload(ProductV2.variants)).filter(
         ProductV2.tenant_id == current_user.tenant_id
-    ).offset(skip).limit(limit).all()
-    
-    # Variantlarni yuklash
-    for product in products:
-        product.variants = db.query(ProductVariant).filter(
-            ProductVariant.product_id == product.id
-        ).all()
+    ).order_by(ProductV2.id).offset(skip).limit(limit).all()
     
     return products
 
+@router.get("/catalog", response_model=schemas.CatalogPage, response_model_exclude_unset=True)
+def read_catalog(
+    db: Session = Depends(deps.get_db),
+    cursor: Optional[str] = Query(None, description="Oldingi sahifaning next_cursor qiymati"),
+    limit: int = Query(200, ge=1, le=1000),
+    include: Optional[str] = Query(None, description="Og'ir maydonlar: description,metadata,attributes"),
+    category_id: Optional[int] = None,
+    active_only: bool = True,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Kassalar uchun katalog - keyset sahifalash va ustunlar proyeksiyasi
+    Sahifa uchun ikki so'rov: mahsulotlar va ularning variantlari (IN).
+    embedding_vector va retsept hech qachon yuklanmaydi.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    # Versiya ma'lumotlardan oldin o'qiladi - keyingi o'zgarishlar delta da keladi
+    version = catalog_sync.current_version(db, current_user.tenant_id)
+    
+    include_fields = {field.strip() for field in include.split(",") if field.strip()} if include else set()
+    unknown = include_fields - schemas.CATALOG_HEAVY_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Noma'lum maydonlar: {', '.join(sorted(unknown))}")
+    
+    after_id = None
+    if cursor:
+        try:
+            (after_id,) = decode_cursor(cursor, int)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    products = catalog_service.load_catalog_page(
+        db,
+        tenant_id=current_user.tenant_id,
+        after_id=after_id,
+        limit=limit,
+        include=include_fields,
+        active_only=active_only,
+        category_id=category_id,
+    )
+    
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor(products[-1]["id"])
+    
+    return schemas.CatalogPage(
+        items=[schemas.CatalogProduct(**product) for product in products],
+        next_cursor=next_cursor,
+        version=version,
+    )
+
+@router.get("/changes", response_model=schemas.CatalogChanges, response_model_exclude_unset=True)
+def read_catalog_changes(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    since: int = Query(0, ge=0, description="Kassadagi katalog versiyasi"),
+    limit: int = Query(1000, ge=1, le=5000),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Delta sinxronizatsiya - since versiyadan keyingi o'zgarishlar
+    Faqat o'zgargan mahsulotlar, variantlar, narx darajalari va o'chirilganlar
+    ro'yxati qaytadi. O'zgarish bo'lmasa If-None-Match bilan 304.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    version = catalog_sync.current_version(db, current_user.tenant_id)
+    etag = catalog_sync.changes_etag(current_user.tenant_id, since, version, limit)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    if since >= version:
+        # Kassa eng oxirgi versiyada - jurnalni o'qish shart emas
+        return {"version": since, "has_more": False}
+    return catalog_sync.load_changes(db, current_user.tenant_id, since, limit)
+
+@router.get("/snapshot")
+def download_catalog_snapshot(
+    db: Session = Depends(deps.get_db),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Kassani ishga tushirish uchun katalog tasviri (MessagePack + gzip, ustunli)
+    Katalog versiyasi uchun bir marta quriladi va diskdan beriladi.
+    Range/If-Range qo'llab-quvvatlanadi - uzilgan yuklab olish davom ettiriladi.
+    Keyingi o'zgarishlar: /changes?since=<X-Catalog-Version>
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    path, version = catalog_snapshot.get_snapshot(db, current_user.tenant_id)
+    headers = {
+        "ETag": catalog_snapshot.snapshot_etag(current_user.tenant_id, version),
+        "X-Catalog-Version": str(version),
+        "Cache-Control": "private, no-cache",
+    }
+    if if_none_match == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return FileResponse(
+        path,
+        media_type=catalog_snapshot.MEDIA_TYPE,
+        filename=os.path.basename(path),
+        headers=headers,
+    )
+
+@router.get("/facets", response_model=schemas.FacetSearchResult, response_model_exclude_unset=True)
+def facet_search(
+    db: Session = Depends(deps.get_db),
+    attr: List[str] = Query([], description="Filtr atribut:qiymat, masalan attr=size:XL&attr=color:Red"),
+    cursor: Optional[str] = Query(None, description="Oldingi sahifaning next_cursor qiymati"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Variant atributlari bo'yicha fasetli filtr
+    Variantlar va sanoqlar bitta manbadan - tenant faset indeksidan olinadi
+    (barcha bazalarda bir xil yo'l); bir atributning bir nechta qiymati - YOKI.
+    Bazadan faqat sahifadagi variantlar ID bo'yicha o'qiladi.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    filters = {}
+    for item in attr:
+        key, sep, value = item.partition(":")
+        if not sep or not key.strip() or not value.strip():
+            raise HTTPException(status_code=400, detail=f"Noto'g'ri filtr: {item} (atribut:qiymat)")
+        filters.setdefault(key.strip(), set()).add(value.strip())
+    filters = {key: tuple(sorted(values)) for key, values in filters.items()}
+    
+    after_id = None
+    if cursor:
+        try:
+            (after_id,) = decode_cursor(cursor, int)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    facets = facet_index.get(db, current_user.tenant_id)
+    counts = facets.counts(filters)
+    
+    columns = dict(catalog_service.VARIANT_COLUMNS, **catalog_service.VARIANT_HEAVY_COLUMNS)
+    query = db.query(*columns.values()).filter(
+        ProductVariant.tenant_id == current_user.tenant_id,
+        ProductVariant.is_active == True
+    )
+    names = list(columns)
+    next_cursor = None
+    if filters:
+        matched = facets.matching(filters)
+        if after_id is not None:
+            matched = [variant_id for variant_id in matched if variant_id > after_id]
+        page_ids = heapq.nsmallest(limit + 1, matched)
+        if len(page_ids) > limit:
+            page_ids = page_ids[:limit]
+            next_cursor = encode_cursor(page_ids[-1])
+        rows = [
+            dict(zip(names, row))
+            for row in query.filter(ProductVariant.id.in_(page_ids)).order_by(ProductVariant.id)
+        ]
+    else:
+        if after_id is not None:
+            query = query.filter(ProductVariant.id > after_id)
+        rows = [dict(zip(names, row)) for row in query.order_by(ProductVariant.id).limit(limit + 1)]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["id"])
+    for row in rows:
+        row["barcode_aliases"] = row["barcode_aliases"] or []
+    
+    return schemas.FacetSearchResult(
+        items=[schemas.CatalogVariant(**row) for row in rows],
+        next_cursor=next_cursor,
+        total=counts["total"],
+        facets={
+            key: [schemas.FacetValue(value=value, count=count) for value, count in values]
+            for key, values in counts["facets"].items()
+        },
+    )
+
+@router.get("/search", response_model=List[schemas.ProductSearchHit])
+def search_products(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Typeahead - nom bo'yicha xatolarga chidamli qidiruv
+    Lotin va kirill yozuvlari bir xil topiladi (trigram indeks, tenant bo'yicha)
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    index = product_search_index.get(db, current_user.tenant_id)
+    return [
+        {"id": product_id, "name": index.names[product_id], "score": score}
+        for product_id, score in index.search(q, limit)
+        if product_id in index.names
+    ]
+
+@router.get("/barcode/{code}", response_model=schemas.BarcodeMatch)
+def resolve_barcode(
+    *,
+    db: Session = Depends(deps.get_db),
+    code: str,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Skaner: shtrix-kod yoki SKU bo'yicha variant
+    Xotiradagi indeksdan (tenant bo'yicha, boshqa worker yozuvlaridan keyin qayta quriladi)
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    snapshot = barcode_index.resolve(db, current_user.tenant_id, code)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Mahsulot topilmadi")
+    
+    return snapshot.to_dict()
+
+@router.post("/import", response_model=schemas.ProductImportJob)
+def import_products(
+    *,
+    db: Session = Depends(deps.get_db),
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    mode: str = Query(product_import.MODE_UPSERT, pattern="^(upsert|insert)$"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Mahsulotlarni CSV/XLSX fayldan ommaviy import qilish (fon ishi)
+    Har bir qator - variant: name, sku, price (+ cost_price, stock_quantity,
+    barcode, category_id, tax_rate, description, attr:<kalit>, tier:<min_miqdor>)
+    mode=upsert - mavjud SKU yangilanadi, mode=insert - xato sifatida qaytariladi
+    Progress: GET /imports/{import_id}
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    filename = os.path.basename(file.filename or "")
+    if os.path.splitext(filename)[1].lower() not in (".csv", ".txt", ".xlsx", ".xlsm"):
+        raise HTTPException(status_code=400, detail="Faqat CSV yoki XLSX fayl qabul qilinadi")
+    
+    # Fayl diskka oqim bilan yoziladi - fon ishi uni qatorma-qator o'qiydi
+    directory = os.path.join(settings.UPLOAD_DIR, "imports")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}{os.path.splitext(filename)[1].lower()}")
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file.file, out, 1024 * 1024)
+    
+    job = ProductImport(
+        tenant_id=current_user.tenant_id,
+        filename=filename,
+        mode=mode,
+        status=ImportStatus.PENDING,
+        processed_rows=0,
+        created=0,
+        updated=0,
+        failed=0,
+        errors=[],
+        created_by=current_user.id,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    background_tasks.add_task(product_import.run_import_job, job.id, path)
+    return job
+
+@router.get("/imports/{import_id}", response_model=schemas.ProductImportJob)
+def read_import(
+    *,
+    db: Session = Depends(deps.get_db),
+    import_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Import ishi holati, progress va qatorlar xatolari"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    job = db.query(ProductImport).filter(
+        and_(
+            ProductImport.id == import_id,
+            ProductImport.tenant_id == current_user.tenant_id
+        )
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import topilmadi")
+    
+    return job
+
 @router.get("/{product_id}", response_model=schemas.Product)
 def read_product(
     *,
@@ -120,7 +448,7 @@ def read_product(
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="Tenant topilmadi")
     
-    product = db.query(ProductV2).filter(
+    product = db.query(ProductV2).options(selectinload(ProductV2.variants)).filter(
         and_(
             ProductV2.id == product_id,
             ProductV2.tenant_id == current_user.tenant_id
@@ -130,10 +458,6 @@ def read_product(
     if not product:
         raise HTTPException(status_code=404, detail="Mahsulot topilmadi")
     
-    product.variants = db.query(ProductVariant).filter(
-        ProductVariant.product_id == product.id
-    ).all()
-    
     return product
 
 @router.post("/variants/{variant_id}/price-tiers", response_model=schemas.PriceTier)
@@ -169,15 +493,155 @@ def create_price_tier(
         customer_group=tier_in.customer_group,
     )
     db.add(tier_obj)
+    db.flush()
+    catalog_sync.record_changes(db, current_user.tenant_id, [(catalog_sync.PRICE_TIER, tier_obj.id, False)])
     db.commit()
     db.refresh(tier_obj)
     
+    # Narx indeksini yangilash
+    price_tier_index.invalidate(db, current_user.tenant_id)
+    
     return tier_obj
 
+@router.delete("/price-tiers/{tier_id}")
+def delete_price_tier(
+    *,
+    db: Session = Depends(deps.get_db),
+    tier_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Narx darajasini o'chirish"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    tier = db.query(PriceTier).filter(
+        and_(
+            PriceTier.id == tier_id,
+            PriceTier.tenant_id == current_user.tenant_id
+        )
+    ).first()
+    
+    if not tier:
+        raise HTTPException(status_code=404, detail="Narx darajasi topilmadi")
+    
+    db.delete(tier)
+    catalog_sync.record_changes(db, current_user.tenant_id, [(catalog_sync.PRICE_TIER, tier_id, True)])
+    db.commit()
+    
+    price_tier_index.invalidate(db, current_user.tenant_id)
+    
+    return {"message": "Narx darajasi o'chirildi"}
 
+@router.delete("/{product_id}")
+def deactivate_product(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Mahsulotni o'chirish (nofaol qilish)
+    Sotuvlar tarixi saqlanadi, kassalarga o'chirilgan deb yuboriladi
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    product = db.query(ProductV2).filter(
+        and_(
+            ProductV2.id == product_id,
+            ProductV2.tenant_id == current_user.tenant_id
+        )
+    ).first()
+    
+    if not product:
+        raise HTTPException(status_code=404, detail="Mahsulot topilmadi")
+    
+    product.is_active = False
+    variant_ids = [
+        variant_id for (variant_id,) in db.query(ProductVariant.id).filter(
+            ProductVariant.product_id == product.id
+        ).all()
+    ]
+    db.query(ProductVariant).filter(ProductVariant.product_id == product.id).update(
+        {"is_active": False}, synchronize_session=False
+    )
+    catalog_sync.record_changes(db, current_user.tenant_id, [(catalog_sync.PRODUCT, product.id, True)] + [
+        (catalog_sync.VARIANT, variant_id, True) for variant_id in variant_ids
+    ])
+    db.commit()
+    
+    barcode_index.invalidate(db, current_user.tenant_id)
+    product_search_index.remove(current_user.tenant_id, product.id)
+    facet_index.remove(current_user.tenant_id, variant_ids)
+    for variant_id in variant_ids:
+        vector_index.remove(current_user.tenant_id, variant_id)
+    for cache in (product_search_index, facet_index, vector_index):
+        cache.touch(db, current_user.tenant_id)
+    
+    return {"message": "Mahsulot o'chirildi"}
 
-
-
-
-
-
+@router.put("/{product_id}/recipe")
+def update_recipe(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    recipe_in: schemas.RecipeUpdate,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retseptni yangilash (Kitchen/Cafe)
+    Ichki retseptlar yoyiladi, sikl bo'lsa rad etiladi
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    product = db.query(ProductV2).filter(
+        and_(
+            ProductV2.id == product_id,
+            ProductV2.tenant_id == current_user.tenant_id
+        )
+    ).first()
+    
+    if not product:
+        raise HTTPException(status_code=404, detail="Mahsulot topilmadi")
+    
+    # Ingredientlar shu tenant ga tegishli bo'lishi kerak
+    ingredient_ids = {ing.id for ing in recipe_in.ingredients}
+    if ingredient_ids:
+        found = {
+            variant_id for (variant_id,) in db.query(ProductVariant.id).filter(
+                and_(
+                    ProductVariant.id.in_(ingredient_ids),
+                    ProductVariant.tenant_id == current_user.tenant_id
+                )
+            ).all()
+        }
+        missing = sorted(ingredient_ids - found)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Ingredient variantlar topilmadi: {missing}")
+    
+    product.recipe = {"ingredients": [ing.dict() for ing in recipe_in.ingredients]}
+    db.flush()
+    
+    # Yangi retsept bilan kompilyatsiya - sikl bo'lsa saqlamaymiz
+    book = compile_recipe_book(db, current_user.tenant_id)
+    variant_ids = [
+        variant_id for (variant_id,) in db.query(ProductVariant.id).filter(
+            ProductVariant.product_id == product.id
+        ).all()
+    ]
+    for variant_id in variant_ids:
+        if variant_id in book.cycles:
+            db.rollback()
+            path = " -> ".join(str(v) for v in book.cycles[variant_id])
+            raise HTTPException(status_code=400, detail=f"Retseptda sikl: {path}")
+    
+    db.commit()
+    recipe_cache.invalidate(db, current_user.tenant_id)
+    recipe_cache.put(db, current_user.tenant_id, book)
+    
+    return {
+        "product_id": product.id,
+        "recipe": product.recipe,
+        "ingredients": {variant_id: book.compiled.get(variant_id, {}) for variant_id in variant_ids},
+    }
@@ -0,0 +1,121 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+
+from app.api import deps
+from app.models import User
+from app.models.product_v2 import ProductV2, ProductVariant
+from app.models.promotion import Promotion
+from app.schemas import promotion as schemas
+from app.services.promotion_engine import NEVER, promotion_engine
+
+router = APIRouter()
+
+@router.post("/", response_model=schemas.Promotion)
+def create_promotion(
+    *,
+    db: Session = Depends(deps.get_db),
+    promotion_in: schemas.PromotionCreate,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Aksiya yaratish (happy hour, X+Y, kategoriya chegirmasi)"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    if promotion_in.variant_id is not None:
+        variant = db.query(ProductVariant.id).filter(
+            and_(
+                ProductVariant.id == promotion_in.variant_id,
+                ProductVariant.tenant_id == current_user.tenant_id
+            )
+        ).first()
+        if not variant:
+            raise HTTPException(status_code=404, detail="Variant topilmadi")
+    
+    if promotion_in.category_id is not None:
+        # Kategoriyalar umumiy - tenant mahsulotlarida ishlatilganlari uniki hisoblanadi
+        category = db.query(ProductV2.id).filter(
+            and_(
+                ProductV2.category_id == promotion_in.category_id,
+                ProductV2.tenant_id == current_user.tenant_id
+            )
+        ).first()
+        if not category:
+            raise HTTPException(status_code=404, detail="Kategoriya topilmadi")
+    
+    promotion = Promotion(
+        tenant_id=current_user.tenant_id,
+        is_active=True,
+        **promotion_in.model_dump(),
+    )
+    db.add(promotion)
+    db.commit()
+    db.refresh(promotion)
+    
+    # Aksiyalar to'plamini qayta kompilyatsiya qilish
+    promotion_engine.invalidate(db, current_user.tenant_id)
+    
+    return promotion
+
+@router.get("/", response_model=List[schemas.Promotion])
+def read_promotions(
+    db: Session = Depends(deps.get_db),
+    include_inactive: bool = False,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Aksiyalar ro'yxati"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    query = db.query(Promotion).filter(Promotion.tenant_id == current_user.tenant_id)
+    if not include_inactive:
+        query = query.filter(Promotion.is_active == True)
+    return query.order_by(Promotion.id.desc()).all()
+
+@router.get("/active", response_model=schemas.ActivePromotions)
+def read_active_promotions(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Hozir amal qilayotgan aksiyalar va keyingi o'zgarish vaqti"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    active = promotion_engine.active(db, current_user.tenant_id)
+    rules = [rule for rules in active.by_variant.values() for rule in rules]
+    rules += [rule for rules in active.by_category.values() for rule in rules]
+    rules += active.global_rules
+    return {
+        "compiled_at": active.compiled_at,
+        "valid_until": None if active.valid_until == NEVER else active.valid_until,
+        "promotion_ids": sorted(rule.id for rule in rules),
+    }
+
+@router.delete("/{promotion_id}")
+def deactivate_promotion(
+    *,
+    db: Session = Depends(deps.get_db),
+    promotion_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Aksiyani to'xtatish"""
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    promotion = db.query(Promotion).filter(
+        and_(
+            Promotion.id == promotion_id,
+            Promotion.tenant_id == current_user.tenant_id
+        )
+    ).first()
+    
+    if not promotion:
+        raise HTTPException(status_code=404, detail="Aksiya topilmadi")
+    
+    promotion.is_active = False
+    db.commit()
+    
+    promotion_engine.invalidate(db, current_user.tenant_id)
+    
+    return {"message": "Aksiya to'xtatildi"}
@@ -16,6 +16,7 @@ from app.schemas.receipt import (
     ReceiptConfirmRequest, ScannedReceiptResponse, ReceiptHistoryItem
 )
 from app.services.openai_service import openai_service
+from app.services.search_index import find_product_by_name, legacy_product_search_index
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -132,10 +133,7 @@ async def upload_receipt(
                 if not product_name:
                     continue
                     
-                matched_product = db.query(Product).filter(
-                    Product.name.ilike(f"%{product_name}%"),
-                    Product.organization_id == organization_id
-                ).first()
+                matched_product = find_product_by_name(db, organization_id, product_name)
                 
                 # Safely convert values to float
                 quantity = float(item_data.get("quantity", 1.0) or 1.0)
@@ -295,10 +293,7 @@ def confirm_receipt(
             if not product:
                 # Get organization_id (already have org_id from above, reuse it)
                 # Check if product with same name already exists (within same organization)
-                existing_product = db.query(Product).filter(
-                    Product.name.ilike(f"%{item_data.name}%"),
-                    Product.organization_id == org_id
-                ).first()
+                existing_product = find_product_by_name(db, org_id, item_data.name, database_fallback=True)
                 
                 if existing_product:
                     # Use existing product
@@ -316,6 +311,8 @@ def confirm_receipt(
                     )
                     db.add(product)
                     db.flush()
+                    # Shu chekdagi keyingi qatorlar yangi mahsulotni topishi uchun
+                    legacy_product_search_index.upsert(org_id, product.id, product.name)
                     created_products.append({
                         "id": product.id,
                         "name": product.name,
@@ -1,11 +1,13 @@
 from typing import Any
+from html import escape
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.models import Sale, SaleItem, Product, User
-from app.services.qr_service import generate_qr_code, generate_receipt_id, verify_receipt_id
+from app.services.cache import get_cache_key, get_cached, set_cached
+from app.services.qr_service import generate_qr_code, generate_receipt_id, generate_sale_qr, parse_receipt_id
 
 router = APIRouter()
 
@@ -33,23 +35,10 @@ def get_sale_qr(
 # Public verification endpoint (no auth required)
 public_router = APIRouter()
 
-@public_router.get("/{receipt_id}", response_class=HTMLResponse)
-def verify_receipt(
-    *,
-    db: Session = Depends(deps.get_db),
-    receipt_id: str,
-) -> HTMLResponse:
-    """Public page to verify receipt."""
-    # Find sale by receipt_id
-    sales = db.query(Sale).all()
-    sale = None
-    for s in sales:
-        if verify_receipt_id(receipt_id, s.id):
-            sale = s
-            break
-    
-    if not sale:
-        return HTMLResponse(content="""
+# Legacy sales are immutable, so a rendered page can be reused
+RECEIPT_PAGE_TTL_SECONDS = 3600
+
+RECEIPT_NOT_FOUND_HTML = """
         <!DOCTYPE html>
         <html>
         <head>
@@ -68,14 +57,14 @@ def verify_receipt(
             </div>
         </body>
         </html>
-        """, status_code=404)
-    
-    # Get sale items
-    items = db.query(SaleItem).filter(SaleItem.sale_id == sale.id).all()
+        """
+
+
+def render_receipt_page(sale: Sale, rows) -> str:
+    """Render the verified receipt page. rows: [(SaleItem, product name)]"""
     items_html = ""
-    for item in items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        name = product.name if product else "Noma'lum"
+    for item, product_name in rows:
+        name = escape(product_name) if product_name else "Noma'lum"
         items_html += f"""
         <tr>
             <td style="padding: 8px; border-bottom: 1px solid #eee;">{name}</td>
@@ -85,7 +74,7 @@ def verify_receipt(
         </tr>
         """
     
-    return HTMLResponse(content=f"""
+    return f"""
     <!DOCTYPE html>
     <html>
     <head>
@@ -134,4 +123,40 @@ def verify_receipt(
         </div>
     </body>
     </html>
-    """)
+    """
+
+
+@public_router.get("/{receipt_id}", response_class=HTMLResponse)
+def verify_receipt(
+    *,
+    db: Session = Depends(deps.get_db),
+    receipt_id: str,
+) -> HTMLResponse:
+    """
+    Public page to verify receipt.
+    The receipt ID is decoded and HMAC-checked first, so invalid IDs never
+    reach the database and valid ones cost a single primary key lookup.
+    """
+    sale_id = parse_receipt_id(receipt_id)
+    if sale_id is None:
+        return HTMLResponse(content=RECEIPT_NOT_FOUND_HTML, status_code=404)
+    
+    cache_key = get_cache_key("receipt_page", sale_id)
+    content = get_cached(cache_key)
+    if content is None:
+        sale = db.query(Sale).filter(Sale.id == sale_id).first()
+        if not sale:
+            return HTMLResponse(content=RECEIPT_NOT_FOUND_HTML, status_code=404)
+        
+        # Items and product names in one query
+        rows = db.query(SaleItem, Product.name).outerjoin(
+            Product, Product.id == SaleItem.product_id
+        ).filter(SaleItem.sale_id == sale.id).order_by(SaleItem.id).all()
+        
+        content = render_receipt_page(sale, rows)
+        set_cached(cache_key, content, ttl_seconds=RECEIPT_PAGE_TTL_SECONDS)
+    
+    return HTMLResponse(
+        content=content,
+        headers={"Cache-Control": f"public, max-age={RECEIPT_PAGE_TTL_SECONDS}"},
+    )
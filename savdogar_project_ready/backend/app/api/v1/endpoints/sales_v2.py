@@ -1,16 +1,23 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, func, insert, tuple_
+from sqlalchemy.exc import IntegrityError
 from decimal import Decimal
+from datetime import datetime, timezone
 
 from app.api import deps
 from app.models import User
 from app.models.product_v2 import ProductVariant, ProductV2
-from app.models.pricing import PriceTier, PriceTierType
-from app.models.customer_v2 import CustomerV2, CustomerTier
+from app.models.customer_v2 import CustomerV2
 from app.models.sale_v2 import SaleV2, SaleItemV2, PaymentMethod, SaleStatus
+from app.models.tenant import BusinessType
 from app.schemas import sale_v2 as schemas
+from app.services import cart_pricing, customer_ledger, stock_service
+from app.services.barcode_index import barcode_index
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.receipt_numbers import receipt_allocator
+from app.services.recipe_compiler import RecipeCycleError, recipe_cache
 
 router = APIRouter()
 
@@ -19,148 +26,22 @@ def calculate_cart_total(
     tenant_id: int,
     items: List[schemas.CartItem],
     customer_id: Optional[int] = None,
+    context: Optional[cart_pricing.PricingContext] = None,
+    check_stock: bool = True,
 ) -> schemas.CartCalculationResult:
     """
     Savatcha jami summasini hisoblash
     PriceTiers ni tekshiradi va eng yaxshi narxni tanlaydi
+    Ma'lumotlar bir martada yuklanadi (qatorlar soniga bog'liq emas)
     """
-    subtotal = 0.0
-    tax_amount = 0.0
-    discount_amount = 0.0
-    item_details = []
-    applied_tiers = []
-    
-    # Mijoz ma'lumotlari
-    customer = None
-    customer_tier = None
-    if customer_id:
-        customer = db.query(CustomerV2).filter(
-            and_(
-                CustomerV2.id == customer_id,
-                CustomerV2.tenant_id == tenant_id
-            )
-        ).first()
-        if customer:
-            customer_tier = customer.price_tier
-    
-    for item in items:
-        # Variantni olish
-        variant = db.query(ProductVariant).filter(
-            and_(
-                ProductVariant.id == item.variant_id,
-                ProductVariant.tenant_id == tenant_id,
-                ProductVariant.is_active == True
-            )
-        ).first()
-        
-        if not variant:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Variant {item.variant_id} topilmadi"
-            )
-        
-        # Ombor tekshirish
-        if variant.stock_quantity < item.quantity:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Variant {variant.sku} uchun yetarli ombor yo'q. Mavjud: {variant.stock_quantity}, Talab: {item.quantity}"
-            )
-        
-        # Narxni aniqlash (PriceTier dan)
-        unit_price = variant.price
-        applied_tier = None
-        
-        # PriceTier ni qidirish
-        tier_query = db.query(PriceTier).filter(
-            and_(
-                PriceTier.variant_id == variant.id,
-                PriceTier.min_quantity <= item.quantity,
-                PriceTier.tenant_id == tenant_id
-            )
+    if context is None:
+        context = cart_pricing.load_pricing_context(
+            db,
+            tenant_id=tenant_id,
+            variant_ids=[item.variant_id for item in items],
+            customer_id=customer_id,
         )
-        
-        # Maksimal miqdor tekshirish
-        tier_query = tier_query.filter(
-            (PriceTier.max_quantity == None) | (PriceTier.max_quantity >= item.quantity)
-        )
-        
-        # Mijoz guruhi tekshirish
-        if customer_tier:
-            if customer_tier == CustomerTier.WHOLESALER:
-                tier_query = tier_query.filter(
-                    (PriceTier.customer_group == None) | 
-                    (PriceTier.customer_group == "wholesale") |
-                    (PriceTier.tier_type == PriceTierType.WHOLESALER)
-                )
-            elif customer_tier == CustomerTier.VIP:
-                tier_query = tier_query.filter(
-                    (PriceTier.customer_group == None) | 
-                    (PriceTier.customer_group == "vip") |
-                    (PriceTier.tier_type == PriceTierType.VIP)
-                )
-        
-        # Eng yaxshi narxni tanlash (eng katta min_quantity)
-        tier = tier_query.order_by(PriceTier.min_quantity.desc()).first()
-        
-        if tier:
-            unit_price = tier.price
-            applied_tier = {
-                "variant_id": variant.id,
-                "tier_id": tier.id,
-                "tier_type": tier.tier_type.value,
-                "min_quantity": tier.min_quantity,
-                "price": tier.price
-            }
-            applied_tiers.append(applied_tier)
-        
-        # Chegirma
-        item_discount = 0.0
-        if item.discount_percent > 0:
-            item_discount = (unit_price * item.quantity) * (item.discount_percent / 100)
-        
-        # Element jami
-        item_total = (unit_price * item.quantity) - item_discount
-        
-        # Soliq - variant.product_id orqali ProductV2 ni topish
-        from app.models.product_v2 import ProductV2
-        product = db.query(ProductV2).filter(ProductV2.id == variant.product_id).first()
-        item_tax = item_total * (product.tax_rate / 100) if product else 0.0
-        
-        item_details.append({
-            "variant_id": variant.id,
-            "sku": variant.sku,
-            "name": product.name if product else "",
-            "quantity": item.quantity,
-            "unit_price": unit_price,
-            "discount_percent": item.discount_percent,
-            "discount_amount": item_discount,
-            "tax_rate": product.tax_rate if product else 0.0,
-            "tax_amount": item_tax,
-            "total": item_total + item_tax,
-        })
-        
-        subtotal += item_total
-        tax_amount += item_tax
-        discount_amount += item_discount
-    
-    # Adaptive Logic: Horeca Service Charge
-    service_charge = 0.0
-    from app.models.tenant import Tenant, BusinessType
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-    if tenant and tenant.business_type == BusinessType.HORECA:
-        service_charge = subtotal * 0.10 # 10% xizmat haqi
-        
-    total = subtotal + tax_amount + service_charge
-    
-    return schemas.CartCalculationResult(
-        subtotal=subtotal,
-        tax_amount=tax_amount,
-        discount_amount=discount_amount,
-        service_charge=service_charge,
-        total=total,
-        items=item_details,
-        applied_price_tiers=applied_tiers,
-    )
+    return cart_pricing.price_cart(context, items, check_stock=check_stock)
 
 @router.post("/cart/calculate", response_model=schemas.CartCalculationResult)
 def calculate_cart(
@@ -184,6 +65,169 @@ def calculate_cart(
         customer_id=customer_id,
     )
 
+def validate_sale(
+    context: cart_pricing.PricingContext,
+    checkout_data: schemas.CheckoutRequest,
+    cart_result: schemas.CartCalculationResult,
+    balance: Optional[float] = None,
+) -> None:
+    """
+    Sotuv tekshiruvlari: mijoz, qarz limiti va Margin Guard
+    balance - to'plamda oldingi qarzlar hisobga olingan joriy balans
+    """
+    # Mijoz tekshirish (agar qarz bo'lsa)
+    customer = context.customer
+    if checkout_data.customer_id and not customer:
+        raise HTTPException(status_code=404, detail="Mijoz topilmadi")
+    
+    # Qarz tekshirish
+    if checkout_data.payment_method == PaymentMethod.DEBT:
+        if not customer:
+            raise HTTPException(
+                status_code=400,
+                detail="Qarz to'lov usuli uchun mijoz kerak"
+            )
+        
+        current_balance = customer.balance if balance is None else balance
+        new_debt = checkout_data.debt_amount or cart_result.total
+        new_balance = current_balance - new_debt  # Negative = qarz
+        
+        # Qarz limitini tekshirish
+        max_debt = customer.max_debt_allowed or customer.credit_limit or 0.0
+        if abs(new_balance) > max_debt:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Qarz limiti oshib ketdi. Maksimal: ${max_debt}, Joriy: ${abs(new_balance)}"
+            )
+    
+    # Margin Guard - Minimal foyda marjasini tekshirish
+    tenant = context.tenant
+    min_margin = tenant.min_margin_percent if tenant else 5.0
+    
+    for item_detail in cart_result.items:
+        variant = context.variants.get(item_detail["variant_id"])
+        if variant and variant.cost_price:
+            profit = item_detail["unit_price"] - variant.cost_price
+            margin = (profit / item_detail["unit_price"]) * 100 if item_detail["unit_price"] > 0 else 0
+            
+            if margin < min_margin:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Marja juda past: {variant.sku}. Minimal: {min_margin}%, Joriy: {margin:.1f}%"
+                )
+
+def offline_sold_at(sale_in: schemas.OfflineSale, now: datetime) -> datetime:
+    """Kassa soatidagi sotuv payti (UTC, naive); kelajakdagi vaqt hozirgi paytga tenglanadi"""
+    sold_at = sale_in.sold_at
+    if sold_at is None:
+        return now
+    if sold_at.tzinfo is not None:
+        sold_at = sold_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(sold_at, now)
+
+def build_stock_demand(
+    db: Session,
+    context: cart_pricing.PricingContext,
+    tenant_id: int,
+    cart_items: List[Dict[str, Any]],
+) -> Tuple[Dict[int, float], List[List[int]]]:
+    """
+    Ombordan chiqariladigan jami miqdorlar (Xirmon: Recipe support for Kitchen/Cafe)
+    Retseptlar oldindan xom ingredientlarga yoyilgan (recipe_cache)
+    Returns: ({variant_id: miqdor}, har bir qator tayangan variantlar)
+    """
+    lines = [(item_detail["variant_id"], item_detail["quantity"]) for item_detail in cart_items]
+    if context.business_type in [BusinessType.KITCHEN, BusinessType.CAFE]:
+        recipe_book = recipe_cache.get(db, tenant_id)
+        try:
+            return recipe_book.demand(lines)
+        except RecipeCycleError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    stock_demand = {}
+    for variant_id, quantity in lines:
+        stock_demand[variant_id] = stock_demand.get(variant_id, 0.0) + quantity
+    return stock_demand, [[variant_id] for variant_id, _ in lines]
+
+def stock_failure_detail(
+    cart_items: List[Dict[str, Any]],
+    line_stock_variants: List[List[int]],
+    stock_demand: Dict[int, float],
+    failed_variant_ids: List[int],
+    available: Dict[int, float],
+) -> Dict[str, Any]:
+    """Qoldig'i yetmagan qatorlar ro'yxati (xato javobi uchun)"""
+    failed = set(failed_variant_ids)
+    failed_lines = []
+    for line_no, (item_detail, line_variant_ids) in enumerate(zip(cart_items, line_stock_variants)):
+        shortages = [
+            {
+                "variant_id": variant_id,
+                "requested": stock_demand[variant_id],
+                "available": available.get(variant_id, 0.0),
+            }
+            for variant_id in line_variant_ids if variant_id in failed
+        ]
+        if shortages:
+            failed_lines.append({
+                "line": line_no,
+                "variant_id": item_detail["variant_id"],
+                "sku": item_detail["sku"],
+                "shortages": shortages,
+            })
+    return {
+        "message": "Omborda yetarli mahsulot yo'q",
+        "failed_lines": failed_lines,
+    }
+
+def build_sale_row(
+    tenant_id: int,
+    cashier_id: int,
+    checkout_data: schemas.CheckoutRequest,
+    cart_result: schemas.CartCalculationResult,
+) -> Dict[str, Any]:
+    """SaleV2 ustunlari (checkout va offline yuklash uchun umumiy)"""
+    is_debt = checkout_data.payment_method == PaymentMethod.DEBT
+    return dict(
+        tenant_id=tenant_id,
+        cashier_id=cashier_id,
+        customer_id=checkout_data.customer_id,
+        branch_id=checkout_data.branch_id,
+        total_amount=cart_result.total,
+        subtotal=cart_result.subtotal,
+        tax_amount=cart_result.tax_amount,
+        discount_amount=cart_result.discount_amount,
+        service_charge=cart_result.service_charge,
+        payment_method=checkout_data.payment_method,
+        status=SaleStatus.COMPLETED,
+        is_debt=is_debt,
+        debt_amount=checkout_data.debt_amount or (cart_result.total if is_debt else 0.0),
+        notes=checkout_data.notes,
+    )
+
+def build_item_rows(
+    sale_id: int,
+    context: cart_pricing.PricingContext,
+    cart_result: schemas.CartCalculationResult,
+) -> List[Dict[str, Any]]:
+    """SaleItemV2 ustunlari"""
+    rows = []
+    for item_detail in cart_result.items:
+        variant = context.variants[item_detail["variant_id"]]
+        rows.append(dict(
+            sale_id=sale_id,
+            variant_id=variant.id,
+            quantity=item_detail["quantity"],
+            unit_price=item_detail["unit_price"],
+            cost_price=variant.cost_price,
+            total=item_detail["total"],
+            discount_percent=item_detail.get("discount_percent", 0.0),
+            discount_amount=item_detail.get("discount_amount", 0.0),
+            tax_rate=item_detail.get("tax_rate", 0.0),
+            tax_amount=item_detail.get("tax_amount", 0.0),
+        ))
+    return rows
+
 @router.post("/checkout", response_model=schemas.Sale)
 def checkout(
     *,
@@ -198,9 +242,15 @@ def checkout(
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="Tenant topilmadi")
     
-    # Database transaction
+    # Database transaction (sessiya tranzaksiyani o'zi boshlaydi)
     try:
-        db.begin()
+        # Savatcha uchun barcha ma'lumotlar bir martada
+        context = cart_pricing.load_pricing_context(
+            db,
+            tenant_id=current_user.tenant_id,
+            variant_ids=[item.variant_id for item in checkout_data.items],
+            customer_id=checkout_data.customer_id,
+        )
         
         # Savatchani hisoblash
         cart_result = calculate_cart_total(
@@ -208,134 +258,63 @@ def checkout(
             tenant_id=current_user.tenant_id,
             items=checkout_data.items,
             customer_id=checkout_data.customer_id,
+            context=context,
+            check_stock=False,
         )
         
-        # Mijoz tekshirish (agar qarz bo'lsa)
-        customer = None
-        if checkout_data.customer_id:
-            customer = db.query(CustomerV2).filter(
-                and_(
-                    CustomerV2.id == checkout_data.customer_id,
-                    CustomerV2.tenant_id == current_user.tenant_id
-                )
-            ).first()
-            
-            if not customer:
-                raise HTTPException(status_code=404, detail="Mijoz topilmadi")
+        # Mijoz, qarz limiti va marja tekshiruvlari
+        validate_sale(context, checkout_data, cart_result)
+        customer = context.customer
         
-        # Qarz tekshirish
-        if checkout_data.payment_method == PaymentMethod.DEBT:
-            if not customer:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Qarz to'lov usuli uchun mijoz kerak"
-                )
-            
-            new_debt = checkout_data.debt_amount or cart_result.total
-            new_balance = customer.balance - new_debt  # Negative = qarz
-            
-            # Qarz limitini tekshirish
-            max_debt = customer.max_debt_allowed or customer.credit_limit or 0.0
-            if abs(new_balance) > max_debt:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Qarz limiti oshib ketdi. Maksimal: ${max_debt}, Joriy: ${abs(new_balance)}"
+        # Omborni atomik kamaytirish - bitta UPDATE ... RETURNING
+        stock_demand, line_stock_variants = build_stock_demand(
+            db, context, current_user.tenant_id, cart_result.items
+        )
+        failed_variant_ids = stock_service.decrement_stock(db, current_user.tenant_id, stock_demand)
+        if failed_variant_ids:
+            available = stock_service.get_stock_levels(db, current_user.tenant_id, failed_variant_ids)
+            raise HTTPException(
+                status_code=400,
+                detail=stock_failure_detail(
+                    cart_result.items, line_stock_variants, stock_demand, failed_variant_ids, available
                 )
+            )
         
-        # Margin Guard - Minimal foyda marjasini tekshirish
-        from app.models.tenant import Tenant
-        tenant = db.query(Tenant).filter(Tenant.id == current_user.tenant_id).first()
-        min_margin = tenant.min_margin_percent if tenant else 5.0
-        
-        for item_detail in cart_result.items:
-            variant = db.query(ProductVariant).filter(ProductVariant.id == item_detail["variant_id"]).first()
-            if variant and variant.cost_price:
-                profit = item_detail["unit_price"] - variant.cost_price
-                margin = (profit / item_detail["unit_price"]) * 100 if item_detail["unit_price"] > 0 else 0
-                
-                if margin < min_margin:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Marja juda past: {variant.sku}. Minimal: {min_margin}%, Joriy: {margin:.1f}%"
-                    )
-        
-        # Sale yaratish
-        sale_obj = SaleV2(
-            tenant_id=current_user.tenant_id,
-            cashier_id=current_user.id,
-            customer_id=checkout_data.customer_id,
-            branch_id=checkout_data.branch_id,
-            total_amount=cart_result.total,
-            subtotal=cart_result.subtotal,
-            tax_amount=cart_result.tax_amount,
-            discount_amount=cart_result.discount_amount,
-            service_charge=cart_result.service_charge,
-            payment_method=checkout_data.payment_method,
-            status=SaleStatus.COMPLETED,
-            is_debt=(checkout_data.payment_method == PaymentMethod.DEBT),
-            debt_amount=checkout_data.debt_amount or (cart_result.total if checkout_data.payment_method == PaymentMethod.DEBT else 0.0),
-            notes=checkout_data.notes,
+        # Sale yaratish - chek raqami jarayon blokidan (hisoblagich qatori qulflanmaydi)
+        sale_obj = SaleV2(**build_sale_row(
+            current_user.tenant_id, current_user.id, checkout_data, cart_result
+        ))
+        sale_obj.receipt_number = receipt_allocator.next_number(
+            db, current_user.tenant_id, checkout_data.branch_id
         )
         db.add(sale_obj)
         db.flush()  # ID ni olish uchun
         
-        # Sale items yaratish va omborni yangilash
-        for item_detail in cart_result.items:
-            variant = db.query(ProductVariant).filter(
-                ProductVariant.id == item_detail["variant_id"]
-            ).first()
-            
-            # Omborni yangilash (Xirmon: Recipe support for Kitchen/Cafe)
-            from app.models.tenant import BusinessType
-            product = variant.product_v2
-            if tenant.business_type in [BusinessType.KITCHEN, BusinessType.CAFE] and product.recipe and "ingredients" in product.recipe:
-                for ing in product.recipe["ingredients"]:
-                     # Deduct ingredient: qty * portions
-                     ing_qty = item_detail["quantity"] * ing["qty"]
-                     ing_variant = db.query(ProductVariant).filter(ProductVariant.id == ing["id"]).first()
-                     if ing_variant:
-                         ing_variant.stock_quantity -= ing_qty
-            else:
-                variant.stock_quantity -= item_detail["quantity"]
-            
-            # Sale item yaratish
-            sale_item = SaleItemV2(
-                sale_id=sale_obj.id,
-                variant_id=variant.id,
-                quantity=item_detail["quantity"],
-                unit_price=item_detail["unit_price"],
-                cost_price=variant.cost_price,
-                total=item_detail["total"],
-                discount_percent=item_detail.get("discount_percent", 0.0),
-                discount_amount=item_detail.get("discount_amount", 0.0),
-                tax_rate=item_detail.get("tax_rate", 0.0),
-                tax_amount=item_detail.get("tax_amount", 0.0),
-            )
-            db.add(sale_item)
+        # Sale items yaratish
+        for item_row in build_item_rows(sale_obj.id, context, cart_result):
+            db.add(SaleItemV2(**item_row))
         
-        # Qarz kitobiga yozuv qo'shish
+        # Qarz kitobiga yozuv - balans bazada atomik kamayadi, limit shu UPDATE da tekshiriladi
         if checkout_data.payment_method == PaymentMethod.DEBT and customer:
-            from app.models.customer_v2 import CustomerLedger
-            
             new_debt = checkout_data.debt_amount or cart_result.total
-            new_balance = customer.balance - new_debt
-            
-            ledger_entry = CustomerLedger(
-                customer_id=customer.id,
-                sale_id=sale_obj.id,  # SaleV2 id
-                debit=new_debt,
-                credit=0.0,
-                balance_after=new_balance,
-                description=f"Sotuv #{sale_obj.id} - Qarz",
-                reference_number=str(sale_obj.id),
-                created_by=current_user.id,
-            )
-            db.add(ledger_entry)
-            
-            # Mijoz balansini yangilash
-            customer.balance = new_balance
+            try:
+                customer_ledger.post_entries(db, current_user.tenant_id, [dict(
+                    customer_id=customer.id,
+                    sale_id=sale_obj.id,  # SaleV2 id
+                    debit=new_debt,
+                    credit=0.0,
+                    description=f"Sotuv #{sale_obj.id} - Qarz",
+                    reference_number=str(sale_obj.id),
+                    created_by=current_user.id,
+                )], enforce_limit=True)
+            except customer_ledger.DebtLimitExceeded:
+                # Parallel sotuv shu orada balansni o'zgartirgan
+                raise HTTPException(status_code=400, detail="Qarz limiti oshib ketdi")
         
         db.commit()
+        barcode_index.apply_stock_changes(
+            current_user.tenant_id, {variant_id: -qty for variant_id, qty in stock_demand.items()}
+        )
         db.refresh(sale_obj)
         
         # Sale items ni yuklash
@@ -355,6 +334,268 @@ def checkout(
             detail=f"Checkout xatosi: {str(e)}"
         )
 
+@router.post("/bulk", response_model=schemas.BulkSalesResult)
+def upload_offline_sales(
+    *,
+    db: Session = Depends(deps.get_db),
+    upload: schemas.BulkSalesUpload,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Offline kassalardan sotuvlarni to'plab yuklash
+    idempotency_key bo'yicha takroriy yuborilgan sotuvlar asl sotuvni qaytaradi
+    (ombor qayta kamaytirilmaydi). Butun to'plam bitta tranzaksiyada.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    tenant_id = current_user.tenant_id
+    results: Dict[str, schemas.BulkSaleResult] = {}
+    
+    # 1. Takroriy kalitlar - to'plam ichida va avval yuklanganlar (bitta so'rov)
+    pending: List[schemas.OfflineSale] = []
+    seen = set()
+    for sale_in in upload.sales:
+        if sale_in.idempotency_key in seen:
+            continue
+        seen.add(sale_in.idempotency_key)
+        pending.append(sale_in)
+    
+    existing = dict(
+        db.query(SaleV2.idempotency_key, SaleV2.id).filter(
+            and_(
+                SaleV2.tenant_id == tenant_id,
+                SaleV2.idempotency_key.in_(seen)
+            )
+        ).all()
+    )
+    for key, sale_id in existing.items():
+        results[key] = schemas.BulkSaleResult(idempotency_key=key, status="duplicate", sale_id=sale_id)
+    pending = [sale_in for sale_in in pending if sale_in.idempotency_key not in existing]
+    
+    try:
+        # 2. Narxlash va tekshirish - bitta kontekst butun to'plam uchun
+        context = cart_pricing.load_batch_pricing_context(
+            db,
+            tenant_id=tenant_id,
+            variant_ids=[item.variant_id for sale_in in pending for item in sale_in.items],
+            customer_ids=[sale_in.customer_id for sale_in in pending],
+        )
+        
+        priced = []
+        for sale_in in pending:
+            # Aksiya oynalari va shartnoma muddatlari sotilgan paytga tekshiriladi
+            sale_context = context.with_customer(sale_in.customer_id, offline_sold_at(sale_in, context.priced_at))
+            try:
+                cart_result = cart_pricing.price_cart(sale_context, sale_in.items, check_stock=False)
+                stock_demand, _ = build_stock_demand(db, sale_context, tenant_id, cart_result.items)
+            except HTTPException as e:
+                results[sale_in.idempotency_key] = schemas.BulkSaleResult(
+                    idempotency_key=sale_in.idempotency_key, status="failed", error=e.detail
+                )
+                continue
+            priced.append((sale_in, sale_context, cart_result, stock_demand))
+        
+        # 3. Ombor va qarz limiti - kelish tartibida xotirada taqsimlash, keyin bitta atomik UPDATE
+        # Qarz faqat ombordan o'tgan sotuv uchun balansdan ayiriladi
+        demand_ids = {variant_id for *_, demand in priced for variant_id in demand}
+        stock_left = stock_service.get_stock_levels(db, tenant_id, list(demand_ids))
+        balances = {customer_id: c.balance for customer_id, c in context.customers.items()}
+        accepted = []
+        for entry in priced:
+            sale_in, sale_context, cart_result, stock_demand = entry
+            short = [v for v, qty in stock_demand.items() if stock_left.get(v, 0.0) < qty]
+            if short:
+                results[sale_in.idempotency_key] = schemas.BulkSaleResult(
+                    idempotency_key=sale_in.idempotency_key,
+                    status="failed",
+                    error={"message": "Omborda yetarli mahsulot yo'q", "variant_ids": short},
+                )
+                continue
+            try:
+                validate_sale(sale_context, sale_in, cart_result, balance=balances.get(sale_in.customer_id))
+            except HTTPException as e:
+                results[sale_in.idempotency_key] = schemas.BulkSaleResult(
+                    idempotency_key=sale_in.idempotency_key, status="failed", error=e.detail
+                )
+                continue
+            for variant_id, qty in stock_demand.items():
+                stock_left[variant_id] -= qty
+            if sale_in.payment_method == PaymentMethod.DEBT:
+                balances[sale_in.customer_id] -= sale_in.debt_amount or cart_result.total
+            accepted.append(entry)
+        
+        total_demand: Dict[int, float] = {}
+        for *_, stock_demand in accepted:
+            for variant_id, qty in stock_demand.items():
+                total_demand[variant_id] = total_demand.get(variant_id, 0.0) + qty
+        
+        failed_variant_ids = stock_service.decrement_stock(db, tenant_id, total_demand)
+        if failed_variant_ids:
+            # Parallel kassa shu orada omborni kamaytirgan - to'plam qayta yuborilishi kerak
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Ombor o'zgardi, qayta yuboring", "variant_ids": failed_variant_ids}
+            )
+        
+        # 4. Bulk insert - sotuvlar, elementlar, qarz kitobi
+        if accepted:
+            # Chek raqamlari filial bo'yicha bir martada
+            receipt_numbers: Dict[Optional[int], List[str]] = {}
+            for sale_in, *_ in accepted:
+                receipt_numbers.setdefault(sale_in.branch_id, []).append(sale_in.idempotency_key)
+            for branch_id, keys in receipt_numbers.items():
+                receipt_numbers[branch_id] = receipt_allocator.next_numbers(db, tenant_id, branch_id, len(keys))
+            
+            sale_rows = []
+            for sale_in, _, cart_result, _ in accepted:
+                row = build_sale_row(tenant_id, current_user.id, sale_in, cart_result)
+                row["idempotency_key"] = sale_in.idempotency_key
+                row["created_at"] = offline_sold_at(sale_in, context.priced_at)
+                row["receipt_number"] = receipt_numbers[sale_in.branch_id].pop(0)
+                sale_rows.append(row)
+            
+            sale_ids = db.scalars(
+                insert(SaleV2).returning(SaleV2.id, sort_by_parameter_order=True),
+                sale_rows,
+            ).all()
+            
+            item_rows = []
+            ledger_rows = []
+            for sale_id, (sale_in, sale_context, cart_result, _) in zip(sale_ids, accepted):
+                item_rows.extend(build_item_rows(sale_id, sale_context, cart_result))
+                
+                if sale_in.payment_method == PaymentMethod.DEBT:
+                    new_debt = sale_in.debt_amount or cart_result.total
+                    ledger_rows.append(dict(
+                        customer_id=sale_in.customer_id,
+                        sale_id=sale_id,
+                        debit=new_debt,
+                        credit=0.0,
+                        description=f"Sotuv #{sale_id} - Qarz",
+                        reference_number=str(sale_id),
+                        created_by=current_user.id,
+                    ))
+                
+                results[sale_in.idempotency_key] = schemas.BulkSaleResult(
+                    idempotency_key=sale_in.idempotency_key, status="created", sale_id=sale_id
+                )
+            
+            db.execute(insert(SaleItemV2), item_rows)
+            
+            # Qarz kitobi va mijoz balanslari - bitta atomik UPDATE
+            try:
+                customer_ledger.post_entries(db, tenant_id, ledger_rows, enforce_limit=True)
+            except customer_ledger.DebtLimitExceeded as e:
+                # Parallel sotuv shu orada balansni o'zgartirgan - to'plam qayta yuborilishi kerak
+                db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail={"message": "Mijoz balansi o'zgardi, qayta yuboring", "customer_ids": e.customer_ids}
+                )
+        
+        db.commit()
+        barcode_index.apply_stock_changes(
+            tenant_id, {variant_id: -qty for variant_id, qty in total_demand.items()}
+        )
+        
+    except HTTPException:
+        db.rollback()
+        raise
+    except IntegrityError:
+        # Boshqa so'rov xuddi shu kalitni parallel yozgan
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Takroriy idempotency_key parallel yuklandi, qayta yuboring"
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Offline yuklash xatosi: {str(e)}"
+        )
+    
+    # Javob yuborilgan tartibda; to'plam ichidagi takrorlar birinchisiga ishora qiladi
+    ordered = []
+    answered = set()
+    for sale_in in upload.sales:
+        result = results[sale_in.idempotency_key]
+        if sale_in.idempotency_key in answered and result.status == "created":
+            result = schemas.BulkSaleResult(
+                idempotency_key=sale_in.idempotency_key, status="duplicate", sale_id=result.sale_id
+            )
+        answered.add(sale_in.idempotency_key)
+        ordered.append(result)
+    
+    return schemas.BulkSalesResult(
+        created=sum(1 for r in ordered if r.status == "created"),
+        duplicates=sum(1 for r in ordered if r.status == "duplicate"),
+        failed=sum(1 for r in ordered if r.status == "failed"),
+        results=ordered,
+    )
+
+@router.get("/journal", response_model=schemas.SalesPage)
+def read_sales_journal(
+    db: Session = Depends(deps.get_db),
+    cursor: Optional[str] = Query(None, description="Oldingi sahifaning next_cursor qiymati"),
+    limit: int = Query(50, ge=1, le=200),
+    branch_id: Optional[int] = None,
+    cashier_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    payment_method: Optional[PaymentMethod] = None,
+    sale_status: Optional[SaleStatus] = Query(None, alias="status"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Sotuvlar jurnali - keyset sahifalash (created_at, id) bo'yicha
+    idx_sales_tenant_date dan o'qiladi: 1- va 10 000- sahifa bir xil tez.
+    Elementlar bitta IN so'rovi bilan yuklanadi.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="Tenant topilmadi")
+    
+    query = db.query(SaleV2).filter(SaleV2.tenant_id == current_user.tenant_id)
+    
+    # Filtrlar
+    if branch_id is not None:
+        query = query.filter(SaleV2.branch_id == branch_id)
+    if cashier_id is not None:
+        query = query.filter(SaleV2.cashier_id == cashier_id)
+    if customer_id is not None:
+        query = query.filter(SaleV2.customer_id == customer_id)
+    if payment_method is not None:
+        query = query.filter(SaleV2.payment_method == payment_method)
+    if sale_status is not None:
+        query = query.filter(SaleV2.status == sale_status)
+    if date_from is not None:
+        query = query.filter(SaleV2.created_at >= date_from)
+    if date_to is not None:
+        query = query.filter(SaleV2.created_at < date_to)
+    
+    if cursor:
+        try:
+            last_created_at, last_id = decode_cursor(cursor, datetime, int)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.filter(
+            tuple_(SaleV2.created_at, SaleV2.id) < tuple_(last_created_at, last_id)
+        )
+    
+    sales = query.options(selectinload(SaleV2.items)).order_by(
+        SaleV2.created_at.desc(), SaleV2.id.desc()
+    ).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(sales) > limit:
+        sales = sales[:limit]
+        next_cursor = encode_cursor(sales[-1].created_at, sales[-1].id)
+    
+    return schemas.SalesPage(items=sales, next_cursor=next_cursor)
+
 @router.get("/", response_model=List[schemas.Sale])
 def read_sales(
     db: Session = Depends(deps.get_db),
@@ -362,26 +603,13 @@ def read_sales(
     limit: int = 100,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Sotuvlarni olish"""
+    """Sotuvlarni olish (chuqur sahifalar uchun /journal dan foydalaning)"""
     if not current_user.tenant_id:
         raise HTTPException(status_code=400, detail="Tenant topilmadi")
     
-    sales = db.query(SaleV2).filter(
+    # Items bitta IN so'rovi bilan yuklanadi
+    sales = db.query(SaleV2).options(selectinload(SaleV2.items)).filter(
         SaleV2.tenant_id == current_user.tenant_id
-    ).order_by(SaleV2.created_at.desc()).offset(skip).limit(limit).all()
-    
-    # Items ni yuklash
-    for sale in sales:
-        sale.items = db.query(SaleItemV2).filter(
-            SaleItemV2.sale_id == sale.id
-        ).all()
+    ).order_by(SaleV2.created_at.desc(), SaleV2.id.desc()).offset(skip).limit(limit).all()
     
     return sales
-
-
-
-
-
-
-
-
@@ -29,16 +29,36 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "supersecretkey_change_me_in_prod")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Old MD5-suffixed receipt IDs (already printed QR codes) are accepted only for
+    # sales up to this id (the last sale before the HMAC switch); 0 disables them
+    RECEIPT_LEGACY_MAX_SALE_ID: int = int(os.getenv("RECEIPT_LEGACY_MAX_SALE_ID", "0"))
     
     # Azure OpenAI Configuration
     AZURE_OPENAI_ENDPOINT: str = os.getenv("AZURE_OPENAI_ENDPOINT", "")
     AZURE_OPENAI_API_KEY: str = os.getenv("AZURE_OPENAI_API_KEY", "")
     AZURE_OPENAI_DEPLOYMENT_NAME: str = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o")
     AZURE_OPENAI_API_VERSION: str = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+
+    # Embeddings (provider: "azure" yoki "stub" - tarmoqsiz lokal sinov uchun)
+    EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "azure")
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    EMBEDDING_CONCURRENCY: int = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+    # Shuncha daqiqa progress yozmagan fon ishi to'xtab qolgan hisoblanadi
+    JOB_STALE_MINUTES: int = int(os.getenv("JOB_STALE_MINUTES", "30"))
     
     # File Uploads
     # In serverless, local file system is ephemeral. 
     # For now, we keep this but warn. Ideally should use S3/Blob.
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "/tmp/uploads")
+    # Semantik qidiruv indeksi nusxalari (tenant bo'yicha .npy fayllar)
+    VECTOR_INDEX_DIR: str = os.getenv("VECTOR_INDEX_DIR", "/tmp/vector_index")
+    # Kassalar uchun katalog tasvirlari (versiya bo'yicha)
+    CATALOG_SNAPSHOT_DIR: str = os.getenv("CATALOG_SNAPSHOT_DIR", "/tmp/catalog_snapshots")
+    # Aksiyalarning kunlik oynalari (happy hour) shu vaqt zonasida hisoblanadi
+    LOCAL_TIMEZONE: str = os.getenv("LOCAL_TIMEZONE", "Asia/Tashkent")
+    # Offline kassa sotuvlari sotilgan paytdagi narxda hisoblanadi - tugagan
+    # aksiya va shartnoma narxlari keshda shuncha kun saqlanadi
+    OFFLINE_PRICING_WINDOW_DAYS: int = int(os.getenv("OFFLINE_PRICING_WINDOW_DAYS", "7"))
 
 settings = Settings()
@@ -33,6 +33,17 @@ def health_check():
     from datetime import datetime
     from app.services.cache import get_cache_stats
     from app.middleware.rate_limit import get_rate_limit_stats
+    from app.services.price_tier_index import get_price_tier_index_stats
+    from app.services.contract_prices import get_contract_price_index_stats
+    from app.services.promotion_engine import get_promotion_engine_stats
+    from app.services.receipt_numbers import get_receipt_allocator_stats
+    from app.services.barcode_index import get_barcode_index_stats
+    from app.services.search_index import get_search_index_stats
+    from app.services.vector_index import get_vector_index_stats
+    from app.services.embedding_pipeline import get_embedding_pipeline_stats
+    from app.services.facet_index import get_facet_index_stats
+    from app.services.customer_lookup import get_customer_lookup_stats
+    from app.services.customer_segments import get_customer_segmentation_stats
     
     return {
         "status": "healthy",
@@ -41,6 +52,17 @@ def health_check():
         "timestamp": datetime.utcnow().isoformat(),
         "cache": get_cache_stats(),
         "rate_limit": get_rate_limit_stats(),
+        "price_tier_index": get_price_tier_index_stats(),
+        "contract_prices": get_contract_price_index_stats(),
+        "promotions": get_promotion_engine_stats(),
+        "receipt_allocator": get_receipt_allocator_stats(),
+        "barcode_index": get_barcode_index_stats(),
+        "search_index": get_search_index_stats(),
+        "vector_index": get_vector_index_stats(),
+        "embeddings": get_embedding_pipeline_stats(),
+        "facet_index": get_facet_index_stats(),
+        "customer_lookup": get_customer_lookup_stats(),
+        "customer_segments": get_customer_segmentation_stats(),
     }
 
 @app.get("/")
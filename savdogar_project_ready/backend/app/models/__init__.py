@@ -15,7 +15,11 @@ from .invoice import Invoice, InvoiceItem
 
 # V2 Multi-tenant models
 from .tenant import Tenant, BusinessType
-from .product_v2 import ProductV2, ProductVariant, ProductType
-from .pricing import PriceTier, PriceTierType
-from .customer_v2 import CustomerV2, CustomerTransactionV2, CustomerLedger, CustomerTier
-from .sale_v2 import SaleV2, SaleItemV2, PaymentMethod, SaleStatus
+from .product_v2 import ProductV2, ProductVariant, ProductType, CatalogChange, ProductImport, ImportStatus, EmbeddingBackfill
+from .pricing import (
+    PriceTier, PriceTierType, ExchangeRateChange, RepricingStatus,
+    CustomerPriceList, CustomerPriceListItem,
+)
+from .customer_v2 import CustomerV2, CustomerTransactionV2, CustomerLedger, CustomerBalanceCheckpoint, ReceivableLot, CustomerAging, CustomerTier, CustomerSegmentRun, SegmentationStatus
+from .promotion import Promotion, PromotionType
+from .sale_v2 import SaleV2, SaleItemV2, PaymentMethod, SaleStatus, ReceiptCounter
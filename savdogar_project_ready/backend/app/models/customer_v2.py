@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum, Index
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -43,6 +43,8 @@ class CustomerV2(Base):
     # Positive = Credit (mijozda pul bor)
     # Negative = Debt (mijoz qarzdor)
     balance = Column(Float, default=0.0, nullable=False)
+    # Qarz kitobidagi yozuvlar soni (balans nazorat nuqtalari uchun)
+    ledger_count = Column(Integer, default=0, nullable=False)
     
     # Qarz limitlari (Wholesale uchun)
     credit_limit = Column(Float, default=0.0)  # Maksimal qarz miqdori
@@ -105,6 +107,8 @@ class CustomerLedger(Base):
     """
     Mijozlar qarz kitobi (Wholesale uchun)
     Har bir qarz/pul o'tkazish yozuvi
+    Faqat qo'shiladi (append-only): yozuvlar o'zgartirilmaydi va o'chirilmaydi,
+    tuzatishlar teskari yozuv bilan kiritiladi (app.services.customer_ledger)
     """
     __tablename__ = "customer_ledger"
 
@@ -134,10 +138,108 @@ class CustomerLedger(Base):
         Index('idx_ledger_customer_date', 'customer_id', 'created_at'),
     )
 
+class CustomerBalanceCheckpoint(Base):
+    """
+    Balans nazorat nuqtasi - ledger_id gacha (shu yozuv ham) bo'lgan balans
+    "Sanadagi balans" = oxirgi nazorat nuqtasi + undan keyingi qisqa dum
+    """
+    __tablename__ = "customer_balance_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    customer_id = Column(Integer, ForeignKey("customers_v2.id"), nullable=False)
+    ledger_id = Column(Integer, ForeignKey("customer_ledger.id"), nullable=False)
+
+    balance = Column(Float, nullable=False)
+    entries = Column(Integer, nullable=False)  # Shu nuqtagacha yozuvlar soni
+    as_of = Column(DateTime, nullable=False)  # ledger_id yozuvining vaqti
 
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_balance_checkpoints_customer', 'customer_id', 'as_of'),
+    )
 
+class ReceivableLot(Base):
+    """
+    Ochiq qarz qismi (debitorlik) - to'lovlar eng eskisidan (FIFO) yopiladi
+    To'liq yopilgan qismlar o'chiriladi: jadval tarix emas, qoldiq qarz hajmida
+    """
+    __tablename__ = "receivable_lots"
 
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers_v2.id"), nullable=False)
+    ledger_id = Column(Integer, ForeignKey("customer_ledger.id"), nullable=False)
 
+    debit_at = Column(DateTime, nullable=False)  # Qarz paydo bo'lgan vaqt (yosh shundan)
+    amount = Column(Float, nullable=False)
+    remaining = Column(Float, nullable=False)
 
+    # Indexes
+    __table_args__ = (
+        Index('idx_receivable_lots_customer', 'customer_id', 'id'),
+        Index('idx_receivable_lots_tenant', 'tenant_id'),
+    )
 
+class CustomerAging(Base):
+    """
+    Mijoz qarzining yosh bo'yicha taqsimoti (0-30 / 31-60 / 61-90 / 90+ kun)
+    Qarz kitobiga yozuv qo'shilganda yangilanadi, kun o'tganda aged_on bo'yicha
+    qayta taqsimlanadi. Faqat qarzdor mijozlar uchun qator bor.
+    """
+    __tablename__ = "customer_aging"
 
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers_v2.id"), nullable=False, unique=True)
+
+    current = Column(Float, default=0.0, nullable=False)       # 0-30 kun
+    days_31_60 = Column(Float, default=0.0, nullable=False)
+    days_61_90 = Column(Float, default=0.0, nullable=False)
+    days_over_90 = Column(Float, default=0.0, nullable=False)
+    total = Column(Float, default=0.0, nullable=False)
+
+    oldest_debit_at = Column(DateTime, nullable=True)
+    aged_on = Column(Date, nullable=False)  # Taqsimot shu kun uchun hisoblangan
+
+    # Relationships
+    customer_v2 = relationship("CustomerV2")
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_customer_aging_tenant_total', 'tenant_id', 'total'),
+        Index('idx_customer_aging_tenant_over_90', 'tenant_id', 'days_over_90'),
+    )
+
+class SegmentationStatus(str, enum.Enum):
+    """Segmentlash ishi holati"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class CustomerSegmentRun(Base):
+    """
+    Tenant mijozlarini RFM bo'yicha segmentlash ishi (fon ishi)
+    Progress (yozilgan profillar) va yakuniy natija shu yerda saqlanadi.
+    """
+    __tablename__ = "customer_segment_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
+    status = Column(Enum(SegmentationStatus), default=SegmentationStatus.PENDING, nullable=False)
+
+    # Progress va natija
+    total = Column(Integer, default=0)  # yakunlangan sotuvi bor mijozlar
+    processed = Column(Integer, default=0)
+    segments = Column(JSONB, nullable=True)  # {"champions": 12, ...}
+    clv_total = Column(Float, nullable=True)
+    as_of = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
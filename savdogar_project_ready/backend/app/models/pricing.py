@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Index
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Index, DateTime, Text, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from datetime import datetime
 import enum
 
 class PriceTierType(str, enum.Enum):
@@ -45,9 +46,88 @@ class PriceTier(Base):
     )
 
 
+class RepricingStatus(str, enum.Enum):
+    """Qayta narxlash ishi holati"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
 
 
+class ExchangeRateChange(Base):
+    """
+    Dollar kursi tarixi va qayta narxlash ishi
+    Har bir kurs o'zgarishi yozib boriladi - narxlarni shu kurs bilan qayta
+    hisoblash (replay) yoki oldingi kursga qaytarish (rollback) mumkin.
+    """
+    __tablename__ = "exchange_rate_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    old_rate = Column(Float, nullable=True)
+    new_rate = Column(Float, nullable=False)
+    reverts_id = Column(Integer, ForeignKey("exchange_rate_changes.id"), nullable=True)  # rollback bo'lsa
+
+    # Ish holati va progress
+    status = Column(Enum(RepricingStatus), default=RepricingStatus.PENDING, nullable=False)
+    total = Column(Integer, default=0)  # price_usd li variantlar soni
+    processed = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # oxirgi progress (to'xtab qolgan ishni aniqlash uchun)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_rate_changes_tenant_created', 'tenant_id', 'created_at'),
+    )
+
+
+class CustomerPriceList(Base):
+    """
+    Mijoz bilan kelishilgan (shartnoma) narxlar ro'yxati
+    valid_from/valid_to oralig'ida amal qiladi (NULL = chegarasiz)
+    """
+    __tablename__ = "customer_price_lists"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers_v2.id"), nullable=False)
+    name = Column(String, nullable=False)
 
+    # Amal qilish muddati
+    valid_from = Column(DateTime, nullable=True)
+    valid_to = Column(DateTime, nullable=True)
+    is_active = Column(Boolean, default=True, nullable=False)
 
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    customer = relationship("CustomerV2")
+    items = relationship("CustomerPriceListItem", back_populates="price_list", cascade="all, delete-orphan")
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_price_lists_tenant_customer', 'tenant_id', 'customer_id'),
+    )
 
 
+class CustomerPriceListItem(Base):
+    """Shartnoma narxi: bitta variant uchun kelishilgan narx"""
+    __tablename__ = "customer_price_list_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    price_list_id = Column(Integer, ForeignKey("customer_price_lists.id", ondelete="CASCADE"), nullable=False)
+    variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=False)
+    price = Column(Float, nullable=False)
+
+    # Relationships
+    price_list = relationship("CustomerPriceList", back_populates="items")
+
+    # Indexes
+    __table_args__ = (
+        UniqueConstraint('price_list_id', 'variant_id', name='uq_price_list_items_variant'),
+        Index('idx_price_list_items_variant', 'variant_id'),
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Boolean, Enum, Index
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Boolean, Enum, Index, DateTime
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from datetime import datetime
 import enum
 import uuid
 
@@ -51,7 +52,7 @@ class ProductV2(Base):
     
     # Indexes
     __table_args__ = (
-        Index('idx_products_tenant_active', 'tenant_id', 'is_active'),
+        Index('idx_products_tenant_active', 'tenant_id', 'is_active', 'id'),  # Keyset katalog
     )
 
 class ProductVariant(Base):
@@ -91,6 +92,7 @@ class ProductVariant(Base):
     # AI - Brain Features
     velocity_score = Column(Float, default=0.0) # Sotuv tezligi (kuniga o'rtacha)
     embedding_vector = Column(ARRAY(Float), nullable=True) # Semantic qidiruv uchun
+    embedding_hash = Column(String(64), nullable=True) # Embed qilingan matn xeshi (model + matn)
     
     # Status
     is_active = Column(Boolean, default=True, index=True)
@@ -109,9 +111,84 @@ class ProductVariant(Base):
     )
 
 
+class CatalogChange(Base):
+    """
+    Katalog o'zgarishlari jurnali (kassalar uchun delta sinxronizatsiya)
+    Har bir yozuv tranzaksiyasi tenants.catalog_version ni oshiradi va
+    o'zgargan mahsulot/variant/narx darajalarini shu versiya bilan yozadi.
+    deleted = True - o'chirilgan (yoki nofaol qilingan) qator.
+    """
+    __tablename__ = "catalog_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    entity = Column(String(20), nullable=False)  # product, variant, price_tier
+    entity_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('idx_catalog_changes_tenant_version', 'tenant_id', 'version'),
+    )
 
 
+class ImportStatus(str, enum.Enum):
+    """Import ishi holati"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
 
 
+class ProductImport(Base):
+    """
+    Mahsulotlarni fayldan (CSV/XLSX) import qilish ishi
+    Progress va qatorlar xatolari shu yerda saqlanadi.
+    """
+    __tablename__ = "product_imports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    mode = Column(String(10), nullable=False, default="upsert")  # upsert, insert
+    status = Column(Enum(ImportStatus), default=ImportStatus.PENDING, nullable=False)
+
+    # Progress
+    processed_rows = Column(Integer, default=0)
+    created = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    errors = Column(JSONB, nullable=True, default=[])  # [{"row": 12, "sku": "...", "error": "..."}]
+    error = Column(Text, nullable=True)  # Butun ish xatosi
+
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class EmbeddingBackfill(Base):
+    """
+    Variant embeddinglarini to'ldirish ishi (fon ishi, progress shu yerda)
+    heartbeat_at har bir sahifadan keyin yangilanadi - uzoq vaqt
+    yangilanmagan PENDING/RUNNING ish to'xtab qolgan hisoblanadi.
+    """
+    __tablename__ = "embedding_backfills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
+    force = Column(Boolean, default=False, nullable=False)
+    status = Column(Enum(ImportStatus), default=ImportStatus.PENDING, nullable=False)
+
+    # Progress
+    total = Column(Integer, default=0)  # faol variantlar soni
+    scanned = Column(Integer, default=0)
+    embedded = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
 
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Index, DateTime, Time, Boolean
+from app.core.database import Base
+from datetime import datetime
+import enum
+
+class PromotionType(str, enum.Enum):
+    """Aksiya turlari"""
+    PERCENT_OFF = "percent_off"     # Foizli chegirma (happy hour, kategoriya chegirmasi)
+    BUY_X_GET_Y = "buy_x_get_y"     # X ta olsang, Y tasi bepul
+
+class Promotion(Base):
+    """
+    Aksiyalar (tenant bo'yicha)
+    Qo'llanish sohasi: variant_id yoki category_id (ikkalasi bo'sh bo'lsa - hamma tovarlar)
+    Vaqt oynasi: starts_at/ends_at (UTC) va har kunlik daily_start/daily_end
+    (mahalliy vaqt, masalan happy hour 17:00-19:00)
+    """
+    __tablename__ = "promotions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    name = Column(String, nullable=False)
+    promo_type = Column(Enum(PromotionType), nullable=False)
+    
+    # Qo'llanish sohasi
+    variant_id = Column(Integer, ForeignKey("product_variants.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    
+    # Shartlar
+    percent = Column(Float, nullable=True)        # PERCENT_OFF: 0-100
+    buy_quantity = Column(Integer, nullable=True)  # BUY_X_GET_Y: X
+    get_quantity = Column(Integer, nullable=True)  # BUY_X_GET_Y: Y
+    
+    # Vaqt oynalari
+    starts_at = Column(DateTime, nullable=True)
+    ends_at = Column(DateTime, nullable=True)
+    daily_start = Column(Time, nullable=True)
+    daily_end = Column(Time, nullable=True)
+    
+    # Bir qatorga bir nechta aksiya mos kelsa: avval priority, keyin chegirma summasi
+    priority = Column(Integer, default=0, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_promotions_tenant_active', 'tenant_id', 'is_active'),
+    )
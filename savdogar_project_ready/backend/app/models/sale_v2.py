@@ -51,6 +51,7 @@ class SaleV2(Base):
     # Metadata
     notes = Column(Text, nullable=True)
     receipt_number = Column(String, nullable=True, index=True)  # Unique receipt number
+    idempotency_key = Column(String, nullable=True)  # Offline kassa tomonidan yaratilgan kalit
     
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -65,9 +66,11 @@ class SaleV2(Base):
     
     # Indexes
     __table_args__ = (
-        Index('idx_sales_tenant_date', 'tenant_id', 'created_at'),
+        Index('idx_sales_tenant_date', 'tenant_id', 'created_at', 'id'),  # Keyset jurnal
         Index('idx_sales_customer', 'customer_id'),
         Index('idx_sales_debt', 'is_debt', 'status'),
+        Index('idx_sales_tenant_idempotency', 'tenant_id', 'idempotency_key', unique=True),
+        Index('idx_sales_tenant_receipt', 'tenant_id', 'receipt_number', unique=True),
     )
 
 class SaleItemV2(Base):
@@ -113,3 +116,21 @@ class SaleItemV2(Base):
 
 
 
+
+class ReceiptCounter(Base):
+    """
+    Chek raqamlari hisoblagichi - tenant va filial bo'yicha
+    Worker jarayonlari bu yerdan raqamlar blokini oladi (hi/lo),
+    shuning uchun qator har bir sotuvda emas, har blokda bir marta yangilanadi.
+    """
+    __tablename__ = "receipt_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    branch_id = Column(Integer, nullable=False, default=0)  # 0 - filialsiz sotuvlar
+    next_value = Column(Integer, nullable=False, default=1)  # Keyingi bo'sh raqam
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_receipt_counters_tenant_branch', 'tenant_id', 'branch_id', unique=True),
+    )
@@ -35,6 +35,12 @@ class Tenant(Base):
     # Margin Guard - Minimal foyda marjasi (%)
     min_margin_percent = Column(Float, default=5.0)
     
+    # Katalog versiyasi - har bir katalog yozuvida oshiriladi (kassa sinxronizatsiyasi)
+    catalog_version = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Xotiradagi keshlar versiyalari {kesh nomi: versiya} - barcha worker jarayonlari uchun
+    cache_versions = Column(JSONB, nullable=False, default=dict, server_default="{}")
+    
     # Industry-specific konfiguratsiya (JSONB)
     # Retail: {"allow_negative_stock": true, "require_barcode": false}
     # Fashion: {"size_chart": {...}, "color_variants": true}
@@ -55,11 +61,11 @@ class Tenant(Base):
     
     # Relationships
     users = relationship("User", back_populates="tenant")
-    # products = relationship("ProductV2", back_populates="tenant")
-    # product_variants = relationship("ProductVariant", back_populates="tenant")
-    # sales = relationship("SaleV2", back_populates="tenant")
-    # customers = relationship("CustomerV2", back_populates="tenant")
-    # price_tiers = relationship("PriceTier", back_populates="tenant")
+    products = relationship("ProductV2", back_populates="tenant")
+    product_variants = relationship("ProductVariant", back_populates="tenant")
+    sales = relationship("SaleV2", back_populates="tenant")
+    customers = relationship("CustomerV2", back_populates="tenant")
+    price_tiers = relationship("PriceTier", back_populates="tenant")
 
 
 
@@ -1,7 +1,7 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field, EmailStr
 from datetime import datetime
-from app.models.customer_v2 import CustomerTier
+from app.models.customer_v2 import CustomerTier, SegmentationStatus
 from app.models.sale_v2 import PaymentMethod
 
 class CustomerCreate(BaseModel):
@@ -60,10 +60,136 @@ class CustomerLedgerEntry(BaseModel):
     class Config:
         from_attributes = True
 
+class LedgerStatementEntry(BaseModel):
+    """Hisob-kitob varaqasi qatori (yig'ma balans bilan)"""
+    id: int
+    created_at: datetime
+    sale_id: Optional[int]
+    reference_number: Optional[str]
+    description: Optional[str]
+    debit: float
+    credit: float
+    balance: float
 
+class LedgerStatement(BaseModel):
+    """Hisob-kitob varaqasi sahifasi (keyset) va oyna jami"""
+    customer_id: int
+    date_from: Optional[datetime]
+    date_to: Optional[datetime]
+    opening_balance: float
+    closing_balance: float
+    period_debit: float
+    period_credit: float
+    entries: int
+    items: List[LedgerStatementEntry]
+    next_cursor: Optional[str] = None
 
+class CustomerPaymentCreate(BaseModel):
+    """Mijoz to'lovi (qarzni kamaytiradi)"""
+    amount: float = Field(..., gt=0)
+    payment_method: PaymentMethod = PaymentMethod.CASH
+    description: Optional[str] = None
+    reference_number: Optional[str] = None
 
+class CustomerBalance(BaseModel):
+    """Mijozning berilgan paytdagi balansi"""
+    customer_id: int
+    balance: float
+    at: datetime
 
+class CustomerAgingRow(BaseModel):
+    """Mijoz qarzi yosh bo'yicha (0-30 / 31-60 / 61-90 / 90+ kun)"""
+    customer_id: int
+    name: str
+    phone: Optional[str]
+    current: float
+    days_31_60: float
+    days_61_90: float
+    days_over_90: float
+    total: float
+    oldest_debit_at: Optional[datetime]
 
+class CustomerAgingPage(BaseModel):
+    """Debitorlik hisoboti sahifasi (keyset)"""
+    items: List[CustomerAgingRow]
+    next_cursor: Optional[str] = None
 
+class CustomerAgingSummary(BaseModel):
+    """Tenant bo'yicha debitorlik xulosasi"""
+    customers: int
+    current: float
+    days_31_60: float
+    days_61_90: float
+    days_over_90: float
+    total: float
+
+class CustomerLookupMatch(BaseModel):
+    """Kassada topilgan mijoz (joriy balans va daraja bilan)"""
+    id: int
+    name: str
+    phone: Optional[str]
+    balance: float
+    price_tier: CustomerTier
+    matched: str
+    score: float
 
+class CustomerSegment(BaseModel):
+    """Mijozning RFM profili (segmentlash ishi natijasi)"""
+    customer_id: int
+    segment: str
+    recency_days: int
+    frequency: int
+    monetary: float
+    r_score: int
+    f_score: int
+    m_score: int
+    average_order: float
+    clv: float
+    as_of: datetime
+    narrative: Optional[str] = None
+
+class CustomerSegmentationRun(BaseModel):
+    """Tenant bo'yicha segmentlash ishi (progress va natija)"""
+    id: int
+    status: SegmentationStatus
+    total: int
+    processed: int
+    segments: Optional[Dict[str, int]] = None
+    clv_total: Optional[float] = None
+    as_of: Optional[datetime] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ContractPriceItem(BaseModel):
+    """Shartnoma narxi (bitta variant)"""
+    variant_id: int
+    price: float = Field(..., gt=0)
+
+    class Config:
+        from_attributes = True
+
+class ContractPriceListCreate(BaseModel):
+    """Mijoz uchun shartnoma narxlari ro'yxatini yaratish"""
+    name: str = Field(..., min_length=1)
+    valid_from: Optional[datetime] = None
+    valid_to: Optional[datetime] = None
+    items: List[ContractPriceItem] = Field(..., min_length=1)
+
+class ContractPriceList(BaseModel):
+    """Shartnoma narxlari ro'yxati"""
+    id: int
+    customer_id: int
+    name: str
+    valid_from: Optional[datetime]
+    valid_to: Optional[datetime]
+    is_active: bool
+    created_at: datetime
+    items: List[ContractPriceItem]
+
+    class Config:
+        from_attributes = True
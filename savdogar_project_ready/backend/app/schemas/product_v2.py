@@ -1,7 +1,7 @@
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
-from app.models.product_v2 import ProductType
+from app.models.product_v2 import ProductType, ImportStatus
 from app.models.pricing import PriceTierType
 
 # ==================== Product Variant Schemas ====================
@@ -142,6 +142,119 @@ class Product(BaseModel):
     class Config:
         from_attributes = True
 
+# ==================== Catalog (terminal) Schemas ====================
+
+# include= orqali so'raladigan og'ir maydonlar
+CATALOG_HEAVY_FIELDS = {"description", "metadata", "attributes"}
+
+class CatalogVariant(BaseModel):
+    """Katalog varianti - faqat kassaga kerakli ustunlar"""
+    id: int
+    product_id: int
+    sku: str
+    price: float
+    stock_quantity: float
+    barcode_aliases: List[str] = []
+    is_active: bool
+    attributes: Optional[Dict[str, Any]] = None  # include=attributes
+
+class CatalogProduct(BaseModel):
+    """Katalog mahsuloti (embedding va retsept yuklanmaydi)"""
+    id: int
+    category_id: Optional[int]
+    name: str
+    type: ProductType
+    base_price: float
+    tax_rate: float
+    is_active: bool
+    description: Optional[str] = None  # include=description
+    metadata: Optional[Dict[str, Any]] = None  # include=metadata
+    variants: List[CatalogVariant] = []
+
+class CatalogPage(BaseModel):
+    """Katalog sahifasi (keyset)"""
+    items: List[CatalogProduct]
+    next_cursor: Optional[str] = None
+    version: Optional[int] = None  # Delta sinxronizatsiya shu versiyadan boshlanadi
+
+class CatalogPriceTier(BaseModel):
+    """Katalog narx darajasi"""
+    id: int
+    variant_id: int
+    tier_type: PriceTierType
+    min_quantity: float
+    max_quantity: Optional[float]
+    price: float
+    customer_group: Optional[str]
+
+class CatalogTombstones(BaseModel):
+    """O'chirilgan (yoki nofaol qilingan) qatorlar ID lari"""
+    products: List[int] = []
+    variants: List[int] = []
+    price_tiers: List[int] = []
+
+class CatalogChanges(BaseModel):
+    """Delta sinxronizatsiya javobi"""
+    version: int
+    has_more: bool = False
+    products: List[CatalogProduct] = []
+    variants: List[CatalogVariant] = []
+    price_tiers: List[CatalogPriceTier] = []
+    deleted: CatalogTombstones = CatalogTombstones()
+
+class FacetValue(BaseModel):
+    """Faset qiymati va unga mos variantlar soni"""
+    value: str
+    count: int
+
+class FacetSearchResult(BaseModel):
+    """Fasetli filtr natijasi (variantlar keyset sahifasi + sanoqlar)"""
+    items: List[CatalogVariant]
+    next_cursor: Optional[str] = None
+    total: int
+    facets: Dict[str, List[FacetValue]]
+
+class ProductImportError(BaseModel):
+    """Import qilinmagan qator"""
+    row: int
+    sku: Optional[str] = None
+    error: str
+
+class ProductImportJob(BaseModel):
+    """Mahsulot importi ishi (progress)"""
+    id: int
+    filename: str
+    mode: str
+    status: ImportStatus
+    processed_rows: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[ProductImportError] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class BarcodeMatch(BaseModel):
+    """Skaner natijasi - variant snapshot"""
+    variant_id: int
+    product_id: int
+    sku: str
+    name: str
+    price: float
+    stock_quantity: Optional[float] = 0.0
+    is_active: bool
+
+class ProductSearchHit(BaseModel):
+    """Typeahead natijasi"""
+    id: int
+    name: str
+    score: float
+
 # ==================== Price Tier Schemas ====================
 
 class PriceTierCreate(BaseModel):
@@ -181,3 +294,14 @@ class PriceTier(BaseModel):
 
 
 
+
+# ==================== Recipe Schemas ====================
+
+class RecipeIngredient(BaseModel):
+    """Retsept ingredienti (ingredient variant ID va bir porsiya uchun miqdor)"""
+    id: int = Field(..., description="Ingredient variant ID")
+    qty: float = Field(..., gt=0)
+
+class RecipeUpdate(BaseModel):
+    """Retseptni yangilash (Kitchen/Cafe)"""
+    ingredients: List[RecipeIngredient] = Field(default_factory=list)
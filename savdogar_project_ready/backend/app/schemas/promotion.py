@@ -0,0 +1,61 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from datetime import datetime, time
+from app.models.promotion import PromotionType
+
+class PromotionCreate(BaseModel):
+    """Aksiya yaratish"""
+    name: str = Field(..., min_length=1)
+    promo_type: PromotionType
+    variant_id: Optional[int] = None
+    category_id: Optional[int] = None
+    percent: Optional[float] = Field(None, gt=0, le=100)
+    buy_quantity: Optional[int] = Field(None, ge=1)
+    get_quantity: Optional[int] = Field(None, ge=1)
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    daily_start: Optional[time] = Field(None, description="Mahalliy vaqt, masalan 17:00")
+    daily_end: Optional[time] = Field(None, description="Mahalliy vaqt, masalan 19:00")
+    priority: int = 0
+
+    @model_validator(mode="after")
+    def check_rule(self):
+        if self.promo_type == PromotionType.PERCENT_OFF and self.percent is None:
+            raise ValueError("percent_off uchun percent kerak")
+        if self.promo_type == PromotionType.BUY_X_GET_Y and (self.buy_quantity is None or self.get_quantity is None):
+            raise ValueError("buy_x_get_y uchun buy_quantity va get_quantity kerak")
+        if self.variant_id is not None and self.category_id is not None:
+            raise ValueError("variant_id yoki category_id dan faqat bittasi")
+        if (self.daily_start is None) != (self.daily_end is None):
+            raise ValueError("daily_start va daily_end birga beriladi")
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValueError("ends_at starts_at dan keyin bo'lishi kerak")
+        return self
+
+class Promotion(BaseModel):
+    """Promotion response"""
+    id: int
+    tenant_id: int
+    name: str
+    promo_type: PromotionType
+    variant_id: Optional[int]
+    category_id: Optional[int]
+    percent: Optional[float]
+    buy_quantity: Optional[int]
+    get_quantity: Optional[int]
+    starts_at: Optional[datetime]
+    ends_at: Optional[datetime]
+    daily_start: Optional[time]
+    daily_end: Optional[time]
+    priority: int
+    is_active: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ActivePromotions(BaseModel):
+    """Hozir amal qilayotgan aksiyalar"""
+    compiled_at: datetime
+    valid_until: Optional[datetime]
+    promotion_ids: List[int]
@@ -90,6 +90,7 @@ class Sale(BaseModel):
     is_debt: bool
     debt_amount: float
     receipt_number: Optional[str]
+    idempotency_key: Optional[str] = None
     notes: Optional[str]
     created_at: datetime
     items: List[SaleItem] = []
@@ -97,6 +98,36 @@ class Sale(BaseModel):
     class Config:
         from_attributes = True
 
+class SalesPage(BaseModel):
+    """Sotuvlar jurnali sahifasi (keyset)"""
+    items: List[Sale]
+    next_cursor: Optional[str] = None  # Keyingi sahifa uchun; None - oxirgi sahifa
+
+# ==================== Offline Bulk Upload ====================
+
+class OfflineSale(CheckoutRequest):
+    """Offline kassada yaratilgan sotuv"""
+    idempotency_key: str = Field(..., min_length=1, max_length=100, description="Kassa yaratgan unikal kalit")
+    sold_at: Optional[datetime] = Field(None, description="Sotuv vaqti (kassa soati bo'yicha)")
+
+class BulkSalesUpload(BaseModel):
+    """Offline sotuvlar to'plami"""
+    sales: List[OfflineSale] = Field(..., min_items=1, max_items=500)
+
+class BulkSaleResult(BaseModel):
+    """Bitta offline sotuv natijasi"""
+    idempotency_key: str
+    status: str  # created, duplicate, failed
+    sale_id: Optional[int] = None
+    error: Optional[Any] = None
+
+class BulkSalesResult(BaseModel):
+    """Offline yuklash natijasi"""
+    created: int
+    duplicates: int
+    failed: int
+    results: List[BulkSaleResult]
+
 # ==================== Cart Calculation ====================
 
 class CartCalculationResult(BaseModel):
@@ -108,6 +139,8 @@ class CartCalculationResult(BaseModel):
     service_charge: Optional[float] = 0.0
     items: List[Dict[str, Any]]  # Har bir element uchun narx ma'lumotlari
     applied_price_tiers: List[Dict[str, Any]]  # Qo'llangan narx darajalari
+    applied_contract_prices: List[Dict[str, Any]] = []  # Qo'llangan shartnoma narxlari
+    applied_promotions: List[Dict[str, Any]] = []  # Qo'llangan aksiyalar
 
 
 
@@ -9,6 +9,7 @@ from sqlalchemy import func
 from datetime import datetime, timedelta
 from app.models import Product, Sale, SaleItem, Category
 from app.services.openai_service import openai_service
+from app.services.search_index import find_product_by_name
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,7 @@ def get_product_recommendations_for_sale(
         # Get cart products info
         cart_products = db.query(Product).filter(Product.id.in_(cart_product_ids)).all()
         cart_product_names = [p.name for p in cart_products]
+        organization_id = cart_products[0].organization_id if cart_products else None
         
         # Get frequently bought together products
         frequently_bought = get_frequently_bought_together(db, cart_product_ids, limit=10)
@@ -107,10 +109,8 @@ Faqat JSON qaytaring, boshqa matn yo'q."""
             product_name = rec.get('product_name', '').strip()
             reason = rec.get('reason', '')
             
-            # Find product by name (fuzzy match)
-            product = db.query(Product).filter(
-                Product.name.ilike(f"%{product_name}%")
-            ).first()
+            # Find product by name (trigram index, cart's organization)
+            product = find_product_by_name(db, organization_id, product_name)
             
             if product and product.id not in cart_product_ids:
                 recommendations.append({
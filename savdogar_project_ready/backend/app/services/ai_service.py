@@ -197,13 +197,11 @@ class AIService:
             raise e
 
     async def get_embedding(self, text: str):
-        """Matn uchun embedding (vector) olish"""
+        """Matn uchun embedding (vector) olish - takroriy so'rovlar LRU keshdan"""
+        from app.services.embedding_pipeline import embedding_pipeline
+
         try:
-            response = await azure_openai.client.embeddings.create(
-                input=[text],
-                model="text-embedding-3-small"
-            )
-            return response.data[0].embedding
+            return await embedding_pipeline.embed_query(text)
 
         except Exception as e:
             print(f"Embedding error: {e}")
@@ -216,18 +214,26 @@ class AIService:
             return []
 
         from app.models.product_v2 import ProductVariant
-        from sqlalchemy import text
-        
-        # PostgreSQL vector similarity (using <-> operator if pgvector installed, 
-        # but here we'll use a standard array approach if pgvector isnt guaranteed)
-        # Assuming pgvector is available as we are on Azure PG
-        results = db.query(ProductVariant).filter(
-            ProductVariant.tenant_id == tenant_id,
-            ProductVariant.is_active == True
-        ).order_by(
-            ProductVariant.embedding_vector.op('<->')(query_vector)
-        ).limit(limit).all()
-        
-        return results
+        from app.services.vector_index import vector_index
+
+        # Xotiradagi IVF indeks (kosinus); nofaol bo'lib qolganlar uchun zaxira bilan
+        try:
+            matches = vector_index.search(db, tenant_id, query_vector, limit * 2)
+        except ValueError:
+            # So'rov va indeks embedding o'lchamlari mos emas
+            return []
+        ids = [variant_id for variant_id, _ in matches]
+        if not ids:
+            return []
+
+        variants = {
+            variant.id: variant
+            for variant in db.query(ProductVariant).filter(
+                ProductVariant.tenant_id == tenant_id,
+                ProductVariant.id.in_(ids),
+                ProductVariant.is_active == True
+            )
+        }
+        return [variants[variant_id] for variant_id in ids if variant_id in variants][:limit]
 
 ai_service = AIService()
@@ -0,0 +1,113 @@
+"""
+Barcode Index - Skaner uchun shtrix-kod/SKU -> variant xaritasi (tenant bo'yicha)
+Har bir SKU va barcode_aliases elementi variant snapshot (narx, qoldiq) ga
+bog'lanadi. Indeks birinchi skanerda quriladi, mahsulot yozuvlarida
+invalidate() qilinadi, sotuvlardan keyin qoldiqlar joyida yangilanadi.
+Boshqa worker jarayonlaridagi sotuvlar qoldig'i max_age_seconds gacha
+kechikishi mumkin - bu faqat ma'lumot uchun, sotuvda qoldiq atomik tekshiriladi.
+Boshqa worker qo'shgan variantlar bazadagi kesh versiyasi orqali ko'rinadi
+(indeks qayta quriladi), shuning uchun topilmagan kod bazadan qidirilmaydi.
+"""
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.product_v2 import ProductV2, ProductVariant
+from app.services.tenant_cache import TenantCache
+
+
+class VariantSnapshot:
+    """Skaner javobi uchun variant nusxasi"""
+
+    __slots__ = ("variant_id", "product_id", "sku", "name", "price", "stock_quantity", "is_active")
+
+    def __init__(self, variant_id, product_id, sku, name, price, stock_quantity, is_active):
+        self.variant_id = variant_id
+        self.product_id = product_id
+        self.sku = sku
+        self.name = name
+        self.price = price
+        self.stock_quantity = stock_quantity
+        self.is_active = is_active
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+SNAPSHOT_COLUMNS = (
+    ProductVariant.id,
+    ProductVariant.product_id,
+    ProductVariant.sku,
+    ProductV2.name,
+    ProductVariant.price,
+    ProductVariant.stock_quantity,
+    ProductVariant.is_active,
+    ProductVariant.barcode_aliases,
+)
+
+
+class TenantBarcodeIndex:
+    """Bitta tenant ning kod -> variant xaritasi"""
+
+    def __init__(self):
+        self.codes: Dict[str, VariantSnapshot] = {}
+        self.variants: Dict[int, VariantSnapshot] = {}
+
+    def add(self, snapshot: VariantSnapshot, sku: str, aliases) -> None:
+        self.variants[snapshot.variant_id] = snapshot
+        for alias in aliases or []:
+            # SKU lar alias lardan ustun - mavjud SKU ni bosib o'tmaymiz
+            existing = self.codes.get(alias)
+            if existing is None or existing.sku != alias:
+                self.codes[alias] = snapshot
+        self.codes[sku] = snapshot
+
+    def resolve(self, code: str) -> Optional[VariantSnapshot]:
+        return self.codes.get(code)
+
+
+def _snapshot(row) -> VariantSnapshot:
+    variant_id, product_id, sku, name, price, stock, is_active, _ = row
+    return VariantSnapshot(variant_id, product_id, sku, name, price, stock, is_active)
+
+
+class BarcodeIndex(TenantCache):
+    """Jarayon ichidagi shtrix-kod indekslari reestri"""
+
+    name = "barcodes"
+
+    def build(self, db: Session, tenant_id: int) -> TenantBarcodeIndex:
+        index = TenantBarcodeIndex()
+        rows = db.query(*SNAPSHOT_COLUMNS).join(
+            ProductV2, ProductV2.id == ProductVariant.product_id
+        ).filter(ProductVariant.tenant_id == tenant_id)
+        for row in rows:
+            index.add(_snapshot(row), row.sku, row.barcode_aliases)
+        return index
+
+    def resolve(self, db: Session, tenant_id: int, code: str) -> Optional[VariantSnapshot]:
+        """Kod bo'yicha variant (indeks eskirgan bo'lsa qayta quriladi)"""
+        return self.get(db, tenant_id).resolve(code)
+
+    def apply_stock_changes(self, tenant_id: int, deltas: Dict[int, float]) -> None:
+        """Sotuvdan keyin qoldiqlarni joyida yangilash (indeks qayta qurilmaydi)"""
+        index = self.peek(tenant_id)
+        if index is None:
+            return
+        for variant_id, delta in deltas.items():
+            snapshot = index.variants.get(variant_id)
+            if snapshot is not None:
+                snapshot.stock_quantity = (snapshot.stock_quantity or 0.0) + delta
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["codes"] = sum(len(index.codes) for index in self.values())
+        return stats
+
+
+barcode_index = BarcodeIndex()
+
+
+def get_barcode_index_stats() -> Dict:
+    """Get barcode index statistics."""
+    return barcode_index.stats()
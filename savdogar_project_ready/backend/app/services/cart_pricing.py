@@ -0,0 +1,304 @@
+"""
+Cart Pricing Engine - Savatchani to'plamli (batched) hisoblash
+Variantlar, mahsulotlar, mijoz va tenant savatchadagi qatorlar sonidan
+qat'i nazar o'zgarmas sonli so'rovlar bilan yuklanadi. Narx darajalari
+tenant indeksidan (price_tier_index), mijoz shartnoma narxlari
+contract_price_index dan, amaldagi aksiyalar promotion_engine dan olinadi.
+Chegirma, soliq va xizmat haqi xotirada hisoblanadi.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+
+from app.models.product_v2 import ProductVariant, ProductV2
+from app.models.customer_v2 import CustomerV2, CustomerTier
+from app.models.tenant import Tenant, BusinessType
+from app.schemas.sale_v2 import CartItem, CartCalculationResult
+from app.services.contract_prices import ContractEntry, TenantContracts, contract_price_index, resolve
+from app.services.price_tier_index import TenantTierIndex, price_tier_index
+from app.services.promotion_engine import ActiveRuleSet, TenantPromotions, promotion_engine
+
+# Horeca xizmat haqi (subtotal dan)
+HORECA_SERVICE_CHARGE_RATE = 0.10
+
+
+class PricingContext:
+    """
+    Bitta savatcha uchun oldindan yuklangan ma'lumotlar
+    checkout ham shu kontekstdan foydalanadi (qayta so'rov yo'q)
+    """
+
+    def __init__(
+        self,
+        tenant: Optional[Tenant],
+        customer: Optional[CustomerV2],
+        variants: Dict[int, ProductVariant],
+        products: Dict[int, ProductV2],
+        tier_index: TenantTierIndex,
+        customers: Optional[Dict[int, CustomerV2]] = None,
+        contracts: Optional[TenantContracts] = None,
+        priced_at: Optional[datetime] = None,
+        promotions: Optional[ActiveRuleSet] = None,
+        promotion_book: Optional[TenantPromotions] = None,
+    ):
+        self.tenant = tenant
+        self.customer = customer
+        self.variants = variants
+        self.products = products
+        self.tier_index = tier_index
+        self.customers = customers or ({customer.id: customer} if customer else {})
+        self.contracts = contracts
+        self.priced_at = priced_at or datetime.utcnow()
+        self.promotions = promotions
+        self.promotion_book = promotion_book
+
+    def with_customer(self, customer_id: Optional[int], priced_at: Optional[datetime] = None) -> "PricingContext":
+        """
+        To'plamdagi boshqa mijoz uchun kontekst (ma'lumotlar umumiy)
+        priced_at - sotuv payti (offline): aksiyalar shu paytga, shartnoma
+        narxlari price_cart da shu paytga tekshiriladi
+        """
+        promotions = self.promotions
+        if priced_at is not None and priced_at != self.priced_at and self.promotion_book is not None:
+            promotions = self.promotion_book.active(priced_at)
+        return PricingContext(
+            tenant=self.tenant,
+            customer=self.customers.get(customer_id) if customer_id else None,
+            variants=self.variants,
+            products=self.products,
+            tier_index=self.tier_index,
+            customers=self.customers,
+            contracts=self.contracts,
+            priced_at=priced_at or self.priced_at,
+            promotions=promotions,
+            promotion_book=self.promotion_book,
+        )
+
+    @property
+    def customer_tier(self) -> Optional[CustomerTier]:
+        return self.customer.price_tier if self.customer else None
+
+    @property
+    def contract_prices(self) -> Dict[int, List[ContractEntry]]:
+        """Mijozning shartnoma narxlari lug'ati (variant_id -> narxlar)"""
+        if self.contracts is None or self.customer is None:
+            return {}
+        return self.contracts.customer_prices(self.customer.id)
+
+    @property
+    def business_type(self) -> Optional[BusinessType]:
+        return self.tenant.business_type if self.tenant else None
+
+
+def load_pricing_context(
+    db: Session,
+    tenant_id: int,
+    variant_ids: Iterable[int],
+    customer_id: Optional[int] = None,
+) -> PricingContext:
+    """
+    Savatcha uchun barcha ma'lumotlarni yuklash
+    So'rovlar soni: tenant + mijoz + variant/mahsulot (<= 3)
+    Narx darajalari, shartnoma narxlari va aksiyalar keshlari eskirgan bo'lsa,
+    har biri yana bitta so'rov bilan quriladi
+    """
+    variant_ids = set(variant_ids)
+    priced_at = datetime.utcnow()
+
+    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+
+    customer = None
+    if customer_id:
+        customer = db.query(CustomerV2).filter(
+            and_(
+                CustomerV2.id == customer_id,
+                CustomerV2.tenant_id == tenant_id
+            )
+        ).first()
+
+    variants: Dict[int, ProductVariant] = {}
+    products: Dict[int, ProductV2] = {}
+
+    if variant_ids:
+        rows = db.query(ProductVariant, ProductV2).outerjoin(
+            ProductV2, ProductV2.id == ProductVariant.product_id
+        ).filter(
+            and_(
+                ProductVariant.id.in_(variant_ids),
+                ProductVariant.tenant_id == tenant_id,
+                ProductVariant.is_active == True
+            )
+        ).all()
+
+        for variant, product in rows:
+            variants[variant.id] = variant
+            if product is not None:
+                products[product.id] = product
+
+    promotion_book = promotion_engine.get(db, tenant_id)
+    return PricingContext(
+        tenant=tenant,
+        customer=customer,
+        variants=variants,
+        products=products,
+        tier_index=price_tier_index.get(db, tenant_id),
+        contracts=contract_price_index.get(db, tenant_id),
+        priced_at=priced_at,
+        promotions=promotion_book.active(priced_at),
+        promotion_book=promotion_book,
+    )
+
+
+def load_batch_pricing_context(
+    db: Session,
+    tenant_id: int,
+    variant_ids: Iterable[int],
+    customer_ids: Iterable[int],
+) -> PricingContext:
+    """
+    Ko'p sotuvli to'plam uchun kontekst (offline yuklash)
+    Barcha mijozlar bitta so'rov bilan yuklanadi, with_customer() bilan
+    mijoz va sotuv payti tanlanadi
+    """
+    context = load_pricing_context(db, tenant_id, variant_ids)
+    customer_ids = {customer_id for customer_id in customer_ids if customer_id}
+    if customer_ids:
+        context.customers = {
+            customer.id: customer for customer in db.query(CustomerV2).filter(
+                and_(
+                    CustomerV2.id.in_(customer_ids),
+                    CustomerV2.tenant_id == tenant_id
+                )
+            ).all()
+        }
+    return context
+
+
+def price_cart(ctx: PricingContext, items: List[CartItem], check_stock: bool = True) -> CartCalculationResult:
+    """
+    Savatchani xotirada hisoblash - DB ga murojaat yo'q
+    check_stock=False - ombor sotuvda atomik chiqarishda tekshiriladi (checkout, offline yuklash)
+    """
+    # Retseptli taom o'z qoldig'iga emas, ingredientlariga tayanadi
+    check_stock = check_stock and ctx.business_type not in (BusinessType.KITCHEN, BusinessType.CAFE)
+    subtotal = 0.0
+    tax_amount = 0.0
+    discount_amount = 0.0
+    item_details = []
+    applied_tiers = []
+    applied_contracts = []
+    applied_promotions = []
+
+    customer_tier = ctx.customer_tier
+    contract_prices = ctx.contract_prices
+    promotions = ctx.promotions
+
+    for item in items:
+        variant = ctx.variants.get(item.variant_id)
+        if not variant:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Variant {item.variant_id} topilmadi"
+            )
+
+        # Ombor tekshirish (oldindan ko'rish)
+        if check_stock and variant.stock_quantity < item.quantity:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Variant {variant.sku} uchun yetarli ombor yo'q. Mavjud: {variant.stock_quantity}, Talab: {item.quantity}"
+            )
+
+        # Narxni aniqlash: shartnoma narxi, undan arzon bo'lsa PriceTier
+        unit_price = variant.price
+        contract = resolve(contract_prices, variant.id, ctx.priced_at) if contract_prices else None
+        if contract:
+            unit_price = contract.price
+            applied_contracts.append({
+                "variant_id": variant.id,
+                "price_list_id": contract.price_list_id,
+                "price": contract.price
+            })
+
+        tier = ctx.tier_index.best_tier(variant.id, item.quantity, customer_tier)
+        if tier and (contract is None or tier.price < contract.price):
+            unit_price = tier.price
+            applied_tiers.append({
+                "variant_id": variant.id,
+                "tier_id": tier.id,
+                "tier_type": tier.tier_type.value,
+                "min_quantity": tier.min_quantity,
+                "price": tier.price
+            })
+
+        product = ctx.products.get(variant.product_id)
+
+        # Chegirma
+        item_discount = 0.0
+        if item.discount_percent > 0:
+            item_discount = (unit_price * item.quantity) * (item.discount_percent / 100)
+
+        # Aksiya (variant/kategoriya bo'yicha eng yaxshisi)
+        promotion_id = None
+        promotion_discount = 0.0
+        if promotions:
+            best = promotions.best(variant.id, product.category_id if product else None, unit_price, item.quantity)
+            if best:
+                rule, amount = best
+                promotion_discount = min(amount, unit_price * item.quantity - item_discount)
+            if promotion_discount > 0:
+                promotion_id = rule.id
+                item_discount += promotion_discount
+                applied_promotions.append({
+                    "variant_id": variant.id,
+                    "promotion_id": rule.id,
+                    "name": rule.name,
+                    "promo_type": rule.promo_type.value,
+                    "discount": promotion_discount
+                })
+
+        # Element jami
+        item_total = (unit_price * item.quantity) - item_discount
+
+        # Soliq
+        tax_rate = product.tax_rate if product else 0.0
+        item_tax = item_total * (tax_rate / 100) if product else 0.0
+
+        item_details.append({
+            "variant_id": variant.id,
+            "sku": variant.sku,
+            "name": product.name if product else "",
+            "quantity": item.quantity,
+            "unit_price": unit_price,
+            "discount_percent": item.discount_percent,
+            "discount_amount": item_discount,
+            "promotion_id": promotion_id,
+            "promotion_discount": promotion_discount,
+            "tax_rate": tax_rate,
+            "tax_amount": item_tax,
+            "total": item_total + item_tax,
+        })
+
+        subtotal += item_total
+        tax_amount += item_tax
+        discount_amount += item_discount
+
+    # Adaptive Logic: Horeca Service Charge
+    service_charge = 0.0
+    if ctx.business_type == BusinessType.HORECA:
+        service_charge = subtotal * HORECA_SERVICE_CHARGE_RATE
+
+    total = subtotal + tax_amount + service_charge
+
+    return CartCalculationResult(
+        subtotal=subtotal,
+        tax_amount=tax_amount,
+        discount_amount=discount_amount,
+        service_charge=service_charge,
+        total=total,
+        items=item_details,
+        applied_price_tiers=applied_tiers,
+        applied_contract_prices=applied_contracts,
+        applied_promotions=applied_promotions,
+    )
@@ -0,0 +1,109 @@
+"""
+Catalog Service - Kassalar uchun yengil mahsulot katalogi
+Faqat kerakli ustunlar o'qiladi (embedding_vector, retsept va og'ir JSONB
+maydonlar so'ralmasa yuklanmaydi), ORM obyektlari yaratilmaydi.
+Sahifa: mahsulotlar uchun bitta so'rov + variantlar uchun bitta IN so'rov.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.models.product_v2 import ProductV2, ProductVariant
+
+PRODUCT_COLUMNS = {
+    "id": ProductV2.id,
+    "category_id": ProductV2.category_id,
+    "name": ProductV2.name,
+    "type": ProductV2.type,
+    "base_price": ProductV2.base_price,
+    "tax_rate": ProductV2.tax_rate,
+    "is_active": ProductV2.is_active,
+}
+PRODUCT_HEAVY_COLUMNS = {
+    "description": ProductV2.description,
+    "metadata": ProductV2.product_metadata,
+}
+
+VARIANT_COLUMNS = {
+    "id": ProductVariant.id,
+    "product_id": ProductVariant.product_id,
+    "sku": ProductVariant.sku,
+    "price": ProductVariant.price,
+    "stock_quantity": ProductVariant.stock_quantity,
+    "barcode_aliases": ProductVariant.barcode_aliases,
+    "is_active": ProductVariant.is_active,
+}
+VARIANT_HEAVY_COLUMNS = {
+    "attributes": ProductVariant.attributes,
+}
+
+
+def _select(columns: Dict[str, Any], heavy: Dict[str, Any], include: Set[str]) -> Dict[str, Any]:
+    selected = dict(columns)
+    selected.update({name: column for name, column in heavy.items() if name in include})
+    return selected
+
+
+def load_variants(
+    db: Session,
+    tenant_id: int,
+    product_ids: Iterable[int],
+    include: Set[str] = frozenset(),
+    active_only: bool = True,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Mahsulotlar variantlari bitta IN so'rovda: {product_id: [variant, ...]}"""
+    product_ids = list(product_ids)
+    grouped: Dict[int, List[Dict[str, Any]]] = {product_id: [] for product_id in product_ids}
+    if not product_ids:
+        return grouped
+
+    columns = _select(VARIANT_COLUMNS, VARIANT_HEAVY_COLUMNS, include)
+    query = db.query(*columns.values()).filter(
+        and_(
+            ProductVariant.tenant_id == tenant_id,
+            ProductVariant.product_id.in_(product_ids)
+        )
+    )
+    if active_only:
+        query = query.filter(ProductVariant.is_active == True)
+
+    names = list(columns)
+    for row in query.order_by(ProductVariant.product_id, ProductVariant.id):
+        variant = dict(zip(names, row))
+        variant["barcode_aliases"] = variant["barcode_aliases"] or []
+        grouped[variant["product_id"]].append(variant)
+    return grouped
+
+
+def load_catalog_page(
+    db: Session,
+    tenant_id: int,
+    after_id: Optional[int] = None,
+    limit: int = 200,
+    include: Set[str] = frozenset(),
+    active_only: bool = True,
+    category_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    id bo'yicha keyset sahifa (idx_products_tenant_active)
+    limit + 1 ta qator qaytarishi mumkin - keyingi sahifa borligini bilish uchun
+    """
+    columns = _select(PRODUCT_COLUMNS, PRODUCT_HEAVY_COLUMNS, include)
+    query = db.query(*columns.values()).filter(ProductV2.tenant_id == tenant_id)
+    if active_only:
+        query = query.filter(ProductV2.is_active == True)
+    if category_id is not None:
+        query = query.filter(ProductV2.category_id == category_id)
+    if after_id is not None:
+        query = query.filter(ProductV2.id > after_id)
+
+    names = list(columns)
+    products = [dict(zip(names, row)) for row in query.order_by(ProductV2.id).limit(limit + 1)]
+
+    variants = load_variants(
+        db, tenant_id, [p["id"] for p in products[:limit]], include, active_only
+    )
+    for product in products:
+        product["variants"] = variants.get(product["id"], [])
+    return products
@@ -0,0 +1,144 @@
+"""
+Catalog Snapshot - Kassani ishga tushirish uchun ixcham katalog tasviri
+Mahsulotlar, variantlar va narx darajalari ustunli ko'rinishda
+({"id": [...], "name": [...]}) MessagePack bilan kodlanadi va gzip
+bilan siqiladi. Tasvir katalog versiyasi uchun bir marta quriladi va
+diskda saqlanadi; endpoint faylni Range qo'llab-quvvatlovi bilan beradi,
+shuning uchun uzilgan yuklab olish davom ettiriladi. Tasvirdagi version
+dan keyingi o'zgarishlar /v2/products/changes orqali olinadi.
+"""
+import enum
+import gzip
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+import msgpack
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.pricing import PriceTier
+from app.models.product_v2 import ProductV2, ProductVariant
+from app.services.catalog_service import PRODUCT_COLUMNS, VARIANT_COLUMNS, VARIANT_HEAVY_COLUMNS
+from app.services.catalog_sync import PRICE_TIER_COLUMNS, current_version
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_BATCH = 5000
+KEEP_SNAPSHOTS = 2
+MEDIA_TYPE = "application/vnd.savdogar.catalog+msgpack"
+
+_build_locks: Dict[int, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _columnar(query, columns: Dict[str, Any]) -> Dict[str, list]:
+    """Qatorlar -> {ustun: [qiymatlar]} (ORM obyektlarisiz)"""
+    names = list(columns)
+    table = {name: [] for name in names}
+    for row in query.yield_per(SNAPSHOT_BATCH):
+        for name, value in zip(names, row):
+            table[name].append(_plain(value))
+    return table
+
+
+def build_snapshot(db: Session, tenant_id: int) -> Tuple[int, bytes]:
+    """Tenant katalogining siqilgan tasviri: (version, bytes)"""
+    # Versiya ma'lumotlardan oldin o'qiladi - keyingi o'zgarishlar delta da keladi
+    version = current_version(db, tenant_id)
+
+    products = db.query(*PRODUCT_COLUMNS.values()).filter(
+        ProductV2.tenant_id == tenant_id,
+        ProductV2.is_active == True
+    ).order_by(ProductV2.id)
+
+    variant_columns = dict(VARIANT_COLUMNS, **VARIANT_HEAVY_COLUMNS)
+    variants = db.query(*variant_columns.values()).filter(
+        ProductVariant.tenant_id == tenant_id,
+        ProductVariant.is_active == True
+    ).order_by(ProductVariant.id)
+
+    tiers = db.query(*PRICE_TIER_COLUMNS.values()).join(
+        ProductVariant, ProductVariant.id == PriceTier.variant_id
+    ).filter(
+        PriceTier.tenant_id == tenant_id,
+        ProductVariant.is_active == True
+    ).order_by(PriceTier.id)
+
+    variant_table = _columnar(variants, variant_columns)
+    variant_table["barcode_aliases"] = [aliases or [] for aliases in variant_table["barcode_aliases"]]
+
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "tenant_id": tenant_id,
+        "version": version,
+        "generated_at": datetime.utcnow().isoformat(),
+        "products": _columnar(products, PRODUCT_COLUMNS),
+        "variants": variant_table,
+        "price_tiers": _columnar(tiers, PRICE_TIER_COLUMNS),
+    }
+    return version, encode_snapshot(payload)
+
+
+def encode_snapshot(payload: Dict[str, Any]) -> bytes:
+    return gzip.compress(msgpack.packb(payload, use_bin_type=True), compresslevel=6)
+
+
+def decode_snapshot(data: bytes) -> Dict[str, Any]:
+    """Tasvirni ochish (kassa tomonidagi kabi)"""
+    return msgpack.unpackb(gzip.decompress(data), raw=False)
+
+
+def snapshot_dir(tenant_id: int) -> str:
+    return os.path.join(settings.CATALOG_SNAPSHOT_DIR, f"tenant_{tenant_id}")
+
+
+def snapshot_path(tenant_id: int, version: int) -> str:
+    return os.path.join(snapshot_dir(tenant_id), f"catalog-v{version}-f{SNAPSHOT_FORMAT}.msgpack.gz")
+
+
+def snapshot_etag(tenant_id: int, version: int) -> str:
+    return f'"catalog-{tenant_id}-v{version}-f{SNAPSHOT_FORMAT}"'
+
+
+def _tenant_lock(tenant_id: int) -> threading.Lock:
+    with _locks_guard:
+        return _build_locks.setdefault(tenant_id, threading.Lock())
+
+
+def get_snapshot(db: Session, tenant_id: int) -> Tuple[str, int]:
+    """
+    Joriy versiya tasviri fayli: (path, version)
+    Fayl yo'q bo'lsa quriladi (bir tenant uchun bir vaqtda bitta qurish),
+    eski versiyalar fayllari o'chiriladi.
+    """
+    version = current_version(db, tenant_id)
+    path = snapshot_path(tenant_id, version)
+    if os.path.exists(path):
+        return path, version
+
+    with _tenant_lock(tenant_id):
+        if os.path.exists(path):
+            return path, version
+        built_version, data = build_snapshot(db, tenant_id)
+        path = snapshot_path(tenant_id, built_version)
+        directory = snapshot_dir(tenant_id)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        # Oldingi tasvir saqlanadi - uni hozir berayotgan so'rovlar uzilmasin
+        files = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory) if not name.endswith(".tmp")),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for old in files[KEEP_SNAPSHOTS:]:
+            os.remove(old)
+    return path, built_version
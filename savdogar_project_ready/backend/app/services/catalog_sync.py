@@ -0,0 +1,136 @@
+"""
+Catalog Sync - Kassalar uchun katalog o'zgarishlari lentasi (delta)
+Har bir katalog yozuvi tranzaksiyasida tenants.catalog_version oshiriladi
+(UPDATE ... RETURNING - tenant qatori tranzaksiya oxirigacha qulflanadi,
+shuning uchun versiyalar commit tartibida ko'rinadi) va o'zgargan qatorlar
+catalog_changes jurnaliga yoziladi. Kassa "V versiyadan keyingi
+o'zgarishlar" ni so'raydi va faqat o'zgargan qatorlar va o'chirilganlar
+ro'yxatini oladi.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.models.pricing import PriceTier
+from app.models.product_v2 import CatalogChange, ProductV2, ProductVariant
+from app.models.tenant import Tenant
+from app.services.catalog_service import PRODUCT_COLUMNS, VARIANT_COLUMNS
+
+PRODUCT = "product"
+VARIANT = "variant"
+PRICE_TIER = "price_tier"
+
+PRICE_TIER_COLUMNS = {
+    "id": PriceTier.id,
+    "variant_id": PriceTier.variant_id,
+    "tier_type": PriceTier.tier_type,
+    "min_quantity": PriceTier.min_quantity,
+    "max_quantity": PriceTier.max_quantity,
+    "price": PriceTier.price,
+    "customer_group": PriceTier.customer_group,
+}
+
+# entity -> (model, ustunlar, faol qatorlar sharti)
+_ENTITIES = {
+    PRODUCT: (ProductV2, PRODUCT_COLUMNS, ProductV2.is_active == True),
+    VARIANT: (ProductVariant, VARIANT_COLUMNS, ProductVariant.is_active == True),
+    PRICE_TIER: (PriceTier, PRICE_TIER_COLUMNS, None),
+}
+_PLURAL = {PRODUCT: "products", VARIANT: "variants", PRICE_TIER: "price_tiers"}
+
+
+def record_changes(db: Session, tenant_id: int, changes: Iterable[Tuple[str, int, bool]]) -> Optional[int]:
+    """
+    O'zgarishlarni jurnalga yozish: [(entity, entity_id, deleted), ...]
+    Chaqiruvchi tranzaksiyasida ishlaydi (commit qilmaydi), yangi versiyani qaytaradi.
+    """
+    changes = list(changes)
+    if not changes:
+        return None
+    version = db.execute(
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(catalog_version=Tenant.catalog_version + 1)
+        .returning(Tenant.catalog_version)
+    ).scalar_one()
+    db.execute(insert(CatalogChange), [
+        {"tenant_id": tenant_id, "version": version, "entity": entity, "entity_id": entity_id, "deleted": deleted}
+        for entity, entity_id, deleted in changes
+    ])
+    return version
+
+
+def current_version(db: Session, tenant_id: int) -> int:
+    version = db.query(Tenant.catalog_version).filter(Tenant.id == tenant_id).scalar()
+    return version or 0
+
+
+def _load_rows(db: Session, tenant_id: int, entity: str, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Joriy faol qatorlar (proyeksiya) - topilmaganlari o'chirilgan hisoblanadi"""
+    model, columns, active = _ENTITIES[entity]
+    query = db.query(*columns.values()).filter(model.tenant_id == tenant_id, model.id.in_(ids))
+    if active is not None:
+        query = query.filter(active)
+    names = list(columns)
+    rows = {}
+    for row in query:
+        item = dict(zip(names, row))
+        if "barcode_aliases" in item:
+            item["barcode_aliases"] = item["barcode_aliases"] or []
+        rows[item["id"]] = item
+    return rows
+
+
+def load_changes(db: Session, tenant_id: int, since: int, limit: int = 1000) -> Dict[str, Any]:
+    """
+    since versiyadan keyingi o'zgarishlar
+    Bitta versiya hech qachon ikki sahifaga bo'linmaydi; has_more = True bo'lsa
+    kassa qaytarilgan version bilan yana so'raydi.
+    """
+    rows = db.query(
+        CatalogChange.version, CatalogChange.entity, CatalogChange.entity_id, CatalogChange.deleted
+    ).filter(
+        CatalogChange.tenant_id == tenant_id,
+        CatalogChange.version > since
+    ).order_by(CatalogChange.version, CatalogChange.id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    if has_more:
+        cut = rows[limit].version
+        kept = [row for row in rows if row.version < cut]
+        if kept:
+            rows = kept
+        else:
+            # Bitta versiya limit dan katta - uni to'liq qaytaramiz
+            rows = db.query(
+                CatalogChange.version, CatalogChange.entity, CatalogChange.entity_id, CatalogChange.deleted
+            ).filter(
+                CatalogChange.tenant_id == tenant_id,
+                CatalogChange.version == cut
+            ).order_by(CatalogChange.id).all()
+
+    # Har bir qator uchun oxirgi holat yetarli
+    latest: Dict[Tuple[str, int], bool] = {}
+    for row in rows:
+        latest[(row.entity, row.entity_id)] = row.deleted
+
+    result: Dict[str, Any] = {
+        "version": rows[-1].version if rows else since,
+        "has_more": has_more,
+        "deleted": {plural: [] for plural in _PLURAL.values()},
+    }
+    for entity, plural in _PLURAL.items():
+        ids = sorted(entity_id for (kind, entity_id), deleted in latest.items() if kind == entity and not deleted)
+        current = _load_rows(db, tenant_id, entity, ids) if ids else {}
+        result[plural] = [current[entity_id] for entity_id in ids if entity_id in current]
+        result["deleted"][plural] = sorted(
+            entity_id for (kind, entity_id), deleted in latest.items()
+            if kind == entity and (deleted or entity_id not in current)
+        )
+    return result
+
+
+def changes_etag(tenant_id: int, since: int, version: int, limit: int) -> str:
+    """Javob tenant, since, joriy versiya va limit bilan to'liq aniqlanadi"""
+    return f'W/"catalog-{tenant_id}-{since}-{version}-{limit}"'
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from app.services.azure_openai_client import azure_openai
 from app.models.sale_v2 import SaleV2
 from app.models.customer_v2 import CustomerV2
+from app.services import receivables_aging
 from sqlalchemy import func
 
 class CFOAgentService:
@@ -16,6 +17,8 @@ class CFOAgentService:
         total_sales = db.query(func.sum(SaleV2.total_amount)).filter(SaleV2.tenant_id == tenant_id).scalar() or 0
         total_debt = db.query(func.sum(CustomerV2.balance)).filter(CustomerV2.tenant_id == tenant_id, CustomerV2.balance < 0).scalar() or 0
         customer_count = db.query(func.count(CustomerV2.id)).filter(CustomerV2.tenant_id == tenant_id).scalar() or 0
+        receivables_aging.refresh(db, tenant_id)
+        aging = receivables_aging.summary(db, tenant_id)
         
         # 2. GPT-4o orqali "Deep Reasoning" (Mukammal mantiq)
         prompt = f"""
@@ -23,6 +26,7 @@ class CFOAgentService:
         Hozirgi holat:
         - Jami savdo: {total_sales:,.0f} so'm
         - Mijozlar qarzi: {abs(total_debt):,.0f} so'm
+          (0-30 kun: {aging["current"]:,.0f}, 31-60: {aging["days_31_60"]:,.0f}, 61-90: {aging["days_61_90"]:,.0f}, 90+: {aging["days_over_90"]:,.0f})
         - Jami mijozlar: {customer_count} ta
         
         Vazifa: Ushbu biznes egasiga chuqur, strategik va o'zbek tilida 3 ta maslahat bering. 
@@ -41,6 +45,7 @@ class CFOAgentService:
             "cfo_report": report,
             "metrics": {
                 "health_score": "HEALTHY" if abs(total_debt) < (total_sales * 0.2) else "RISKY",
-                "debt_to_sales_ratio": f"{(abs(total_debt) / total_sales) * 100:.1f}%" if total_sales > 0 else "0%"
+                "debt_to_sales_ratio": f"{(abs(total_debt) / total_sales) * 100:.1f}%" if total_sales > 0 else "0%",
+                "receivables_aging": aging,
             }
         }
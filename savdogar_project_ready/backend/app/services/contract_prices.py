@@ -0,0 +1,108 @@
+"""
+Contract Prices - Mijozlar bilan kelishilgan narxlar uchun xotiradagi indeks
+Har bir tenant uchun mijoz -> variant -> shartnoma narxlari lug'ati bitta
+so'rov bilan quriladi, savatchadagi har bir qator uchun narx O(1) da
+topiladi (qatorma-qator so'rov yo'q). Amal qilish muddati narx olinayotgan
+paytda tekshiriladi; narxlar ro'yxati yozilganda invalidate() chaqiriladi.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.pricing import CustomerPriceList, CustomerPriceListItem
+from app.services.tenant_cache import TenantCache
+
+
+class ContractEntry:
+    """Shartnoma narxining sessiyaga bog'lanmagan nusxasi"""
+
+    __slots__ = ("price_list_id", "variant_id", "price", "valid_from", "valid_to")
+
+    def __init__(self, price_list_id, variant_id, price, valid_from, valid_to):
+        self.price_list_id = price_list_id
+        self.variant_id = variant_id
+        self.price = price
+        self.valid_from = valid_from
+        self.valid_to = valid_to
+
+    def is_valid(self, at: datetime) -> bool:
+        if self.valid_from is not None and at < self.valid_from:
+            return False
+        if self.valid_to is not None and at > self.valid_to:
+            return False
+        return True
+
+
+class TenantContracts:
+    """Bitta tenant ning shartnoma narxlari: {customer_id: {variant_id: [entry, ...]}}"""
+
+    def __init__(self, rows):
+        self.entry_count = 0
+        self._customers: Dict[int, Dict[int, List[ContractEntry]]] = {}
+        for customer_id, price_list_id, variant_id, price, valid_from, valid_to in rows:
+            entry = ContractEntry(price_list_id, variant_id, price, valid_from, valid_to)
+            self._customers.setdefault(customer_id, {}).setdefault(variant_id, []).append(entry)
+            self.entry_count += 1
+
+        # Ustma-ust tushgan ro'yxatlardan eng yangisi ustun (keyin boshlangan, keyin yaratilgan)
+        for prices in self._customers.values():
+            for candidates in prices.values():
+                candidates.sort(key=lambda e: (e.valid_from or datetime.min, e.price_list_id), reverse=True)
+
+    def customer_prices(self, customer_id: Optional[int]) -> Dict[int, List[ContractEntry]]:
+        """Mijozning variant -> narxlar lug'ati (savatcha uchun bir marta olinadi)"""
+        if not customer_id:
+            return {}
+        return self._customers.get(customer_id, {})
+
+    def price_for(self, customer_id: Optional[int], variant_id: int, at: Optional[datetime] = None) -> Optional[ContractEntry]:
+        return resolve(self.customer_prices(customer_id), variant_id, at or datetime.utcnow())
+
+
+def resolve(prices: Dict[int, List[ContractEntry]], variant_id: int, at: datetime) -> Optional[ContractEntry]:
+    """at paytida amal qiladigan shartnoma narxi"""
+    for entry in prices.get(variant_id, ()):
+        if entry.is_valid(at):
+            return entry
+    return None
+
+
+class ContractPriceIndex(TenantCache):
+    """Jarayon ichidagi shartnoma narxlari reestri"""
+
+    name = "contract_prices"
+
+    def build(self, db: Session, tenant_id: int) -> TenantContracts:
+        # Muddati o'tganlari faqat offline sotuvlar oynasi ichida yuklanadi (kelajakdagilari yuklanadi)
+        expired_after = datetime.utcnow() - timedelta(days=settings.OFFLINE_PRICING_WINDOW_DAYS)
+        rows = db.query(
+            CustomerPriceList.customer_id,
+            CustomerPriceList.id,
+            CustomerPriceListItem.variant_id,
+            CustomerPriceListItem.price,
+            CustomerPriceList.valid_from,
+            CustomerPriceList.valid_to,
+        ).join(
+            CustomerPriceListItem, CustomerPriceListItem.price_list_id == CustomerPriceList.id
+        ).filter(
+            CustomerPriceList.tenant_id == tenant_id,
+            CustomerPriceList.is_active == True,
+            or_(CustomerPriceList.valid_to.is_(None), CustomerPriceList.valid_to >= expired_after)
+        ).all()
+        return TenantContracts(rows)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["prices"] = sum(contracts.entry_count for contracts in self.values())
+        return stats
+
+
+contract_price_index = ContractPriceIndex()
+
+
+def get_contract_price_index_stats() -> Dict:
+    """Get contract price index statistics."""
+    return contract_price_index.stats()
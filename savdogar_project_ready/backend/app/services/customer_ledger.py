@@ -0,0 +1,212 @@
+"""
+Customer Ledger - Mijoz balansini atomik o'zgartirish va qarz kitobi
+Balans Python da o'qib-yozilmaydi: bitta UPDATE ... FROM (VALUES ...) ...
+RETURNING bilan bazaning o'zida oshiriladi/kamaytiriladi, shuning uchun
+bir mijozga parallel qarz sotuvlarida "lost update" bo'lmaydi. Qarz
+kitobiga yozuvlar faqat qo'shiladi; balance_after UPDATE qaytargan
+balansdan hisoblanadi (mijoz qatori commit gacha qulflangan - bir mijozning
+yozuvlari ID tartibida ketma-ket).
+
+Debitorlik yosh taqsimoti (receivables_aging) shu tranzaksiyada yangilanadi.
+Har CHECKPOINT_INTERVAL ta yozuvda shu tranzaksiyaning o'zida balans nazorat
+nuqtasi yoziladi. "Sanadagi balans" va hisob-kitob so'rovlari butun tarixni
+emas, oxirgi nazorat nuqtasi + undan keyingi qisqa dumni yig'adi.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.customer_v2 import CustomerBalanceCheckpoint, CustomerLedger
+from app.services import receivables_aging
+
+# Nazorat nuqtalari orasidagi yozuvlar soni
+CHECKPOINT_INTERVAL = 500
+
+# validate_sale dagi limit: max_debt_allowed or credit_limit or 0
+DEBT_LIMIT = "COALESCE(NULLIF(customers_v2.max_debt_allowed, 0), customers_v2.credit_limit, 0)"
+
+
+class DebtLimitExceeded(Exception):
+    """Qarz limiti oshib ketadi - balanslar o'zgartirilmadi"""
+
+    def __init__(self, customer_ids: List[int]):
+        self.customer_ids = customer_ids
+        super().__init__(f"Qarz limiti oshib ketdi: {customer_ids}")
+
+
+def entry_delta(entry: Dict[str, Any]) -> float:
+    """Yozuvning balansga ta'siri: to'lov (+), qarz (-)"""
+    return (entry.get("credit") or 0.0) - (entry.get("debit") or 0.0)
+
+
+def apply_balance_deltas(
+    db: Session,
+    tenant_id: int,
+    deltas: Dict[int, Tuple[float, int]],
+    enforce_limit: bool = False,
+) -> Dict[int, Tuple[float, int]]:
+    """
+    Balanslarni bitta so'rov bilan o'zgartirish
+    deltas: {customer_id: (balans o'zgarishi, yozuvlar soni)}
+    enforce_limit: qarzni oshiradigan o'zgarish limitdan o'tsa qator yangilanmaydi
+    Returns: yangilangan mijozlar {customer_id: (yangi balans, yozuvlar soni)}
+    """
+    if not deltas:
+        return {}
+
+    params = {"tenant_id": tenant_id}
+    rows = []
+    for i, (customer_id, (delta, count)) in enumerate(deltas.items()):
+        params[f"id_{i}"] = customer_id
+        params[f"delta_{i}"] = delta
+        params[f"n_{i}"] = count
+        rows.append(f"(CAST(:id_{i} AS INTEGER), CAST(:delta_{i} AS FLOAT), CAST(:n_{i} AS INTEGER))")
+
+    limit_check = ""
+    if enforce_limit:
+        limit_check = f"AND (v.delta >= 0 OR customers_v2.balance + v.delta >= -{DEBT_LIMIT})"
+
+    # CTE shakli Postgres va SQLite (testlar) da bir xil ishlaydi
+    statement = text(f"""
+        WITH v(id, delta, n) AS (VALUES {", ".join(rows)})
+        UPDATE customers_v2
+        SET balance = customers_v2.balance + v.delta,
+            ledger_count = customers_v2.ledger_count + v.n
+        FROM v
+        WHERE customers_v2.id = v.id
+          AND customers_v2.tenant_id = :tenant_id
+          {limit_check}
+        RETURNING customers_v2.id, customers_v2.balance, customers_v2.ledger_count
+    """)
+
+    return {customer_id: (balance, count) for customer_id, balance, count in db.execute(statement, params)}
+
+
+def post_entries(
+    db: Session,
+    tenant_id: int,
+    entries: List[Dict[str, Any]],
+    enforce_limit: bool = False,
+) -> List[int]:
+    """
+    Qarz kitobiga yozuvlar qo'shish va balanslarni atomik o'zgartirish
+    entries: CustomerLedger ustunlari (customer_id, sale_id, debit, credit, ...);
+    balance_after va created_at shu yerda qo'yiladi
+    Returns: yangi yozuvlar ID lari (entries tartibida)
+    Eslatma: DebtLimitExceeded bo'lsa chaqiruvchi tranzaksiyani rollback qilishi kerak
+    """
+    if not entries:
+        return []
+
+    deltas: Dict[int, Tuple[float, int]] = {}
+    for entry in entries:
+        delta, count = deltas.get(entry["customer_id"], (0.0, 0))
+        deltas[entry["customer_id"]] = (delta + entry_delta(entry), count + 1)
+
+    updated = apply_balance_deltas(db, tenant_id, deltas, enforce_limit=enforce_limit)
+    failed = [customer_id for customer_id in deltas if customer_id not in updated]
+    if failed:
+        raise DebtLimitExceeded(failed)
+
+    # balance_after - yakuniy balansdan orqaga (oxirgi yozuv = mijoz balansi)
+    now = datetime.utcnow()
+    remaining = {customer_id: balance for customer_id, (balance, _) in updated.items()}
+    rows = [None] * len(entries)
+    for i in range(len(entries) - 1, -1, -1):
+        entry = entries[i]
+        customer_id = entry["customer_id"]
+        rows[i] = {**entry, "balance_after": remaining[customer_id], "created_at": now}
+        remaining[customer_id] -= entry_delta(entry)
+
+    ledger_ids = db.scalars(
+        insert(CustomerLedger).returning(CustomerLedger.id, sort_by_parameter_order=True),
+        rows,
+    ).all()
+
+    # Debitorlik qismlari va yosh taqsimoti (faqat shu mijozlar)
+    receivables_aging.apply_postings(db, tenant_id, [
+        dict(row, id=ledger_id) for ledger_id, row in zip(ledger_ids, rows)
+    ])
+
+    # Nazorat nuqtasi - yozuvlar soni CHECKPOINT_INTERVAL chegarasidan o'tganda
+    last_ids = {row["customer_id"]: ledger_id for ledger_id, row in zip(ledger_ids, rows)}
+    checkpoints = []
+    for customer_id, (balance, count) in updated.items():
+        before = count - deltas[customer_id][1]
+        if before // CHECKPOINT_INTERVAL != count // CHECKPOINT_INTERVAL:
+            checkpoints.append(dict(
+                customer_id=customer_id,
+                ledger_id=last_ids[customer_id],
+                balance=balance,
+                entries=count,
+                as_of=now,
+            ))
+    if checkpoints:
+        db.execute(insert(CustomerBalanceCheckpoint), checkpoints)
+
+    return ledger_ids
+
+
+def latest_checkpoint(db: Session, customer_id: int, at: datetime, inclusive: bool = True) -> Tuple[int, float]:
+    """at paytigacha bo'lgan oxirgi nazorat nuqtasi: (ledger_id, balans); yo'q bo'lsa (0, 0.0)"""
+    checkpoint = db.query(
+        CustomerBalanceCheckpoint.ledger_id, CustomerBalanceCheckpoint.balance
+    ).filter(
+        CustomerBalanceCheckpoint.customer_id == customer_id,
+        CustomerBalanceCheckpoint.as_of <= at if inclusive else CustomerBalanceCheckpoint.as_of < at,
+    ).order_by(
+        CustomerBalanceCheckpoint.as_of.desc(), CustomerBalanceCheckpoint.ledger_id.desc()
+    ).first()
+    if checkpoint is None:
+        return 0, 0.0
+    return checkpoint.ledger_id, checkpoint.balance
+
+
+def balance_as_of(db: Session, customer_id: int, at: datetime, inclusive: bool = True) -> float:
+    """
+    at paytidagi balans: nazorat nuqtasi + undan keyingi yozuvlar (at gacha)
+    inclusive=False - at paytidagi yozuvlarsiz (hisob-kitob oynasining boshlang'ich balansi)
+    """
+    after_id, balance = latest_checkpoint(db, customer_id, at, inclusive=inclusive)
+    tail = db.query(
+        func.coalesce(func.sum(
+            func.coalesce(CustomerLedger.credit, 0.0) - func.coalesce(CustomerLedger.debit, 0.0)
+        ), 0.0)
+    ).filter(
+        CustomerLedger.customer_id == customer_id,
+        CustomerLedger.id > after_id,
+        CustomerLedger.created_at <= at if inclusive else CustomerLedger.created_at < at,
+    ).scalar()
+    return balance + tail
+
+
+def backfill_checkpoints(db: Session, customer_id: int) -> int:
+    """
+    Nazorat nuqtalari bo'lmagan eski tarix uchun (bir marta)
+    Yozuvlar ID tartibida o'qiladi, har CHECKPOINT_INTERVAL tada nuqta yoziladi.
+    Mavjud mijozlar uchun c5e9a3d7b2f4 migratsiyasi xuddi shu hisobni SQL da bajaradi.
+    Returns: yozilgan nazorat nuqtalari soni
+    """
+    exists = db.query(CustomerBalanceCheckpoint.id).filter(
+        CustomerBalanceCheckpoint.customer_id == customer_id
+    ).first()
+    if exists:
+        return 0
+
+    rows = db.query(
+        CustomerLedger.id, CustomerLedger.debit, CustomerLedger.credit, CustomerLedger.created_at
+    ).filter(CustomerLedger.customer_id == customer_id).order_by(CustomerLedger.id)
+
+    balance, count, checkpoints = 0.0, 0, []
+    for ledger_id, debit, credit, created_at in rows.yield_per(2000):
+        balance += (credit or 0.0) - (debit or 0.0)
+        count += 1
+        if count % CHECKPOINT_INTERVAL == 0:
+            checkpoints.append(dict(
+                customer_id=customer_id, ledger_id=ledger_id, balance=balance, entries=count, as_of=created_at
+            ))
+    if checkpoints:
+        db.execute(insert(CustomerBalanceCheckpoint), checkpoints)
+    return len(checkpoints)
@@ -0,0 +1,212 @@
+"""
+Customer Lookup - Kassada mijozni telefon yoki ism bo'yicha tez topish
+Telefonlar milliy 9 raqamli ko'rinishga keltiriladi (+998 / 998 / 8 olib
+tashlanadi) va ikki tartiblangan ro'yxatda saqlanadi: raqam bo'yicha (boshi
+mos - "90 12...") va teskari raqam bo'yicha (oxiri mos - "...4567").
+Ikkalasi ham bisect bilan O(log n) da o'qiladi. Ismlar search_index dagi
+trigram indeksida (xatoli yozilgan ism ham topiladi).
+
+Indeks faqat id/ism/telefonni saqlaydi; balans va daraja tez o'zgargani
+uchun topilgan bir nechta mijoz uchun bazadan asosiy kalit bo'yicha olinadi.
+"""
+from bisect import bisect_left, insort
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.customer_v2 import CustomerV2
+from app.services.search_index import NgramIndex
+from app.services.tenant_cache import TenantCache
+
+COUNTRY_CODE = "998"
+NATIONAL_LENGTH = 9
+# Telefon qidiruvi uchun kamida shuncha raqam
+MIN_PHONE_DIGITS = 3
+
+PHONE_EXACT, PHONE_PREFIX, PHONE_SUFFIX = "phone", "phone_prefix", "phone_suffix"
+
+_NON_DIGIT = re.compile(r"\D+")
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """'+998 (90) 123-45-67' / '8 90 1234567' -> '901234567'"""
+    digits = _NON_DIGIT.sub("", phone or "")
+    if len(digits) == len(COUNTRY_CODE) + NATIONAL_LENGTH and digits.startswith(COUNTRY_CODE):
+        return digits[len(COUNTRY_CODE):]
+    if len(digits) == NATIONAL_LENGTH + 1 and digits.startswith("8"):
+        return digits[1:]
+    return digits
+
+
+def phone_query(query: str) -> str:
+    """
+    Yozilayotgan so'rov raqamlari: '+99890' -> '90', '998901234567' -> '901234567'
+    '998' faqat '+' bilan yoki 9 tadan ko'p raqam bo'lsa kod deb olinadi
+    (99 8.. bilan boshlanadigan milliy raqamlar ham bor)
+    """
+    digits = _NON_DIGIT.sub("", query or "")
+    if digits.startswith(COUNTRY_CODE) and (query.lstrip().startswith("+") or len(digits) > NATIONAL_LENGTH):
+        return digits[len(COUNTRY_CODE):]
+    return normalize_phone(digits)
+
+
+class _SortedKeys:
+    """(kalit, customer_id) tartiblangan ro'yxati - boshi bo'yicha qidiruv"""
+
+    def __init__(self, items: List[Tuple[str, int]]):
+        self.items = sorted(items)
+
+    def add(self, key: str, customer_id: int) -> None:
+        insort(self.items, (key, customer_id))
+
+    def discard(self, key: str, customer_id: int) -> None:
+        i = bisect_left(self.items, (key, customer_id))
+        if i < len(self.items) and self.items[i] == (key, customer_id):
+            del self.items[i]
+
+    def starting_with(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        items = self.items
+        i = bisect_left(items, (prefix, -1))
+        found = []
+        while i < len(items) and len(found) < limit and items[i][0].startswith(prefix):
+            found.append(items[i])
+            i += 1
+        return found
+
+
+class CustomerDirectory:
+    """Bitta tenant ning telefon (boshi/oxiri) va ism indekslari"""
+
+    def __init__(self, rows: List[Tuple[int, str, Optional[str]]]):
+        self.phones: Dict[int, str] = {}
+        self.names = NgramIndex([(customer_id, name) for customer_id, name, _ in rows])
+        self._lock = threading.Lock()
+        for customer_id, _, phone in rows:
+            phone = normalize_phone(phone)
+            if phone:
+                self.phones[customer_id] = phone
+        self.by_prefix = _SortedKeys([(phone, customer_id) for customer_id, phone in self.phones.items()])
+        self.by_suffix = _SortedKeys([(phone[::-1], customer_id) for customer_id, phone in self.phones.items()])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def upsert(self, customer_id: int, name: str, phone: Optional[str]) -> None:
+        self.names.upsert(customer_id, name)
+        with self._lock:
+            self._remove_phone(customer_id)
+            phone = normalize_phone(phone)
+            if phone:
+                self.phones[customer_id] = phone
+                self.by_prefix.add(phone, customer_id)
+                self.by_suffix.add(phone[::-1], customer_id)
+
+    def remove(self, customer_id: int) -> None:
+        self.names.remove(customer_id)
+        with self._lock:
+            self._remove_phone(customer_id)
+
+    def _remove_phone(self, customer_id: int) -> None:
+        phone = self.phones.pop(customer_id, None)
+        if phone:
+            self.by_prefix.discard(phone, customer_id)
+            self.by_suffix.discard(phone[::-1], customer_id)
+
+    def search_phone(self, digits: str, limit: int) -> List[Tuple[int, str]]:
+        """[(customer_id, qanday mos kelgani)] - to'liq, boshi, keyin oxiri"""
+        matches: Dict[int, str] = {}
+        for phone, customer_id in self.by_prefix.starting_with(digits, limit):
+            matches[customer_id] = PHONE_EXACT if phone == digits else PHONE_PREFIX
+        if len(matches) < limit:
+            for _, customer_id in self.by_suffix.starting_with(digits[::-1], limit):
+                matches.setdefault(customer_id, PHONE_SUFFIX)
+        order = {PHONE_EXACT: 0, PHONE_PREFIX: 1, PHONE_SUFFIX: 2}
+        ranked = sorted(matches.items(), key=lambda item: (order[item[1]], self.phones[item[0]]))
+        return ranked[:limit]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, str, float]]:
+        """
+        [(customer_id, qanday mos kelgani, ball)]
+        Raqamli so'rov - telefon bo'yicha, harfli so'rov - ism bo'yicha
+        """
+        results: List[Tuple[int, str, float]] = []
+        seen = set()
+        digits = phone_query(query)
+        if len(digits) >= MIN_PHONE_DIGITS:
+            for customer_id, matched in self.search_phone(digits, limit):
+                results.append((customer_id, matched, 1.0))
+                seen.add(customer_id)
+        if any(ch.isalpha() for ch in query) and len(results) < limit:
+            for customer_id, score in self.names.search(query, limit):
+                if customer_id not in seen:
+                    results.append((customer_id, "name", score))
+        return results[:limit]
+
+
+class CustomerLookupIndex(TenantCache):
+    """Tenant mijozlari qidiruv indekslari reestri"""
+
+    name = "customers"
+
+    def build(self, db: Session, tenant_id: int) -> CustomerDirectory:
+        rows = db.query(CustomerV2.id, CustomerV2.name, CustomerV2.phone).filter(
+            CustomerV2.tenant_id == tenant_id
+        ).all()
+        return CustomerDirectory(rows)
+
+    def upsert(self, tenant_id: int, customer_id: int, name: str, phone: Optional[str]) -> None:
+        directory = self.peek(tenant_id)
+        if directory is not None:
+            directory.upsert(customer_id, name, phone)
+
+    def remove(self, tenant_id: int, customer_id: int) -> None:
+        directory = self.peek(tenant_id)
+        if directory is not None:
+            directory.remove(customer_id)
+
+    def lookup(self, db: Session, tenant_id: int, query: str, limit: int = 10) -> List[Dict]:
+        """Eng mos mijozlar joriy balans va daraja bilan (bitta asosiy kalit so'rovi)"""
+        matches = self.get(db, tenant_id).search(query, limit)
+        if not matches:
+            return []
+        customers = {
+            customer.id: customer
+            for customer in db.query(
+                CustomerV2.id, CustomerV2.name, CustomerV2.phone, CustomerV2.balance, CustomerV2.price_tier
+            ).filter(
+                CustomerV2.id.in_([customer_id for customer_id, _, _ in matches]),
+                CustomerV2.tenant_id == tenant_id
+            )
+        }
+        results = []
+        for customer_id, matched, score in matches:
+            customer = customers.get(customer_id)
+            if customer is None:
+                continue
+            results.append({
+                "id": customer.id,
+                "name": customer.name,
+                "phone": customer.phone,
+                "balance": customer.balance,
+                "price_tier": customer.price_tier,
+                "matched": matched,
+                "score": score,
+            })
+        return results
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        directories = self.values()
+        stats["customers"] = sum(len(directory) for directory in directories)
+        stats["phones"] = sum(len(directory.phones) for directory in directories)
+        return stats
+
+
+customer_lookup_index = CustomerLookupIndex()
+
+
+def get_customer_lookup_stats() -> Dict:
+    """Get customer lookup index statistics."""
+    return customer_lookup_index.stats()
@@ -0,0 +1,390 @@
+"""
+Customer Segments - RFM segmentlash va mijoz umrbod qiymati (CLV)
+Tenant ning barcha mijozlari uchun bitta guruhlangan so'rov bilan SaleV2
+agregatlari (soni, summasi, birinchi/oxirgi xarid) olinadi, so'ng NumPy
+massivlarida bir vaqtda hisoblanadi:
+  - R/F/M ballari (1-5) - kvintil chegaralari bo'yicha
+  - segment (champions, loyal, new, promising, need_attention, at_risk, lost)
+  - oddiy CLV = o'rtacha chek * yillik xaridlar * ufq (yil) * faollik ehtimoli
+
+Tenant bo'yicha hisoblash fon ishi sifatida bajariladi (customer_segment_runs
+jadvali, start_segmentation + run_segmentation_job). Natija
+CustomerV2.ai_preferences["rfm"] ga bo'laklab yoziladi - qatorlar qulflanib
+(SELECT ... FOR UPDATE) o'qiladi va faqat shu kalit almashtiriladi, shuning
+uchun parallel yozilgan boshqa kalitlar (buying_habit_summary va h.k.)
+yo'qolmaydi. Barcha bazalarda bir xil yo'l ishlaydi. LLM faqat
+so'ralganda profil bo'yicha qisqa matn yozadi (describe) va matn profil ichida
+saqlanadi (set_narrative).
+"""
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.customer_v2 import CustomerSegmentRun, CustomerV2, SegmentationStatus
+from app.models.sale_v2 import SaleStatus, SaleV2
+from app.services.azure_openai_client import azure_openai
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY = "rfm"
+SCORE_LEVELS = 5
+# Bitta xarid qilgan mijozning taxminiy xaridlar oralig'i (kun)
+DEFAULT_INTERVAL_DAYS = 90.0
+# Shuncha odatiy oraliq xaridsiz o'tsa mijoz deyarli yo'qotilgan
+CHURN_INTERVALS = 3.0
+CLV_HORIZON_YEARS = 1.0
+WRITE_CHUNK = 5000
+
+SEGMENTS = ["champions", "loyal", "new", "promising", "need_attention", "at_risk"]
+DEFAULT_SEGMENT = "lost"
+
+_lock = threading.Lock()
+_stats = {"runs": 0, "customers": 0, "last_run_ms": 0.0}
+
+
+class SegmentationInProgress(Exception):
+    """Tenant uchun segmentlash allaqachon ishlamoqda"""
+
+
+def load_aggregates(db: Session, tenant_id: int) -> Dict[str, np.ndarray]:
+    """Mijoz bo'yicha yakunlangan sotuvlar agregatlari - bitta GROUP BY so'rov"""
+    rows = db.execute(
+        select(
+            SaleV2.customer_id,
+            func.count(SaleV2.id),
+            func.coalesce(func.sum(SaleV2.total_amount), 0.0),
+            func.min(SaleV2.created_at),
+            func.max(SaleV2.created_at),
+        ).where(
+            SaleV2.tenant_id == tenant_id,
+            SaleV2.customer_id.isnot(None),
+            SaleV2.status == SaleStatus.COMPLETED,
+        ).group_by(SaleV2.customer_id)
+    ).all()
+    if not rows:
+        empty = np.array([], dtype=np.int64)
+        return {"ids": empty, "frequency": empty, "monetary": empty.astype(float),
+                "first": empty.astype("datetime64[s]"), "last": empty.astype("datetime64[s]")}
+
+    ids, counts, totals, firsts, lasts = zip(*rows)
+    return {
+        "ids": np.array(ids, dtype=np.int64),
+        "frequency": np.array(counts, dtype=np.int64),
+        "monetary": np.array(totals, dtype=np.float64),
+        "first": np.array(firsts, dtype="datetime64[s]"),
+        "last": np.array(lasts, dtype="datetime64[s]"),
+    }
+
+
+def quantile_scores(values: np.ndarray, levels: int = SCORE_LEVELS) -> np.ndarray:
+    """
+    1..levels ballar - kvantil chegaralari bo'yicha
+    Teng qiymatlar bir xil ball oladi (masalan, bitta xarid qilganlarning hammasi 1)
+    """
+    edges = np.quantile(values, np.linspace(0, 1, levels + 1)[1:-1])
+    return 1 + np.searchsorted(edges, values, side="left")
+
+
+def score(aggregates: Dict[str, np.ndarray], now: datetime) -> Dict[str, np.ndarray]:
+    """Barcha mijozlar uchun R/F/M ballari, segment va CLV (vektorlashtirilgan)"""
+    frequency = aggregates["frequency"]
+    monetary = aggregates["monetary"]
+    day = np.timedelta64(1, "D")
+    recency = (np.datetime64(now, "s") - aggregates["last"]) / day
+    tenure = (aggregates["last"] - aggregates["first"]) / day
+
+    r = quantile_scores(-recency)
+    f = quantile_scores(frequency)
+    m = quantile_scores(monetary)
+
+    segment = np.select(
+        [
+            (r >= 4) & (f >= 4),
+            (r == 3) & (f >= 4),
+            (r >= 4) & (frequency == 1),
+            r >= 4,
+            r == 3,
+            f >= 3,
+        ],
+        SEGMENTS,
+        default=DEFAULT_SEGMENT,
+    )
+
+    # Odatiy xaridlar oralig'i va shunga ko'ra faollik ehtimoli
+    interval = np.where(frequency > 1, tenure / np.maximum(frequency - 1, 1), DEFAULT_INTERVAL_DAYS)
+    interval = np.maximum(interval, 1.0)
+    p_alive = np.exp(-recency / (interval * CHURN_INTERVALS))
+    average_order = monetary / frequency
+    clv = average_order * (365.0 / interval) * CLV_HORIZON_YEARS * p_alive
+
+    return {
+        "recency_days": np.floor(recency).astype(np.int64),
+        "r_score": r,
+        "f_score": f,
+        "m_score": m,
+        "segment": segment,
+        "average_order": np.round(average_order, 2),
+        "clv": np.round(clv, 2),
+    }
+
+
+def _rewrite_profiles(
+    db: Session, ids, change: Callable[[int, Dict[str, Any]], Optional[Dict[str, Any]]]
+) -> int:
+    """
+    ai_preferences ni qulflab o'qish, change() bilan o'zgartirish va qayta yozish
+    change(customer_id, preferences) yangi lug'at yoki None (o'zgarishsiz) qaytaradi.
+    Qatorlar ID tartibida qulflanadi - parallel yozuvlar bilan deadlock bo'lmaydi.
+    """
+    customers = CustomerV2.__table__
+    rows = db.execute(
+        select(customers.c.id, customers.c.ai_preferences)
+        .where(customers.c.id.in_(sorted(ids)))
+        .order_by(customers.c.id)
+        .with_for_update()
+    ).all()
+    params = []
+    for customer_id, preferences in rows:
+        updated = change(customer_id, dict(preferences or {}))
+        if updated is not None:
+            params.append({"customer_id": customer_id, "preferences": updated})
+    if params:
+        db.execute(
+            update(customers).where(customers.c.id == bindparam("customer_id")).values(
+                ai_preferences=bindparam("preferences", type_=customers.c.ai_preferences.type)
+            ),
+            params,
+        )
+    return len(params)
+
+
+def _profile(preferences: Dict[str, Any]) -> Dict[str, Any]:
+    profile = preferences.get(PROFILE_KEY)
+    return profile if isinstance(profile, dict) else {}
+
+
+def _drop_stale_profiles(db: Session, tenant_id: int, as_of: str) -> int:
+    """Bu ishda yozilmagan (endi yakunlangan sotuvi yo'q) mijozlar profilini olib tashlash"""
+    def is_stale(preferences) -> bool:
+        return isinstance(preferences, dict) and _profile(preferences).get("as_of") not in (None, as_of)
+
+    def drop(customer_id: int, preferences: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Qulf ostida qayta tekshiriladi
+        if not is_stale(preferences):
+            return None
+        preferences.pop(PROFILE_KEY)
+        return preferences
+
+    stale = [
+        customer_id for customer_id, preferences in db.query(CustomerV2.id, CustomerV2.ai_preferences).filter(
+            CustomerV2.tenant_id == tenant_id
+        ).yield_per(WRITE_CHUNK)
+        if is_stale(preferences)
+    ]
+    return sum(
+        _rewrite_profiles(db, stale[i:i + WRITE_CHUNK], drop) for i in range(0, len(stale), WRITE_CHUNK)
+    )
+
+
+def set_narrative(db: Session, customer_id: int, as_of: str, text: str) -> bool:
+    """
+    AI matnini profil ichiga yozish (faqat shu maydon)
+    Profil shu orada qayta hisoblangan bo'lsa (as_of boshqa) yozilmaydi.
+    """
+    def with_narrative(_, preferences: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        profile = _profile(preferences)
+        if profile.get("as_of") != as_of:
+            return None
+        preferences[PROFILE_KEY] = dict(profile, narrative=text)
+        return preferences
+
+    written = _rewrite_profiles(db, [customer_id], with_narrative)
+    db.commit()
+    return written > 0
+
+
+def segment_tenant(
+    db: Session,
+    tenant_id: int,
+    now: Optional[datetime] = None,
+    on_chunk: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Tenant mijozlarini segmentlash va profillarni ai_preferences ga yozish
+    Har WRITE_CHUNK ta profil alohida commit qilinadi, on_chunk(yozilgan, jami).
+    Returns: {"customers", "segments": {segment: soni}, "clv_total", "as_of"}
+    """
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    as_of = now.isoformat()
+    aggregates = load_aggregates(db, tenant_id)
+    scores = score(aggregates, now) if len(aggregates["ids"]) else None
+
+    profiles = {}
+    if scores is not None:
+        columns = zip(
+            aggregates["ids"].tolist(),
+            aggregates["frequency"].tolist(),
+            aggregates["monetary"].tolist(),
+            *(scores[key].tolist() for key in
+              ("recency_days", "r_score", "f_score", "m_score", "segment", "average_order", "clv")),
+        )
+        for (customer_id, frequency, monetary, recency, r, f, m,
+             segment, average_order, clv) in columns:
+            profiles[customer_id] = {
+                "segment": segment,
+                "recency_days": recency,
+                "frequency": frequency,
+                "monetary": monetary,
+                "r_score": r,
+                "f_score": f,
+                "m_score": m,
+                "average_order": average_order,
+                "clv": clv,
+                "as_of": as_of,
+            }
+
+    def with_profile(customer_id: int, preferences: Dict[str, Any]) -> Dict[str, Any]:
+        preferences[PROFILE_KEY] = profiles[customer_id]
+        return preferences
+
+    ids = list(profiles)
+    for i in range(0, len(ids), WRITE_CHUNK):
+        _rewrite_profiles(db, ids[i:i + WRITE_CHUNK], with_profile)
+        db.commit()
+        if on_chunk:
+            on_chunk(min(i + WRITE_CHUNK, len(ids)), len(ids))
+    # Endi yakunlangan sotuvi qolmagan mijozlarning eski profili olib tashlanadi
+    _drop_stale_profiles(db, tenant_id, as_of)
+    db.commit()
+
+    segments = {}
+    if scores is not None:
+        names, counts = np.unique(scores["segment"], return_counts=True)
+        segments = dict(zip(names.tolist(), counts.tolist()))
+
+    with _lock:
+        _stats["runs"] += 1
+        _stats["customers"] = len(profiles)
+        _stats["last_run_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    return {
+        "customers": len(profiles),
+        "segments": segments,
+        "clv_total": float(scores["clv"].sum()) if scores is not None else 0.0,
+        "as_of": now,
+    }
+
+
+def start_segmentation(db: Session, tenant_id: int, user_id: Optional[int] = None) -> CustomerSegmentRun:
+    """
+    Segmentlash ishini yaratish (ish run_segmentation da bajariladi)
+    Tirik ish bo'lsa SegmentationInProgress; JOB_STALE_MINUTES davomida progress
+    yozmagani to'xtab qolgan hisoblanadi va FAILED qilinadi.
+    """
+    stale_before = datetime.utcnow() - timedelta(minutes=settings.JOB_STALE_MINUTES)
+    active = db.query(CustomerSegmentRun).filter(
+        CustomerSegmentRun.tenant_id == tenant_id,
+        CustomerSegmentRun.status.in_([SegmentationStatus.PENDING, SegmentationStatus.RUNNING])
+    ).all()
+    for running in active:
+        last_seen = running.heartbeat_at or running.started_at or running.created_at
+        if last_seen >= stale_before:
+            raise SegmentationInProgress(f"Segmentlash ishlamoqda (#{running.id})")
+        running.status = SegmentationStatus.FAILED
+        running.error = "Ish to'xtab qolgan (progress yozilmadi)"
+        running.finished_at = datetime.utcnow()
+
+    run = CustomerSegmentRun(
+        tenant_id=tenant_id,
+        status=SegmentationStatus.PENDING,
+        total=0,
+        processed=0,
+        created_by=user_id,
+    )
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def run_segmentation(db: Session, run_id: int, now: Optional[datetime] = None) -> CustomerSegmentRun:
+    """Segmentlash ishini bajarish (progress har bir bo'lakdan keyin yoziladi)"""
+    run = db.query(CustomerSegmentRun).filter(CustomerSegmentRun.id == run_id).first()
+    tenant_id = run.tenant_id
+    run.status = SegmentationStatus.RUNNING
+    run.started_at = run.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+    def report(processed: int, total: int) -> None:
+        db.query(CustomerSegmentRun).filter(CustomerSegmentRun.id == run_id).update({
+            "processed": processed, "total": total, "heartbeat_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+
+    try:
+        result = segment_tenant(db, tenant_id, now, on_chunk=report)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Customer segmentation #{run_id} failed: {e}")
+        db.query(CustomerSegmentRun).filter(CustomerSegmentRun.id == run_id).update({
+            "status": SegmentationStatus.FAILED, "error": str(e), "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+    else:
+        db.query(CustomerSegmentRun).filter(CustomerSegmentRun.id == run_id).update({
+            "status": SegmentationStatus.COMPLETED,
+            "total": result["customers"],
+            "processed": result["customers"],
+            "segments": result["segments"],
+            "clv_total": result["clv_total"],
+            "as_of": result["as_of"],
+            "finished_at": datetime.utcnow(),
+        }, synchronize_session=False)
+    db.commit()
+
+    db.refresh(run)
+    return run
+
+
+def run_segmentation_job(run_id: int) -> None:
+    """Fon ishi uchun - o'z sessiyasini ochadi"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        run_segmentation(db, run_id)
+    finally:
+        db.close()
+
+
+async def describe(name: str, profile: Dict[str, Any]) -> str:
+    """Saqlangan RFM profili bo'yicha qisqa matn - LLM faqat shu yerda chaqiriladi"""
+    prompt = (
+        f"Mijoz: {name}\n"
+        f"Segment: {profile['segment']}\n"
+        f"Oxirgi xariddan beri: {profile['recency_days']} kun\n"
+        f"Xaridlar soni: {profile['frequency']}, jami: {profile['monetary']}, "
+        f"o'rtacha chek: {profile['average_order']}\n"
+        f"R/F/M ballari (1-5): {profile['r_score']}/{profile['f_score']}/{profile['m_score']}\n"
+        f"Taxminiy yillik qiymat (CLV): {profile['clv']}\n\n"
+        "Ushbu mijoz haqida 1-2 jumla bilan o'zbek tilida xulosa va kassa xodimiga bitta "
+        "amaliy taklif yozing."
+    )
+    result = await azure_openai.generate_json(
+        "You are a CRM expert. Output JSON.",
+        prompt + "\nReturn JSON: {'summary': '...'}"
+    )
+    return result.get("summary", "")
+
+
+def get_customer_segmentation_stats() -> Dict:
+    """Get customer segmentation job statistics."""
+    with _lock:
+        return dict(_stats)
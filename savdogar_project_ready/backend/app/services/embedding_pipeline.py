@@ -0,0 +1,372 @@
+"""
+Embedding Pipeline - Mahsulot variantlari uchun embeddinglarni to'plab olish
+Matnlar (mahsulot nomi + atributlar) katta paketlarga bo'linib, cheklangan
+parallellik bilan provayderga yuboriladi. Har bir matnning kontent xeshi
+ProductVariant.embedding_hash da saqlanadi - matni o'zgarmagan variantlar
+qayta embed qilinmaydi. Qidiruv so'rovlari LRU keshda saqlanadi.
+
+Provayder: "azure" (text-embedding-3-small) yoki "stub" (tarmoqsiz,
+deterministik - lokal sinov va benchmark uchun).
+
+To'liq backfill fon ishi sifatida bajariladi (embedding_backfills jadvali,
+start_backfill + run_backfill_job) - so'rov event loop ni band qilmaydi.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product_v2 import EmbeddingBackfill, ImportStatus, ProductV2, ProductVariant
+from app.services.vector_index import vector_index
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_PAGE = 2000
+QUERY_CACHE_SIZE = 1024
+_SPACES = re.compile(r"\s+")
+
+
+class BackfillInProgress(Exception):
+    """Tenant uchun embedding backfill allaqachon ishlamoqda"""
+
+
+class AzureEmbeddingProvider:
+    """Azure OpenAI embeddings (bitta so'rovda ko'p matn)"""
+
+    max_batch = 2048
+
+    def __init__(self, model: str = None):
+        self.model = model or settings.EMBEDDING_MODEL
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        from app.services.azure_openai_client import azure_openai
+
+        response = await azure_openai.client.embeddings.create(input=texts, model=self.model)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class StubEmbeddingProvider:
+    """
+    Tarmoqsiz provayder: harf trigramlari xeshlanib vektorga yig'iladi,
+    shuning uchun o'xshash nomlar o'xshash vektor oladi.
+    latency - har bir so'rovning sun'iy kechikishi (soniya).
+    """
+
+    max_batch = 2048
+
+    def __init__(self, dim: int = 256, latency: float = 0.0):
+        self.model = f"stub-{dim}"
+        self.dim = dim
+        self.latency = latency
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        padded = f"  {text.lower()} "
+        for i in range(len(padded) - 2):
+            digest = hashlib.blake2b(padded[i:i + 3].encode(), digest_size=4).digest()
+            bucket = int.from_bytes(digest, "little")
+            vector[bucket % self.dim] += 1.0 if bucket & 0x80000000 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+
+def get_provider(name: Optional[str] = None):
+    name = name or settings.EMBEDDING_PROVIDER
+    if name == "stub":
+        return StubEmbeddingProvider()
+    return AzureEmbeddingProvider()
+
+
+def variant_text(name: str, attributes: Optional[Dict[str, Any]]) -> str:
+    """Embed qilinadigan matn: 'Futbolka | color: Red, size: XL'"""
+    parts = [
+        f"{key}: {value}"
+        for key, value in sorted((attributes or {}).items())
+        if value not in (None, "", [], {})
+    ]
+    text = name.strip()
+    return f"{text} | {', '.join(parts)}" if parts else text
+
+
+def content_hash(model: str, text: str) -> str:
+    """Model + matn xeshi (model almashsa hammasi qayta embed qilinadi)"""
+    return hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+
+
+def normalize_query(text: str) -> str:
+    return _SPACES.sub(" ", (text or "").strip().lower())
+
+
+class QueryEmbeddingCache:
+    """Qidiruv so'rovlari uchun LRU kesh"""
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._items.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._items[key] = vector
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict:
+        return {"size": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+class EmbeddingPipeline:
+    """
+    Paketli embedding: matnlar takrorlanmas qilinadi, xesh bo'yicha
+    keshlanadi va batch_size lik paketlar concurrency tadan parallel yuboriladi.
+    """
+
+    def __init__(self, provider=None, batch_size: int = None, concurrency: int = None):
+        self._provider = provider
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.concurrency = concurrency or settings.EMBEDDING_CONCURRENCY
+        self.query_cache = QueryEmbeddingCache()
+        self.requests = 0
+        self.embedded_texts = 0
+
+    @property
+    def provider(self):
+        # Azure klienti faqat birinchi ishlatilganda yaratiladi
+        if self._provider is None:
+            self._provider = get_provider()
+        return self._provider
+
+    async def embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
+        """Matnlar embeddinglari (kirish tartibida); bir xil matn bir marta yuboriladi"""
+        unique = list(dict.fromkeys(texts))
+        size = min(self.batch_size, self.provider.max_batch)
+        batches = [unique[i:i + size] for i in range(0, len(unique), size)]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                self.requests += 1
+                return await self.provider.embed(batch)
+
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        vectors: Dict[str, List[float]] = {}
+        for batch, batch_vectors in zip(batches, results):
+            if len(batch_vectors) != len(batch):
+                raise ValueError("Provayder javobi so'rovga mos emas")
+            vectors.update(zip(batch, batch_vectors))
+        self.embedded_texts += len(unique)
+        return [vectors[text] for text in texts]
+
+    async def embed_query(self, text: str) -> Optional[List[float]]:
+        """Qidiruv so'rovi embeddingi (LRU kesh orqali)"""
+        key = normalize_query(text)
+        if not key:
+            return None
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = (await self.embed_texts([key]))[0]
+            self.query_cache.put(key, vector)
+        return vector
+
+    async def backfill(
+        self,
+        db: Session,
+        tenant_id: int,
+        force: bool = False,
+        on_page: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict:
+        """
+        Tenant faol variantlari embeddinglarini to'ldirish
+        Faqat xeshi o'zgargan (yoki embeddingi yo'q) variantlar yuboriladi.
+        on_page(scanned, embedded) - har bir sahifadan keyin (progress uchun).
+        """
+        started = time.perf_counter()
+        model = self.provider.model
+        scanned = embedded = 0
+        after_id = 0
+
+        while True:
+            rows = db.query(
+                ProductVariant.id,
+                ProductVariant.attributes,
+                ProductVariant.embedding_hash,
+                ProductVariant.embedding_vector.isnot(None),
+                ProductV2.name,
+            ).join(ProductV2, ProductV2.id == ProductVariant.product_id).filter(
+                ProductVariant.tenant_id == tenant_id,
+                ProductVariant.is_active == True,
+                ProductVariant.id > after_id
+            ).order_by(ProductVariant.id).limit(BACKFILL_PAGE).all()
+            if not rows:
+                break
+            after_id = rows[-1].id
+            scanned += len(rows)
+
+            stale = []
+            for variant_id, attributes, old_hash, has_vector, name in rows:
+                text = variant_text(name, attributes)
+                new_hash = content_hash(model, text)
+                if force or new_hash != old_hash or not has_vector:
+                    stale.append((variant_id, text, new_hash))
+            if not stale:
+                if on_page:
+                    on_page(scanned, embedded)
+                continue
+
+            vectors = await self.embed_texts([text for _, text, _ in stale])
+            db.execute(update(ProductVariant), [
+                {"id": variant_id, "embedding_vector": vector, "embedding_hash": new_hash}
+                for (variant_id, _, new_hash), vector in zip(stale, vectors)
+            ])
+            db.commit()
+            embedded += len(stale)
+            try:
+                for (variant_id, _, new_hash), vector in zip(stale, vectors):
+                    vector_index.upsert(tenant_id, variant_id, vector, new_hash)
+            except ValueError:
+                # Model (vektor o'lchami) almashgan - indeks bazadan qayta quriladi
+                vector_index.drop(db, tenant_id)
+            else:
+                vector_index.touch(db, tenant_id)
+            if on_page:
+                on_page(scanned, embedded)
+
+        vector_index.flush(tenant_id)
+        seconds = time.perf_counter() - started
+        logger.info(f"Embedding backfill tenant={tenant_id} scanned={scanned} embedded={embedded} in {seconds:.2f}s")
+        return {
+            "scanned": scanned,
+            "embedded": embedded,
+            "skipped": scanned - embedded,
+            "seconds": round(seconds, 3),
+            "variants_per_second": round(scanned / seconds, 1) if seconds else None,
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "embedded_texts": self.embedded_texts,
+            "query_cache": self.query_cache.stats(),
+        }
+
+
+embedding_pipeline = EmbeddingPipeline()
+
+
+def _stale_before() -> datetime:
+    return datetime.utcnow() - timedelta(minutes=settings.JOB_STALE_MINUTES)
+
+
+def start_backfill(db: Session, tenant_id: int, force: bool = False, user_id: Optional[int] = None) -> EmbeddingBackfill:
+    """
+    Backfill ishini yaratish (ish run_backfill da bajariladi)
+    Tenant uchun tirik ish bo'lsa BackfillInProgress; to'xtab qolgani FAILED qilinadi.
+    """
+    active = db.query(EmbeddingBackfill).filter(
+        EmbeddingBackfill.tenant_id == tenant_id,
+        EmbeddingBackfill.status.in_([ImportStatus.PENDING, ImportStatus.RUNNING])
+    ).order_by(EmbeddingBackfill.id.desc()).first()
+    if active:
+        last_seen = active.heartbeat_at or active.started_at or active.created_at
+        if last_seen >= _stale_before():
+            raise BackfillInProgress(f"Embedding backfill ishlamoqda (#{active.id})")
+        active.status = ImportStatus.FAILED
+        active.error = "Ish to'xtab qolgan (progress yozilmadi)"
+        active.finished_at = datetime.utcnow()
+
+    job = EmbeddingBackfill(
+        tenant_id=tenant_id,
+        force=force,
+        status=ImportStatus.PENDING,
+        total=db.query(func.count(ProductVariant.id)).filter(
+            ProductVariant.tenant_id == tenant_id, ProductVariant.is_active == True
+        ).scalar(),
+        scanned=0,
+        embedded=0,
+        created_by=user_id,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def run_backfill(db: Session, job_id: int, pipeline: EmbeddingPipeline = None) -> EmbeddingBackfill:
+    """Backfill ishini bajarish (progress har bir sahifadan keyin yoziladi)"""
+    pipeline = pipeline or embedding_pipeline
+    job = db.query(EmbeddingBackfill).filter(EmbeddingBackfill.id == job_id).first()
+    tenant_id, force = job.tenant_id, job.force
+    job.status = ImportStatus.RUNNING
+    job.started_at = job.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+    def report(scanned: int, embedded: int) -> None:
+        db.query(EmbeddingBackfill).filter(EmbeddingBackfill.id == job_id).update({
+            "scanned": scanned, "embedded": embedded, "heartbeat_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+
+    try:
+        asyncio.run(pipeline.backfill(db, tenant_id, force=force, on_page=report))
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Embedding backfill #{job_id} failed: {e}")
+        db.query(EmbeddingBackfill).filter(EmbeddingBackfill.id == job_id).update({
+            "status": ImportStatus.FAILED, "error": str(e), "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+    else:
+        db.query(EmbeddingBackfill).filter(EmbeddingBackfill.id == job_id).update({
+            "status": ImportStatus.COMPLETED, "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+    db.commit()
+
+    db.refresh(job)
+    return job
+
+
+def run_backfill_job(job_id: int) -> None:
+    """Fon ishi uchun - o'z sessiyasini ochadi (thread pool da, alohida event loop bilan)"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        run_backfill(db, job_id)
+    finally:
+        db.close()
+
+
+def get_embedding_pipeline_stats() -> Dict:
+    """Get embedding pipeline statistics."""
+    return embedding_pipeline.stats()
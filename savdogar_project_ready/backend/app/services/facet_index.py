@@ -0,0 +1,186 @@
+"""
+Facet Index - Variant atributlari (JSONB) bo'yicha fasetli filtr va sanoqlar
+Har bir tenant uchun atribut -> qiymat -> variant ID lar to'plami saqlanadi.
+Sanoqlar to'plamlar kesishmasidan olinadi (variantlar qayta o'qilmaydi) va
+filtr kaliti bo'yicha keshlanadi; mahsulot yozuvlarida indeks joyida
+yangilanadi va keshlangan sanoqlar eskiradi.
+
+Faset sanoqlari "disjunktiv": har bir atribut uchun boshqa atributlar
+filtrlari qo'llanadi, shuning uchun size=XL tanlanganda ham boshqa
+o'lchamlar soni ko'rinadi.
+"""
+from collections import OrderedDict
+import threading
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.product_v2 import ProductVariant
+from app.services.tenant_cache import TenantCache
+
+# Bitta faset uchun qaytariladigan qiymatlar soni
+MAX_FACET_VALUES = 50
+# Har bir tenant uchun keshlangan filtr natijalari
+COUNTS_CACHE_SIZE = 256
+
+Filters = Dict[str, Tuple[str, ...]]
+
+
+def facet_values(attributes: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Fasetlanadigan atributlar: faqat oddiy (skalyar) qiymatlar, matn ko'rinishida"""
+    values = {}
+    for key, value in (attributes or {}).items():
+        if isinstance(value, bool):
+            values[key] = "true" if value else "false"
+        elif isinstance(value, (str, int, float)) and value != "":
+            values[key] = str(value)
+    return values
+
+
+def filters_key(filters: Filters) -> Tuple:
+    return tuple(sorted((key, tuple(sorted(values))) for key, values in filters.items()))
+
+
+def value_selected(filters: Filters, key: str, value: str) -> bool:
+    return value in filters.get(key, ())
+
+
+class TenantFacets:
+    """Bitta tenant ning faset indeksi"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, Set[int]]] = {}
+        self.attributes: Dict[int, Dict[str, str]] = {}
+        self._counts: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.count_hits = 0
+        self.count_misses = 0
+
+    def __len__(self) -> int:
+        return len(self.attributes)
+
+    def upsert(self, variant_id: int, attributes: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._remove(variant_id)
+            values = facet_values(attributes)
+            self.attributes[variant_id] = values
+            for key, value in values.items():
+                self.postings.setdefault(key, {}).setdefault(value, set()).add(variant_id)
+            self._counts.clear()
+
+    def remove(self, variant_id: int) -> None:
+        with self._lock:
+            self._remove(variant_id)
+            self._counts.clear()
+
+    def _remove(self, variant_id: int) -> None:
+        values = self.attributes.pop(variant_id, None)
+        if values is None:
+            return
+        for key, value in values.items():
+            ids = self.postings[key][value]
+            ids.discard(variant_id)
+            if not ids:
+                del self.postings[key][value]
+                if not self.postings[key]:
+                    del self.postings[key]
+
+    def _matching(self, filters: Filters, skip: Optional[str] = None) -> Optional[Set[int]]:
+        """Filtrlarga mos variantlar (skip - shu atribut filtri hisobga olinmaydi); None - filtr yo'q"""
+        result: Optional[Set[int]] = None
+        groups = []
+        for key, values in filters.items():
+            if key == skip:
+                continue
+            by_value = self.postings.get(key, {})
+            group = set().union(*(by_value.get(value, set()) for value in values))
+            groups.append(group)
+        for group in sorted(groups, key=len):
+            result = group if result is None else result & group
+            if not result:
+                return set()
+        return result
+
+    def matching(self, filters: Filters) -> Set[int]:
+        with self._lock:
+            matched = self._matching(filters)
+            return set(self.attributes) if matched is None else set(matched)
+
+    def counts(self, filters: Filters) -> Dict[str, Any]:
+        """{"total": N, "facets": {atribut: [(qiymat, soni), ...]}} - keshlangan"""
+        cache_key = filters_key(filters)
+        with self._lock:
+            cached = self._counts.get(cache_key)
+            if cached is not None:
+                self._counts.move_to_end(cache_key)
+                self.count_hits += 1
+                return cached
+            self.count_misses += 1
+
+            matched = self._matching(filters)
+            facets = {}
+            for key, by_value in self.postings.items():
+                base = self._matching(filters, skip=key) if key in filters else matched
+                if base is None:
+                    counted = [(value, len(ids)) for value, ids in by_value.items()]
+                else:
+                    counted = [(value, len(ids & base)) for value, ids in by_value.items()]
+                counted = [item for item in counted if item[1] > 0 or value_selected(filters, key, item[0])]
+                counted.sort(key=lambda item: (-item[1], item[0]))
+                facets[key] = counted[:MAX_FACET_VALUES]
+
+            result = {
+                "total": len(self.attributes) if matched is None else len(matched),
+                "facets": facets,
+            }
+            self._counts[cache_key] = result
+            while len(self._counts) > COUNTS_CACHE_SIZE:
+                self._counts.popitem(last=False)
+            return result
+
+
+class FacetIndex(TenantCache):
+    """Tenant faset indekslari reestri"""
+
+    name = "facets"
+
+    def build(self, db: Session, tenant_id: int) -> TenantFacets:
+        facets = TenantFacets()
+        rows = db.query(ProductVariant.id, ProductVariant.attributes).filter(
+            ProductVariant.tenant_id == tenant_id,
+            ProductVariant.is_active == True
+        )
+        for variant_id, attributes in rows.yield_per(2000):
+            facets.upsert(variant_id, attributes)
+        return facets
+
+    def upsert(self, tenant_id: int, variants: Iterable[Tuple[int, Optional[Dict[str, Any]]]]) -> None:
+        """Variant yaratilganda yoki atributlari o'zgarganda"""
+        facets = self.peek(tenant_id)
+        if facets is None:
+            return
+        for variant_id, attributes in variants:
+            facets.upsert(variant_id, attributes)
+
+    def remove(self, tenant_id: int, variant_ids: Iterable[int]) -> None:
+        facets = self.peek(tenant_id)
+        if facets is None:
+            return
+        for variant_id in variant_ids:
+            facets.remove(variant_id)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        indexes = self.values()
+        stats["variants"] = sum(len(facets) for facets in indexes)
+        stats["count_hits"] = sum(facets.count_hits for facets in indexes)
+        stats["count_misses"] = sum(facets.count_misses for facets in indexes)
+        return stats
+
+
+facet_index = FacetIndex()
+
+
+def get_facet_index_stats() -> Dict:
+    """Get facet index statistics."""
+    return facet_index.stats()
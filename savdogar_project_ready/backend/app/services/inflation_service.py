@@ -1,36 +1,216 @@
+from datetime import datetime, timedelta
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+
+from app.core.config import settings
 from app.models.tenant import Tenant
 from app.models.product_v2 import ProductVariant
+from app.models.pricing import ExchangeRateChange, RepricingStatus
+from app.services import catalog_sync
+from app.services.barcode_index import barcode_index
+
+logger = logging.getLogger(__name__)
+
+# Bitta tranzaksiyada qayta narxlanadigan variantlar soni
+REPRICE_CHUNK = 1000
+PREVIEW_SAMPLE = 20
+# price_usd matn bo'lsa shu ko'rinishda bo'lishi kerak (aks holda qayta narxlanmaydi)
+NUMERIC_TEXT = r"^\s*[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)\s*$"
+
+
+def parse_price_usd(value: Any) -> Optional[float]:
+    """
+    attributes['price_usd'] raqam sifatida: JSON raqam yoki raqamli matn ("12.5", importdan)
+    Boshqa qiymatlar ("abc", true) va musbat bo'lmaganlar - None (qayta narxlanmaydi).
+    Bazada CAST qilinmaydi - Postgres da ::float noto'g'ri qiymatda butun so'rovni yiqitadi.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        if not re.match(NUMERIC_TEXT, value):
+            return None
+        value = float(value)
+    if not isinstance(value, (int, float)) or not value > 0:
+        return None
+    return float(value)
+
+
+def priced_variants(db: Session, tenant_id: int, after_id: int = 0, limit: Optional[int] = None):
+    """
+    price_usd li variantlar id tartibida: (id, sku, narx, price_usd)
+    Qaytadi: (ro'yxat, ko'rilgan oxirgi id) - keyingi bo'lak shu id dan boshlanadi.
+    """
+    query = db.query(
+        ProductVariant.id, ProductVariant.sku, ProductVariant.price, ProductVariant.attributes["price_usd"]
+    ).filter(ProductVariant.tenant_id == tenant_id, ProductVariant.id > after_id).order_by(ProductVariant.id)
+    rows = query.limit(limit).all() if limit else query.yield_per(REPRICE_CHUNK)
+    priced, last_id = [], None
+    for variant_id, sku, price, raw in rows:
+        last_id = variant_id
+        usd = parse_price_usd(raw)
+        if usd is not None:
+            priced.append((variant_id, sku, price, usd))
+    return priced, last_id
+
+
+class RepricingInProgress(Exception):
+    """Tenant uchun qayta narxlash allaqachon ishlamoqda"""
+
 
 class InflationShieldService:
     """
     Dollar kursiga bog'liq narxlarni avtomatik yangilash xizmati.
     Inflyatsiyadan himoya qilish uchun.
+
+    Narxlar attributes['price_usd'] * kurs sifatida id bo'yicha bo'laklarda
+    (REPRICE_CHUNK) qayta hisoblanadi: price_usd Python da tekshiriladi, faqat
+    o'zgargan narxlar bitta executemany UPDATE bilan yoziladi, har bir bo'lak
+    alohida commit qilinadi. Har bir kurs o'zgarishi exchange_rate_changes
+    ga yoziladi (tarix + ish progressi).
     """
-    
+
+    @staticmethod
+    def preview_repricing(db: Session, tenant_id: int, new_rate: float, sample_size: int = PREVIEW_SAMPLE) -> Dict:
+        """Dry-run: nechta variant o'zgaradi va namunaviy farqlar (hech narsa yozilmaydi)"""
+        priced, _ = priced_variants(db, tenant_id)
+        changed = [
+            (variant_id, sku, usd, price, usd * new_rate)
+            for variant_id, sku, price, usd in priced if price != usd * new_rate
+        ]
+        current_rate = db.query(Tenant.usd_to_uzs_rate).filter(Tenant.id == tenant_id).scalar()
+
+        return {
+            "current_rate": current_rate,
+            "new_rate": new_rate,
+            "total": len(priced),
+            "changed": len(changed),
+            "sample": [
+                {"variant_id": variant_id, "sku": sku, "price_usd": usd,
+                 "old_price": old_price, "new_price": price}
+                for variant_id, sku, usd, old_price, price in changed[:sample_size]
+            ],
+        }
+
     @staticmethod
-    def update_tenant_exchange_rate(db: Session, tenant_id: int, new_rate: float):
-        """Dollar kursini yangilash va barcha bog'liq narxlarni qayta hisoblash"""
-        tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+    def start_repricing(
+        db: Session,
+        tenant_id: int,
+        new_rate: float,
+        user_id: Optional[int] = None,
+        reverts_id: Optional[int] = None,
+    ) -> Optional[ExchangeRateChange]:
+        """
+        Qayta narxlash ishini yaratish (ish run_repricing da bajariladi)
+        Tenant kursi faqat ish muvaffaqiyatli tugaganda yoziladi - yiqilgan ishdan
+        keyin kurs eskisicha qoladi va ishni shu kurs bilan qayta boshlash mumkin.
+        JOB_STALE_MINUTES davomida progress yozmagan PENDING/RUNNING ish (masalan,
+        worker qayta ishga tushgan) to'xtab qolgan hisoblanadi va FAILED qilinadi.
+        """
+        tenant = db.query(Tenant).filter(Tenant.id == tenant_id).with_for_update().first()
         if not tenant:
             return None
-            
-        old_rate = tenant.usd_to_uzs_rate
-        tenant.usd_to_uzs_rate = new_rate
-        
-        # Barcha product variantlarini topish
-        # Agar narx dollarda saqlangan bo'lsa (masalan attributes da 'price_usd' bo'lsa)
-        # biz joriy so'mdagi 'price' ni yangilab chiqamiz.
-        
-        variants = db.query(ProductVariant).filter(ProductVariant.tenant_id == tenant_id).all()
-        for variant in variants:
-            price_usd = variant.attributes.get('price_usd')
-            if price_usd:
-                # Yangi kurs bo'yicha so'mdagi narxni hisoblash
-                variant.price = float(price_usd) * new_rate
-        
+
+        stale_before = datetime.utcnow() - timedelta(minutes=settings.JOB_STALE_MINUTES)
+        active = db.query(ExchangeRateChange).filter(
+            ExchangeRateChange.tenant_id == tenant_id,
+            ExchangeRateChange.status.in_([RepricingStatus.PENDING, RepricingStatus.RUNNING])
+        ).all()
+        for running in active:
+            last_seen = running.heartbeat_at or running.started_at or running.created_at
+            if last_seen >= stale_before:
+                db.rollback()
+                raise RepricingInProgress(f"Qayta narxlash ishlamoqda (#{running.id})")
+            logger.warning(f"Repricing #{running.id} is stale (last progress {last_seen}), marking failed")
+            running.status = RepricingStatus.FAILED
+            running.error = "Ish to'xtab qolgan (progress yozilmadi)"
+            running.finished_at = datetime.utcnow()
+
+        change = ExchangeRateChange(
+            tenant_id=tenant_id,
+            old_rate=tenant.usd_to_uzs_rate,
+            new_rate=new_rate,
+            reverts_id=reverts_id,
+            status=RepricingStatus.PENDING,
+            total=len(priced_variants(db, tenant_id)[0]),
+            processed=0,
+            created_by=user_id,
+        )
+        db.add(change)
+        db.commit()
+        db.refresh(change)
+        return change
+
+    @staticmethod
+    def run_repricing(db: Session, change_id: int, chunk_size: int = REPRICE_CHUNK) -> ExchangeRateChange:
+        """
+        Qayta narxlash: id bo'yicha bo'laklar, har birida o'zgargan narxlar bitta
+        executemany UPDATE bilan yoziladi va alohida commit. Progress har bo'lakdan keyin yoziladi.
+        """
+        change = db.query(ExchangeRateChange).filter(ExchangeRateChange.id == change_id).first()
+        tenant_id, rate = change.tenant_id, change.new_rate
+        change.status = RepricingStatus.RUNNING
+        change.started_at = change.heartbeat_at = datetime.utcnow()
         db.commit()
-        return tenant
+
+        after_id = 0
+        try:
+            while True:
+                priced, last_id = priced_variants(db, tenant_id, after_id, chunk_size)
+                if last_id is None:
+                    break
+
+                changed = [
+                    {"id": variant_id, "price": usd * rate}
+                    for variant_id, _, price, usd in priced if price != usd * rate
+                ]
+                if changed:
+                    db.execute(update(ProductVariant), changed)
+                catalog_sync.record_changes(db, tenant_id, [
+                    (catalog_sync.VARIANT, row["id"], False) for row in changed
+                ])
+                db.query(ExchangeRateChange).filter(ExchangeRateChange.id == change_id).update(
+                    {"processed": ExchangeRateChange.processed + len(priced), "heartbeat_at": datetime.utcnow()},
+                    synchronize_session=False
+                )
+                db.commit()
+                after_id = last_id
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Repricing #{change_id} failed: {e}")
+            db.query(ExchangeRateChange).filter(ExchangeRateChange.id == change_id).update({
+                "status": RepricingStatus.FAILED, "error": str(e), "finished_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+        else:
+            # Kurs va yakunlangan holat bitta tranzaksiyada
+            db.query(Tenant).filter(Tenant.id == tenant_id).update(
+                {"usd_to_uzs_rate": rate}, synchronize_session=False
+            )
+            db.query(ExchangeRateChange).filter(ExchangeRateChange.id == change_id).update({
+                "status": RepricingStatus.COMPLETED, "finished_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            # Skaner snapshotlarida eski narxlar bo'lmasin
+            barcode_index.invalidate(db, tenant_id)
+
+        db.refresh(change)
+        return change
+
+    @staticmethod
+    def run_repricing_job(change_id: int) -> None:
+        """Fon ishi uchun - o'z sessiyasini ochadi"""
+        from app.core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            InflationShieldService.run_repricing(db, change_id)
+        finally:
+            db.close()
 
     @staticmethod
     def calculate_price_by_usd(usd_price: float, current_rate: float):
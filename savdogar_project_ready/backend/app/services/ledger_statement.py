@@ -0,0 +1,168 @@
+"""
+Ledger Statement - Mijoz hisob-kitob varaqasi (akt sverki)
+Yozuvlar idx_ledger_customer_date bo'yicha (created_at, id) tartibida keyset
+sahifalanadi. Har bir qatordagi yig'ma balans SQL da oyna funksiyasi bilan
+hisoblanadi: sahifa boshidagi balans + SUM(credit - debit) OVER (...).
+Sahifa boshidagi balans cursor ichida keladi, shuning uchun har bir sahifa
+faqat o'z qatorlarini o'qiydi.
+
+Oynaning boshlang'ich balansi nazorat nuqtasi + dumdan olinadi
+(customer_ledger.balance_as_of), davr jami bitta agregat so'rov.
+To'liq CSV ko'chirma server tomondagi cursor bilan oqim sifatida yuboriladi.
+"""
+import csv
+from datetime import datetime
+import io
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.customer_v2 import CustomerLedger
+from app.services import customer_ledger
+
+# CSV oqimi: bir bo'lakdagi qatorlar soni
+CSV_CHUNK = 500
+
+CSV_HEADER = ["id", "created_at", "sale_id", "reference_number", "description", "debit", "credit", "balance"]
+
+DELTA = func.coalesce(CustomerLedger.credit, 0.0) - func.coalesce(CustomerLedger.debit, 0.0)
+
+
+def _window(customer_id: int, date_from: Optional[datetime], date_to: Optional[datetime]) -> List:
+    """Oyna shartlari: [date_from, date_to)"""
+    conditions = [CustomerLedger.customer_id == customer_id]
+    if date_from is not None:
+        conditions.append(CustomerLedger.created_at >= date_from)
+    if date_to is not None:
+        conditions.append(CustomerLedger.created_at < date_to)
+    return conditions
+
+
+def _entries(conditions: List, start_balance: float, limit: Optional[int] = None):
+    """Yozuvlar + yig'ma balans (oyna funksiyasi) so'rovi"""
+    rows = select(
+        CustomerLedger.id,
+        CustomerLedger.created_at,
+        CustomerLedger.sale_id,
+        CustomerLedger.reference_number,
+        CustomerLedger.description,
+        func.coalesce(CustomerLedger.debit, 0.0).label("debit"),
+        func.coalesce(CustomerLedger.credit, 0.0).label("credit"),
+        DELTA.label("delta"),
+    ).where(*conditions).order_by(CustomerLedger.created_at, CustomerLedger.id)
+    if limit is not None:
+        # Avval sahifa, keyin oyna funksiyasi - faqat sahifa qatorlari yig'iladi
+        rows = rows.limit(limit)
+    rows = rows.subquery()
+
+    order = (rows.c.created_at, rows.c.id)
+    return select(
+        rows.c.id,
+        rows.c.created_at,
+        rows.c.sale_id,
+        rows.c.reference_number,
+        rows.c.description,
+        rows.c.debit,
+        rows.c.credit,
+        (literal(start_balance) + func.sum(rows.c.delta).over(order_by=order)).label("balance"),
+    ).order_by(*order)
+
+
+def summary(
+    db: Session,
+    customer_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Oyna uchun boshlang'ich/yakuniy balans va davr debet/kredit jami"""
+    opening = 0.0
+    if date_from is not None:
+        opening = customer_ledger.balance_as_of(db, customer_id, date_from, inclusive=False)
+
+    entries, debit, credit = db.execute(
+        select(
+            func.count(CustomerLedger.id),
+            func.coalesce(func.sum(func.coalesce(CustomerLedger.debit, 0.0)), 0.0),
+            func.coalesce(func.sum(func.coalesce(CustomerLedger.credit, 0.0)), 0.0),
+        ).where(*_window(customer_id, date_from, date_to))
+    ).one()
+
+    return {
+        "opening_balance": opening,
+        "period_debit": debit,
+        "period_credit": credit,
+        "closing_balance": opening + credit - debit,
+        "entries": entries,
+    }
+
+
+def page(
+    db: Session,
+    customer_id: int,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    opening_balance: float,
+    after: Optional[Tuple[datetime, int, float]] = None,
+    limit: int = 50,
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[datetime, int, float]]]:
+    """
+    Bitta sahifa yozuvlari (yig'ma balans bilan)
+    after: oldingi sahifa oxiri (created_at, id, balans) - cursor dan
+    Returns: (yozuvlar, keyingi sahifa uchun after yoki None)
+    """
+    conditions = _window(customer_id, date_from, date_to)
+    start_balance = opening_balance
+    if after is not None:
+        last_created_at, last_id, start_balance = after
+        conditions.append(
+            tuple_(CustomerLedger.created_at, CustomerLedger.id) > tuple_(last_created_at, last_id)
+        )
+
+    rows = [dict(row._mapping) for row in db.execute(_entries(conditions, start_balance, limit=limit + 1))]
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_after = (last["created_at"], last["id"], last["balance"])
+    return rows, next_after
+
+
+def iter_csv(
+    db: Session,
+    customer_id: int,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    totals: Dict[str, Any],
+) -> Iterator[str]:
+    """
+    To'liq ko'chirma CSV bo'laklari - xotirada to'planmaydi
+    O'z ulanishini ochadi (javob oqimi so'rov sessiyasidan uzoq yashaydi)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(CSV_HEADER)
+    writer.writerow(["", date_from.isoformat() if date_from else "", "", "", "Boshlang'ich balans", "", "",
+                     totals["opening_balance"]])
+
+    statement = _entries(_window(customer_id, date_from, date_to), totals["opening_balance"])
+    with db.get_bind().connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=CSV_CHUNK).execute(statement)
+        for rows in result.partitions():
+            for row in rows:
+                writer.writerow([
+                    row.id, row.created_at.isoformat(), row.sale_id or "", row.reference_number or "",
+                    row.description or "", row.debit, row.credit, row.balance,
+                ])
+            yield flush()
+
+    writer.writerow(["", date_to.isoformat() if date_to else "", "", "", "Yakuniy balans",
+                     totals["period_debit"], totals["period_credit"], totals["closing_balance"]])
+    yield flush()
@@ -0,0 +1,41 @@
+"""
+Pagination - Keyset (cursor) sahifalash uchun yordamchilar
+Cursor oxirgi qatorning tartiblash kalitlarini (masalan created_at, id)
+shaffof bo'lmagan satr sifatida saqlaydi. OFFSET dan farqli ravishda
+har qanday sahifa indeks bo'yicha bir xil tezlikda o'qiladi.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+import json
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """Tartiblash kalitlarini cursor satriga aylantirish"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """
+    Cursor ni qayta o'qish
+    types: har bir kalit turi (datetime, int, float, str)
+    Noto'g'ri cursor uchun ValueError
+    """
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Noto'g'ri cursor")
+
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError("Noto'g'ri cursor")
+
+    try:
+        return [
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for value, kind in zip(payload, types)
+        ]
+    except (ValueError, TypeError):
+        raise ValueError("Noto'g'ri cursor")
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from app.services.azure_openai_client import azure_openai
 from app.models.customer_v2 import CustomerV2
 from app.models.sale_v2 import SaleV2, SaleItemV2
+from app.services.customer_segments import PROFILE_KEY
 
 class POSWhispererService:
     """
@@ -22,8 +23,18 @@ class POSWhispererService:
             items = db.query(SaleItemV2).filter(SaleItemV2.sale_id == s.id).all()
             history_str += f"- {', '.join([i.variant.sku for i in items])}\n"
 
+        # Segmentlash ishi hisoblagan RFM profili (bo'lsa)
+        profile = (customer.ai_preferences or {}).get(PROFILE_KEY)
+        profile_str = ""
+        if profile:
+            profile_str = (
+                f"Segment: {profile['segment']}, oxirgi xariddan beri {profile['recency_days']} kun, "
+                f"{profile['frequency']} ta xarid, o'rtacha chek {profile['average_order']}"
+            )
+
         prompt = f"""
         Mijoz: {customer.name}
+        {profile_str}
         Xarid tarixi:\n{history_str}
         
         Kassa xodimiga ushbu mijoz bo'yicha 1 ta juda qisqa va aqlli maslahat bering (o'zbek tilida).
@@ -32,6 +43,6 @@ class POSWhispererService:
         """
         
         system_prompt = "Siz tajribali kassa administratori va sales-coachsiz."
-        tip = await azure_openai.generate_text(system_prompt, prompt)
+        result = await azure_openai.generate_json(system_prompt, prompt + "\nReturn JSON: {'tip': '...'}")
         
-        return tip
+        return result.get("tip")
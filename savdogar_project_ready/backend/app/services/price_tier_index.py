@@ -0,0 +1,156 @@
+"""
+Price Tier Index - Narx darajalari uchun xotiradagi indeks (tenant bo'yicha)
+Har bir variant uchun min_quantity bo'yicha tartiblangan chegaralar saqlanadi,
+"Q miqdor va mijoz darajasi uchun eng yaxshi narx" binary search bilan topiladi.
+Indeks versiyalanadi: narx darajasi yozilganda invalidate() chaqiriladi.
+"""
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.pricing import PriceTier, PriceTierType
+from app.models.customer_v2 import CustomerTier
+from app.services.tenant_cache import TenantCache
+
+# Mijoz auditoriyalari (avvalgi SQL filtrlari bilan bir xil)
+AUDIENCE_ANY = "any"
+AUDIENCE_WHOLESALE = "wholesale"
+AUDIENCE_VIP = "vip"
+
+
+class TierEntry:
+    """PriceTier ning sessiyaga bog'lanmagan nusxasi"""
+
+    __slots__ = ("id", "variant_id", "tier_type", "min_quantity", "max_quantity", "price", "customer_group")
+
+    def __init__(self, id, variant_id, tier_type, min_quantity, max_quantity, price, customer_group):
+        self.id = id
+        self.variant_id = variant_id
+        self.tier_type = tier_type
+        self.min_quantity = min_quantity
+        self.max_quantity = max_quantity
+        self.price = price
+        self.customer_group = customer_group
+
+    @classmethod
+    def from_model(cls, tier: PriceTier) -> "TierEntry":
+        return cls(
+            id=tier.id,
+            variant_id=tier.variant_id,
+            tier_type=tier.tier_type,
+            min_quantity=tier.min_quantity,
+            max_quantity=tier.max_quantity,
+            price=tier.price,
+            customer_group=tier.customer_group,
+        )
+
+
+def audience_for(customer_tier: Optional[CustomerTier]) -> str:
+    """Mijoz darajasini indeks auditoriyasiga o'girish"""
+    if customer_tier == CustomerTier.WHOLESALER:
+        return AUDIENCE_WHOLESALE
+    if customer_tier == CustomerTier.VIP:
+        return AUDIENCE_VIP
+    return AUDIENCE_ANY
+
+
+def _audiences(tier: TierEntry) -> Tuple[str, ...]:
+    """Narx darajasi qaysi auditoriyalarga ko'rinadi"""
+    audiences = [AUDIENCE_ANY]
+    if (
+        tier.customer_group is None
+        or tier.customer_group == "wholesale"
+        or tier.tier_type == PriceTierType.WHOLESALER
+    ):
+        audiences.append(AUDIENCE_WHOLESALE)
+    if (
+        tier.customer_group is None
+        or tier.customer_group == "vip"
+        or tier.tier_type == PriceTierType.VIP
+    ):
+        audiences.append(AUDIENCE_VIP)
+    return tuple(audiences)
+
+
+class _Breakpoints:
+    """Bitta (variant, auditoriya) uchun o'sish tartibidagi min_quantity lar"""
+
+    __slots__ = ("mins", "tiers")
+
+    def __init__(self, tiers: List[TierEntry]):
+        tiers.sort(key=lambda t: t.min_quantity)
+        self.tiers = tiers
+        self.mins = [t.min_quantity for t in tiers]
+
+    def best(self, quantity: float) -> Optional[TierEntry]:
+        # min_quantity <= quantity bo'lgan eng o'ngdagi element
+        pos = bisect_right(self.mins, quantity) - 1
+        while pos >= 0:
+            tier = self.tiers[pos]
+            if tier.max_quantity is None or tier.max_quantity >= quantity:
+                return tier
+            pos -= 1
+        return None
+
+
+class TenantTierIndex:
+    """Bitta tenant ning barcha narx darajalari"""
+
+    def __init__(self, tenant_id: int, tiers: List[TierEntry]):
+        self.tenant_id = tenant_id
+        self.tier_count = len(tiers)
+
+        grouped: Dict[Tuple[int, str], List[TierEntry]] = {}
+        for tier in tiers:
+            for audience in _audiences(tier):
+                grouped.setdefault((tier.variant_id, audience), []).append(tier)
+
+        self._breakpoints: Dict[Tuple[int, str], _Breakpoints] = {
+            key: _Breakpoints(entries) for key, entries in grouped.items()
+        }
+
+    def best_tier(
+        self,
+        variant_id: int,
+        quantity: float,
+        customer_tier: Optional[CustomerTier] = None,
+    ) -> Optional[TierEntry]:
+        """Q miqdor va mijoz darajasi uchun eng yaxshi narx darajasi"""
+        breakpoints = self._breakpoints.get((variant_id, audience_for(customer_tier)))
+        if breakpoints is None:
+            return None
+        return breakpoints.best(quantity)
+
+
+class PriceTierIndex(TenantCache):
+    """Jarayon ichidagi narx indekslari reestri"""
+
+    name = "price_tiers"
+
+    def build(self, db: Session, tenant_id: int) -> TenantTierIndex:
+        rows = db.query(PriceTier).filter(PriceTier.tenant_id == tenant_id).all()
+        return TenantTierIndex(tenant_id, [TierEntry.from_model(t) for t in rows])
+
+    def best_tier(
+        self,
+        db: Session,
+        tenant_id: int,
+        variant_id: int,
+        quantity: float,
+        customer_tier: Optional[CustomerTier] = None,
+    ) -> Optional[TierEntry]:
+        return self.get(db, tenant_id).best_tier(variant_id, quantity, customer_tier)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["tiers"] = sum(index.tier_count for index in self.values())
+        return stats
+
+
+price_tier_index = PriceTierIndex()
+
+
+def get_price_tier_index_stats() -> Dict:
+    """Get price tier index statistics."""
+    return price_tier_index.stats()
@@ -4,61 +4,36 @@ PriceTiers ni tekshiradi va eng yaxshi narxni tanlaydi
 """
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
 from app.models.product_v2 import ProductVariant
-from app.models.pricing import PriceTier, PriceTierType
-from app.models.customer_v2 import Customer, CustomerTier
+from app.models.customer_v2 import CustomerV2
+from app.services.price_tier_index import TierEntry, price_tier_index
 
 
 def get_best_price(
     db: Session,
     variant: ProductVariant,
     quantity: float,
-    customer: Optional[Customer] = None,
-) -> tuple[float, Optional[PriceTier]]:
+    customer: Optional[CustomerV2] = None,
+) -> tuple[float, Optional[TierEntry]]:
     """
-    Eng yaxshi narxni topish
+    Eng yaxshi narxni topish (tenant narx indeksidan, DB so'rovisiz)
     Returns: (price, applied_tier)
     """
     # Default narx
     best_price = variant.price
-    applied_tier = None
     
-    # PriceTier ni qidirish
-    tier_query = db.query(PriceTier).filter(
-        and_(
-            PriceTier.variant_id == variant.id,
-            PriceTier.min_quantity <= quantity,
-        )
+    # Eng yaxshi narx (eng katta min_quantity - eng katta chegirma)
+    applied_tier = price_tier_index.best_tier(
+        db,
+        tenant_id=variant.tenant_id,
+        variant_id=variant.id,
+        quantity=quantity,
+        customer_tier=customer.price_tier if customer else None,
     )
     
-    # Maksimal miqdor tekshirish
-    tier_query = tier_query.filter(
-        (PriceTier.max_quantity == None) | (PriceTier.max_quantity >= quantity)
-    )
-    
-    # Mijoz guruhi tekshirish
-    if customer:
-        if customer.price_tier == CustomerTier.WHOLESALER:
-            tier_query = tier_query.filter(
-                (PriceTier.customer_group == None) | 
-                (PriceTier.customer_group == "wholesale") |
-                (PriceTier.tier_type == PriceTierType.WHOLESALER)
-            )
-        elif customer.price_tier == CustomerTier.VIP:
-            tier_query = tier_query.filter(
-                (PriceTier.customer_group == None) | 
-                (PriceTier.customer_group == "vip") |
-                (PriceTier.tier_type == PriceTierType.VIP)
-            )
-    
-    # Eng yaxshi narxni tanlash (eng katta min_quantity - eng katta chegirma)
-    tier = tier_query.order_by(PriceTier.min_quantity.desc()).first()
-    
-    if tier:
-        best_price = tier.price
-        applied_tier = tier
+    if applied_tier:
+        best_price = applied_tier.price
     
     return best_price, applied_tier
 
@@ -0,0 +1,508 @@
+"""
+Product Import - Mahsulotlarni CSV/XLSX fayldan ommaviy import qilish
+Fayl qatorma-qator o'qiladi (CSV - csv.reader, XLSX - openpyxl read_only),
+butunligicha xotiraga yuklanmaydi. Har bir qator = bitta variant; bir xil
+nomli qatorlar bitta mahsulotga birlashadi. SKU takrorlanishi xotiradagi
+to'plam bilan tekshiriladi, yozuv IMPORT_CHUNK lik bo'laklarda ko'p qatorli
+INSERT ... ON CONFLICT (tenant_id, sku) DO UPDATE bilan bajariladi va har bir
+bo'lak alohida commit qilinadi (progress product_imports jadvalida).
+
+Ustunlar: name, sku, price (majburiy); cost_price, stock_quantity,
+barcode (bir nechtasi ";" bilan), category_id, tax_rate, description,
+attr:<kalit> (variant atributi), tier:<min_miqdor> (ulgurji narx darajasi).
+"""
+import csv
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.pricing import PriceTier, PriceTierType
+from app.models.product import Category
+from app.models.product_v2 import ImportStatus, ProductImport, ProductType, ProductV2, ProductVariant
+from app.services import catalog_sync
+from app.services.barcode_index import barcode_index
+from app.services.facet_index import facet_index
+from app.services.price_tier_index import price_tier_index
+from app.services.recipe_compiler import recipe_cache
+from app.services.search_index import product_search_index
+from app.services.tenant_cache import invalidate_caches
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK = 1000
+# product_imports.errors da saqlanadigan xatolar soni (failed - to'liq son)
+MAX_ERRORS = 1000
+
+MODE_UPSERT = "upsert"
+MODE_INSERT = "insert"
+
+REQUIRED_COLUMNS = ("name", "sku", "price")
+_ALIASES = {"product_name": "name", "stock": "stock_quantity", "barcodes": "barcode"}
+ATTR_PREFIX = "attr:"
+TIER_PREFIX = "tier:"
+
+
+class RowError(ValueError):
+    """Qator xatosi (qator o'tkazib yuboriladi, import davom etadi)"""
+
+
+class ImportRow:
+    __slots__ = (
+        "row", "name", "sku", "price", "cost_price", "stock_quantity", "barcodes",
+        "category_id", "tax_rate", "description", "attributes", "tiers",
+    )
+
+    def __init__(self, row: int, **values):
+        self.row = row
+        for name in self.__slots__[1:]:
+            setattr(self, name, values.get(name))
+
+
+def _column(header: Any) -> str:
+    name = str(header or "").strip().lower()
+    return _ALIASES.get(name, name)
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel SKU/shtrix-kodlarni son sifatida beradi
+    text = str(value).strip()
+    return text or None
+
+
+def _number(value: Any, column: str) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        text = str(value).strip().replace(" ", "").replace("\u00a0", "")
+        if "," in text and "." not in text:
+            text = text.replace(",", ".")
+        try:
+            number = float(text)
+        except ValueError:
+            raise RowError(f"{column}: son emas ({value!r})")
+    if number < 0:
+        raise RowError(f"{column}: manfiy bo'lishi mumkin emas")
+    return number
+
+
+class RowParser:
+    """Sarlavha bo'yicha qatorlarni ImportRow ga o'girish"""
+
+    def __init__(self, header: List[Any]):
+        columns = [_column(value) for value in header]
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Majburiy ustunlar yo'q: {', '.join(missing)}")
+
+        self.index: Dict[str, int] = {}
+        self.attributes: List[Tuple[int, str]] = []
+        self.tiers: List[Tuple[int, float]] = []
+        for position, name in enumerate(columns):
+            if name.startswith(ATTR_PREFIX) and name[len(ATTR_PREFIX):]:
+                self.attributes.append((position, str(header[position]).strip()[len(ATTR_PREFIX):]))
+            elif name.startswith(TIER_PREFIX):
+                self.tiers.append((position, _number(name[len(TIER_PREFIX):], name)))
+            elif name and name not in self.index:
+                self.index[name] = position
+
+    def has(self, column: str) -> bool:
+        return column in self.index
+
+    def sku_of(self, values: List[Any]) -> Optional[str]:
+        position = self.index["sku"]
+        return _text(values[position]) if position < len(values) else None
+
+    def parse(self, number: int, values: List[Any]) -> Optional[ImportRow]:
+        """Bo'sh qator - None; noto'g'ri qator - RowError"""
+        if not any(value not in (None, "") for value in values):
+            return None
+
+        def cell(position: Optional[int]) -> Any:
+            if position is None or position >= len(values):
+                return None
+            value = values[position]
+            return value.strip() if isinstance(value, str) else value
+
+        def get(column: str) -> Any:
+            return cell(self.index.get(column))
+
+        name, sku = _text(get("name")), _text(get("sku"))
+        if not name:
+            raise RowError("name bo'sh")
+        if not sku:
+            raise RowError("sku bo'sh")
+        price = _number(get("price"), "price")
+        if price is None:
+            raise RowError("price bo'sh")
+
+        category = _number(get("category_id"), "category_id")
+        barcodes = _text(get("barcode"))
+        attributes = {}
+        for position, key in self.attributes:
+            value = cell(position)
+            if value not in (None, ""):
+                attributes[key] = value
+        tiers = []
+        for position, min_quantity in self.tiers:
+            tier_price = _number(cell(position), f"tier:{min_quantity:g}")
+            if tier_price is not None:
+                tiers.append((min_quantity, tier_price))
+
+        return ImportRow(
+            number,
+            name=name,
+            sku=sku,
+            price=price,
+            cost_price=_number(get("cost_price"), "cost_price"),
+            stock_quantity=_number(get("stock_quantity"), "stock_quantity"),
+            barcodes=[code.strip() for code in barcodes.split(";") if code.strip()] if barcodes else [],
+            category_id=int(category) if category is not None else None,
+            tax_rate=_number(get("tax_rate"), "tax_rate"),
+            description=_text(get("description")),
+            attributes=attributes,
+            tiers=tiers,
+        )
+
+
+def iter_csv(path: str) -> Iterator[Tuple[int, List[Any]]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        first = f.readline()
+        delimiter = ";" if first.count(";") > first.count(",") else ","
+        f.seek(0)
+        for number, values in enumerate(csv.reader(f, delimiter=delimiter), start=1):
+            yield number, values
+
+
+def iter_xlsx(path: str) -> Iterator[Tuple[int, List[Any]]]:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for number, values in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+            yield number, list(values)
+    finally:
+        workbook.close()
+
+
+def read_rows(path: str, filename: str) -> Iterator[Tuple[int, List[Any]]]:
+    """Fayl qatorlari (1-qator - sarlavha)"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return iter_xlsx(path)
+    if extension in (".csv", ".txt"):
+        return iter_csv(path)
+    raise ValueError(f"Fayl turi qo'llab-quvvatlanmaydi: {extension or filename}")
+
+
+class ProductImporter:
+    """
+    Bitta tenant uchun import: mavjud SKU, mahsulot nomlari va kategoriyalar
+    boshida bir marta yuklanadi, keyin qatorlar bo'laklarda yoziladi.
+    on_chunk(importer) - har bir bo'lak commit qilinishidan oldin chaqiriladi.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        tenant_id: int,
+        mode: str = MODE_UPSERT,
+        chunk_size: int = IMPORT_CHUNK,
+        on_chunk: Optional[Callable[["ProductImporter"], None]] = None,
+    ):
+        self.db = db
+        self.tenant_id = tenant_id
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.on_chunk = on_chunk
+        self.insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+        self.processed = self.created = self.updated = self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+        # sku -> product_id (mavjud variantlar)
+        self.skus: Dict[str, int] = dict(db.query(ProductVariant.sku, ProductVariant.product_id).filter(
+            ProductVariant.tenant_id == tenant_id
+        ).all())
+        # Yangi SKU lar faqat faol mahsulotga biriktiriladi (o'chirilgan nom - yangi mahsulot)
+        self.products: Dict[str, int] = {}
+        for product_id, name in db.query(ProductV2.id, ProductV2.name).filter(
+            ProductV2.tenant_id == tenant_id,
+            ProductV2.is_active == True
+        ).order_by(ProductV2.id):
+            self.products.setdefault(name, product_id)
+        self.categories: Set[int] = {category_id for (category_id,) in db.query(Category.id)}
+        self.seen: Set[str] = set()
+        # Shu importda yaratilgan mahsulotlar -> variantlar soni
+        self.new_products: Dict[int, int] = {}
+
+    def add_error(self, row: int, sku: Optional[str], message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"row": row, "sku": sku, "error": message})
+
+    def run(self, rows: Iterable[Tuple[int, List[Any]]]) -> Dict[str, Any]:
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("Fayl bo'sh")
+        self.parser = RowParser(header[1])
+
+        # Mavjud SKU da faqat faylda bor ustunlar yangilanadi
+        self.update_columns = ["price", "is_active"]
+        for column, field in (("cost_price", "cost_price"), ("stock_quantity", "stock_quantity"), ("barcode", "barcode_aliases")):
+            if self.parser.has(column):
+                self.update_columns.append(field)
+        if self.parser.attributes:
+            self.update_columns.append("attributes")
+
+        chunk: List[ImportRow] = []
+        for number, values in rows:
+            try:
+                row = self.parser.parse(number, values)
+                if row is None:
+                    continue
+                self._validate(row)
+            except RowError as e:
+                self.processed += 1
+                self.add_error(number, self.parser.sku_of(values), str(e))
+                continue
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self._write(chunk)
+                chunk = []
+        if chunk:
+            self._write(chunk)
+        self._mark_variable_products()
+        return self.summary()
+
+    def _validate(self, row: ImportRow) -> None:
+        if row.sku in self.seen:
+            raise RowError("SKU faylda takrorlangan")
+        if self.mode == MODE_INSERT and row.sku in self.skus:
+            raise RowError("SKU allaqachon mavjud")
+        if row.category_id is not None and row.category_id not in self.categories:
+            raise RowError(f"Kategoriya {row.category_id} topilmadi")
+        self.seen.add(row.sku)
+
+    def _write(self, chunk: List[ImportRow]) -> None:
+        try:
+            created_products, variants = self._upsert(chunk)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            message = str(getattr(e, "orig", None) or e).splitlines()[0]
+            logger.warning(f"Import chunk failed tenant={self.tenant_id}: {message}")
+            for row in chunk:
+                self.add_error(row.row, row.sku, f"Bo'lak yozilmadi: {message}")
+            self.processed += len(chunk)
+            self._report()
+            self.db.commit()
+            return
+
+        for row in chunk:
+            if row.sku in self.skus:
+                self.updated += 1
+            else:
+                self.created += 1
+        self.processed += len(chunk)
+        self._report()
+        self.db.commit()
+
+        for name, product_id in created_products:
+            self.products[name] = product_id
+            self.new_products[product_id] = 0
+        for sku, product_id in variants:
+            if sku not in self.skus and product_id in self.new_products:
+                self.new_products[product_id] += 1
+            self.skus[sku] = product_id
+
+    def _report(self) -> None:
+        if self.on_chunk is not None:
+            self.on_chunk(self)
+
+    def _upsert(self, chunk: List[ImportRow]) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+        db, tenant_id = self.db, self.tenant_id
+
+        # 1. Yangi mahsulotlar - faqat yangi SKU si bor nomlar uchun
+        pending: Dict[str, ImportRow] = {}
+        for row in chunk:
+            if row.sku not in self.skus and row.name not in self.products:
+                pending.setdefault(row.name, row)
+        created_products: List[Tuple[str, int]] = []
+        product_ids = dict(self.products)
+        if pending:
+            result = db.execute(
+                insert(ProductV2).returning(ProductV2.id, ProductV2.name, sort_by_parameter_order=True),
+                [
+                    {
+                        "tenant_id": tenant_id,
+                        "name": name,
+                        "description": row.description,
+                        "category_id": row.category_id,
+                        "type": ProductType.SIMPLE,
+                        "base_price": row.price,
+                        "cost_price": row.cost_price if row.cost_price is not None else row.price,
+                        "tax_rate": row.tax_rate or 0.0,
+                        "product_metadata": {},
+                        "recipe": {},
+                        "is_active": True,
+                    }
+                    for name, row in pending.items()
+                ],
+            ).all()
+            for product_id, name in result:
+                created_products.append((name, product_id))
+                product_ids[name] = product_id
+
+        # 2. Variantlar - INSERT ... ON CONFLICT (executemany ko'p qatorli VALUES ga yig'iladi)
+        stmt = self.insert(ProductVariant)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProductVariant.tenant_id, ProductVariant.sku],
+            set_={column: stmt.excluded[column] for column in self.update_columns},
+        ).returning(ProductVariant.id, ProductVariant.sku, ProductVariant.product_id, sort_by_parameter_order=True)
+        variant_rows = db.execute(stmt, [
+            {
+                "tenant_id": tenant_id,
+                "product_id": self.skus.get(row.sku) or product_ids[row.name],
+                "sku": row.sku,
+                "price": row.price,
+                "cost_price": row.cost_price if row.cost_price is not None else row.price,
+                "stock_quantity": row.stock_quantity or 0.0,
+                "attributes": row.attributes,
+                "barcode_aliases": row.barcodes,
+                "is_active": True,
+            }
+            for row in chunk
+        ]).all()
+        variant_ids = {sku: variant_id for variant_id, sku, _ in variant_rows}
+
+        # Faollashgan variantning o'chirilgan mahsuloti ham qayta faollashadi (aks holda katalogda ko'rinmaydi)
+        reactivated = db.execute(
+            update(ProductV2).where(
+                ProductV2.id.in_({product_id for _, _, product_id in variant_rows}),
+                ProductV2.is_active == False,
+            ).values(is_active=True).returning(ProductV2.id).execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        # 3. Ulgurji narx darajalari (faylda tier: ustunlari bo'lsa almashtiriladi)
+        deleted_tiers: List[int] = []
+        created_tiers: List[int] = []
+        if self.parser.tiers:
+            deleted_tiers = db.execute(
+                delete(PriceTier).where(
+                    PriceTier.variant_id.in_(variant_ids.values()),
+                    PriceTier.tier_type == PriceTierType.BULK,
+                    PriceTier.customer_group.is_(None),
+                ).returning(PriceTier.id).execution_options(synchronize_session=False)
+            ).scalars().all()
+            tiers = [
+                {
+                    "variant_id": variant_ids[row.sku],
+                    "tenant_id": tenant_id,
+                    "tier_type": PriceTierType.BULK,
+                    "min_quantity": min_quantity,
+                    "price": price,
+                }
+                for row in chunk for min_quantity, price in row.tiers
+            ]
+            if tiers:
+                created_tiers = db.execute(
+                    insert(PriceTier).returning(PriceTier.id, sort_by_parameter_order=True), tiers
+                ).scalars().all()
+
+        catalog_sync.record_changes(
+            db, tenant_id,
+            [(catalog_sync.PRODUCT, product_id, False) for _, product_id in created_products]
+            + [(catalog_sync.PRODUCT, product_id, False) for product_id in reactivated]
+            + [(catalog_sync.VARIANT, variant_id, False) for variant_id in variant_ids.values()]
+            + [(catalog_sync.PRICE_TIER, tier_id, True) for tier_id in deleted_tiers]
+            + [(catalog_sync.PRICE_TIER, tier_id, False) for tier_id in created_tiers],
+        )
+        return created_products, [(sku, product_id) for _, sku, product_id in variant_rows]
+
+    def _mark_variable_products(self) -> None:
+        """Bir nechta variantli yangi mahsulotlar - VARIABLE"""
+        variable = [product_id for product_id, count in self.new_products.items() if count > 1]
+        for start in range(0, len(variable), self.chunk_size):
+            ids = variable[start:start + self.chunk_size]
+            self.db.execute(
+                update(ProductV2).where(ProductV2.id.in_(ids)).values(type=ProductType.VARIABLE)
+                .execution_options(synchronize_session=False)
+            )
+            catalog_sync.record_changes(self.db, self.tenant_id, [
+                (catalog_sync.PRODUCT, product_id, False) for product_id in ids
+            ])
+            self.db.commit()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "processed_rows": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def invalidate_catalog_caches(db: Session, tenant_id: int) -> None:
+    """Import tugagach tenant keshlari (barcha worker jarayonlarida) qayta quriladi"""
+    invalidate_caches(db, tenant_id, barcode_index, recipe_cache, price_tier_index, facet_index, product_search_index)
+
+
+def run_import(db: Session, import_id: int, path: str, chunk_size: int = IMPORT_CHUNK) -> ProductImport:
+    """Import ishini bajarish (progress har bir bo'lakda yoziladi)"""
+    job = db.query(ProductImport).filter(ProductImport.id == import_id).first()
+    tenant_id = job.tenant_id
+    job.status = ImportStatus.RUNNING
+    job.started_at = datetime.utcnow()
+    db.commit()
+
+    def report(importer: ProductImporter) -> None:
+        db.query(ProductImport).filter(ProductImport.id == import_id).update(
+            importer.summary(), synchronize_session=False
+        )
+
+    try:
+        importer = ProductImporter(db, tenant_id, job.mode, chunk_size, on_chunk=report)
+        summary = importer.run(read_rows(path, job.filename))
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Product import #{import_id} failed: {e}")
+        db.query(ProductImport).filter(ProductImport.id == import_id).update({
+            "status": ImportStatus.FAILED, "error": str(e), "finished_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+    else:
+        db.query(ProductImport).filter(ProductImport.id == import_id).update(dict(
+            summary, status=ImportStatus.COMPLETED, finished_at=datetime.utcnow()
+        ), synchronize_session=False)
+        db.commit()
+    finally:
+        invalidate_catalog_caches(db, tenant_id)
+
+    db.refresh(job)
+    return job
+
+
+def run_import_job(import_id: int, path: str) -> None:
+    """Fon ishi uchun - o'z sessiyasini ochadi, faylni oxirida o'chiradi"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        run_import(db, import_id, path)
+    finally:
+        db.close()
+        if os.path.exists(path):
+            os.remove(path)
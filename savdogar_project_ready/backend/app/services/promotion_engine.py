@@ -0,0 +1,273 @@
+"""
+Promotion Engine - Aksiyalarni savatchada qo'llash
+Tenant aksiyalari bir marta yuklanadi (TenantCache) va joriy paytda amal
+qiladigan qoidalar to'plamiga "kompilyatsiya" qilinadi: variant bo'yicha,
+kategoriya bo'yicha va umumiy qoidalar lug'atlari. To'plam keyingi vaqt
+chegarasigacha (biror aksiya oynasi ochiladi yoki yopiladi) qayta
+ishlatiladi; aksiyalar yozilganda invalidate() chaqiriladi.
+
+Savatchadagi har bir qator uchun faqat shu variant/kategoriyaga tegishli
+qoidalar ko'riladi - DB ga murojaat yo'q.
+"""
+from datetime import datetime, time, timedelta, timezone
+import threading
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.promotion import Promotion, PromotionType
+from app.services.tenant_cache import TenantCache
+
+NEVER = datetime.max
+ORIGIN = datetime.min
+
+
+def local_zone() -> ZoneInfo:
+    return ZoneInfo(settings.LOCAL_TIMEZONE)
+
+
+def to_local(moment: datetime, zone: ZoneInfo) -> datetime:
+    """UTC (naive) -> mahalliy vaqt (naive)"""
+    return moment.replace(tzinfo=timezone.utc).astimezone(zone).replace(tzinfo=None)
+
+
+def to_utc(moment: datetime, zone: ZoneInfo) -> datetime:
+    """Mahalliy vaqt (naive) -> UTC (naive)"""
+    return moment.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _next_daily(local_now: datetime, at: time) -> datetime:
+    """at soatining local_now dan keyingi birinchi kelishi (mahalliy vaqt)"""
+    candidate = datetime.combine(local_now.date(), at)
+    if candidate <= local_now:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def _previous_daily(local_now: datetime, at: time) -> datetime:
+    """at soatining local_now gacha (shu payt ham) oxirgi kelishi (mahalliy vaqt)"""
+    candidate = datetime.combine(local_now.date(), at)
+    if candidate > local_now:
+        candidate -= timedelta(days=1)
+    return candidate
+
+
+class PromotionRule:
+    """Promotion ning sessiyaga bog'lanmagan nusxasi"""
+
+    __slots__ = (
+        "id", "name", "promo_type", "variant_id", "category_id", "percent",
+        "buy_quantity", "get_quantity", "starts_at", "ends_at", "daily_start", "daily_end", "priority",
+    )
+
+    def __init__(self, id, name, promo_type, variant_id=None, category_id=None, percent=None,
+                 buy_quantity=None, get_quantity=None, starts_at=None, ends_at=None,
+                 daily_start=None, daily_end=None, priority=0):
+        self.id = id
+        self.name = name
+        self.promo_type = promo_type
+        self.variant_id = variant_id
+        self.category_id = category_id
+        self.percent = percent
+        self.buy_quantity = buy_quantity
+        self.get_quantity = get_quantity
+        self.starts_at = starts_at
+        self.ends_at = ends_at
+        self.daily_start = daily_start
+        self.daily_end = daily_end
+        self.priority = priority or 0
+
+    @classmethod
+    def from_model(cls, promotion: Promotion) -> "PromotionRule":
+        return cls(**{name: getattr(promotion, name) for name in cls.__slots__})
+
+    @property
+    def has_daily_window(self) -> bool:
+        return self.daily_start is not None and self.daily_end is not None
+
+    def is_active(self, now: datetime, local_now: datetime) -> bool:
+        if self.starts_at is not None and now < self.starts_at:
+            return False
+        if self.ends_at is not None and now >= self.ends_at:
+            return False
+        if self.has_daily_window:
+            moment = local_now.time()
+            if self.daily_start <= self.daily_end:
+                return self.daily_start <= moment < self.daily_end
+            # Yarim tundan o'tadigan oyna (22:00 - 02:00)
+            return moment >= self.daily_start or moment < self.daily_end
+        return True
+
+    def next_boundary(self, now: datetime, local_now: datetime, zone: ZoneInfo) -> datetime:
+        """Qoida holati o'zgarishi mumkin bo'lgan keyingi payt (UTC)"""
+        if self.ends_at is not None and now >= self.ends_at:
+            return NEVER
+        boundaries = [moment for moment in (self.starts_at, self.ends_at) if moment is not None and moment > now]
+        if self.has_daily_window:
+            boundaries += [
+                to_utc(_next_daily(local_now, at), zone) for at in (self.daily_start, self.daily_end)
+            ]
+        return min(boundaries, default=NEVER)
+
+    def previous_boundary(self, now: datetime, local_now: datetime, zone: ZoneInfo) -> datetime:
+        """Qoida holati oxirgi marta o'zgargan payt (UTC, now dan keyin emas)"""
+        if self.ends_at is not None and now >= self.ends_at:
+            return self.ends_at
+        boundaries = [moment for moment in (self.starts_at, self.ends_at) if moment is not None and moment <= now]
+        if self.has_daily_window:
+            boundaries += [
+                to_utc(_previous_daily(local_now, at), zone) for at in (self.daily_start, self.daily_end)
+            ]
+        return max(boundaries, default=ORIGIN)
+
+    def discount(self, unit_price: float, quantity: float) -> float:
+        """Qator uchun chegirma summasi"""
+        gross = unit_price * quantity
+        if self.promo_type == PromotionType.PERCENT_OFF:
+            return min(gross, gross * (self.percent or 0.0) / 100)
+        if self.promo_type == PromotionType.BUY_X_GET_Y:
+            buy, get = self.buy_quantity or 0, self.get_quantity or 0
+            if buy <= 0 or get <= 0:
+                return 0.0
+            free_units = int(quantity // (buy + get)) * get
+            return unit_price * free_units
+        return 0.0
+
+
+class ActiveRuleSet:
+    """
+    Bir paytda amal qiladigan qoidalar (kompilyatsiya qilingan)
+    [valid_from, valid_until) oralig'ida o'zgarmaydi
+    """
+
+    def __init__(
+        self,
+        rules: List[PromotionRule],
+        compiled_at: datetime,
+        valid_until: datetime,
+        valid_from: Optional[datetime] = None,
+    ):
+        self.compiled_at = compiled_at
+        self.valid_from = compiled_at if valid_from is None else valid_from
+        self.valid_until = valid_until
+        self.rule_count = len(rules)
+        self.by_variant: Dict[int, List[PromotionRule]] = {}
+        self.by_category: Dict[int, List[PromotionRule]] = {}
+        self.global_rules: List[PromotionRule] = []
+        for rule in rules:
+            if rule.variant_id is not None:
+                self.by_variant.setdefault(rule.variant_id, []).append(rule)
+            elif rule.category_id is not None:
+                self.by_category.setdefault(rule.category_id, []).append(rule)
+            else:
+                self.global_rules.append(rule)
+
+    def __bool__(self) -> bool:
+        return self.rule_count > 0
+
+    def covers(self, now: datetime) -> bool:
+        return self.valid_from <= now < self.valid_until
+
+    def best(
+        self,
+        variant_id: int,
+        category_id: Optional[int],
+        unit_price: float,
+        quantity: float,
+    ) -> Optional[Tuple[PromotionRule, float]]:
+        """Qator uchun eng yaxshi aksiya: (qoida, chegirma) yoki None"""
+        best: Optional[Tuple[PromotionRule, float]] = None
+        candidates = (
+            self.by_variant.get(variant_id, ()),
+            self.by_category.get(category_id, ()) if category_id is not None else (),
+            self.global_rules,
+        )
+        for rules in candidates:
+            for rule in rules:
+                amount = rule.discount(unit_price, quantity)
+                if amount <= 0:
+                    continue
+                if best is None or (rule.priority, amount) > (best[0].priority, best[1]):
+                    best = (rule, amount)
+        return best
+
+
+class TenantPromotions:
+    """Bitta tenant ning barcha aksiyalari + joriy kompilyatsiya qilingan to'plam"""
+
+    def __init__(self, rules: List[PromotionRule]):
+        self.rules = rules
+        self.compilations = 0
+        self._active: Optional[ActiveRuleSet] = None
+        self._lock = threading.Lock()
+
+    def active(self, now: Optional[datetime] = None) -> ActiveRuleSet:
+        """
+        now (UTC) paytidagi to'plam - faqat vaqt chegarasi o'tganda qayta quriladi
+        Joriy to'plamdan oldingi payt (kechikkan so'rov, offline sotuv) uchun
+        bir martalik to'plam quriladi, joriy to'plam almashtirilmaydi
+        """
+        now = now or datetime.utcnow()
+        active = self._active
+        if active is not None and active.covers(now):
+            return active
+        with self._lock:
+            active = self._active
+            if active is not None and active.covers(now):
+                return active
+            compiled = self._compile(now)
+            if active is None or now >= active.valid_until:
+                self._active = compiled
+            return compiled
+
+    def _compile(self, now: datetime) -> ActiveRuleSet:
+        zone = local_zone()
+        local_now = to_local(now, zone)
+        rules = [rule for rule in self.rules if rule.is_active(now, local_now)]
+        valid_until = min(
+            (rule.next_boundary(now, local_now, zone) for rule in self.rules),
+            default=NEVER,
+        )
+        valid_from = max(
+            (rule.previous_boundary(now, local_now, zone) for rule in self.rules),
+            default=ORIGIN,
+        )
+        self.compilations += 1
+        return ActiveRuleSet(rules, compiled_at=now, valid_until=valid_until, valid_from=valid_from)
+
+
+class PromotionEngine(TenantCache):
+    """Jarayon ichidagi aksiyalar reestri"""
+
+    name = "promotions"
+
+    def build(self, db: Session, tenant_id: int) -> TenantPromotions:
+        # Tugaganlari faqat offline sotuvlar oynasi ichida yuklanadi
+        ended_after = datetime.utcnow() - timedelta(days=settings.OFFLINE_PRICING_WINDOW_DAYS)
+        rows = db.query(Promotion).filter(
+            Promotion.tenant_id == tenant_id,
+            Promotion.is_active == True,
+            or_(Promotion.ends_at.is_(None), Promotion.ends_at > ended_after)
+        ).all()
+        return TenantPromotions([PromotionRule.from_model(promotion) for promotion in rows])
+
+    def active(self, db: Session, tenant_id: int, now: Optional[datetime] = None) -> ActiveRuleSet:
+        return self.get(db, tenant_id).active(now)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        promotions = self.values()
+        stats["rules"] = sum(len(tenant.rules) for tenant in promotions)
+        stats["compilations"] = sum(tenant.compilations for tenant in promotions)
+        return stats
+
+
+promotion_engine = PromotionEngine()
+
+
+def get_promotion_engine_stats() -> Dict:
+    """Get promotion engine statistics."""
+    return promotion_engine.stats()
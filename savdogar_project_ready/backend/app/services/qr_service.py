@@ -8,10 +8,17 @@ import io
 from typing import Optional
 from PIL import Image
 import base64
+import hashlib
+import hmac
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Sale ids are int4 columns - anything longer is rejected before int()/the query
+MAX_SALE_ID = 2 ** 31 - 1
+
 
 def generate_qr_code(
     data: str,
@@ -74,19 +81,54 @@ def generate_sale_qr(sale_id: int) -> str:
     return generate_qr_code(data)
 
 
+def _receipt_signature(sale_id: int) -> str:
+    """HMAC of the sale id, keyed with SECRET_KEY (not guessable without the key)."""
+    digest = hmac.new(settings.SECRET_KEY.encode(), f"SALE_{sale_id}".encode(), hashlib.sha256)
+    return digest.hexdigest()[:12].upper()
+
+
+def _legacy_receipt_signature(sale_id: int) -> str:
+    """Old unkeyed MD5 suffix, kept only to verify already printed receipts."""
+    return hashlib.md5(f"SALE_{sale_id}".encode()).hexdigest()[:8].upper()
+
+
 def generate_receipt_id(sale_id: int) -> str:
     """
     Generate a unique receipt ID for a sale.
-    Format: REC-{sale_id}-{hash}
+    Format: REC-{sale_id}-{hmac}
     """
-    import hashlib
-    hash_str = hashlib.md5(f"SALE_{sale_id}".encode()).hexdigest()[:8].upper()
-    return f"REC-{sale_id}-{hash_str}"
+    return f"REC-{sale_id}-{_receipt_signature(sale_id)}"
+
+
+def parse_receipt_id(receipt_id: str) -> Optional[int]:
+    """
+    Decode a receipt ID to its sale ID without touching the database.
+    Returns None if the format or signature is invalid.
+    """
+    parts = receipt_id.split("-")
+    # isdigit() also accepts non-ASCII digits ("²"), which int() and
+    # compare_digest() reject, so require plain ASCII throughout.
+    if len(parts) != 3 or parts[0] != "REC" or not receipt_id.isascii() or not parts[1].isdecimal():
+        return None
+    if len(parts[1]) > len(str(MAX_SALE_ID)):
+        return None
+
+    sale_id = int(parts[1])
+    if sale_id > MAX_SALE_ID:
+        return None
+    signature = parts[2].upper()
+    if hmac.compare_digest(signature, _receipt_signature(sale_id)):
+        return sale_id
+    # Unkeyed MD5 is forgeable - only receipts printed before the HMAC switch
+    if sale_id <= settings.RECEIPT_LEGACY_MAX_SALE_ID and hmac.compare_digest(
+        signature, _legacy_receipt_signature(sale_id)
+    ):
+        return sale_id
+    return None
 
 
 def verify_receipt_id(receipt_id: str, sale_id: int) -> bool:
     """
     Verify if a receipt ID matches a sale ID.
     """
-    expected_id = generate_receipt_id(sale_id)
-    return receipt_id == expected_id
+    return parse_receipt_id(receipt_id) == sale_id
@@ -0,0 +1,130 @@
+"""
+Receipt Numbers - Chek raqamlarini ajratish (hi/lo)
+Har bir worker jarayoni receipt_counters jadvalidan (tenant, filial) uchun
+block_size ta raqamlik blokni alohida qisqa tranzaksiyada oladi va keyin
+raqamlarni xotiradan beradi. Checkout issiq qatorni faqat har blokda bir
+marta va o'z tranzaksiyasidan tashqarida yangilaydi.
+Jarayon qayta ishga tushsa yoki sotuv bekor bo'lsa raqamlarda bo'shliq
+qolishi mumkin, lekin raqamlar hech qachon takrorlanmaydi.
+"""
+from typing import Dict, List, Optional, Tuple
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+DEFAULT_BLOCK_SIZE = 100
+
+
+def format_receipt_number(branch_id: Optional[int], number: int) -> str:
+    """Odam o'qiy oladigan chek raqami: 000123 yoki filial bilan 3-000123"""
+    if branch_id:
+        return f"{branch_id}-{number:06d}"
+    return f"{number:06d}"
+
+
+class _Block:
+    __slots__ = ("next", "end", "lock")
+
+    def __init__(self):
+        self.next = 0
+        self.end = 0  # Blok oxiri (kirmaydi)
+        self.lock = threading.Lock()
+
+
+class ReceiptNumberAllocator:
+    """Jarayon ichidagi chek raqamlari bloklari"""
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks: Dict[Tuple[int, int], _Block] = {}
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.blocks_reserved = 0
+
+    def _block(self, tenant_id: int, branch_id: int) -> _Block:
+        key = (tenant_id, branch_id)
+        block = self._blocks.get(key)
+        if block is None:
+            with self._lock:
+                block = self._blocks.setdefault(key, _Block())
+        return block
+
+    def reserve_block(self, db: Session, tenant_id: int, branch_id: int, size: int) -> Tuple[int, int]:
+        """
+        Hisoblagichdan [start, end) blokni olish
+        Alohida ulanish va tranzaksiyada: qator qulfi darhol bo'shaydi,
+        checkout rollback bo'lsa ham blok qaytarilmaydi (takror raqam yo'q)
+        """
+        params = {"tenant_id": tenant_id, "branch_id": branch_id, "size": size}
+        with db.get_bind().connect() as conn:
+            with conn.begin():
+                new_next = conn.execute(text("""
+                    UPDATE receipt_counters
+                    SET next_value = next_value + :size
+                    WHERE tenant_id = :tenant_id AND branch_id = :branch_id
+                    RETURNING next_value
+                """), params).scalar()
+
+                if new_next is None:
+                    # Birinchi blok - hisoblagich qatorini yaratish
+                    conn.execute(text("""
+                        INSERT INTO receipt_counters (tenant_id, branch_id, next_value)
+                        VALUES (:tenant_id, :branch_id, 1)
+                        ON CONFLICT (tenant_id, branch_id) DO NOTHING
+                    """), params)
+                    new_next = conn.execute(text("""
+                        UPDATE receipt_counters
+                        SET next_value = next_value + :size
+                        WHERE tenant_id = :tenant_id AND branch_id = :branch_id
+                        RETURNING next_value
+                    """), params).scalar()
+
+        self.blocks_reserved += 1
+        return new_next - size, new_next
+
+    def next_numbers(
+        self,
+        db: Session,
+        tenant_id: int,
+        branch_id: Optional[int],
+        count: int,
+    ) -> List[str]:
+        """count ta ketma-ket chek raqami"""
+        branch_key = branch_id or 0
+        block = self._block(tenant_id, branch_key)
+        numbers: List[int] = []
+        with block.lock:
+            while len(numbers) < count:
+                if block.next >= block.end:
+                    # Katta to'plamlar uchun blok bir martada kattaroq olinadi
+                    size = max(self.block_size, count - len(numbers))
+                    block.next, block.end = self.reserve_block(db, tenant_id, branch_key, size)
+                take = min(block.end - block.next, count - len(numbers))
+                numbers.extend(range(block.next, block.next + take))
+                block.next += take
+            self.allocated += count
+        return [format_receipt_number(branch_id, number) for number in numbers]
+
+    def next_number(self, db: Session, tenant_id: int, branch_id: Optional[int] = None) -> str:
+        return self.next_numbers(db, tenant_id, branch_id, 1)[0]
+
+    def reset(self) -> None:
+        """Xotiradagi bloklarni tashlash (qolgan raqamlar bo'shliq bo'lib qoladi)"""
+        with self._lock:
+            self._blocks.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "block_size": self.block_size,
+            "allocated": self.allocated,
+            "blocks_reserved": self.blocks_reserved,
+        }
+
+
+receipt_allocator = ReceiptNumberAllocator()
+
+
+def get_receipt_allocator_stats() -> Dict:
+    """Get receipt number allocator statistics."""
+    return receipt_allocator.stats()
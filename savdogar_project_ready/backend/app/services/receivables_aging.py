@@ -0,0 +1,212 @@
+"""
+Receivables Aging - Debitorlik qarzini yosh bo'yicha taqsimlash (30/60/90+)
+Har bir qarz yozuvi ochiq "qism" (receivable_lots) bo'ladi, to'lovlar eng
+eski qismdan boshlab (FIFO) yopadi. Qarz kitobiga yozuv qo'shilganda faqat
+tegishli mijozlarning ochiq qismlari o'qiladi va customer_aging qatori shu
+tranzaksiyada qayta yoziladi - tarix qayta ko'rib chiqilmaydi.
+
+Kun o'tganda qismlar keyingi guruhga o'tadi: hisobot o'qilishidan oldin
+aged_on eski bo'lgan qatorlar ochiq qismlardan qayta taqsimlanadi (kuniga
+bir marta). Hisobot va tenant xulosasi faqat customer_aging dan o'qiladi.
+
+Ushbu xizmatdan oldingi qarzlar d4a8f2c7e9b1 migratsiyasida qarz kitobidan
+to'ldiriladi (rebuild_customer bilan bir xil FIFO natija); bitta mijozni
+keyinchalik tekshirish/tuzatish uchun rebuild_customer ishlatiladi.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.customer_v2 import CustomerAging, CustomerLedger, ReceivableLot
+
+BUCKETS = ("current", "days_31_60", "days_61_90", "days_over_90")
+
+# Suzuvchi nuqta qoldiqlari (so'm ulushlari) yopilgan hisoblanadi
+EPSILON = 1e-6
+
+
+def bucket_of(age_days: int) -> str:
+    if age_days <= 30:
+        return "current"
+    if age_days <= 60:
+        return "days_31_60"
+    if age_days <= 90:
+        return "days_61_90"
+    return "days_over_90"
+
+
+def age_lots(lots: Iterable[Tuple[datetime, float]], today: date) -> Dict[str, Any]:
+    """Ochiq qismlar (debit_at, remaining) -> guruhlar bo'yicha summalar"""
+    aging: Dict[str, Any] = {bucket: 0.0 for bucket in BUCKETS}
+    total, oldest = 0.0, None
+    for debit_at, remaining in lots:
+        aging[bucket_of((today - debit_at.date()).days)] += remaining
+        total += remaining
+        if oldest is None or debit_at < oldest:
+            oldest = debit_at
+    aging["total"] = total
+    aging["oldest_debit_at"] = oldest
+    return aging
+
+
+class _Lot:
+    __slots__ = ("id", "ledger_id", "debit_at", "amount", "remaining")
+
+    def __init__(self, id, ledger_id, debit_at, amount, remaining):
+        self.id = id
+        self.ledger_id = ledger_id
+        self.debit_at = debit_at
+        self.amount = amount
+        self.remaining = remaining
+
+
+class _CustomerLots:
+    """Bitta mijozning ochiq qismlari (FIFO tartibida) va o'zgarishlar"""
+
+    def __init__(self, lots: List[_Lot]):
+        self.open = lots
+        self.changed: Dict[int, float] = {}
+        self.closed: List[int] = []
+
+    def apply(self, ledger_id: int, debit: float, credit: float, balance_after: float, at: datetime) -> None:
+        delta = (credit or 0.0) - (debit or 0.0)
+        if delta < 0:
+            # Oldindan to'langan (musbat balans) qismi qarz bo'lmaydi
+            owed = min(-delta, max(0.0, -balance_after))
+            if owed > EPSILON:
+                self.open.append(_Lot(None, ledger_id, at, owed, owed))
+            return
+
+        left = delta
+        while left > EPSILON and self.open:
+            lot = self.open[0]
+            taken = min(left, lot.remaining)
+            lot.remaining -= taken
+            left -= taken
+            if lot.remaining <= EPSILON:
+                self.open.pop(0)
+                if lot.id is not None:
+                    self.changed.pop(lot.id, None)
+                    self.closed.append(lot.id)
+            elif lot.id is not None:
+                self.changed[lot.id] = lot.remaining
+
+
+def _load_lots(db: Session, customer_ids: Iterable[int]) -> Dict[int, _CustomerLots]:
+    customer_ids = list(customer_ids)
+    lots: Dict[int, List[_Lot]] = {customer_id: [] for customer_id in customer_ids}
+    rows = db.query(
+        ReceivableLot.customer_id, ReceivableLot.id, ReceivableLot.ledger_id,
+        ReceivableLot.debit_at, ReceivableLot.amount, ReceivableLot.remaining,
+    ).filter(ReceivableLot.customer_id.in_(customer_ids)).order_by(ReceivableLot.id)
+    for customer_id, *lot in rows:
+        lots[customer_id].append(_Lot(*lot))
+    return {customer_id: _CustomerLots(open_lots) for customer_id, open_lots in lots.items()}
+
+
+def _save(db: Session, tenant_id: int, customers: Dict[int, _CustomerLots], today: date) -> None:
+    """Qismlar o'zgarishlari va customer_aging qatorlarini yozish"""
+    closed = [lot_id for state in customers.values() for lot_id in state.closed]
+    if closed:
+        db.execute(delete(ReceivableLot).where(ReceivableLot.id.in_(closed)))
+
+    changed = [
+        {"id": lot_id, "remaining": remaining}
+        for state in customers.values() for lot_id, remaining in state.changed.items()
+    ]
+    if changed:
+        db.execute(update(ReceivableLot), changed)
+
+    new_lots = [
+        dict(tenant_id=tenant_id, customer_id=customer_id, ledger_id=lot.ledger_id,
+             debit_at=lot.debit_at, amount=lot.amount, remaining=lot.remaining)
+        for customer_id, state in customers.items() for lot in state.open if lot.id is None
+    ]
+    if new_lots:
+        db.execute(insert(ReceivableLot), new_lots)
+
+    # Qarzdorlar uchun qator qayta yoziladi, qarzi yopilganlar o'chiriladi
+    db.execute(delete(CustomerAging).where(CustomerAging.customer_id.in_(list(customers))))
+    aging_rows = []
+    for customer_id, state in customers.items():
+        if not state.open:
+            continue
+        aging = age_lots(((lot.debit_at, lot.remaining) for lot in state.open), today)
+        aging_rows.append(dict(aging, tenant_id=tenant_id, customer_id=customer_id, aged_on=today))
+    if aging_rows:
+        db.execute(insert(CustomerAging), aging_rows)
+
+
+def apply_postings(db: Session, tenant_id: int, postings: List[Dict[str, Any]]) -> None:
+    """
+    Yangi qarz kitobi yozuvlarini qismlarga qo'llash (customer_ledger.post_entries dan)
+    postings: yozuvlar tartibida (id, customer_id, debit, credit, balance_after, created_at)
+    """
+    if not postings:
+        return
+    customers = _load_lots(db, {posting["customer_id"] for posting in postings})
+    for posting in postings:
+        customers[posting["customer_id"]].apply(
+            posting["id"], posting.get("debit"), posting.get("credit"),
+            posting["balance_after"], posting["created_at"],
+        )
+    _save(db, tenant_id, customers, datetime.utcnow().date())
+
+
+def rebuild_customer(db: Session, tenant_id: int, customer_id: int) -> None:
+    """Bitta mijozning qismlarini butun qarz kitobidan qayta qurish (tuzatish uchun)"""
+    db.execute(delete(ReceivableLot).where(ReceivableLot.customer_id == customer_id))
+    state = _CustomerLots([])
+    rows = db.query(
+        CustomerLedger.id, CustomerLedger.debit, CustomerLedger.credit, CustomerLedger.created_at
+    ).filter(CustomerLedger.customer_id == customer_id).order_by(CustomerLedger.id)
+
+    # Balans yozuvlar yig'indisidan (balance_after eski yozuvlarda ishonchsiz bo'lishi mumkin)
+    balance = 0.0
+    for ledger_id, debit, credit, created_at in rows.yield_per(2000):
+        balance += (credit or 0.0) - (debit or 0.0)
+        state.apply(ledger_id, debit, credit, balance, created_at)
+    _save(db, tenant_id, {customer_id: state}, datetime.utcnow().date())
+
+
+def refresh(db: Session, tenant_id: int, today: Optional[date] = None) -> int:
+    """
+    Kun o'tgan qatorlarni ochiq qismlardan qayta taqsimlash
+    Returns: yangilangan mijozlar soni (bugun allaqachon yangilangan bo'lsa 0)
+    """
+    today = today or datetime.utcnow().date()
+    stale = db.query(CustomerAging.id, CustomerAging.customer_id).filter(
+        CustomerAging.tenant_id == tenant_id,
+        CustomerAging.aged_on < today,
+    ).all()
+    if not stale:
+        return 0
+
+    aging_ids = dict((customer_id, aging_id) for aging_id, customer_id in stale)
+    lots: Dict[int, List[Tuple[datetime, float]]] = {customer_id: [] for customer_id in aging_ids}
+    rows = db.query(ReceivableLot.customer_id, ReceivableLot.debit_at, ReceivableLot.remaining).filter(
+        ReceivableLot.tenant_id == tenant_id,
+        ReceivableLot.customer_id.in_(list(aging_ids)),
+    )
+    for customer_id, debit_at, remaining in rows.yield_per(2000):
+        lots[customer_id].append((debit_at, remaining))
+
+    db.execute(update(CustomerAging), [
+        dict(age_lots(customer_lots, today), id=aging_ids[customer_id], aged_on=today)
+        for customer_id, customer_lots in lots.items()
+    ])
+    db.commit()
+    return len(stale)
+
+
+def summary(db: Session, tenant_id: int) -> Dict[str, Any]:
+    """Tenant bo'yicha jami: qarzdorlar soni va guruhlar summasi"""
+    columns = [getattr(CustomerAging, bucket) for bucket in BUCKETS] + [CustomerAging.total]
+    row = db.query(
+        func.count(CustomerAging.id), *(func.coalesce(func.sum(column), 0.0) for column in columns)
+    ).filter(CustomerAging.tenant_id == tenant_id).one()
+    result = {"customers": row[0]}
+    result.update(zip(list(BUCKETS) + ["total"], row[1:]))
+    return result
@@ -0,0 +1,141 @@
+"""
+Recipe Compiler - Retseptlarni (bill of materials) oldindan kompilyatsiya qilish
+Kitchen/Cafe tenantlari uchun har bir sotiladigan variant retsepti
+xom ingredientlar vektoriga yoyiladi: ichki (sub) retseptlar ochiladi,
+sikllar rad etiladi. Natija tenant bo'yicha keshda saqlanadi.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.product_v2 import ProductV2, ProductVariant
+from app.services.tenant_cache import TenantCache
+
+
+class RecipeCycleError(ValueError):
+    """Retsept o'zini o'zi (bevosita yoki bilvosita) o'z ichiga oladi"""
+
+    def __init__(self, path: List[int]):
+        self.path = path
+        super().__init__("Retseptda sikl: " + " -> ".join(str(v) for v in path))
+
+
+def flatten_recipes(
+    recipes: Dict[int, List[Tuple[int, float]]],
+) -> Tuple[Dict[int, Dict[int, float]], Dict[int, List[int]]]:
+    """
+    Retseptlarni xom ingredientlarga yoyish
+    recipes: {variant_id: [(ingredient_variant_id, qty), ...]}
+    Returns: (compiled, cycles)
+        compiled: {variant_id: {xom_ingredient_id: bir porsiya uchun miqdor}}
+        cycles: {variant_id: sikl yo'li} - bu variantlarni sotib bo'lmaydi
+    """
+    compiled: Dict[int, Dict[int, float]] = {}
+    cycles: Dict[int, List[int]] = {}
+
+    def expand(variant_id: int, stack: List[int]) -> Dict[int, float]:
+        if variant_id in compiled:
+            return compiled[variant_id]
+        if variant_id in cycles:
+            raise RecipeCycleError(cycles[variant_id])
+        if variant_id in stack:
+            raise RecipeCycleError(stack[stack.index(variant_id):] + [variant_id])
+
+        stack.append(variant_id)
+        vector: Dict[int, float] = {}
+        try:
+            for ingredient_id, qty in recipes[variant_id]:
+                if ingredient_id in recipes:
+                    for leaf_id, leaf_qty in expand(ingredient_id, stack).items():
+                        vector[leaf_id] = vector.get(leaf_id, 0.0) + qty * leaf_qty
+                else:
+                    vector[ingredient_id] = vector.get(ingredient_id, 0.0) + qty
+        finally:
+            stack.pop()
+
+        compiled[variant_id] = vector
+        return vector
+
+    for variant_id in recipes:
+        try:
+            expand(variant_id, [])
+        except RecipeCycleError as e:
+            cycles[variant_id] = e.path
+
+    return compiled, cycles
+
+
+class RecipeBook:
+    """Bitta tenant ning kompilyatsiya qilingan retseptlari"""
+
+    def __init__(self, compiled: Dict[int, Dict[int, float]], cycles: Dict[int, List[int]]):
+        self.compiled = compiled
+        self.cycles = cycles
+
+    def ingredients(self, variant_id: int) -> Optional[Dict[int, float]]:
+        """Bir porsiya uchun xom ingredientlar (retsept bo'lmasa None)"""
+        if variant_id in self.cycles:
+            raise RecipeCycleError(self.cycles[variant_id])
+        return self.compiled.get(variant_id)
+
+    def demand(self, lines: Iterable[Tuple[int, float]]) -> Tuple[Dict[int, float], List[List[int]]]:
+        """
+        Butun buyurtma uchun ombordan chiqariladigan jami miqdorlar
+        lines: [(variant_id, quantity), ...]
+        Returns: ({variant_id: jami miqdor}, har bir qator tayangan variantlar)
+        """
+        totals: Dict[int, float] = {}
+        line_variants: List[List[int]] = []
+        for variant_id, quantity in lines:
+            vector = self.ingredients(variant_id)
+            if vector is None:
+                vector = {variant_id: 1.0}
+            for ingredient_id, qty in vector.items():
+                totals[ingredient_id] = totals.get(ingredient_id, 0.0) + quantity * qty
+            line_variants.append(list(vector))
+        return totals, line_variants
+
+
+def compile_recipe_book(db: Session, tenant_id: int) -> RecipeBook:
+    """Tenant retseptlarini ikki so'rov bilan yuklab kompilyatsiya qilish"""
+    product_recipes = {
+        product_id: recipe["ingredients"]
+        for product_id, recipe in db.query(ProductV2.id, ProductV2.recipe).filter(
+            ProductV2.tenant_id == tenant_id,
+            ProductV2.recipe.isnot(None)
+        ).all()
+        if recipe and "ingredients" in recipe
+    }
+
+    variant_products = dict(
+        db.query(ProductVariant.id, ProductVariant.product_id).filter(
+            ProductVariant.tenant_id == tenant_id
+        ).all()
+    )
+
+    recipes: Dict[int, List[Tuple[int, float]]] = {}
+    for variant_id, product_id in variant_products.items():
+        ingredients = product_recipes.get(product_id)
+        if ingredients is None:
+            continue
+        # Mavjud bo'lmagan ingredientlar avvalgidek o'tkazib yuboriladi
+        recipes[variant_id] = [
+            (ing["id"], float(ing["qty"]))
+            for ing in ingredients
+            if ing.get("id") in variant_products
+        ]
+
+    compiled, cycles = flatten_recipes(recipes)
+    return RecipeBook(compiled, cycles)
+
+
+class RecipeCache(TenantCache):
+    """Tenant bo'yicha kompilyatsiya qilingan retseptlar"""
+
+    name = "recipes"
+
+    def build(self, db: Session, tenant_id: int) -> RecipeBook:
+        return compile_recipe_book(db, tenant_id)
+
+
+recipe_cache = RecipeCache()
@@ -0,0 +1,278 @@
+"""
+Search Index - Mahsulot nomlari uchun trigram (n-gram) teskari indeks
+Nomlar normallashtiriladi: kichik harf, kirill -> lotin (o'zbek/rus),
+apostroflar olib tashlanadi. Har bir so'z "  so'z " ko'rinishida
+trigramlarga bo'linadi (pg_trgm kabi), shuning uchun xatoli yozilgan
+so'rovlar ham topiladi. Indeks tenant (yoki tashkilot) bo'yicha keshda
+saqlanadi va mahsulot yozuvlarida joyida yangilanadi.
+"""
+from collections import Counter
+import heapq
+import re
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.models.product_v2 import ProductV2
+from app.services.tenant_cache import TenantCache
+
+# Kirill -> lotin (o'zbek lotin yozuviga yaqin)
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "x", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "",
+    "ы": "i", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h",
+}
+_TRANSLATE = str.maketrans(CYRILLIC_TO_LATIN)
+_APOSTROPHES = re.compile(r"['`ʻʼ‘’]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Nomzodlar yig'ishda o'qiladigan posting elementlari chegarasi
+# (kam uchraydigan trigramlar birinchi o'qiladi, ular eng ko'p ma'lumot beradi)
+CANDIDATE_BUDGET = 6000
+# Aniq ball hisoblanadigan nomzodlar soni
+RERANK_CANDIDATES = 100
+MIN_SCORE = 0.3
+
+
+def normalize(text: str) -> str:
+    """Qidiruv uchun yagona ko'rinish: 'Ўзбек чойи' -> 'ozbek choyi'"""
+    text = unicodedata.normalize("NFC", (text or "").lower())
+    # Urg'u va boshqa diakritik belgilar (kirill harflari NFC da saqlanadi)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.translate(_TRANSLATE)
+    text = _APOSTROPHES.sub("", text)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def trigrams(normalized: str) -> FrozenSet[str]:
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return frozenset(grams)
+
+
+class NgramIndex:
+    """
+    Bitta tenant ning trigram indeksi
+    Yozuvlar postings to'plamlarini nusxalab almashtiradi (copy-on-write),
+    shuning uchun qidiruv qulfsiz ishlaydi.
+    """
+
+    def __init__(self, documents: Optional[List[Tuple[int, str]]] = None):
+        self.names: Dict[int, str] = {}
+        self.normalized: Dict[int, str] = {}
+        self.grams: Dict[int, FrozenSet[str]] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+
+        # Boshlang'ich qurish - to'plamlar hali hech kimga ko'rinmaydi
+        for doc_id, name in documents or []:
+            norm = normalize(name)
+            grams = trigrams(norm)
+            self.names[doc_id] = name
+            self.normalized[doc_id] = norm
+            self.grams[doc_id] = grams
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(doc_id)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def upsert(self, doc_id: int, name: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+            norm = normalize(name)
+            grams = trigrams(norm)
+            self.names[doc_id] = name
+            self.normalized[doc_id] = norm
+            self.grams[doc_id] = grams
+            for gram in grams:
+                self.postings[gram] = self.postings.get(gram, set()) | {doc_id}
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: int) -> None:
+        grams = self.grams.pop(doc_id, None)
+        if grams is None:
+            return
+        self.names.pop(doc_id, None)
+        self.normalized.pop(doc_id, None)
+        for gram in grams:
+            remaining = self.postings.get(gram, set()) - {doc_id}
+            if remaining:
+                self.postings[gram] = remaining
+            else:
+                self.postings.pop(gram, None)
+
+    def _candidates(self, query_grams: FrozenSet[str]) -> Counter:
+        """Trigramlar bo'yicha nomzodlar (kam uchraydiganlari birinchi)"""
+        postings = sorted(
+            (self.postings[gram] for gram in query_grams if gram in self.postings),
+            key=len,
+        )
+        counts: Counter = Counter()
+        read = 0
+        for posting in postings:
+            if counts and read + len(posting) > CANDIDATE_BUDGET:
+                break
+            counts.update(posting)
+            read += len(posting)
+        return counts
+
+    def search(self, query: str, limit: int = 10, min_score: float = MIN_SCORE) -> List[Tuple[int, float]]:
+        """
+        Eng mos limit ta hujjat: [(doc_id, ball)]
+        Ball = so'rov trigramlarining qoplanishi + Jaccard o'xshashligi,
+        nom so'rovni to'liq o'z ichiga olsa yoki so'z boshi mos kelsa qo'shimcha.
+        """
+        norm = normalize(query)
+        query_grams = trigrams(norm)
+        if not query_grams:
+            return []
+
+        counts = self._candidates(query_grams)
+        query_size = len(query_grams)
+        scored = []
+        for doc_id, _ in counts.most_common(RERANK_CANDIDATES):
+            doc_grams = self.grams.get(doc_id)
+            doc_norm = self.normalized.get(doc_id)
+            if doc_grams is None or doc_norm is None:
+                continue
+            shared = len(query_grams & doc_grams)
+            score = shared / query_size + shared / (query_size + len(doc_grams) - shared)
+            if norm in doc_norm:
+                score += 1.0
+                if doc_norm.startswith(norm) or f" {norm}" in doc_norm:
+                    score += 0.5
+            if score >= min_score:
+                scored.append((round(score, 4), -len(doc_norm), doc_id))
+
+        return [(doc_id, score) for score, _, doc_id in heapq.nlargest(limit, scored)]
+
+    def find_containing(self, text: str) -> Optional[int]:
+        """
+        ILIKE '%text%' o'rnini bosuvchi: normallashtirilgan nomi text ni
+        o'z ichiga olgan eng qisqa nomli hujjat
+        """
+        norm = normalize(text)
+        if not norm:
+            return None
+
+        # Faqat so'z ichidagi trigramlar - ular nomning istalgan joyida uchraydi
+        inner = {word[i:i + 3] for word in norm.split() for i in range(len(word) - 2)}
+        if inner:
+            postings = sorted((self.postings.get(gram, set()) for gram in inner), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting
+                if not candidates:
+                    return None
+        else:
+            # 1-2 harfli so'zlar - trigram yo'q, nomlarni to'g'ridan-to'g'ri tekshiramiz
+            candidates = list(self.normalized)
+
+        normalized = self.normalized
+        matches = [doc_id for doc_id in candidates if norm in normalized.get(doc_id, "")]
+        if not matches:
+            return None
+        return min(matches, key=lambda doc_id: (len(normalized.get(doc_id, "")), doc_id))
+
+
+class _SearchIndexCache(TenantCache):
+    """Kesh ustidagi umumiy amallar (joyida yangilash)"""
+
+    def upsert(self, key: int, doc_id: int, name: str) -> None:
+        index = self.peek(key)
+        if index is not None:
+            index.upsert(doc_id, name)
+
+    def remove(self, key: int, doc_id: int) -> None:
+        index = self.peek(key)
+        if index is not None:
+            index.remove(doc_id)
+
+    def search(self, db: Session, key: int, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        return self.get(db, key).search(query, limit)
+
+    def find_containing(self, db: Session, key: int, text: str) -> Optional[int]:
+        return self.get(db, key).find_containing(text)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["documents"] = sum(len(index) for index in self.values())
+        return stats
+
+
+class ProductSearchIndex(_SearchIndexCache):
+    """ProductV2 nomlari - tenant bo'yicha"""
+
+    name = "product_names"
+
+    def build(self, db: Session, tenant_id: int) -> NgramIndex:
+        rows = db.query(ProductV2.id, ProductV2.name).filter(
+            ProductV2.tenant_id == tenant_id,
+            ProductV2.is_active == True
+        ).all()
+        return NgramIndex(rows)
+
+
+class LegacyProductSearchIndex(_SearchIndexCache):
+    """Eski Product nomlari - tashkilot (organization_id) bo'yicha"""
+
+    def build(self, db: Session, organization_id: int) -> NgramIndex:
+        rows = db.query(Product.id, Product.name).filter(
+            Product.organization_id == organization_id
+        ).all()
+        return NgramIndex(rows)
+
+
+product_search_index = ProductSearchIndex()
+legacy_product_search_index = LegacyProductSearchIndex()
+
+
+def find_product_by_name(
+    db: Session,
+    organization_id: Optional[int],
+    name: str,
+    database_fallback: bool = False,
+) -> Optional[Product]:
+    """
+    Nomi name ni o'z ichiga olgan mahsulot (avvalgi ILIKE '%name%' o'rniga)
+    database_fallback - indeksda topilmasa bazadan ham tekshirish (boshqa
+    worker yaqinda qo'shgan mahsulot takror yaratilmasligi uchun)
+    """
+    if not organization_id or not name:
+        return None
+    product_id = legacy_product_search_index.find_containing(db, organization_id, name)
+    if product_id is not None:
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if product is not None:
+            return product
+    if not database_fallback:
+        return None
+
+    product = db.query(Product).filter(
+        Product.name.ilike(f"%{name}%"),
+        Product.organization_id == organization_id
+    ).first()
+    if product is not None:
+        legacy_product_search_index.upsert(organization_id, product.id, product.name)
+    return product
+
+
+def get_search_index_stats() -> Dict:
+    """Get search index statistics."""
+    return {
+        "products_v2": product_search_index.stats(),
+        "products": legacy_product_search_index.stats(),
+    }
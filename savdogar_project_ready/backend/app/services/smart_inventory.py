@@ -9,6 +9,7 @@ from sqlalchemy import func
 from datetime import datetime, timedelta
 from app.models import Product, Sale, SaleItem
 from app.services.openai_service import openai_service
+from app.services.search_index import find_product_by_name
 import logging
 
 logger = logging.getLogger(__name__)
@@ -203,10 +204,7 @@ Faqat JSON qaytaring, boshqa matn yo'q."""
         # Match suggestions with actual products
         suggestions = []
         for sug in ai_result.get('suggestions', []):
-            product = db.query(Product).filter(
-                Product.name.ilike(f"%{sug.get('product_name', '')}%"),
-                Product.organization_id == organization_id
-            ).first()
+            product = find_product_by_name(db, organization_id, sug.get('product_name', ''))
             
             if product:
                 suggestions.append({
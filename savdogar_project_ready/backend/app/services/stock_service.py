@@ -0,0 +1,67 @@
+"""
+Stock Service - Omborni atomik (shartli) kamaytirish
+Butun buyurtma uchun bitta UPDATE ... FROM (VALUES ...) ... RETURNING:
+faqat yetarli qoldig'i bor qatorlar kamayadi, qolganlari qaytariladi.
+Parallel kassalar bir xil SKU ni sotganda "lost update" bo'lmaydi.
+"""
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, text
+
+from app.models.product_v2 import ProductVariant
+
+
+def decrement_stock(db: Session, tenant_id: int, quantities: Dict[int, float]) -> List[int]:
+    """
+    Variantlar omborini bitta so'rov bilan kamaytirish
+    quantities: {variant_id: jami miqdor} (bir xil variant oldindan yig'ilgan bo'lishi kerak)
+    Returns: qoldig'i yetmagan (yoki topilmagan) variant ID lari
+    Eslatma: muvaffaqiyatsiz bo'lsa chaqiruvchi tranzaksiyani rollback qilishi kerak
+    """
+    if not quantities:
+        return []
+
+    # Qatorlar doim id tartibida qulflanadi - bir xil SKU larni boshqa tartibda
+    # sotayotgan ikki kassa bir-birini kutib deadlock ga tushmaydi
+    # (UPDATE ... FROM o'zi join tartibida qulflaydi; SQLite FOR UPDATE ni e'tiborsiz qoldiradi)
+    ordered = sorted(quantities)
+    db.query(ProductVariant.id).filter(
+        ProductVariant.id.in_(ordered),
+        ProductVariant.tenant_id == tenant_id
+    ).order_by(ProductVariant.id).with_for_update().all()
+
+    params = {"tenant_id": tenant_id}
+    rows = []
+    for i, variant_id in enumerate(ordered):
+        qty = quantities[variant_id]
+        params[f"id_{i}"] = variant_id
+        params[f"qty_{i}"] = qty
+        rows.append(f"(CAST(:id_{i} AS INTEGER), CAST(:qty_{i} AS FLOAT))")
+
+    # CTE shakli Postgres va SQLite (testlar) da bir xil ishlaydi
+    statement = text(f"""
+        WITH v(id, qty) AS (VALUES {", ".join(rows)})
+        UPDATE product_variants
+        SET stock_quantity = product_variants.stock_quantity - v.qty
+        FROM v
+        WHERE product_variants.id = v.id
+          AND product_variants.tenant_id = :tenant_id
+          AND product_variants.stock_quantity >= v.qty
+        RETURNING product_variants.id
+    """)
+
+    updated = {row[0] for row in db.execute(statement, params)}
+    return [variant_id for variant_id in quantities if variant_id not in updated]
+
+
+def get_stock_levels(db: Session, tenant_id: int, variant_ids: List[int]) -> Dict[int, float]:
+    """Joriy qoldiqlar (xato xabari uchun)"""
+    if not variant_ids:
+        return {}
+    rows = db.query(ProductVariant.id, ProductVariant.stock_quantity).filter(
+        and_(
+            ProductVariant.id.in_(variant_ids),
+            ProductVariant.tenant_id == tenant_id
+        )
+    ).all()
+    return {variant_id: stock for variant_id, stock in rows}
@@ -0,0 +1,182 @@
+"""
+Tenant Cache - Tenant bo'yicha versiyalangan xotiradagi keshlar uchun asos
+Har bir tenant uchun qiymat build() orqali quriladi. Versiya ikki qismdan
+iborat: jarayon ichidagi (lokal) va bazadagi tenants.cache_versions[name].
+Yozuvdan keyin invalidate(db, ...) bazadagi versiyani oshiradi, shuning
+uchun boshqa worker jarayonlari ham keyingi get() da qiymatni qayta quradi.
+get() versiyani db.get(Tenant) orqali o'qiydi - tenant sessiyada yuklangan
+bo'lsa qo'shimcha so'rov bo'lmaydi. invalidate() dan o'tmaydigan joyida
+yangilanishlar (masalan, sotuvdan keyingi qoldiqlar) uchun max_age_seconds
+chegara bo'lib qoladi.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Tuple
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.models.tenant import Tenant
+
+DEFAULT_MAX_AGE_SECONDS = 300
+
+
+class _Entry:
+    __slots__ = ("version", "shared", "built_at", "value")
+
+    def __init__(self, version: int, shared: int, value: Any):
+        self.version = version
+        self.shared = shared
+        self.built_at = time.monotonic()
+        self.value = value
+
+
+def _bump_shared(db: Session, tenant_id: int, names: Iterable[str]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Bazadagi kesh versiyalarini oshirish va commit qilish
+    Tenant qatori qulflanadi - parallel yozuvlar bir-birining oshirishini yo'qotmaydi.
+    (oldingi, yangi) versiyalar lug'atlarini qaytaradi.
+    """
+    names = sorted(set(names))
+    if not names:
+        return {}, {}
+    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).populate_existing().with_for_update().first()
+    if tenant is None:
+        db.rollback()
+        return {}, {}
+    previous = dict(tenant.cache_versions or {})
+    current = dict(previous)
+    for name in names:
+        current[name] = previous.get(name, 0) + 1
+    # Yangi lug'at berilmasa JSON ustun o'zgarishi sezilmaydi
+    tenant.cache_versions = current
+    db.commit()
+    return previous, current
+
+
+def invalidate_caches(db: Session, tenant_id: int, *caches: "TenantCache") -> None:
+    """Bir nechta keshni bitta tranzaksiyada eskirtirish (yozuv commit qilingandan keyin)"""
+    _bump_shared(db, tenant_id, [cache.name for cache in caches if cache.name])
+    for cache in caches:
+        cache._evict(tenant_id)
+
+
+class TenantCache(ABC):
+    """
+    Asosiy klass: build() ni aniqlash kerak
+    name - tenants.cache_versions dagi kalit (None bo'lsa faqat lokal versiya,
+    masalan tenant emas, tashkilot bo'yicha keshlar uchun)
+    Statistika: hits, misses, rebuilds, invalidations
+    """
+
+    name: Optional[str] = None
+
+    def __init__(self, max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._entries: Dict[int, _Entry] = {}
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.invalidations = 0
+
+    @abstractmethod
+    def build(self, db: Session, tenant_id: int) -> Any:
+        """Tenant qiymatini bazadan qurish"""
+
+    def version(self, tenant_id: int) -> int:
+        return self._versions.get(tenant_id, 0)
+
+    def shared_version(self, db: Session, tenant_id: int) -> int:
+        """Bazadagi versiya (barcha worker jarayonlari uchun umumiy)"""
+        if not self.name:
+            return 0
+        tenant = db.get(Tenant, tenant_id)
+        if tenant is None:
+            return 0
+        return (tenant.cache_versions or {}).get(self.name, 0)
+
+    def invalidate(self, db: Session, tenant_id: int) -> None:
+        """Tenant ma'lumotlari o'zgarganda (commit dan keyin) chaqiriladi"""
+        invalidate_caches(db, tenant_id, self)
+
+    def touch(self, db: Session, tenant_id: int) -> None:
+        """
+        Joyida yangilashdan keyin: boshqa jarayonlar qayta quradi, bu jarayondagi
+        yangilangan nusxa esa saqlanadi (oraliqda boshqa o'zgarish bo'lmagan bo'lsa)
+        """
+        if not self.name:
+            return
+        previous, current = _bump_shared(db, tenant_id, [self.name])
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is None or not current:
+                return
+            if entry.shared == previous.get(self.name, 0):
+                entry.shared = current[self.name]
+            else:
+                self._entries.pop(tenant_id, None)
+
+    def _evict(self, tenant_id: int) -> None:
+        """Faqat shu jarayondagi nusxani eskirtirish"""
+        with self._lock:
+            self._versions[tenant_id] = self._versions.get(tenant_id, 0) + 1
+            self._entries.pop(tenant_id, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def put(self, db: Session, tenant_id: int, value: Any) -> None:
+        """Tayyor qiymatni joriy versiya bilan saqlash"""
+        shared = self.shared_version(db, tenant_id)
+        with self._lock:
+            self._entries[tenant_id] = _Entry(self.version(tenant_id), shared, value)
+
+    def peek(self, tenant_id: int) -> Optional[Any]:
+        """Lokal yangi bo'lsa keshdagi qiymat, aks holda None (qurmaydi)"""
+        entry = self._entries.get(tenant_id)
+        return entry.value if self._is_fresh(tenant_id, entry) else None
+
+    def _is_fresh(self, tenant_id: int, entry: Optional[_Entry], shared: Optional[int] = None) -> bool:
+        if entry is None:
+            return False
+        if entry.version != self.version(tenant_id):
+            return False
+        if shared is not None and entry.shared != shared:
+            return False
+        return (time.monotonic() - entry.built_at) < self.max_age_seconds
+
+    def get(self, db: Session, tenant_id: int) -> Any:
+        """Tenant qiymatini olish (kerak bo'lsa qurish)"""
+        # Versiya qurishdan oldin o'qiladi: oraliqdagi yozuv keyingi get() da qayta qurdiradi
+        shared = self.shared_version(db, tenant_id)
+        entry = self._entries.get(tenant_id)
+        if self._is_fresh(tenant_id, entry, shared):
+            self.hits += 1
+            return entry.value
+
+        self.misses += 1
+        version = self.version(tenant_id)
+        value = self.build(db, tenant_id)
+
+        with self._lock:
+            # Qurilish vaqtida invalidate bo'lgan bo'lsa, eskisini saqlamaymiz
+            if version == self.version(tenant_id):
+                self._entries[tenant_id] = _Entry(version, shared, value)
+            self.rebuilds += 1
+        return value
+
+    def values(self):
+        return [entry.value for entry in list(self._entries.values())]
+
+    def stats(self) -> Dict:
+        return {
+            "tenants": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rebuilds": self.rebuilds,
+            "invalidations": self.invalidations,
+        }
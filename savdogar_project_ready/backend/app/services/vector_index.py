@@ -0,0 +1,553 @@
+"""
+Vector Index - Semantik qidiruv uchun taxminiy eng yaqin qo'shnilar (ANN) indeksi
+ProductVariant.embedding_vector lar normallashtiriladi (kosinus = skalyar
+ko'paytma) va IVF usulida guruhlanadi: k-means markazlari o'qitiladi, har bir
+vektor eng yaqin markaz ro'yxatiga tushadi. Qidiruvda so'rovga eng yaqin
+nprobe ta ro'yxat to'liq tekshiriladi. Kichik indekslar aniq qidiriladi.
+
+Indeks tenant bo'yicha xotirada saqlanadi va VECTOR_INDEX_DIR ga .npy
+fayllar sifatida yoziladi; qayta ishga tushganda vektorlar memmap orqali
+ochiladi (Postgres dan yuz minglab vektorlarni qayta o'qimaslik uchun).
+Har bir saqlash alohida build-<id> papkasiga yoziladi va CURRENT fayli bitta
+os.replace bilan shu papkaga ko'chiriladi - parallel saqlashlar (bir nechta
+worker) fayllarni aralashtirib yubormaydi, o'quvchi doim to'liq nusxani ochadi.
+Embedding o'zgarishlari upsert()/remove() bilan kiritiladi: yangi vektorlar
+kutish buferiga tushadi, eski qator o'chirilgan deb belgilanadi, bufer
+kattalashganda indeks siqiladi (compact) va diskka qayta yoziladi.
+
+Har bir qator bilan embedding_hash kaliti (hash_key) saqlanadi - nusxa
+ochilganda bazadagi xeshi farq qiladigan (boshqa jarayonda qayta embed
+qilingan) variantlar vektori qayta o'qiladi.
+"""
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product_v2 import ProductVariant
+from app.services.tenant_cache import TenantCache
+
+# Bundan kichik indekslar ro'yxatlarga bo'linmaydi (aniq qidiruv tezroq)
+FLAT_THRESHOLD = 4096
+KMEANS_ITERATIONS = 8
+# k-means har bir markaz uchun shuncha namunada o'qitiladi
+KMEANS_SAMPLE_PER_LIST = 32
+ASSIGN_CHUNK = 16384
+# Tekshiriladigan ro'yxatlar ulushi (nprobe = nlist * ulush, kamida MIN_NPROBE)
+NPROBE_RATIO = 0.1
+MIN_NPROBE = 8
+# Siqish: kutish buferi yoki o'chirilganlar shu chegaradan oshganda
+COMPACT_MIN_CHANGES = 1024
+COMPACT_CHANGE_RATIO = 0.05
+# Hajm shu marta o'zgarsa markazlar qayta o'qitiladi
+RETRAIN_GROWTH = 2.0
+# Diskdagi nusxa bundan eski bo'lsa bazadan to'liq qayta quriladi
+SNAPSHOT_MAX_AGE_SECONDS = 24 * 3600
+VECTOR_INDEX_MAX_AGE_SECONDS = 3600
+LOAD_BATCH = 1000
+
+CURRENT_FILE = "CURRENT"
+BUILD_PREFIX = "build-"
+# Joriy bo'lmagan nusxalar shundan keyin o'chiriladi (davom etayotgan saqlashga tegmaslik uchun)
+STALE_BUILD_SECONDS = 600
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Vektorlarni birlik uzunlikka keltirish (float32)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def hash_key(embedding_hash: Optional[str]) -> int:
+    """embedding_hash ning int64 kaliti (birinchi 60 bit); xesh yo'q bo'lsa 0"""
+    return int(embedding_hash[:15], 16) if embedding_hash else 0
+
+
+def default_nlist(size: int) -> int:
+    return max(1, int(math.sqrt(size)))
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Eng katta k ta ball indekslari (kamayish tartibida)"""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if len(scores) > k:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Har bir vektor uchun eng yaqin markaz (bo'laklab - xotira uchun)"""
+    lists = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        chunk = np.asarray(vectors[start:start + ASSIGN_CHUNK])
+        lists[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return lists
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """Sferik k-means: markazlar ham birlik uzunlikda"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        lists = assign_lists(sample, centroids)
+        order = np.argsort(lists, kind="stable")
+        starts = np.searchsorted(lists[order], np.arange(nlist))
+        counts = np.bincount(lists, minlength=nlist)
+
+        sums = np.zeros_like(centroids)
+        filled = counts > 0
+        sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+        # Bo'sh qolgan markazlar tasodifiy namunalar bilan qayta ekiladi
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            sums[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class _Segment:
+    """Siqilgan (o'zgarmas) qism: qatorlar ro'yxatlar bo'yicha ketma-ket"""
+
+    __slots__ = ("ids", "vectors", "keys", "centroids", "offsets", "alive", "row_of")
+
+    def __init__(self, ids, vectors, keys, centroids=None, offsets=None):
+        self.ids = ids
+        self.vectors = vectors
+        self.keys = keys
+        self.centroids = centroids
+        self.offsets = offsets
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.row_of: Dict[int, int] = dict(zip(ids.tolist(), range(len(ids))))
+
+    def list_ids(self) -> np.ndarray:
+        """Har bir qatorning ro'yxat raqami"""
+        return np.repeat(np.arange(len(self.centroids)), np.diff(self.offsets))
+
+
+def _grouped_segment(
+    ids: np.ndarray, vectors: np.ndarray, keys: np.ndarray, centroids: np.ndarray, lists: np.ndarray
+) -> _Segment:
+    order = np.argsort(lists, kind="stable")
+    offsets = np.searchsorted(lists[order], np.arange(len(centroids) + 1))
+    return _Segment(ids[order], vectors[order], keys[order], centroids, offsets)
+
+
+class IVFIndex:
+    """
+    Bitta tenant ning vektor indeksi
+    Qidiruv qulfsiz: siqish yangi segment yaratib bitta atributni almashtiradi.
+    """
+
+    def __init__(self, segment: _Segment, dim: int, trained_size: int = 0, built_at: Optional[float] = None):
+        self._segment = segment
+        self._pending: Dict[int, np.ndarray] = {}
+        self._pending_keys: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.dim = dim
+        self.trained_size = trained_size
+        self.built_at = built_at or time.time()
+        self.dead = 0
+        self.dirty = False
+
+    @classmethod
+    def build(cls, ids: Iterable[int], vectors, nlist: Optional[int] = None, keys=None) -> "IVFIndex":
+        """keys - har bir vektorning hash_key qiymati (berilmasa 0)"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        vectors = normalize_rows(vectors)
+        keys = np.zeros(len(ids), dtype=np.int64) if keys is None else np.asarray(keys, dtype=np.int64)
+        if vectors.ndim != 2 or len(vectors) != len(ids) or len(keys) != len(ids):
+            raise ValueError("ids va vectors mos emas")
+        dim = vectors.shape[1]
+        if len(ids) < FLAT_THRESHOLD:
+            return cls(_Segment(ids, vectors, keys), dim)
+
+        centroids = train_centroids(vectors, nlist or default_nlist(len(ids)))
+        segment = _grouped_segment(ids, vectors, keys, centroids, assign_lists(vectors, centroids))
+        return cls(segment, dim, trained_size=len(ids))
+
+    def __len__(self) -> int:
+        return len(self._segment.ids) - self.dead + len(self._pending)
+
+    @property
+    def nlist(self) -> int:
+        centroids = self._segment.centroids
+        return 0 if centroids is None else len(centroids)
+
+    def default_nprobe(self) -> int:
+        return min(self.nlist, max(MIN_NPROBE, int(self.nlist * NPROBE_RATIO)))
+
+    def search(self, query, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Kosinus o'xshashligi bo'yicha eng yaqin k ta: [(variant_id, ball)]"""
+        query = normalize_rows(query)
+        if query.shape != (self.dim,):
+            raise ValueError(f"So'rov o'lchami {query.shape} != {self.dim}")
+
+        segment = self._segment
+        pending = list(self._pending.items())
+        id_parts, score_parts = [], []
+
+        if segment.centroids is None:
+            ranges = [(0, len(segment.ids))]
+        else:
+            probe = top_k(segment.centroids @ query, nprobe or self.default_nprobe())
+            offsets = segment.offsets
+            ranges = [(offsets[l], offsets[l + 1]) for l in probe]
+
+        for start, end in ranges:
+            if end <= start:
+                continue
+            scores = segment.vectors[start:end] @ query
+            alive = segment.alive[start:end]
+            if not alive.all():
+                scores = np.where(alive, scores, -np.inf)
+            best = top_k(scores, k)
+            id_parts.append(segment.ids[start:end][best])
+            score_parts.append(scores[best])
+
+        if pending:
+            pending_ids = np.fromiter((doc_id for doc_id, _ in pending), dtype=np.int64, count=len(pending))
+            id_parts.append(pending_ids)
+            score_parts.append(np.stack([vector for _, vector in pending]) @ query)
+
+        if not id_parts:
+            return []
+        ids = np.concatenate(id_parts)
+        scores = np.concatenate(score_parts)
+        return [
+            (int(ids[i]), round(float(scores[i]), 6))
+            for i in top_k(scores, k) if np.isfinite(scores[i])
+        ]
+
+    def upsert(self, doc_id: int, vector, key: int = 0) -> None:
+        """key - vektor embedding_hash ining hash_key qiymati"""
+        vector = normalize_rows(vector)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Vektor o'lchami {vector.shape} != {self.dim}")
+        with self._lock:
+            self._kill(doc_id)
+            self._pending[doc_id] = vector
+            self._pending_keys[doc_id] = key
+            self.dirty = True
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            removed = self._pending.pop(doc_id, None) is not None
+            self._pending_keys.pop(doc_id, None)
+            if self._kill(doc_id) or removed:
+                self.dirty = True
+
+    def _kill(self, doc_id: int) -> bool:
+        segment = self._segment
+        row = segment.row_of.get(doc_id)
+        if row is None or not segment.alive[row]:
+            return False
+        segment.alive[row] = False
+        self.dead += 1
+        return True
+
+    def ids(self) -> set:
+        segment = self._segment
+        alive_ids = set(segment.ids[segment.alive].tolist())
+        return alive_ids | set(self._pending)
+
+    def keys(self) -> Dict[int, int]:
+        """Tirik qatorlar: {doc_id: hash_key}"""
+        segment = self._segment
+        alive = segment.alive
+        keys = dict(zip(segment.ids[alive].tolist(), segment.keys[alive].tolist()))
+        keys.update(self._pending_keys)
+        return keys
+
+    def needs_compaction(self) -> bool:
+        changes = len(self._pending) + self.dead
+        return changes >= max(COMPACT_MIN_CHANGES, COMPACT_CHANGE_RATIO * len(self._segment.ids))
+
+    def compact(self) -> None:
+        """Kutish buferi va o'chirilganlarni segmentga birlashtirish"""
+        with self._lock:
+            segment = self._segment
+            pending = self._pending
+            if not pending and not self.dead:
+                return
+
+            alive = segment.alive
+            pending_ids = np.fromiter(pending.keys(), dtype=np.int64, count=len(pending))
+            pending_vectors = (
+                np.stack(list(pending.values())) if pending
+                else np.empty((0, self.dim), dtype=np.float32)
+            )
+            pending_keys = np.fromiter(
+                (self._pending_keys.get(doc_id, 0) for doc_id in pending), dtype=np.int64, count=len(pending)
+            )
+            ids = np.concatenate([segment.ids[alive], pending_ids])
+            vectors = np.concatenate([np.asarray(segment.vectors[alive]), pending_vectors])
+            keys = np.concatenate([segment.keys[alive], pending_keys])
+            size = len(ids)
+
+            if size < FLAT_THRESHOLD:
+                new_segment, trained_size = _Segment(ids, vectors, keys), 0
+            elif (
+                segment.centroids is None
+                or size > self.trained_size * RETRAIN_GROWTH
+                or size * RETRAIN_GROWTH < self.trained_size
+            ):
+                centroids = train_centroids(vectors, default_nlist(size))
+                new_segment = _grouped_segment(ids, vectors, keys, centroids, assign_lists(vectors, centroids))
+                trained_size = size
+            else:
+                # Mavjud markazlar saqlanadi - faqat yangi vektorlar taqsimlanadi
+                lists = np.concatenate([
+                    segment.list_ids()[alive],
+                    assign_lists(pending_vectors, segment.centroids),
+                ])
+                new_segment = _grouped_segment(ids, vectors, keys, segment.centroids, lists)
+                trained_size = self.trained_size
+
+            self._segment = new_segment
+            self._pending = {}
+            self._pending_keys = {}
+            self.dead = 0
+            self.trained_size = trained_size
+
+    def save(self, directory: str) -> None:
+        """
+        Diskka yozish: yangi build-<id> papkasiga .npy + meta.json, so'ng
+        CURRENT bitta os.replace bilan almashtiriladi (eski memmap lar ishlayveradi)
+        """
+        self.compact()
+        segment = self._segment
+        build_id = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+        build_dir = os.path.join(directory, BUILD_PREFIX + build_id)
+        os.makedirs(build_dir)
+
+        arrays = {"ids": segment.ids, "vectors": segment.vectors, "keys": segment.keys}
+        if segment.centroids is not None:
+            arrays.update(centroids=segment.centroids, offsets=segment.offsets)
+        for name, array in arrays.items():
+            np.save(os.path.join(build_dir, f"{name}.npy"), np.asarray(array))
+
+        built_at = time.time()
+        meta = {
+            "build_id": build_id,
+            "dim": self.dim,
+            "count": len(segment.ids),
+            "nlist": self.nlist,
+            "trained_size": self.trained_size,
+            "built_at": built_at,
+        }
+        with open(os.path.join(build_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        current_path = os.path.join(directory, CURRENT_FILE)
+        with open(f"{current_path}.{build_id}.tmp", "w") as f:
+            f.write(build_id)
+        os.replace(f"{current_path}.{build_id}.tmp", current_path)
+        self.built_at = built_at
+        self.dirty = False
+        _remove_stale_builds(directory, build_id)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["IVFIndex"]:
+        """CURRENT ko'rsatgan nusxani ochish (vektorlar memmap); yaroqsiz bo'lsa None"""
+        try:
+            with open(os.path.join(directory, CURRENT_FILE)) as f:
+                build_id = f.read().strip()
+            build_dir = os.path.join(directory, BUILD_PREFIX + build_id)
+            with open(os.path.join(build_dir, "meta.json")) as f:
+                meta = json.load(f)
+            if meta["build_id"] != build_id:
+                return None
+            ids = np.load(os.path.join(build_dir, "ids.npy"))
+            vectors = np.load(os.path.join(build_dir, "vectors.npy"), mmap_mode="r")
+            keys = np.load(os.path.join(build_dir, "keys.npy"))
+            centroids = offsets = None
+            if meta["nlist"]:
+                centroids = np.load(os.path.join(build_dir, "centroids.npy"))
+                offsets = np.load(os.path.join(build_dir, "offsets.npy"))
+        except (OSError, ValueError, KeyError):
+            return None
+
+        count, dim = meta["count"], meta["dim"]
+        if len(ids) != count or len(keys) != count or vectors.shape != (count, dim):
+            return None
+        if centroids is not None and (
+            centroids.shape != (meta["nlist"], dim) or len(offsets) != meta["nlist"] + 1 or offsets[-1] != count
+        ):
+            return None
+        segment = _Segment(ids, vectors, keys, centroids, offsets)
+        return cls(segment, dim, trained_size=meta["trained_size"], built_at=meta["built_at"])
+
+
+def _remove_stale_builds(directory: str, saved_id: str) -> None:
+    """Eski nusxalarni o'chirish: joriy, shu saqlangan va yaqinda boshlangan saqlashlar qoladi"""
+    keep = {BUILD_PREFIX + saved_id}
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            keep.add(BUILD_PREFIX + f.read().strip())
+    except OSError:
+        pass
+    started_before = time.time_ns() - STALE_BUILD_SECONDS * 10 ** 9
+    for name in os.listdir(directory):
+        if not name.startswith(BUILD_PREFIX) or name in keep:
+            continue
+        try:
+            started = int(name[len(BUILD_PREFIX):].split("-", 1)[0])
+        except ValueError:
+            continue
+        if started < started_before:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+class VectorIndex(TenantCache):
+    """
+    Tenant vektor indekslari reestri
+    Qurishda avval diskdagi nusxa ochiladi va bazadagi variantlar ro'yxati va
+    embedding_hash lari bilan solishtiriladi (yangi, o'chgan va qayta embed
+    qilingan variantlar joyida yangilanadi), nusxa bo'lmasa yoki juda eski
+    bo'lsa bazadan to'liq quriladi.
+    """
+
+    name = "vectors"
+
+    def __init__(self, directory: Optional[str] = None, max_age_seconds: int = VECTOR_INDEX_MAX_AGE_SECONDS):
+        super().__init__(max_age_seconds)
+        self.directory = directory or settings.VECTOR_INDEX_DIR
+        self.snapshot_loads = 0
+        self.snapshot_saves = 0
+
+    def path(self, tenant_id: int) -> str:
+        return os.path.join(self.directory, f"tenant_{tenant_id}")
+
+    def build(self, db: Session, tenant_id: int) -> Optional[IVFIndex]:
+        # Muddati o'tgan nusxadagi saqlanmagan o'zgarishlar yo'qolmasin
+        stale = self._entries.get(tenant_id)
+        if stale is not None and stale.value is not None and stale.value.dirty:
+            self.save(tenant_id, stale.value)
+
+        index = IVFIndex.load(self.path(tenant_id))
+        if index is not None and time.time() - index.built_at < SNAPSHOT_MAX_AGE_SECONDS:
+            self.snapshot_loads += 1
+            self._sync(db, tenant_id, index)
+            return index
+
+        ids, vectors, keys = self._load_vectors(db, tenant_id)
+        if not ids:
+            shutil.rmtree(self.path(tenant_id), ignore_errors=True)
+            return None
+        index = IVFIndex.build(ids, vectors, keys=keys)
+        self.save(tenant_id, index)
+        return index
+
+    def _query(self, db: Session, tenant_id: int):
+        return db.query(ProductVariant.id).filter(
+            ProductVariant.tenant_id == tenant_id,
+            ProductVariant.is_active == True,
+            ProductVariant.embedding_vector.isnot(None)
+        )
+
+    def _load_vectors(self, db: Session, tenant_id: int, only_ids: Optional[List[int]] = None):
+        query = self._query(db, tenant_id).add_columns(ProductVariant.embedding_hash, ProductVariant.embedding_vector)
+        batches = (
+            [only_ids[i:i + LOAD_BATCH] for i in range(0, len(only_ids), LOAD_BATCH)]
+            if only_ids is not None else [None]
+        )
+        ids, vectors, keys, dim = [], [], [], None
+        for batch in batches:
+            rows = query if batch is None else query.filter(ProductVariant.id.in_(batch))
+            for variant_id, embedding_hash, vector in rows.yield_per(LOAD_BATCH):
+                if not vector:
+                    continue
+                dim = dim or len(vector)
+                # Boshqa model bilan yaratilgan (o'lchami farqli) vektorlar tashlanadi
+                if len(vector) == dim:
+                    ids.append(variant_id)
+                    vectors.append(vector)
+                    keys.append(hash_key(embedding_hash))
+        return ids, vectors, keys
+
+    def _sync(self, db: Session, tenant_id: int, index: IVFIndex) -> None:
+        """Diskdagi nusxani bazadagi variantlar va ularning embedding_hash lariga moslash"""
+        db_keys = {
+            variant_id: hash_key(embedding_hash)
+            for variant_id, embedding_hash in self._query(db, tenant_id).add_columns(ProductVariant.embedding_hash)
+        }
+        index_keys = index.keys()
+        for variant_id in index_keys.keys() - db_keys.keys():
+            index.remove(variant_id)
+        # Yangi va boshqa jarayonda qayta embed qilingan variantlar
+        changed = sorted(
+            variant_id for variant_id, key in db_keys.items() if index_keys.get(variant_id) != key
+        )
+        if changed:
+            for variant_id, vector, key in zip(*self._load_vectors(db, tenant_id, changed)):
+                if len(vector) == index.dim:
+                    index.upsert(variant_id, vector, key)
+
+    def save(self, tenant_id: int, index: IVFIndex) -> None:
+        index.save(self.path(tenant_id))
+        self.snapshot_saves += 1
+
+    def search(self, db: Session, tenant_id: int, query_vector, k: int = 10) -> List[Tuple[int, float]]:
+        index = self.get(db, tenant_id)
+        if index is None:
+            return []
+        return index.search(query_vector, k)
+
+    def upsert(self, tenant_id: int, variant_id: int, vector, embedding_hash: Optional[str] = None) -> None:
+        """Embedding yangilanganda (indeks qurilmagan bo'lsa keyingi qurishda o'qiladi)"""
+        index = self.peek(tenant_id)
+        if index is None:
+            # Eskirgan nusxa bu vektorni bilmaydi - uni diskka yozmasdan tashlaymiz,
+            # keyingi qurish bazadagi xesh bo'yicha vektorni qayta o'qiydi
+            if tenant_id in self._entries:
+                self._evict(tenant_id)
+            return
+        index.upsert(variant_id, vector, hash_key(embedding_hash))
+        if index.needs_compaction():
+            self.save(tenant_id, index)
+
+    def remove(self, tenant_id: int, variant_id: int) -> None:
+        index = self.peek(tenant_id)
+        if index is not None:
+            index.remove(variant_id)
+
+    def drop(self, db: Session, tenant_id: int) -> None:
+        """Indeks va diskdagi nusxani o'chirish (keyingi qidiruvda bazadan quriladi)"""
+        self.invalidate(db, tenant_id)
+        shutil.rmtree(self.path(tenant_id), ignore_errors=True)
+
+    def flush(self, tenant_id: int) -> None:
+        """Saqlanmagan o'zgarishlarni diskka yozish"""
+        index = self.peek(tenant_id)
+        if index is not None and index.dirty:
+            self.save(tenant_id, index)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        indexes = [index for index in self.values() if index is not None]
+        stats["vectors"] = sum(len(index) for index in indexes)
+        stats["snapshot_loads"] = self.snapshot_loads
+        stats["snapshot_saves"] = self.snapshot_saves
+        return stats
+
+
+vector_index = VectorIndex()
+
+
+def get_vector_index_stats() -> Dict:
+    """Get vector index statistics."""
+    return vector_index.stats()
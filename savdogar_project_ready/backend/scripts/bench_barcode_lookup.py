@@ -0,0 +1,54 @@
+"""
+Skaner benchmark - xotiradagi shtrix-kod indeksi kechikishi.
+
+N ta variant (har birida SKU + 2 ta alias) bilan TenantBarcodeIndex quriladi,
+so'ng tasodifiy kodlar bo'yicha resolve() kechikishi (p50/p99) va
+bir oqimdagi o'tkazuvchanlik o'lchanadi. Ma'lumotlar bazasi kerak emas.
+
+    python scripts/bench_barcode_lookup.py --variants 50000 --scans 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.barcode_index import TenantBarcodeIndex, VariantSnapshot
+
+
+def build(variants: int) -> TenantBarcodeIndex:
+    index = TenantBarcodeIndex()
+    for i in range(variants):
+        sku = f"SKU-{i:06d}"
+        snapshot = VariantSnapshot(i, i // 3, sku, f"Mahsulot {i}", 1000.0 + i, 50.0, True)
+        index.add(snapshot, sku, [f"478{i:010d}", f"QR-{i}"])
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", type=int, default=50_000)
+    parser.add_argument("--scans", type=int, default=200_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build(args.variants)
+    print(f"[BENCH] variants={args.variants} codes={len(index.codes)} build={time.perf_counter() - started:.2f}s")
+
+    codes = list(index.codes)
+    scans = [random.choice(codes) for _ in range(args.scans)]
+    latencies = []
+    started = time.perf_counter()
+    for code in scans:
+        t0 = time.perf_counter()
+        index.resolve(code).to_dict()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"[scan ] p50={p50:.1f}us p99={p99:.1f}us throughput={args.scans / elapsed:,.0f} scans/s")
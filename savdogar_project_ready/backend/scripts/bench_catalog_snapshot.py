@@ -0,0 +1,102 @@
+"""
+Katalog tasviri benchmark - JSON ro'yxat va MessagePack tasvir hajmi/ochilishi.
+
+Sintetik oziq-ovqat katalogi (mahsulot, variantlar, narx darajalari)
+read_products javobi kabi JSON (xom va gzip) hamda ustunli MessagePack +
+gzip tasvir ko'rinishida kodlanadi; hajm va kassa tomonida ochish vaqti
+o'lchanadi. Ma'lumotlar bazasi kerak emas.
+
+    python scripts/bench_catalog_snapshot.py --products 20000 --repeat 5
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.catalog_snapshot import SNAPSHOT_FORMAT, decode_snapshot, encode_snapshot
+
+WORDS = ["Sut", "Non", "Choy", "Qahva", "Shakar", "Guruch", "Yog'", "Pishloq", "Kolbasa", "Sharbat"]
+BRANDS = ["Musaffo", "Nestle", "Lipton", "Coca-Cola", "Bonduelle", "Nur", "Asl", "Oila"]
+
+
+def make_catalog(rng: random.Random, count: int):
+    products, tier_id, variant_id = [], 0, 0
+    for product_id in range(1, count + 1):
+        base_price = float(rng.randint(10, 500) * 100)
+        variants = []
+        for _ in range(rng.choice([1, 1, 1, 2, 3])):
+            variant_id += 1
+            variants.append({
+                "id": variant_id, "product_id": product_id, "tenant_id": 1,
+                "sku": f"SKU-{variant_id:07d}", "price": base_price, "cost_price": base_price * 0.8,
+                "stock_quantity": float(rng.randint(0, 300)),
+                "attributes": {"weight": rng.choice(["250g", "500g", "1kg"]), "brand": rng.choice(BRANDS)},
+                "barcode_aliases": [f"478{rng.randint(10 ** 9, 10 ** 10 - 1)}"],
+                "is_active": True,
+                "price_tiers": [],
+            })
+            if rng.random() < 0.3:
+                tier_id += 1
+                variants[-1]["price_tiers"].append({
+                    "id": tier_id, "variant_id": variant_id, "tier_type": "bulk", "min_quantity": 10.0,
+                    "max_quantity": None, "price": base_price * 0.95, "customer_group": None,
+                })
+        products.append({
+            "id": product_id, "tenant_id": 1, "category_id": rng.randint(1, 40),
+            "name": f"{rng.choice(WORDS)} {rng.choice(BRANDS)} {product_id}",
+            "description": None, "type": "simple", "base_price": base_price,
+            "cost_price": base_price * 0.8, "tax_rate": 12.0, "metadata": {},
+            "is_active": True, "variants": variants,
+        })
+    return products
+
+
+def columnar(rows, columns):
+    return {column: [row[column] for row in rows] for column in columns}
+
+
+def to_snapshot(products):
+    variants = [variant for product in products for variant in product["variants"]]
+    tiers = [tier for variant in variants for tier in variant["price_tiers"]]
+    return {
+        "format": SNAPSHOT_FORMAT, "tenant_id": 1, "version": 1, "generated_at": "",
+        "products": columnar(products, ["id", "category_id", "name", "type", "base_price", "tax_rate", "is_active"]),
+        "variants": columnar(variants, ["id", "product_id", "sku", "price", "stock_quantity",
+                                        "barcode_aliases", "is_active", "attributes"]),
+        "price_tiers": columnar(tiers, ["id", "variant_id", "tier_type", "min_quantity", "max_quantity",
+                                        "price", "customer_group"]),
+    }
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    products = make_catalog(random.Random(42), args.products)
+    listing = json.dumps(products).encode()
+    listing_gz = gzip.compress(listing, compresslevel=6)
+    snapshot = encode_snapshot(to_snapshot(products))
+
+    print(f"[BENCH] products={args.products} variants={sum(len(p['variants']) for p in products)}")
+    print(f"[json      ] size={len(listing) / 1024:,.0f}KB decode={timed(lambda: json.loads(listing), args.repeat):.1f}ms")
+    print(f"[json+gzip ] size={len(listing_gz) / 1024:,.0f}KB "
+          f"decode={timed(lambda: json.loads(gzip.decompress(listing_gz)), args.repeat):.1f}ms")
+    print(f"[snapshot  ] size={len(snapshot) / 1024:,.0f}KB "
+          f"decode={timed(lambda: decode_snapshot(snapshot), args.repeat):.1f}ms")
@@ -0,0 +1,113 @@
+"""
+Parallel debt checkout benchmark - bitta mijozga bir vaqtda ko'p kassa.
+
+Ikki usul solishtiriladi:
+  legacy  - balansni o'qish, Python da ayirish, balance_after bilan yozish (avvalgi checkout)
+  atomic  - customer_ledger.post_entries (UPDATE ... RETURNING + append-only yozuv)
+
+Ishga tushirish (backend papkasidan, Postgres DATABASE_URL bilan):
+    python scripts/bench_customer_balance.py --workers 12 --sales 300
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models.tenant import Tenant
+from app.models.customer_v2 import CustomerV2, CustomerLedger, CustomerBalanceCheckpoint
+from app.services import customer_ledger
+
+DEBT = 10.0
+
+
+def setup():
+    db = SessionLocal()
+    tenant = Tenant(name="bench-ledger", config={})
+    db.add(tenant)
+    db.flush()
+    customer = CustomerV2(tenant_id=tenant.id, name="bench-customer", max_debt_allowed=1e12)
+    db.add(customer)
+    db.commit()
+    ids = (tenant.id, customer.id)
+    db.close()
+    return ids
+
+
+def teardown(tenant_id: int, customer_id: int):
+    # Qarz kitobi append-only (trigger) - bench yozuvlari trigger o'chirilgan holda tozalanadi
+    db = SessionLocal()
+    db.execute(text("ALTER TABLE customer_ledger DISABLE TRIGGER customer_ledger_append_only"))
+    db.query(CustomerBalanceCheckpoint).filter(CustomerBalanceCheckpoint.customer_id == customer_id).delete()
+    db.query(CustomerLedger).filter(CustomerLedger.customer_id == customer_id).delete()
+    db.execute(text("ALTER TABLE customer_ledger ENABLE TRIGGER customer_ledger_append_only"))
+    db.query(CustomerV2).filter(CustomerV2.id == customer_id).delete()
+    db.query(Tenant).filter(Tenant.id == tenant_id).delete()
+    db.commit()
+    db.close()
+
+
+def legacy_sale(tenant_id: int, customer_id: int) -> None:
+    db = SessionLocal()
+    try:
+        customer = db.query(CustomerV2).filter(CustomerV2.id == customer_id).first()
+        new_balance = customer.balance - DEBT
+        db.add(CustomerLedger(customer_id=customer_id, debit=DEBT, credit=0.0, balance_after=new_balance))
+        customer.balance = new_balance
+        db.commit()
+    finally:
+        db.close()
+
+
+def atomic_sale(tenant_id: int, customer_id: int) -> None:
+    db = SessionLocal()
+    try:
+        customer_ledger.post_entries(
+            db, tenant_id, [dict(customer_id=customer_id, debit=DEBT, credit=0.0)], enforce_limit=True
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(name, sale_fn, workers: int, sales: int):
+    tenant_id, customer_id = setup()
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: sale_fn(tenant_id, customer_id), range(sales)))
+        elapsed = time.perf_counter() - started
+
+        db = SessionLocal()
+        balance = db.query(CustomerV2.balance).filter(CustomerV2.id == customer_id).scalar()
+        after = [b for (b,) in db.query(CustomerLedger.balance_after).filter(
+            CustomerLedger.customer_id == customer_id
+        ).order_by(CustomerLedger.id)]
+        db.close()
+
+        expected = -DEBT * sales
+        broken = sum(1 for i, b in enumerate(after) if b != -DEBT * (i + 1))
+        print(
+            f"[{name:6}] throughput={sales / elapsed:8.1f} sales/s "
+            f"balance={balance:.0f} expected={expected:.0f} "
+            f"lost_updates={(balance - expected) / DEBT:.0f} inconsistent_balance_after={broken}"
+        )
+    finally:
+        teardown(tenant_id, customer_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=12)  # pool_size + max_overflow = 15
+    parser.add_argument("--sales", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"[BENCH] workers={args.workers} sales={args.sales}")
+    run("legacy", legacy_sale, args.workers, args.sales)
+    run("atomic", atomic_sale, args.workers, args.sales)
@@ -0,0 +1,81 @@
+"""
+Customer lookup benchmark - 200k mijozli tenantda kassa qidiruvi.
+
+Sintetik ism va telefonlar (turli yozilish: +998, 998, 8, bo'shliqli) bilan
+CustomerDirectory quriladi, so'ng telefon boshi/oxiri, to'liq raqam va ism
+so'rovlari kechikishi o'lchanadi. Ma'lumotlar bazasi kerak emas
+(balans/daraja uchun asosiy kalit so'rovi bu yerda o'lchanmaydi).
+
+    python scripts/bench_customer_lookup.py --customers 200000 --queries 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.customer_lookup import CustomerDirectory, normalize_phone
+
+FIRST = [
+    "Akmal", "Aziz", "Bekzod", "Botir", "Dilnoza", "Gulnora", "Jasur", "Kamola", "Laylo", "Madina",
+    "Nodir", "Otabek", "Rustam", "Sardor", "Sherzod", "Shoira", "Ulug'bek", "Zarina", "Азиз", "Мадина",
+]
+LAST = [
+    "Karimov", "Rahimov", "Yusupov", "Tursunov", "Aliyev", "Qodirov", "Ismoilov", "Nazarov",
+    "Saidov", "Ergashev", "Xolmatov", "Mirzayev", "Каримов", "Юсупов",
+]
+OPERATORS = ["90", "91", "93", "94", "95", "97", "98", "99", "33", "88"]
+FORMATS = [
+    lambda op, n: f"+998 {op} {n[:3]} {n[3:5]} {n[5:]}",
+    lambda op, n: f"998{op}{n}",
+    lambda op, n: f"8{op}{n}",
+    lambda op, n: f"({op}) {n[:3]}-{n[3:5]}-{n[5:]}",
+]
+
+
+def make_customer(rng: random.Random, customer_id: int):
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    if rng.random() < 0.3:
+        name += f" ({rng.choice(['do`kon', 'opt', 'bozor', 'kafe'])} {rng.randint(1, 500)})"
+    number = f"{rng.randrange(10 ** 7):07d}"
+    phone = rng.choice(FORMATS)(rng.choice(OPERATORS), number) if rng.random() < 0.95 else None
+    return customer_id, name, phone
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = [make_customer(rng, i) for i in range(args.customers)]
+
+    started = time.perf_counter()
+    directory = CustomerDirectory(rows)
+    print(f"[BENCH] customers={args.customers} phones={len(directory.phones)} "
+          f"build={time.perf_counter() - started:.2f}s")
+
+    with_phone = [(i, normalize_phone(phone)) for i, _, phone in rows if phone]
+    kinds = {
+        "exact": lambda: (lambda i, p: (f"+998 {p}", i))(*rng.choice(with_phone)),
+        "prefix": lambda: (lambda i, p: (p[:5], None))(*rng.choice(with_phone)),
+        "suffix": lambda: (lambda i, p: (p[-7:], i))(*rng.choice(with_phone)),
+        "name": lambda: (lambda i, name, _: (name.split()[-1][:6], None))(*rng.choice(rows)),
+    }
+    for kind, make_query in kinds.items():
+        queries = [make_query() for _ in range(args.queries)]
+        latencies = []
+        hits = 0
+        for query, expected in queries:
+            t0 = time.perf_counter()
+            results = directory.search(query, limit=10)
+            latencies.append(time.perf_counter() - t0)
+            hits += bool(results) and (expected is None or expected in [i for i, _, _ in results])
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"[{kind:6}] p50={p50:.3f}ms p99={p99:.3f}ms hit={hits / len(queries):.1%}")
@@ -0,0 +1,162 @@
+"""
+RFM segmentation benchmark - 1M mijoz uchun ballar, segment va CLV.
+
+Sintetik agregatlar (load_aggregates qaytaradigan massivlar) bilan score()
+vaqti o'lchanadi, so'ng eski usul - har bir mijoz uchun alohida Python
+hisob-kitobi - bilan solishtiriladi. Bu qism uchun ma'lumotlar bazasi kerak emas.
+
+--db bilan to'liq ish o'lchanadi: yangi tenant ga sintetik mijozlar va
+sotuvlar yoziladi, so'ng segment_tenant (agregat so'rovi + score + profillarni
+bo'laklab yozish) ikki marta - birinchi yozish va qayta hisoblash - ishlatiladi.
+Oxirida bench ma'lumotlari o'chiriladi.
+
+Ishga tushirish (backend papkasidan; --db uchun Postgres DATABASE_URL bilan):
+    python scripts/bench_customer_segments.py --customers 1000000
+    python scripts/bench_customer_segments.py --customers 200000 --db
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import insert
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services import customer_segments
+
+SEED_CHUNK = 10_000
+
+
+def make_aggregates(rng: np.random.Generator, n: int, now: datetime):
+    frequency = rng.geometric(0.25, size=n)
+    monetary = frequency * rng.lognormal(11, 0.8, size=n)  # so'm
+    last_days = rng.exponential(60, size=n)
+    first_days = last_days + rng.exponential(90, size=n) * (frequency > 1)
+    now64 = np.datetime64(now, "s")
+    return {
+        "ids": np.arange(n, dtype=np.int64),
+        "frequency": frequency,
+        "monetary": monetary,
+        "first": now64 - (first_days * 86400).astype("timedelta64[s]"),
+        "last": now64 - (last_days * 86400).astype("timedelta64[s]"),
+    }
+
+
+def score_loop(aggregates, now: datetime, sample: int):
+    """Mijozma-mijoz hisoblash (faqat recency/o'rtacha chek) - solishtirish uchun"""
+    results = []
+    for i in range(sample):
+        last = aggregates["last"][i].astype(datetime)
+        recency = (now - last) / timedelta(days=1)
+        results.append((recency, aggregates["monetary"][i] / aggregates["frequency"][i]))
+    return results
+
+
+def seed(db, aggregates) -> int:
+    """Agregatlarga mos tenant, mijozlar va yakunlangan sotuvlar (har xarid - bitta sotuv)"""
+    from app.models.customer_v2 import CustomerV2
+    from app.models.sale_v2 import SaleV2
+    from app.models.tenant import Tenant
+
+    tenant = Tenant(name=f"bench-segments-{int(time.time())}", config={})
+    db.add(tenant)
+    db.commit()
+
+    count = len(aggregates["ids"])
+    for start in range(0, count, SEED_CHUNK):
+        end = min(start + SEED_CHUNK, count)
+        customer_ids = db.scalars(insert(CustomerV2).returning(CustomerV2.id), [
+            {"tenant_id": tenant.id, "name": f"bench-{i}"} for i in range(start, end)
+        ]).all()
+        sales = []
+        for customer_id, i in zip(customer_ids, range(start, end)):
+            frequency = int(aggregates["frequency"][i])
+            first = aggregates["first"][i].astype(datetime)
+            last = aggregates["last"][i].astype(datetime)
+            step = (last - first) / max(frequency - 1, 1)
+            amount = float(aggregates["monetary"][i]) / frequency
+            sales.extend(
+                {"tenant_id": tenant.id, "customer_id": customer_id, "total_amount": amount,
+                 "created_at": first + step * n}
+                for n in range(frequency)
+            )
+        db.execute(insert(SaleV2), sales)
+        db.commit()
+    return tenant.id
+
+
+def cleanup(db, tenant_id: int) -> None:
+    from app.models.customer_v2 import CustomerSegmentRun, CustomerV2
+    from app.models.sale_v2 import SaleV2
+    from app.models.tenant import Tenant
+
+    for model in (SaleV2, CustomerSegmentRun, CustomerV2):
+        db.query(model).filter(model.tenant_id == tenant_id).delete(synchronize_session=False)
+    db.query(Tenant).filter(Tenant.id == tenant_id).delete(synchronize_session=False)
+    db.commit()
+
+
+def bench_db(aggregates, now: datetime) -> None:
+    """To'liq ish: agregat so'rovi, score va profillarni yozish"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        tenant_id = seed(db, aggregates)
+        print(f"[SEED] customers={len(aggregates['ids'])} sales={int(aggregates['frequency'].sum())} "
+              f"{time.perf_counter() - t0:.1f}s")
+        try:
+            for label in ("first", "rerun"):
+                t0 = time.perf_counter()
+                loaded = customer_segments.load_aggregates(db, tenant_id)
+                load = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                customer_segments.score(loaded, now)
+                scoring = time.perf_counter() - t0
+
+                chunks = []
+                t0 = time.perf_counter()
+                result = customer_segments.segment_tenant(
+                    db, tenant_id, now, on_chunk=lambda processed, total: chunks.append(processed)
+                )
+                total = time.perf_counter() - t0
+                print(f"[{label:5}] customers={result['customers']} total={total:.2f}s "
+                      f"(load={load:.2f}s score={scoring:.2f}s write~{total - load - scoring:.2f}s, "
+                      f"{len(chunks)} chunks) {result['customers'] / total:,.0f} customers/s")
+        finally:
+            cleanup(db, tenant_id)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--loop-sample", type=int, default=50_000)
+    parser.add_argument("--db", action="store_true", help="to'liq ish (yozish bilan) - Postgres kerak")
+    args = parser.parse_args()
+
+    now = datetime(2026, 6, 1)
+    aggregates = make_aggregates(np.random.default_rng(42), args.customers, now)
+
+    started = time.perf_counter()
+    scores = customer_segments.score(aggregates, now)
+    elapsed = time.perf_counter() - started
+    names, counts = np.unique(scores["segment"], return_counts=True)
+    print(f"[BENCH] customers={args.customers} score={elapsed:.2f}s")
+    print("[SEGMENTS] " + ", ".join(f"{name}={count}" for name, count in zip(names, counts)))
+    print(f"[CLV] mean={scores['clv'].mean():.0f} p90={np.quantile(scores['clv'], 0.9):.0f}")
+
+    started = time.perf_counter()
+    score_loop(aggregates, now, args.loop_sample)
+    per_customer = (time.perf_counter() - started) / args.loop_sample
+    print(f"[LOOP] {args.loop_sample} customers -> est. {per_customer * args.customers:.2f}s "
+          f"for {args.customers} (recency only, no quantiles)")
+
+    if args.db:
+        bench_db(aggregates, now)
@@ -0,0 +1,80 @@
+"""
+Embedding pipeline benchmark - lokal stub provayder bilan o'tkazuvchanlik.
+
+Stub provayder har bir so'rovga sun'iy tarmoq kechikishi qo'shadi. Avvalgi
+usul (har bir matn alohida so'rov) paketli va parallel yuborish bilan
+solishtiriladi, so'ng Zipf taqsimotli qidiruv so'rovlari uchun LRU kesh
+samaradorligi o'lchanadi. Tarmoq va ma'lumotlar bazasi kerak emas.
+
+    python scripts/bench_embedding_pipeline.py --texts 20000 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.embedding_pipeline import EmbeddingPipeline, StubEmbeddingProvider, variant_text
+
+NAMES = ["Futbolka", "Shim", "Ko'ylak", "Choy", "Qahva", "Sut", "Non", "Shakar", "Guruch", "Yog'"]
+SIZES = ["S", "M", "L", "XL", "0.5L", "1L", "1kg", "5kg"]
+COLORS = ["qora", "oq", "qizil", "ko'k", "yashil"]
+
+
+def make_texts(rng: random.Random, count: int):
+    return [
+        variant_text(f"{rng.choice(NAMES)} {i}", {"size": rng.choice(SIZES), "color": rng.choice(COLORS)})
+        for i in range(count)
+    ]
+
+
+async def measure(pipeline: EmbeddingPipeline, texts) -> float:
+    started = time.perf_counter()
+    await pipeline.embed_texts(texts)
+    return time.perf_counter() - started
+
+
+async def main(args):
+    rng = random.Random(42)
+    texts = make_texts(rng, args.texts)
+    provider = StubEmbeddingProvider(dim=args.dim, latency=args.latency)
+
+    # Avvalgi usul: har bir matn alohida so'rov (namunada o'lchanadi)
+    sample = texts[:args.sequential_sample]
+    single = EmbeddingPipeline(provider, batch_size=1, concurrency=1)
+    elapsed = await measure(single, sample)
+    print(f"[single ] texts={len(sample)} requests={single.requests} "
+          f"throughput={len(sample) / elapsed:,.0f} texts/s")
+
+    for batch_size, concurrency in [(256, 1), (256, 4), (1024, 4)]:
+        pipeline = EmbeddingPipeline(provider, batch_size=batch_size, concurrency=concurrency)
+        elapsed = await measure(pipeline, texts)
+        print(f"[batch={batch_size:<4} conc={concurrency}] texts={len(texts)} requests={pipeline.requests} "
+              f"time={elapsed:.2f}s throughput={len(texts) / elapsed:,.0f} texts/s")
+
+    # Qidiruv so'rovlari: ozchilik so'rovlar ko'p takrorlanadi
+    pipeline = EmbeddingPipeline(provider)
+    vocabulary = [f"{rng.choice(NAMES)} {rng.choice(COLORS)}" for _ in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    queries = rng.choices(vocabulary, weights=weights, k=args.queries)
+    started = time.perf_counter()
+    for query in queries:
+        await pipeline.embed_query(query)
+    elapsed = time.perf_counter() - started
+    stats = pipeline.query_cache.stats()
+    print(f"[queries] count={len(queries)} provider_requests={pipeline.requests} "
+          f"hit_rate={stats['hits'] / len(queries):.1%} avg={elapsed / len(queries) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--sequential-sample", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
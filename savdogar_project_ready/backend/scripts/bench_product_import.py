@@ -0,0 +1,106 @@
+"""
+Mahsulot importi benchmark - 100k variantli CSV faylni import qilish.
+
+Sintetik katalog (mahsulot, 1-3 variant, atributlar, ulgurji narx) CSV ga
+yoziladi; avval faqat o'qish/tekshirish (DB siz), keyin yangi tenant ga
+to'liq import (INSERT ... ON CONFLICT bo'laklari) o'lchanadi va qayta
+import (hammasi UPDATE) vaqti ko'rsatiladi.
+
+Ishga tushirish (backend papkasidan, Postgres DATABASE_URL bilan):
+    python scripts/bench_product_import.py --variants 100000
+    python scripts/bench_product_import.py --variants 100000 --parse-only
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.product_import import IMPORT_CHUNK, ProductImporter, RowParser, invalidate_catalog_caches, read_rows
+
+WORDS = ["Futbolka", "Shim", "Ko'ylak", "Kurtka", "Choy", "Qahva", "Sharbat", "Non", "Sut", "Pishloq"]
+SIZES = ["S", "M", "L", "XL"]
+COLORS = ["Red", "Blue", "Black", "White"]
+
+
+def write_csv(path: str, count: int, rng: random.Random) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "sku", "price", "cost_price", "stock_quantity", "barcode",
+                         "attr:size", "attr:color", "tier:10"])
+        written, product = 0, 0
+        while written < count:
+            product += 1
+            name = f"{rng.choice(WORDS)} {product}"
+            price = rng.randint(10, 500) * 100
+            for _ in range(min(rng.choice([1, 1, 2, 3]), count - written)):
+                written += 1
+                writer.writerow([
+                    name, f"IMP-{written:07d}", price, price * 0.7, rng.randint(0, 100),
+                    f"478{written:010d}", rng.choice(SIZES), rng.choice(COLORS),
+                    price * 0.9 if rng.random() < 0.3 else "",
+                ])
+
+
+def parse_only(path: str) -> int:
+    rows = read_rows(path, path)
+    parser = RowParser(next(rows)[1])
+    return sum(1 for number, values in rows if parser.parse(number, values))
+
+
+def import_file(path: str, tenant_id: int, chunk_size: int):
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        summary = ProductImporter(db, tenant_id, chunk_size=chunk_size).run(read_rows(path, path))
+        invalidate_catalog_caches(db, tenant_id)
+        return summary, time.perf_counter() - t0
+    finally:
+        db.close()
+
+
+def setup_tenant() -> int:
+    from app.core.database import SessionLocal
+    from app.models.tenant import Tenant
+
+    db = SessionLocal()
+    tenant = Tenant(name=f"bench-import-{int(time.time())}", config={})
+    db.add(tenant)
+    db.commit()
+    tenant_id = tenant.id
+    db.close()
+    return tenant_id
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", type=int, default=100_000)
+    parser.add_argument("--chunk", type=int, default=IMPORT_CHUNK)
+    parser.add_argument("--parse-only", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "katalog.csv")
+        write_csv(path, args.variants, random.Random(42))
+        print(f"[BENCH] variants={args.variants} file={os.path.getsize(path) / 1024 / 1024:.1f}MB chunk={args.chunk}")
+
+        t0 = time.perf_counter()
+        rows = parse_only(path)
+        seconds = time.perf_counter() - t0
+        print(f"[parse   ] rows={rows} {seconds:.2f}s ({rows / seconds:,.0f} rows/s)")
+        if args.parse_only:
+            sys.exit(0)
+
+        tenant_id = setup_tenant()
+        for label in ("insert", "update"):
+            summary, seconds = import_file(path, tenant_id, args.chunk)
+            print(f"[{label:8}] created={summary['created']} updated={summary['updated']} "
+                  f"failed={summary['failed']} {seconds:.2f}s ({summary['processed_rows'] / seconds:,.0f} rows/s)")
+        print(f"[cleanup ] tenant_id={tenant_id} (bench ma'lumotlari saqlanib qoldi)")
@@ -0,0 +1,125 @@
+"""
+Aksiyalar benchmark - 1000 ta faol qoida bilan savatchani hisoblash.
+
+Kompilyatsiya qilingan to'plam (variant/kategoriya lug'atlari) va har bir
+qator uchun barcha qoidalarni ko'rib chiqish taqqoslanadi; ikkala holda
+ham price_cart xotiradagi kontekst bilan ishlaydi. Ma'lumotlar bazasi kerak emas.
+
+    python scripts/bench_promotions.py --rules 1000 --lines 50 --carts 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, time as dtime
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.models.product_v2 import ProductV2, ProductVariant
+from app.models.promotion import PromotionType
+from app.schemas.sale_v2 import CartItem
+from app.services.cart_pricing import PricingContext, price_cart
+from app.services.price_tier_index import TenantTierIndex
+from app.services.promotion_engine import ActiveRuleSet, PromotionRule, TenantPromotions
+
+
+class FlatRuleSet(ActiveRuleSet):
+    """Taqqoslash uchun: har bir qatorda barcha qoidalar ko'riladi"""
+
+    def __init__(self, rules, now):
+        super().__init__(rules, compiled_at=now, valid_until=datetime.max)
+        self.rules = rules
+
+    def best(self, variant_id, category_id, unit_price, quantity):
+        best = None
+        for rule in self.rules:
+            if rule.variant_id is not None and rule.variant_id != variant_id:
+                continue
+            if rule.category_id is not None and rule.category_id != category_id:
+                continue
+            amount = rule.discount(unit_price, quantity)
+            if amount > 0 and (best is None or (rule.priority, amount) > (best[0].priority, best[1])):
+                best = (rule, amount)
+        return best
+
+
+def make_catalog(rng: random.Random, count: int, categories: int):
+    variants, products = {}, {}
+    for i in range(1, count + 1):
+        products[i] = ProductV2(id=i, tenant_id=1, name=f"Taom {i}", tax_rate=12.0,
+                                category_id=rng.randint(1, categories))
+        variants[i] = ProductVariant(id=i, product_id=i, tenant_id=1, sku=f"SKU-{i}",
+                                     price=float(rng.randint(10, 200) * 100), stock_quantity=1e9)
+    return variants, products
+
+
+def make_rules(rng: random.Random, count: int, variants: int, categories: int):
+    rules = []
+    for i in range(1, count + 1):
+        kind = rng.random()
+        common = {"priority": rng.randint(0, 3)}
+        if kind < 0.1:
+            # Happy hour - butun kun ochiq, shunda hammasi faol
+            common.update(daily_start=dtime(0, 0), daily_end=dtime(23, 59))
+        if kind < 0.6:
+            rules.append(PromotionRule(i, f"Variant {i}", PromotionType.PERCENT_OFF,
+                                       variant_id=rng.randint(1, variants), percent=rng.randint(5, 30), **common))
+        elif kind < 0.9:
+            rules.append(PromotionRule(i, f"{i}: 2+1", PromotionType.BUY_X_GET_Y,
+                                       variant_id=rng.randint(1, variants), buy_quantity=2, get_quantity=1, **common))
+        else:
+            rules.append(PromotionRule(i, f"Kategoriya {i}", PromotionType.PERCENT_OFF,
+                                       category_id=rng.randint(1, categories), percent=rng.randint(5, 15), **common))
+    return rules
+
+
+def run(context, carts):
+    t0 = time.perf_counter()
+    for items in carts:
+        price_cart(context, items)
+    return (time.perf_counter() - t0) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--variants", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=50)
+    parser.add_argument("--carts", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    variants, products = make_catalog(rng, args.variants, args.categories)
+    rules = make_rules(rng, args.rules, args.variants, args.categories)
+    carts = [
+        [CartItem(variant_id=rng.randint(1, args.variants), quantity=rng.randint(1, 6)) for _ in range(args.lines)]
+        for _ in range(args.carts)
+    ]
+
+    now = datetime.utcnow().replace(hour=12)
+    promotions = TenantPromotions(rules)
+    t0 = time.perf_counter()
+    compiled = promotions.active(now)
+    compile_ms = (time.perf_counter() - t0) * 1000
+
+    def context(rule_set):
+        return PricingContext(tenant=None, customer=None, variants=variants, products=products,
+                              tier_index=TenantTierIndex(1, []), priced_at=now, promotions=rule_set)
+
+    baseline = run(context(None), carts)
+    flat = run(context(FlatRuleSet(rules, now)), carts)
+    fast = run(context(compiled), carts)
+
+    sample = carts[0]
+    assert price_cart(context(compiled), sample).discount_amount == price_cart(
+        context(FlatRuleSet(rules, now)), sample).discount_amount
+
+    total_lines = args.carts * args.lines
+    print(f"[BENCH] rules={args.rules} active={compiled.rule_count} carts={args.carts} lines/cart={args.lines}")
+    print(f"[compile ] {compile_ms:.2f}ms")
+    for name, ms in (("no promo", baseline), ("flat scan", flat), ("compiled", fast)):
+        print(f"[{name:9}] {ms:8.1f}ms total  {ms / args.carts * 1000:8.1f}us/cart  "
+              f"{ms / total_lines * 1000:6.2f}us/line")
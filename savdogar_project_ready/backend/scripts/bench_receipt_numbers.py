@@ -0,0 +1,115 @@
+"""
+Chek raqamlari benchmark - N ta parallel worker, bitta tenant/filial.
+
+Ikki usul solishtiriladi:
+  row    - har bir sotuv hisoblagich qatorini o'z tranzaksiyasida +1 qiladi
+           (qator checkout tugaguncha qulflangan bo'ladi)
+  hilo   - har bir worker ReceiptNumberAllocator bilan blok oladi
+
+Har bir "checkout" --work-ms millisekund davom etadi (boshqa yozuvlar
+taqlidi), shu vaqt ichida row usulida qator qulfi ushlab turiladi.
+
+Ishga tushirish (backend papkasidan, Postgres DATABASE_URL bilan):
+    python scripts/bench_receipt_numbers.py --workers 12 --sales 2000 --block 100
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.core.database import SessionLocal
+from app.models.tenant import Tenant
+from app.models.sale_v2 import ReceiptCounter
+from app.services.receipt_numbers import ReceiptNumberAllocator
+
+
+def setup() -> int:
+    db = SessionLocal()
+    tenant = Tenant(name="bench-receipts", config={})
+    db.add(tenant)
+    db.flush()
+    db.add(ReceiptCounter(tenant_id=tenant.id, branch_id=0, next_value=1))
+    db.commit()
+    tenant_id = tenant.id
+    db.close()
+    return tenant_id
+
+
+def teardown(tenant_id: int):
+    db = SessionLocal()
+    db.query(ReceiptCounter).filter(ReceiptCounter.tenant_id == tenant_id).delete()
+    db.query(Tenant).filter(Tenant.id == tenant_id).delete()
+    db.commit()
+    db.close()
+
+
+def row_sale(tenant_id: int, work_seconds: float) -> int:
+    db = SessionLocal()
+    try:
+        number = db.execute(text("""
+            UPDATE receipt_counters SET next_value = next_value + 1
+            WHERE tenant_id = :tenant_id AND branch_id = 0
+            RETURNING next_value - 1
+        """), {"tenant_id": tenant_id}).scalar()
+        time.sleep(work_seconds)
+        db.commit()
+        return number
+    finally:
+        db.close()
+
+
+def hilo_sale(allocator: ReceiptNumberAllocator, tenant_id: int, work_seconds: float) -> int:
+    db = SessionLocal()
+    try:
+        number = allocator.next_number(db, tenant_id)
+        time.sleep(work_seconds)
+        db.commit()
+        return int(number)
+    finally:
+        db.close()
+
+
+def run(name, workers: int, sales: int, work_seconds: float, block_size: int):
+    tenant_id = setup()
+    # Har bir worker alohida jarayonni taqlid qiladi - o'z alokatori bilan
+    allocators = [ReceiptNumberAllocator(block_size=block_size) for _ in range(workers)]
+    try:
+        def sale(i: int) -> int:
+            if name == "row":
+                return row_sale(tenant_id, work_seconds)
+            return hilo_sale(allocators[i % workers], tenant_id, work_seconds)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            numbers = list(pool.map(sale, range(sales)))
+        elapsed = time.perf_counter() - started
+
+        duplicates = len(numbers) - len(set(numbers))
+        gaps = max(numbers) - len(numbers)
+        reserved = sum(a.blocks_reserved for a in allocators)
+        print(
+            f"[{name:4}] allocations/s={sales / elapsed:9.1f} "
+            f"elapsed={elapsed:6.2f}s duplicates={duplicates} "
+            f"gaps={gaps} counter_updates={sales if name == 'row' else reserved}"
+        )
+    finally:
+        teardown(tenant_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=12)  # pool_size + max_overflow = 15
+    parser.add_argument("--sales", type=int, default=2000)
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    parser.add_argument("--block", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"[BENCH] workers={args.workers} sales={args.sales} work_ms={args.work_ms} block={args.block}")
+    run("row", args.workers, args.sales, args.work_ms / 1000, args.block)
+    run("hilo", args.workers, args.sales, args.work_ms / 1000, args.block)
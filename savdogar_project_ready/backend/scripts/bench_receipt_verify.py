@@ -0,0 +1,63 @@
+"""
+Chek tekshirish benchmark - 1M sotuvli tarix.
+
+Ikki usul solishtiriladi:
+  scan    - avvalgi /verify: har bir sotuv uchun receipt_id ni qayta hisoblash
+            (bu yerda faqat hisoblash; 1M ORM qatorini o'qish vaqti qo'shilmagan)
+  decode  - parse_receipt_id (HMAC) + primary key bo'yicha qidirish (dict taqlidi)
+
+Ma'lumotlar bazasi kerak emas:
+    python scripts/bench_receipt_verify.py --sales 1000000 --lookups 200
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.qr_service import generate_receipt_id, parse_receipt_id
+
+
+def legacy_receipt_id(sale_id: int) -> str:
+    hash_str = hashlib.md5(f"SALE_{sale_id}".encode()).hexdigest()[:8].upper()
+    return f"REC-{sale_id}-{hash_str}"
+
+
+def scan(sale_ids, receipt_id: str):
+    for sale_id in sale_ids:
+        if legacy_receipt_id(sale_id) == receipt_id:
+            return sale_id
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sales", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--scan-lookups", type=int, default=3)
+    args = parser.parse_args()
+
+    sale_ids = range(1, args.sales + 1)
+    primary_key = dict.fromkeys(sale_ids, True)
+    targets = [random.randint(1, args.sales) for _ in range(args.lookups)]
+    print(f"[BENCH] sales={args.sales} lookups={args.lookups}")
+
+    # Avvalgi usul juda sekin - bir necha so'rov yetarli
+    started = time.perf_counter()
+    for sale_id in targets[:args.scan_lookups]:
+        assert scan(sale_ids, legacy_receipt_id(sale_id)) == sale_id
+    per_scan = (time.perf_counter() - started) / args.scan_lookups
+    print(f"[scan  ] {per_scan * 1000:10.2f} ms/verify  {1 / per_scan:10.1f} verify/s")
+
+    receipt_ids = [generate_receipt_id(sale_id) for sale_id in targets]
+    started = time.perf_counter()
+    for receipt_id in receipt_ids:
+        sale_id = parse_receipt_id(receipt_id)
+        assert sale_id in primary_key
+    per_decode = (time.perf_counter() - started) / args.lookups
+    print(f"[decode] {per_decode * 1000:10.4f} ms/verify  {1 / per_decode:10.1f} verify/s")
+    print(f"[BENCH] speedup x{per_scan / per_decode:,.0f}")
@@ -0,0 +1,82 @@
+"""
+Typeahead benchmark - 100k mahsulotli katalogda trigram qidiruv.
+
+Sintetik nomlar (o'zbek/rus so'zlari, lotin va kirill) bilan NgramIndex
+quriladi, so'ng qisqa, to'liq va xatoli so'rovlar kechikishi o'lchanadi.
+Ma'lumotlar bazasi kerak emas.
+
+    python scripts/bench_search_index.py --products 100000 --queries 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.search_index import NgramIndex
+
+WORDS = [
+    "non", "patir", "choy", "qora", "kok", "shakar", "guruch", "un", "yog", "sut", "qatiq",
+    "pishloq", "kolbasa", "tuxum", "olma", "anor", "uzum", "kartoshka", "piyoz", "sabzi",
+    "coca", "cola", "pepsi", "fanta", "sprite", "nescafe", "gold", "alpen", "snickers",
+    "чай", "сахар", "молоко", "хлеб", "масло", "сыр", "колбаса", "яйца", "кофе", "рис",
+]
+SIZES = ["0.5L", "1L", "1.5L", "2L", "100g", "250g", "500g", "1kg", "5kg"]
+SYLLABLES = ["ba", "ka", "lo", "mi", "nu", "ro", "sa", "ti", "zo", "gul", "dor", "mon", "tex", "var", "kon"]
+
+
+def make_vocabulary(rng: random.Random, size: int):
+    """Brend va model nomlari - real katalogdagi kabi ko'p xil so'zlar"""
+    brands = {"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(size)}
+    return sorted(brands)
+
+
+def make_name(rng: random.Random, brands) -> str:
+    words = rng.sample(WORDS, rng.randint(1, 2)) + [rng.choice(brands)]
+    return " ".join(words + [rng.choice(SIZES), f"#{rng.randint(1, 9999)}"])
+
+
+def typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--brands", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    brands = make_vocabulary(rng, args.brands)
+    names = [(i, make_name(rng, brands)) for i in range(args.products)]
+
+    started = time.perf_counter()
+    index = NgramIndex(names)
+    print(f"[BENCH] products={args.products} grams={len(index.postings)} build={time.perf_counter() - started:.2f}s")
+
+    # (so'rov, natija nomida bo'lishi kerak bo'lgan so'z)
+    kinds = {
+        "prefix": lambda words: (words[-3][:4], words[-3][:4]),
+        "full": lambda words: (" ".join(words[-3:-1]), words[-3]),
+        "typo": lambda words: (typo(words[-3], rng), words[-3]),
+    }
+    for kind, make_query in kinds.items():
+        queries = [make_query(rng.choice(names)[1].split()) for _ in range(args.queries)]
+        latencies = []
+        hits = 0
+        for query, expected in queries:
+            t0 = time.perf_counter()
+            results = index.search(query, limit=10)
+            latencies.append(time.perf_counter() - t0)
+            hits += bool(results) and expected in index.names[results[0][0]]
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"[{kind:6}] p50={p50:.2f}ms p99={p99:.2f}ms top1_hit={hits / len(queries):.1%}")
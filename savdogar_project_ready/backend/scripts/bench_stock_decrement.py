@@ -0,0 +1,116 @@
+"""
+Parallel checkout benchmark - bitta SKU ga bir vaqtda ko'p kassa.
+
+Ikki usul solishtiriladi:
+  legacy  - variantni o'qish, Python da ayirish, flush (avvalgi checkout)
+  atomic  - stock_service.decrement_stock (UPDATE ... RETURNING)
+
+Ishga tushirish (backend papkasidan, Postgres DATABASE_URL bilan):
+    python scripts/bench_stock_decrement.py --workers 12 --sales 200
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.core.database import SessionLocal
+from app.models.tenant import Tenant
+from app.models.product_v2 import ProductV2, ProductVariant
+from app.services import stock_service
+
+
+def setup(initial_stock: float):
+    db = SessionLocal()
+    tenant = Tenant(name="bench-stock", config={})
+    db.add(tenant)
+    db.flush()
+    product = ProductV2(tenant_id=tenant.id, name="bench-product", recipe={})
+    db.add(product)
+    db.flush()
+    variant = ProductVariant(
+        product_id=product.id,
+        tenant_id=tenant.id,
+        sku=f"BENCH-{int(time.time() * 1000)}",
+        price=1000.0,
+        stock_quantity=initial_stock,
+    )
+    db.add(variant)
+    db.commit()
+    ids = (tenant.id, product.id, variant.id)
+    db.close()
+    return ids
+
+
+def teardown(tenant_id: int, product_id: int, variant_id: int):
+    db = SessionLocal()
+    db.query(ProductVariant).filter(ProductVariant.id == variant_id).delete()
+    db.query(ProductV2).filter(ProductV2.id == product_id).delete()
+    db.query(Tenant).filter(Tenant.id == tenant_id).delete()
+    db.commit()
+    db.close()
+
+
+def legacy_sale(tenant_id: int, variant_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        variant = db.query(ProductVariant).filter(ProductVariant.id == variant_id).first()
+        if variant.stock_quantity < 1:
+            return False
+        variant.stock_quantity -= 1
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def atomic_sale(tenant_id: int, variant_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        failed = stock_service.decrement_stock(db, tenant_id, {variant_id: 1.0})
+        if failed:
+            db.rollback()
+            return False
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def run(name, sale_fn, workers: int, sales: int, initial_stock: float):
+    tenant_id, product_id, variant_id = setup(initial_stock)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda _: sale_fn(tenant_id, variant_id), range(sales)))
+        elapsed = time.perf_counter() - started
+
+        db = SessionLocal()
+        final_stock = db.query(ProductVariant.stock_quantity).filter(ProductVariant.id == variant_id).scalar()
+        db.close()
+
+        succeeded = sum(results)
+        expected = initial_stock - succeeded
+        print(
+            f"[{name:6}] sales={succeeded}/{sales} "
+            f"throughput={sales / elapsed:8.1f} sales/s "
+            f"final_stock={final_stock:.0f} expected={expected:.0f} "
+            f"lost_updates={final_stock - expected:.0f} oversold={max(0.0, -final_stock):.0f}"
+        )
+    finally:
+        teardown(tenant_id, product_id, variant_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=12)  # pool_size + max_overflow = 15
+    parser.add_argument("--sales", type=int, default=200)
+    parser.add_argument("--stock", type=float, default=150.0)
+    args = parser.parse_args()
+
+    print(f"[BENCH] workers={args.workers} sales={args.sales} initial_stock={args.stock}")
+    run("legacy", legacy_sale, args.workers, args.sales, args.stock)
+    run("atomic", atomic_sale, args.workers, args.sales, args.stock)
@@ -0,0 +1,92 @@
+"""
+Semantik qidiruv benchmark - IVF indeks va aniq (brute-force) qidiruv.
+
+Sintetik klasterlangan embeddinglar (real matn embeddinglari kabi mavzular
+atrofida to'plangan) bilan IVFIndex quriladi, so'ng har bir so'rov uchun
+recall@k (aniq natija bilan kesishma) va kechikish (p50/p99) turli nprobe
+qiymatlarida o'lchanadi. Ma'lumotlar bazasi kerak emas.
+
+    python scripts/bench_vector_index.py --vectors 50000 500000 --dim 256
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.services.vector_index import IVFIndex, normalize_rows, top_k
+
+
+def make_vectors(rng, count: int, dim: int, topics: int) -> np.ndarray:
+    centers = rng.standard_normal((topics, dim), dtype=np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 50_000):
+        size = min(50_000, count - start)
+        noise = rng.standard_normal((size, dim), dtype=np.float32)
+        vectors[start:start + size] = centers[rng.integers(0, topics, size)] + 0.6 * noise
+    return vectors
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def bench(count: int, args) -> None:
+    rng = np.random.default_rng(42)
+    topics = max(16, count // 500)
+    vectors = make_vectors(rng, count, args.dim, topics)
+    queries = normalize_rows(make_vectors(rng, args.queries, args.dim, topics))
+
+    started = time.perf_counter()
+    index = IVFIndex.build(range(count), vectors)
+    build = time.perf_counter() - started
+    normalized = normalize_rows(vectors)
+    del vectors
+
+    # Aniq natija va brute-force kechikishi
+    exact, latencies = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        exact.append(set(top_k(normalized @ query, args.k).tolist()))
+        latencies.append(time.perf_counter() - t0)
+    p50, p99 = percentiles(latencies)
+    print(f"[BENCH] vectors={count} dim={args.dim} nlist={index.nlist} build={build:.1f}s")
+    print(f"[brute     ] p50={p50:.2f}ms p99={p99:.2f}ms recall@{args.k}=100.0%")
+
+    nprobes = sorted({max(1, index.default_nprobe() // 2), index.default_nprobe(), index.default_nprobe() * 2})
+    for nprobe in nprobes:
+        latencies, found = [], 0
+        for query, expected in zip(queries, exact):
+            t0 = time.perf_counter()
+            result = index.search(query, args.k, nprobe=nprobe)
+            latencies.append(time.perf_counter() - t0)
+            found += len({doc_id for doc_id, _ in result} & expected)
+        p50, p99 = percentiles(latencies)
+        print(f"[nprobe={nprobe:<4}] p50={p50:.2f}ms p99={p99:.2f}ms recall@{args.k}={found / (len(queries) * args.k):.1%}")
+
+    # Diskka yozish va memmap orqali qayta ochish
+    with tempfile.TemporaryDirectory() as directory:
+        t0 = time.perf_counter()
+        index.save(directory)
+        saved = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        IVFIndex.load(directory)
+        print(f"[snapshot  ] save={saved:.2f}s load={time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, nargs="+", default=[50_000, 500_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    for count in args.vectors:
+        bench(count, args)
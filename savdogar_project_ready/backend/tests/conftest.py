@@ -1,4 +1,6 @@
+import json
 import os
+import sqlite3
 import sys
 
 import pytest
@@ -12,8 +14,32 @@ BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if BACKEND_ROOT not in sys.path:
     sys.path.insert(0, BACKEND_ROOT)
 
+from sqlalchemy import ARRAY
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
+from sqlalchemy.dialects.sqlite.pysqlite import SQLiteDialect_pysqlite
+from sqlalchemy.ext.compiler import compiles
+
+# Postgres-only column types are stored as JSON in the SQLite test database
+@compiles(JSONB, "sqlite")
+@compiles(ARRAY, "sqlite")
+def _compile_json_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+sqlite3.register_adapter(list, json.dumps)
+
+
+# ...and read back as lists, not character sequences
+class _SQLiteArray(SQLiteJSON):
+    pass
+
+
+SQLiteDialect_pysqlite.colspecs = {**SQLiteDialect_pysqlite.colspecs, ARRAY: _SQLiteArray}
+
 from app.main import app
 from app.core.database import Base, get_db
+from app.middleware.rate_limit import _rate_limits
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -38,6 +64,8 @@ def client():
     """Create test client with fresh database."""
     Base.metadata.create_all(bind=engine)
     app.dependency_overrides[get_db] = override_get_db
+    # Each test starts with an empty rate-limit window (all requests share one client IP)
+    _rate_limits.clear()
     
     with TestClient(app) as c:
         yield c
@@ -72,3 +100,53 @@ def auth_headers(client):
     )
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def make_tenant(client, auth_headers):
+    """Factory: create a tenant and move testuser into it (auth_headers requests act on it)."""
+    from app.models import Tenant, User
+
+    def make(name="Test Tenant", **fields):
+        db = TestingSessionLocal()
+        tenant = Tenant(name=name, **{"config": {}, **fields})
+        db.add(tenant)
+        db.flush()
+        db.query(User).filter(User.username == "testuser").update({"tenant_id": tenant.id})
+        db.commit()
+        db.refresh(tenant)
+        db.close()
+        return tenant
+
+    return make
+
+
+@pytest.fixture
+def tenant(make_tenant):
+    """Default tenant of the test user."""
+    return make_tenant()
+
+
+@pytest.fixture
+def make_variant(client):
+    """Factory: create a variant, with its own product unless product_id is given.
+
+    product - extra ProductV2 fields for the new product (name defaults to the SKU).
+    """
+    from app.models import ProductV2, ProductVariant
+
+    def make(tenant_id, sku, product_id=None, product=None, **fields):
+        db = TestingSessionLocal()
+        if product_id is None:
+            parent = ProductV2(tenant_id=tenant_id, **{"name": sku, "recipe": {}, **(product or {})})
+            db.add(parent)
+            db.flush()
+            product_id = parent.id
+        variant = ProductVariant(tenant_id=tenant_id, product_id=product_id, sku=sku, **{"price": 100.0, **fields})
+        db.add(variant)
+        db.commit()
+        db.refresh(variant)
+        db.close()
+        return variant
+
+    return make
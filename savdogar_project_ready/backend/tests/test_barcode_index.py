@@ -0,0 +1,44 @@
+"""Barcode index tests."""
+from conftest import TestingSessionLocal
+from app.services.barcode_index import BarcodeIndex, barcode_index
+
+
+def test_scan_resolves_sku_and_aliases(client, auth_headers, tenant, make_variant):
+    """SKU va barcha alias lar bitta variantga, sotuvdan keyin qoldiq yangilanadi."""
+    barcode_index.clear()
+    tenant_id = tenant.id
+    variant_id = make_variant(
+        tenant_id, "SUV-1", price=3000.0, stock_quantity=10.0, barcode_aliases=["4780000000017", "SUV-QR"]
+    ).id
+
+    for code in ["SUV-1", "4780000000017", "SUV-QR"]:
+        response = client.get(f"/api/v1/v2/products/barcode/{code}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["variant_id"] == variant_id
+    assert barcode_index.rebuilds == barcode_index.misses
+
+    barcode_index.apply_stock_changes(tenant_id, {variant_id: -4.0})
+    response = client.get("/api/v1/v2/products/barcode/SUV-1", headers=auth_headers)
+    assert response.json()["stock_quantity"] == 6.0
+
+    response = client.get("/api/v1/v2/products/barcode/NOPE", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_scan_sees_variants_added_by_another_worker(client, auth_headers, tenant, make_variant):
+    """Boshqa worker qo'shgan variant uning invalidate() i orqali bu jarayonda ham topiladi."""
+    barcode_index.clear()
+    make_variant(tenant.id, "NON-1")
+    assert client.get("/api/v1/v2/products/barcode/NON-1", headers=auth_headers).status_code == 200
+
+    variant_id = make_variant(tenant.id, "NON-2", barcode_aliases=["4780000000024"]).id
+    assert client.get("/api/v1/v2/products/barcode/4780000000024", headers=auth_headers).status_code == 404
+
+    db = TestingSessionLocal()
+    try:
+        BarcodeIndex().invalidate(db, tenant.id)
+    finally:
+        db.close()
+    response = client.get("/api/v1/v2/products/barcode/4780000000024", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["variant_id"] == variant_id
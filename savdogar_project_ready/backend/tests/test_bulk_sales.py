@@ -0,0 +1,96 @@
+"""Offline bulk sales upload tests."""
+from datetime import datetime, timedelta
+
+from conftest import TestingSessionLocal
+from app.models import CustomerV2, Promotion, PromotionType
+from app.models.sale_v2 import SaleV2
+from app.services import stock_service
+from app.services.promotion_engine import promotion_engine
+
+
+def _sale(key, variant_id, qty):
+    return {
+        "idempotency_key": key,
+        "items": [{"variant_id": variant_id, "quantity": qty}],
+        "payment_method": "cash",
+        "sold_at": "2026-01-05T10:00:00",
+    }
+
+
+def test_bulk_upload_is_idempotent(client, auth_headers, tenant, make_variant):
+    """Qayta yuborilgan to'plam sotuvni takrorlamaydi va omborni qayta kamaytirmaydi."""
+    tenant_id, variant_id = tenant.id, make_variant(tenant.id, "NON-1", stock_quantity=5.0).id
+    payload = {"sales": [_sale("t1-1", variant_id, 2), _sale("t1-2", variant_id, 4), _sale("t1-1", variant_id, 2)]}
+
+    response = client.post("/api/v1/v2/sales/bulk", json=payload, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["duplicates"], body["failed"]) == (1, 1, 1)
+    assert [r["status"] for r in body["results"]] == ["created", "failed", "duplicate"]
+    sale_id = body["results"][0]["sale_id"]
+
+    response = client.post("/api/v1/v2/sales/bulk", json=payload, headers=auth_headers)
+    body = response.json()
+    assert body["created"] == 0
+    assert body["results"][0] == {"idempotency_key": "t1-1", "status": "duplicate", "sale_id": sale_id, "error": None}
+
+    db = TestingSessionLocal()
+    try:
+        assert stock_service.get_stock_levels(db, tenant_id, [variant_id]) == {variant_id: 3.0}
+        sales = db.query(SaleV2).filter(SaleV2.tenant_id == tenant_id).all()
+        assert len(sales) == 1
+        assert sales[0].created_at.year == 2026
+    finally:
+        db.close()
+
+
+def test_stock_rejected_sale_does_not_consume_debt_limit(client, auth_headers, tenant, make_variant):
+    """Ombor yetmagan qarz sotuvi keyingi qarz sotuvining limitini band qilmaydi."""
+    tenant_id, variant_id = tenant.id, make_variant(tenant.id, "NON-1", stock_quantity=4.0).id
+    db = TestingSessionLocal()
+    customer = CustomerV2(tenant_id=tenant_id, name="Nasiya", max_debt_allowed=300.0)
+    db.add(customer)
+    db.commit()
+    customer_id = customer.id
+    db.close()
+
+    def debt_sale(key, qty):
+        return {**_sale(key, variant_id, qty), "payment_method": "debt", "customer_id": customer_id}
+
+    payload = {"sales": [_sale("t2-1", variant_id, 2), debt_sale("t2-2", 3), debt_sale("t2-3", 2)]}
+    response = client.post("/api/v1/v2/sales/bulk", json=payload, headers=auth_headers)
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["created", "failed", "created"]
+
+    db = TestingSessionLocal()
+    try:
+        assert db.get(CustomerV2, customer_id).balance == -200.0
+    finally:
+        db.close()
+
+
+def test_offline_sales_priced_at_sold_at(client, auth_headers, tenant, make_variant):
+    """Tugagan aksiya uning oynasida sotilgan offline sotuvga qo'llanadi, keyingisiga emas."""
+    promotion_engine.clear()
+    tenant_id, variant_id = tenant.id, make_variant(tenant.id, "NON-1", stock_quantity=10.0).id
+    now = datetime.utcnow().replace(microsecond=0)
+    db = TestingSessionLocal()
+    db.add(Promotion(
+        tenant_id=tenant_id, name="Kechagi aksiya", promo_type=PromotionType.PERCENT_OFF, percent=10,
+        starts_at=now - timedelta(days=2), ends_at=now - timedelta(days=1), is_active=True,
+    ))
+    db.commit()
+    db.close()
+
+    during = {**_sale("t3-1", variant_id, 1), "sold_at": (now - timedelta(days=1, hours=12)).isoformat()}
+    after = {**_sale("t3-2", variant_id, 1), "sold_at": (now - timedelta(hours=12)).isoformat()}
+    response = client.post("/api/v1/v2/sales/bulk", json={"sales": [during, after]}, headers=auth_headers)
+    assert response.status_code == 200
+    sale_ids = [r["sale_id"] for r in response.json()["results"]]
+
+    db = TestingSessionLocal()
+    try:
+        assert [db.get(SaleV2, sale_id).total_amount for sale_id in sale_ids] == [90.0, 100.0]
+    finally:
+        db.close()
+        promotion_engine.clear()
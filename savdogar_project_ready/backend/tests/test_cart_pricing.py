@@ -0,0 +1,101 @@
+"""Cart pricing engine tests."""
+import pytest
+from sqlalchemy import event
+
+from conftest import TestingSessionLocal, engine
+from app.api.v1.endpoints.sales_v2 import calculate_cart_total
+from app.models import BusinessType, PriceTier, PriceTierType
+from app.models import CustomerV2, CustomerTier
+from app.schemas.sale_v2 import CartItem
+from app.services.price_tier_index import price_tier_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_tier_index():
+    """Har bir test o'z bazasiga ega - indeks ham toza bo'lishi kerak."""
+    price_tier_index.clear()
+    yield
+    price_tier_index.clear()
+
+
+def _seed_catalog(db, tenant_id, make_variant, count=60):
+    variant_ids = []
+    for i in range(count):
+        variant = make_variant(
+            tenant_id, f"SKU-{i}", product={"name": f"Product {i}", "tax_rate": 12.0},
+            price=1000.0, cost_price=500.0, stock_quantity=1000.0,
+        )
+        db.add_all([
+            PriceTier(variant_id=variant.id, tenant_id=tenant_id, tier_type=PriceTierType.BULK,
+                      min_quantity=10, price=900.0),
+            PriceTier(variant_id=variant.id, tenant_id=tenant_id, tier_type=PriceTierType.BULK,
+                      min_quantity=50, price=800.0),
+            PriceTier(variant_id=variant.id, tenant_id=tenant_id, tier_type=PriceTierType.VIP,
+                      min_quantity=1, price=950.0, customer_group="vip"),
+        ])
+        variant_ids.append(variant.id)
+
+    customer = CustomerV2(tenant_id=tenant_id, name="Opt mijoz", price_tier=CustomerTier.WHOLESALER)
+    db.add(customer)
+    db.commit()
+    return customer.id, variant_ids
+
+
+def _count_queries(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return result, len(statements)
+
+
+def test_cart_query_count_is_constant(client, make_tenant, make_variant):
+    """Savatcha so'rovlari soni qatorlar soniga bog'liq emas."""
+    tenant_id = make_tenant(business_type=BusinessType.WHOLESALE).id
+    db = TestingSessionLocal()
+    try:
+        customer_id, variant_ids = _seed_catalog(db, tenant_id, make_variant)
+
+        def price(n):
+            db.expire_all()
+            items = [CartItem(variant_id=v, quantity=5) for v in variant_ids[:n]]
+            return calculate_cart_total(db, tenant_id, items, customer_id=customer_id)
+
+        price(1)  # narx indeksini qizdirish
+        _, small = _count_queries(lambda: price(2))
+        _, large = _count_queries(lambda: price(60))
+
+        assert small == large
+        assert large <= 3
+    finally:
+        db.close()
+
+
+def test_cart_tier_selection(client, make_tenant, make_variant):
+    """Eng katta mos min_quantity tanlanadi, mijoz guruhi hisobga olinadi."""
+    tenant_id = make_tenant(business_type=BusinessType.HORECA).id
+    db = TestingSessionLocal()
+    try:
+        customer_id, variant_ids = _seed_catalog(db, tenant_id, make_variant, count=1)
+        variant_id = variant_ids[0]
+
+        result = calculate_cart_total(db, tenant_id, [CartItem(variant_id=variant_id, quantity=60)])
+        assert result.items[0]["unit_price"] == 800.0
+
+        result = calculate_cart_total(
+            db, tenant_id, [CartItem(variant_id=variant_id, quantity=2)], customer_id=customer_id
+        )
+        # Wholesale mijozga VIP daraja mos kelmaydi
+        assert result.items[0]["unit_price"] == 1000.0
+        assert result.subtotal == 2000.0
+        assert result.tax_amount == pytest.approx(240.0)
+        assert result.service_charge == pytest.approx(200.0)
+        assert result.total == pytest.approx(2440.0)
+    finally:
+        db.close()
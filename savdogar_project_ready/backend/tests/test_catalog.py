@@ -0,0 +1,44 @@
+"""Terminal catalog listing tests."""
+
+
+def _seed(tenant_id, make_variant, count):
+    for i in range(count):
+        product = {"name": f"Mahsulot {i}", "product_metadata": {"brand": "X"}, "is_active": i != 2}
+        product_id = None
+        for j in range(2):
+            product_id = make_variant(
+                tenant_id, f"SKU-{i}-{j}", product_id=product_id, product=product,
+                attributes={"size": "L"}, embedding_vector=[0.1, 0.2],
+            ).product_id
+
+
+def test_catalog_pages_and_projection(client, auth_headers, tenant, make_variant):
+    """Keyset sahifalar faol mahsulotlarni qaytaradi, og'ir maydonlar so'ralmasa yo'q."""
+    _seed(tenant.id, make_variant, 5)
+
+    names, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/v1/v2/products/catalog", params=params, headers=auth_headers).json()
+        for product in page["items"]:
+            assert "metadata" not in product
+            assert len(product["variants"]) == 2
+            assert "attributes" not in product["variants"][0]
+            assert "embedding_vector" not in product["variants"][0]
+        names.extend(product["name"] for product in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert names == ["Mahsulot 0", "Mahsulot 1", "Mahsulot 3", "Mahsulot 4"]
+
+    page = client.get(
+        "/api/v1/v2/products/catalog", params={"include": "metadata,attributes"}, headers=auth_headers
+    ).json()
+    assert page["items"][0]["metadata"] == {"brand": "X"}
+    assert page["items"][0]["variants"][0]["attributes"] == {"size": "L"}
+
+    response = client.get("/api/v1/v2/products/catalog", params={"include": "recipe"}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,40 @@
+"""Binary catalog snapshot tests."""
+from conftest import TestingSessionLocal
+from app.core.config import settings
+from app.models import PriceTier
+from app.services.catalog_snapshot import decode_snapshot
+
+
+def test_snapshot_download_resumes_with_range(client, auth_headers, tmp_path, monkeypatch, tenant, make_variant):
+    """Tasvir ustunli kodlanadi, Range bilan qismlab yuklanadi, ETag bilan 304."""
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT_DIR", str(tmp_path))
+    variant = make_variant(tenant.id, "NON-1", product={"name": "Non", "base_price": 4000}, price=4000,
+                           barcode_aliases=["4780001"], attributes={"weight": "500g"})
+    db = TestingSessionLocal()
+    db.add(PriceTier(tenant_id=tenant.id, variant_id=variant.id, min_quantity=10, price=3800))
+    db.commit()
+    db.close()
+
+    response = client.get("/api/v1/v2/products/snapshot", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    full = response.content
+    snapshot = decode_snapshot(full)
+    assert snapshot["products"]["name"] == ["Non"]
+    assert snapshot["variants"]["barcode_aliases"] == [["4780001"]]
+    assert snapshot["price_tiers"]["tier_type"] == ["retail"]
+    assert snapshot["version"] == int(response.headers["x-catalog-version"])
+
+    # Uzilgan yuklab olishni davom ettirish
+    etag = response.headers["etag"]
+    head = client.get("/api/v1/v2/products/snapshot", headers={**auth_headers, "Range": "bytes=0-9"})
+    assert head.status_code == 206
+    tail = client.get(
+        "/api/v1/v2/products/snapshot",
+        headers={**auth_headers, "Range": "bytes=10-", "If-Range": etag},
+    )
+    assert tail.status_code == 206
+    assert head.content + tail.content == full
+
+    cached = client.get("/api/v1/v2/products/snapshot", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
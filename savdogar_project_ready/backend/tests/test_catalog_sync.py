@@ -0,0 +1,73 @@
+"""Delta catalog sync tests."""
+from conftest import TestingSessionLocal
+from app.services import catalog_sync
+
+
+def _create_product(tenant_id, make_variant, name):
+    """Mahsulot + variant, create_product kabi bitta versiyada"""
+    variant = make_variant(tenant_id, f"{name}-001", product={"name": name, "base_price": 5000}, price=5000)
+    db = TestingSessionLocal()
+    catalog_sync.record_changes(db, tenant_id, [
+        (catalog_sync.PRODUCT, variant.product_id, False),
+        (catalog_sync.VARIANT, variant.id, False),
+    ])
+    db.commit()
+    db.close()
+    return variant.product_id, variant.id
+
+
+def test_changes_feed_returns_only_deltas(client, auth_headers, tenant, make_variant):
+    """Kassa faqat o'zgarishlarni oladi, o'zgarish bo'lmasa 304."""
+    tenant_id = tenant.id
+    version = client.get("/api/v1/v2/products/catalog", headers=auth_headers).json()["version"]
+    product_id, variant_id = _create_product(tenant_id, make_variant, "Choy")
+
+    response = client.get("/api/v1/v2/products/changes", params={"since": version}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["id"] for p in body["products"]] == [product_id]
+    assert [v["id"] for v in body["variants"]] == [variant_id]
+    assert body["deleted"] == {"products": [], "variants": [], "price_tiers": []}
+    version = body["version"]
+
+    # O'zgarish yo'q - ETag bilan 304
+    response = client.get("/api/v1/v2/products/changes", params={"since": version}, headers=auth_headers)
+    assert response.json() == {"version": version, "has_more": False}
+    etag = response.headers["etag"]
+    response = client.get(
+        "/api/v1/v2/products/changes", params={"since": version},
+        headers={**auth_headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+
+    tier = client.post(f"/api/v1/v2/products/variants/{variant_id}/price-tiers", json={
+        "variant_id": variant_id, "tier_type": "bulk", "min_quantity": 10, "price": 4500,
+    }, headers=auth_headers).json()
+    assert client.delete(f"/api/v1/v2/products/{product_id}", headers=auth_headers).status_code == 200
+
+    response = client.get(
+        "/api/v1/v2/products/changes", params={"since": version},
+        headers={**auth_headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert "products" not in body or body["products"] == []
+    assert [t["id"] for t in body["price_tiers"]] == [tier["id"]]
+    assert body["deleted"]["products"] == [product_id]
+    assert body["deleted"]["variants"] == [variant_id]
+
+
+def test_changes_feed_pages_by_whole_versions(client, auth_headers, tenant, make_variant):
+    """Sahifa versiya o'rtasida uzilmaydi."""
+    tenant_id = tenant.id
+    for name in ["A", "B", "C"]:
+        _create_product(tenant_id, make_variant, name)
+
+    # Har bir versiyada 2 ta qator (mahsulot + variant)
+    first = client.get("/api/v1/v2/products/changes", params={"since": 0, "limit": 3}, headers=auth_headers).json()
+    assert first["has_more"] is True
+    assert len(first["products"]) == 1 and len(first["variants"]) == 1
+
+    rest = client.get("/api/v1/v2/products/changes", params={"since": first["version"]}, headers=auth_headers).json()
+    assert rest["has_more"] is False
+    assert len(rest["products"]) == 2
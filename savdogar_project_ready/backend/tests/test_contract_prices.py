@@ -0,0 +1,126 @@
+"""Customer contract price list tests."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import TestingSessionLocal
+from test_cart_pricing import _count_queries, _seed_catalog
+from app.api.v1.endpoints.sales_v2 import calculate_cart_total
+from app.models import BusinessType
+from app.schemas.sale_v2 import CartItem
+from app.services.contract_prices import contract_price_index
+from app.services.price_tier_index import price_tier_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    price_tier_index.clear()
+    contract_price_index.clear()
+    yield
+    price_tier_index.clear()
+    contract_price_index.clear()
+
+
+def _setup(make_tenant, make_variant, count=60):
+    tenant_id = make_tenant(business_type=BusinessType.WHOLESALE).id
+    db = TestingSessionLocal()
+    customer_id, variant_ids = _seed_catalog(db, tenant_id, make_variant, count=count)
+    return db, tenant_id, customer_id, variant_ids
+
+
+def _create_list(client, auth_headers, customer_id, items, **window):
+    payload = {"name": "2026 shartnoma", "items": items}
+    payload.update({key: value.isoformat() for key, value in window.items()})
+    response = client.post(f"/api/v1/v2/customers/{customer_id}/price-lists", json=payload, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_contract_price_layers_with_tiers(client, auth_headers, make_tenant, make_variant):
+    db, tenant_id, customer_id, variant_ids = _setup(make_tenant, make_variant, count=2)
+    try:
+        first, second = variant_ids
+        price_list = _create_list(client, auth_headers, customer_id, [{"variant_id": first, "price": 850.0}])
+
+        result = calculate_cart_total(db, tenant_id, [
+            CartItem(variant_id=first, quantity=5),
+            CartItem(variant_id=second, quantity=5),
+        ], customer_id=customer_id)
+        assert [item["unit_price"] for item in result.items] == [850.0, 1000.0]
+        assert result.applied_contract_prices == [
+            {"variant_id": first, "price_list_id": price_list["id"], "price": 850.0}
+        ]
+
+        # Miqdor darajasi shartnomadan arzon bo'lsa u qo'llanadi
+        result = calculate_cart_total(db, tenant_id, [CartItem(variant_id=first, quantity=50)], customer_id=customer_id)
+        assert result.items[0]["unit_price"] == 800.0
+
+        # Shartnoma faqat o'sha mijozga tegishli
+        result = calculate_cart_total(db, tenant_id, [CartItem(variant_id=first, quantity=5)])
+        assert result.items[0]["unit_price"] != 850.0
+        assert result.applied_contract_prices == []
+
+        response = client.delete(
+            f"/api/v1/v2/customers/{customer_id}/price-lists/{price_list['id']}", headers=auth_headers
+        )
+        assert response.status_code == 200
+        result = calculate_cart_total(db, tenant_id, [CartItem(variant_id=first, quantity=5)], customer_id=customer_id)
+        assert result.items[0]["unit_price"] == 1000.0
+    finally:
+        db.close()
+
+
+def test_validity_window(client, auth_headers, make_tenant, make_variant):
+    db, tenant_id, customer_id, variant_ids = _setup(make_tenant, make_variant, count=1)
+    try:
+        variant_id = variant_ids[0]
+        now = datetime.utcnow()
+        _create_list(client, auth_headers, customer_id, [{"variant_id": variant_id, "price": 700.0}],
+                     valid_from=now - timedelta(days=60), valid_to=now - timedelta(days=1))
+        _create_list(client, auth_headers, customer_id, [{"variant_id": variant_id, "price": 600.0}],
+                     valid_from=now + timedelta(days=1))
+        _create_list(client, auth_headers, customer_id, [{"variant_id": variant_id, "price": 750.0}],
+                     valid_from=now - timedelta(days=1))
+
+        items = [CartItem(variant_id=variant_id, quantity=1)]
+        result = calculate_cart_total(db, tenant_id, items, customer_id=customer_id)
+        assert result.items[0]["unit_price"] == 750.0
+
+        contracts = contract_price_index.get(db, tenant_id)
+        assert contracts.price_for(customer_id, variant_id, now + timedelta(days=2)).price == 600.0
+
+        lists = client.get(f"/api/v1/v2/customers/{customer_id}/price-lists", headers=auth_headers).json()
+        assert len(lists) == 3
+    finally:
+        db.close()
+
+
+def test_contract_cart_query_count_is_constant(client, auth_headers, make_tenant, make_variant):
+    db, tenant_id, customer_id, variant_ids = _setup(make_tenant, make_variant)
+    try:
+        _create_list(client, auth_headers, customer_id, [
+            {"variant_id": variant_id, "price": 900.0} for variant_id in variant_ids
+        ])
+
+        def price(n):
+            db.expire_all()
+            items = [CartItem(variant_id=v, quantity=5) for v in variant_ids[:n]]
+            return calculate_cart_total(db, tenant_id, items, customer_id=customer_id)
+
+        price(1)  # indekslarni qizdirish
+        _, small = _count_queries(lambda: price(2))
+        result, large = _count_queries(lambda: price(60))
+
+        assert small == large <= 3
+        assert len(result.applied_contract_prices) == 60
+    finally:
+        db.close()
+
+
+def test_price_list_rejects_foreign_variants(client, auth_headers, make_tenant, make_variant):
+    db, tenant_id, customer_id, variant_ids = _setup(make_tenant, make_variant, count=1)
+    db.close()
+    response = client.post(f"/api/v1/v2/customers/{customer_id}/price-lists", json={
+        "name": "Xato", "items": [{"variant_id": 999999, "price": 10.0}],
+    }, headers=auth_headers)
+    assert response.status_code == 404
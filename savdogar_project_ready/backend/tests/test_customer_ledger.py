@@ -0,0 +1,210 @@
+"""Customer balance ledger tests."""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from conftest import TestingSessionLocal, override_get_db
+from app.core.database import Base, get_db
+from app.core.security import get_password_hash
+from app.main import app
+from app.models import Tenant, User, ProductV2, ProductVariant, CustomerV2, CustomerLedger, CustomerBalanceCheckpoint
+from app.services import customer_ledger
+
+
+def _customer(db, tenant_id, max_debt=1000.0):
+    customer = CustomerV2(tenant_id=tenant_id, name="Opt mijoz", max_debt_allowed=max_debt)
+    db.add(customer)
+    db.commit()
+    return customer.id
+
+
+def _debt_sale(variant_id, customer_id, amount):
+    return {
+        "items": [{"variant_id": variant_id, "quantity": 1}],
+        "customer_id": customer_id,
+        "payment_method": "debt",
+        "debt_amount": amount,
+    }
+
+
+def _debit(customer_id, amount):
+    return dict(customer_id=customer_id, debit=amount, credit=0.0, description="Qarz")
+
+
+def test_debt_checkout_and_payment(client, auth_headers, tenant, make_variant):
+    """Qarz sotuvlari va to'lov balansni o'zgartiradi, sanadagi balans tarixdan olinadi."""
+    variant_id = make_variant(tenant.id, "UN-1", cost_price=50.0, stock_quantity=1000.0).id
+    db = TestingSessionLocal()
+    customer_id = _customer(db, tenant.id)
+    db.close()
+
+    for _ in range(3):
+        response = client.post(
+            "/api/v1/v2/sales/checkout", json=_debt_sale(variant_id, customer_id, 200.0), headers=auth_headers
+        )
+        assert response.status_code == 200
+    before_payment = datetime.utcnow()
+
+    response = client.post(
+        "/api/v1/v2/sales/checkout", json=_debt_sale(variant_id, customer_id, 500.0), headers=auth_headers
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        f"/api/v1/v2/customers/{customer_id}/payments", json={"amount": 250.0}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert (response.json()["credit"], response.json()["balance_after"]) == (250.0, -350.0)
+
+    ledger = client.get(f"/api/v1/v2/customers/{customer_id}/ledger", headers=auth_headers).json()
+    assert [entry["balance_after"] for entry in ledger] == [-350.0, -600.0, -400.0, -200.0]
+
+    response = client.get(f"/api/v1/v2/customers/{customer_id}/balance", headers=auth_headers)
+    assert response.json()["balance"] == -350.0
+    response = client.get(
+        f"/api/v1/v2/customers/{customer_id}/balance",
+        params={"at": before_payment.isoformat()},
+        headers=auth_headers,
+    )
+    assert response.json()["balance"] == -600.0
+
+
+def test_checkpoints_and_balance_as_of(client, monkeypatch, tenant):
+    """Nazorat nuqtalari har N yozuvda yoziladi; sanadagi balans nuqta + dumdan hisoblanadi."""
+    monkeypatch.setattr(customer_ledger, "CHECKPOINT_INTERVAL", 3)
+    tenant_id = tenant.id
+    db = TestingSessionLocal()
+    try:
+        customer_id = _customer(db, tenant_id)
+
+        moments, expected = [], []
+        balance = 0.0
+        for i in range(7):
+            amount = 10.0 * (i + 1)
+            entry = _debit(customer_id, amount) if i % 3 else dict(customer_id=customer_id, credit=amount)
+            customer_ledger.post_entries(db, tenant_id, [entry])
+            db.commit()
+            balance += customer_ledger.entry_delta(entry)
+            moments.append(datetime.utcnow())
+            expected.append(balance)
+
+        checkpoints = db.query(CustomerBalanceCheckpoint).order_by(CustomerBalanceCheckpoint.id).all()
+        assert [(c.entries, c.balance) for c in checkpoints] == [(3, expected[2]), (6, expected[5])]
+        assert [customer_ledger.balance_as_of(db, customer_id, at) for at in moments] == expected
+        assert db.get(CustomerV2, customer_id).balance == expected[-1]
+
+        # Bir nechta yozuv bitta chaqiruvda - chegara ichida nuqta bitta
+        customer_ledger.post_entries(db, tenant_id, [_debit(customer_id, 1.0), _debit(customer_id, 2.0)])
+        db.commit()
+        assert db.query(CustomerBalanceCheckpoint).count() == 3
+        assert db.get(CustomerV2, customer_id).ledger_count == 9
+
+        # Eski tarix uchun nuqtalar
+        db.query(CustomerBalanceCheckpoint).delete()
+        db.commit()
+        assert customer_ledger.backfill_checkpoints(db, customer_id) == 3
+        assert customer_ledger.balance_as_of(db, customer_id, datetime.utcnow()) == expected[-1] - 3.0
+        assert customer_ledger.backfill_checkpoints(db, customer_id) == 0
+    finally:
+        db.close()
+
+
+def test_debt_limit_is_checked_in_update(client, tenant):
+    """Limitdan oshadigan qarz balansni o'zgartirmaydi, to'lov esa doim o'tadi."""
+    tenant_id = tenant.id
+    db = TestingSessionLocal()
+    try:
+        customer_id = _customer(db, tenant_id, max_debt=100.0)
+        customer_ledger.post_entries(db, tenant_id, [_debit(customer_id, 80.0)], enforce_limit=True)
+        db.commit()
+
+        with pytest.raises(customer_ledger.DebtLimitExceeded) as exc:
+            customer_ledger.post_entries(db, tenant_id, [_debit(customer_id, 30.0)], enforce_limit=True)
+        assert exc.value.customer_ids == [customer_id]
+        db.rollback()
+
+        customer_ledger.post_entries(
+            db, tenant_id, [dict(customer_id=customer_id, credit=50.0), _debit(customer_id, 30.0)], enforce_limit=True
+        )
+        db.commit()
+        assert db.get(CustomerV2, customer_id).balance == -60.0
+        assert db.query(CustomerLedger).count() == 3
+
+        # Boshqa tenant mijozi yangilanmaydi
+        with pytest.raises(customer_ledger.DebtLimitExceeded):
+            customer_ledger.post_entries(db, tenant_id + 1, [_debit(customer_id, 1.0)])
+        db.rollback()
+    finally:
+        db.close()
+
+
+def test_parallel_debt_checkouts(client, tmp_path, monkeypatch):
+    """Bir mijozga parallel qarz sotuvlari: yo'qolgan yangilanish yo'q, balance_after ketma-ket."""
+    monkeypatch.setattr(customer_ledger, "CHECKPOINT_INTERVAL", 10)
+    # Har bir ish o'z ulanishida - fayldagi baza (yozuvchilar navbat bilan)
+    file_engine = create_engine(
+        f"sqlite:///{tmp_path / 'ledger.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    FileSession = sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+    Base.metadata.create_all(bind=file_engine)
+
+    def file_db():
+        db = FileSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = file_db
+    try:
+        # tenant/make_variant fixture lari xotiradagi bazaga yozadi - bu baza qo'lda to'ldiriladi
+        db = FileSession()
+        tenant = Tenant(name="Ledger Tenant", config={})
+        db.add(tenant)
+        db.flush()
+        db.add(User(username="testuser", email="test@example.com", hashed_password=get_password_hash("testpass"),
+                     is_active=True, role="SUPER_ADMIN", tenant_id=tenant.id))
+        product = ProductV2(tenant_id=tenant.id, name="Un", recipe={})
+        db.add(product)
+        db.flush()
+        variant = ProductVariant(product_id=product.id, tenant_id=tenant.id, sku="UN-1", price=100.0, stock_quantity=1000.0)
+        db.add(variant)
+        db.commit()
+        variant_id = variant.id
+        customer_id = _customer(db, tenant.id, max_debt=10000.0)
+        db.close()
+
+        token = client.post(
+            "/api/v1/auth/login", data={"username": "testuser", "password": "testpass"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def sale(_):
+            response = client.post(
+                "/api/v1/v2/sales/checkout", json=_debt_sale(variant_id, customer_id, 10.0), headers=headers
+            )
+            return response.status_code
+
+        # Chek raqamlari bloki oldindan olinadi (alohida ulanishda)
+        assert sale(0) == 200
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            statuses = list(pool.map(sale, range(40)))
+        assert statuses == [200] * 40
+
+        db = FileSession()
+        customer = db.get(CustomerV2, customer_id)
+        assert (customer.balance, customer.ledger_count) == (-410.0, 41)
+        balances = [b for (b,) in db.query(CustomerLedger.balance_after).order_by(CustomerLedger.id)]
+        assert balances == [-10.0 * (i + 1) for i in range(41)]
+        assert [c.balance for c in db.query(CustomerBalanceCheckpoint).order_by(CustomerBalanceCheckpoint.id)] == [
+            -100.0, -200.0, -300.0, -400.0
+        ]
+        assert db.get(ProductVariant, variant_id).stock_quantity == 959.0
+        db.close()
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+        Base.metadata.drop_all(bind=file_engine)
+        file_engine.dispose()
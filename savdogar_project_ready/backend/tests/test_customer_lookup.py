@@ -0,0 +1,66 @@
+"""Customer lookup index tests."""
+from conftest import TestingSessionLocal
+from app.models import CustomerV2
+from app.services.customer_lookup import CustomerDirectory, customer_lookup_index, normalize_phone, phone_query
+
+
+def test_phone_normalization():
+    """+998, 998, 8 va bo'shliq/qavslar milliy 9 raqamga keltiriladi."""
+    assert normalize_phone("+998 (90) 123-45-67") == "901234567"
+    assert normalize_phone("998901234567") == "901234567"
+    assert normalize_phone("8 90 123 45 67") == "901234567"
+    assert normalize_phone("90 123 45 67") == "901234567"
+    assert phone_query("+99890") == "90"
+    assert phone_query("998") == "998"
+
+
+def test_phone_prefix_suffix_and_name_ranking():
+    """To'liq raqam, boshi, oxiri va ism bo'yicha topiladi; o'zgarishlar darhol ko'rinadi."""
+    directory = CustomerDirectory([
+        (1, "Akmal Karimov", "+998 90 123 45 67"),
+        (2, "Dilnoza Karimova", "+998 90 765 45 67"),
+        (3, "Botir aka", "93 111 22 33"),
+        (4, "Nomsiz", None),
+    ])
+
+    assert directory.search("+998901234567") == [(1, "phone", 1.0)]
+    assert [(i, m) for i, m, _ in directory.search("90 12")] == [(1, "phone_prefix")]
+    assert [(i, m) for i, m, _ in directory.search("4567")] == [(1, "phone_suffix"), (2, "phone_suffix")]
+    assert directory.search("karimova")[0][0] == 2
+    assert directory.search("Каримов")[0][0] == 1
+    # 1-2 raqam telefon qidiruvi uchun juda qisqa
+    assert directory.search("33") == []
+
+    directory.upsert(3, "Botir aka", "+998 99 000 00 01")
+    directory.remove(1)
+    assert directory.search("2233") == []
+    assert [i for i, _, _ in directory.search("990000001")] == [3]
+    assert [i for i, _, _ in directory.search("4567")] == [2]
+
+
+def test_lookup_endpoint(client, auth_headers, tenant):
+    """Endpoint joriy balans va darajani qaytaradi, yangi mijoz qayta qurishsiz topiladi."""
+    customer_lookup_index.clear()
+    tenant_id = tenant.id
+    db = TestingSessionLocal()
+    db.add(CustomerV2(tenant_id=tenant_id, name="Sherzod Do'kon", phone="+998 97 555 12 34", balance=-250.0))
+    db.commit()
+    db.close()
+
+    response = client.get("/api/v1/v2/customers/lookup", params={"q": "1234"}, headers=auth_headers)
+    assert response.status_code == 200
+    [match] = response.json()
+    assert (match["name"], match["balance"], match["price_tier"], match["matched"]) == (
+        "Sherzod Do'kon", -250.0, "retail", "phone_suffix"
+    )
+
+    # Yangi mijoz (create_customer kabi) indeksga joyida qo'shiladi
+    db = TestingSessionLocal()
+    customer = CustomerV2(tenant_id=tenant_id, name="Yangi mijoz", phone="+998 97 555 00 00", price_tier="wholesaler")
+    db.add(customer)
+    db.commit()
+    customer_lookup_index.upsert(tenant_id, customer.id, customer.name, customer.phone)
+    db.close()
+
+    response = client.get("/api/v1/v2/customers/lookup", params={"q": "+998 97 555"}, headers=auth_headers)
+    assert [match["name"] for match in response.json()] == ["Yangi mijoz", "Sherzod Do'kon"]
@@ -0,0 +1,170 @@
+"""RFM segmentation and CLV tests."""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from conftest import TestingSessionLocal
+from app.models import CustomerV2, SaleV2, CustomerSegmentRun, SegmentationStatus
+from app.models.sale_v2 import SaleStatus
+from app.services import customer_segments
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def test_scores_segments_and_clv():
+    """Ballar kvintillar bo'yicha, teng qiymatlar bir xil ball, CLV faollikka bog'liq."""
+    assert customer_segments.quantile_scores(np.arange(10)).tolist() == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+    assert set(customer_segments.quantile_scores(np.array([1, 1, 1, 1, 1, 1, 1, 2, 5, 9])).tolist()[:7]) == {1}
+
+    days = lambda n: np.datetime64(NOW - timedelta(days=n), "s")
+    # 0: tez-tez va yaqinda, 1: bir marta yaqinda, 2: ko'p xarid qilgan, lekin yo'qolmoqda, 3-4: bir marta, eski
+    aggregates = {
+        "ids": np.arange(5),
+        "frequency": np.array([20, 1, 15, 1, 1]),
+        "monetary": np.array([2000.0, 50.0, 1500.0, 40.0, 30.0]),
+        "first": np.array([days(300), days(2), days(400), days(200), days(250)]),
+        "last": np.array([days(1), days(2), days(220), days(200), days(250)]),
+    }
+    scores = customer_segments.score(aggregates, NOW)
+
+    assert scores["segment"].tolist() == ["champions", "new", "at_risk", "need_attention", "lost"]
+    assert scores["recency_days"].tolist() == [1, 2, 220, 200, 250]
+    assert scores["average_order"].tolist() == [100.0, 50.0, 100.0, 40.0, 30.0]
+    clv = scores["clv"]
+    assert clv[0] > clv[2] and clv[1] > clv[3] > clv[4] > 0
+
+
+def test_segmentation_endpoint_and_on_demand_narrative(client, auth_headers, monkeypatch, tenant):
+    """Fon ishi barcha mijozlarni yozadi; AI matni faqat so'ralganda va bir marta."""
+    db = TestingSessionLocal()
+    regular = CustomerV2(tenant_id=tenant.id, name="Doimiy", ai_preferences={"buying_habit_summary": "Choy"})
+    once = CustomerV2(tenant_id=tenant.id, name="Bir martalik")
+    idle = CustomerV2(tenant_id=tenant.id, name="Xaridsiz")
+    db.add_all([regular, once, idle])
+    db.flush()
+    now = datetime.utcnow()
+    db.add_all(
+        [SaleV2(tenant_id=tenant.id, customer_id=regular.id, total_amount=100.0,
+                created_at=now - timedelta(days=7 * week)) for week in range(6)]
+        + [SaleV2(tenant_id=tenant.id, customer_id=once.id, total_amount=500.0, created_at=now - timedelta(days=120)),
+           SaleV2(tenant_id=tenant.id, customer_id=once.id, total_amount=900.0, status=SaleStatus.REFUNDED)]
+    )
+    db.commit()
+    ids = (regular.id, once.id, idle.id)
+    db.close()
+
+    def run_job(run_id):
+        session = TestingSessionLocal()
+        try:
+            customer_segments.run_segmentation(session, run_id)
+        finally:
+            session.close()
+
+    monkeypatch.setattr(customer_segments, "WRITE_CHUNK", 1)
+    monkeypatch.setattr(customer_segments, "run_segmentation_job", run_job)
+
+    response = client.post("/api/v1/v2/customers/segments", headers=auth_headers)
+    assert response.status_code == 200
+    run = response.json()
+    assert (run["status"], run["processed"]) == ("pending", 0)
+
+    run = client.get(f"/api/v1/v2/customers/segments/runs/{run['id']}", headers=auth_headers).json()
+    assert run["status"] == "completed"
+    assert (run["total"], run["processed"], sum(run["segments"].values())) == (2, 2, 2)
+    assert run["clv_total"] > 0
+
+    db = TestingSessionLocal()
+    regular, once, idle = (db.get(CustomerV2, customer_id) for customer_id in ids)
+    assert regular.ai_preferences["buying_habit_summary"] == "Choy"
+    assert regular.ai_preferences["rfm"]["frequency"] == 6
+    # Qaytarilgan sotuv hisobga olinmaydi
+    assert once.ai_preferences["rfm"]["monetary"] == 500.0
+    assert idle.ai_preferences is None
+    db.close()
+
+    calls = []
+
+    async def describe(name, profile):
+        calls.append(name)
+        return f"{name}: {profile['segment']}"
+
+    monkeypatch.setattr(customer_segments, "describe", describe)
+    url = f"/api/v1/v2/customers/{ids[0]}/segment"
+
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["narrative"] is None
+    assert calls == []
+
+    segment = response.json()["segment"]
+    for _ in range(2):
+        response = client.get(url, params={"narrative": True}, headers=auth_headers)
+        assert response.json()["narrative"] == f"Doimiy: {segment}"
+    assert calls == ["Doimiy"]
+
+    response = client.get(f"/api/v1/v2/customers/{ids[2]}/segment", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_segmentation_keeps_concurrent_preference_writes(client, monkeypatch, tenant):
+    """Ish faqat "rfm" kalitini yozadi - ish davomida yozilgan boshqa kalitlar saqlanadi."""
+    db = TestingSessionLocal()
+    customer = CustomerV2(tenant_id=tenant.id, name="Parallel")
+    db.add(customer)
+    db.flush()
+    db.add(SaleV2(tenant_id=tenant.id, customer_id=customer.id, total_amount=100.0, created_at=NOW))
+    db.commit()
+    tenant_id, customer_id = tenant.id, customer.id
+
+    score = customer_segments.score
+
+    def score_during_habit_analysis(aggregates, now):
+        # Boshqa so'rov (AI odatlar tahlili) shu paytda mijoz profiliga yozadi
+        other = TestingSessionLocal()
+        other.get(CustomerV2, customer_id).ai_preferences = {"buying_habit_summary": "Non"}
+        other.commit()
+        other.close()
+        return score(aggregates, now)
+
+    monkeypatch.setattr(customer_segments, "score", score_during_habit_analysis)
+    customer_segments.segment_tenant(db, tenant_id, NOW)
+    db.expire_all()
+    preferences = db.get(CustomerV2, customer_id).ai_preferences
+    assert preferences["buying_habit_summary"] == "Non"
+    assert preferences["rfm"]["frequency"] == 1
+
+    # Matn faqat o'sha profilga yoziladi
+    as_of = preferences["rfm"]["as_of"]
+    assert not customer_segments.set_narrative(db, customer_id, "2020-01-01T00:00:00", "Eski")
+    assert customer_segments.set_narrative(db, customer_id, as_of, "Yangi")
+    db.expire_all()
+    preferences = db.get(CustomerV2, customer_id).ai_preferences
+    assert preferences["rfm"]["narrative"] == "Yangi"
+    assert preferences["buying_habit_summary"] == "Non"
+
+    # Yakunlangan sotuvi qolmagan mijozning eski profili olib tashlanadi, boshqa kalitlar qoladi
+    db.query(SaleV2).filter(SaleV2.customer_id == customer_id).update({"status": SaleStatus.REFUNDED})
+    db.commit()
+    monkeypatch.setattr(customer_segments, "score", score)
+    customer_segments.segment_tenant(db, tenant_id, NOW + timedelta(days=1))
+    db.expire_all()
+    assert db.get(CustomerV2, customer_id).ai_preferences == {"buying_habit_summary": "Non"}
+    db.close()
+
+
+def test_segmentation_run_conflicts_and_stale_runs(client, auth_headers, tenant):
+    """Tirik ish bo'lsa 409; progress yozmay qolgan ish yangisini to'smaydi."""
+    db = TestingSessionLocal()
+    running = customer_segments.start_segmentation(db, tenant.id)
+
+    response = client.post("/api/v1/v2/customers/segments", headers=auth_headers)
+    assert response.status_code == 409
+
+    running.created_at = datetime.utcnow() - timedelta(days=1)
+    db.commit()
+    fresh = customer_segments.start_segmentation(db, tenant.id)
+    db.refresh(running)
+    assert running.status == SegmentationStatus.FAILED
+    assert fresh.status == SegmentationStatus.PENDING
+    assert db.query(CustomerSegmentRun).filter(CustomerSegmentRun.tenant_id == tenant.id).count() == 2
+    db.close()
@@ -0,0 +1,112 @@
+"""Embedding pipeline tests."""
+import asyncio
+from datetime import datetime, timedelta
+
+from conftest import TestingSessionLocal
+from app.models import ProductVariant, EmbeddingBackfill, ImportStatus
+from app.services import embedding_pipeline
+from app.services.embedding_pipeline import EmbeddingPipeline, StubEmbeddingProvider
+
+
+class CountingProvider(StubEmbeddingProvider):
+    def __init__(self):
+        super().__init__(dim=16)
+        self.texts = []
+
+    async def embed(self, texts):
+        self.texts.extend(texts)
+        return await super().embed(texts)
+
+
+def test_backfill_skips_unchanged_variants(client, tenant, make_variant):
+    """Matni o'zgarmagan variantlar qayta yuborilmaydi, paketlar bo'linadi."""
+    first_variant = make_variant(tenant.id, "EMB-0", product={"name": "Futbolka"}, attributes={"size": "S"})
+    product_id = first_variant.product_id
+    for i, size in enumerate(["M", "L", "M"], start=1):
+        make_variant(tenant.id, f"EMB-{i}", product_id=product_id, attributes={"size": size})
+    # Arxivlangan variant embed qilinmaydi
+    make_variant(tenant.id, "EMB-OFF", product_id=product_id, attributes={"size": "XXL"}, is_active=False)
+    db = TestingSessionLocal()
+
+    provider = CountingProvider()
+    pipeline = EmbeddingPipeline(provider, batch_size=2, concurrency=2)
+
+    first = asyncio.run(pipeline.backfill(db, tenant.id))
+    assert first["embedded"] == 4
+    # Bir xil matnli ikkita variant bitta matn sifatida yuboriladi
+    assert sorted(provider.texts) == ["Futbolka | size: L", "Futbolka | size: M", "Futbolka | size: S"]
+    assert pipeline.requests == 2
+
+    second = asyncio.run(pipeline.backfill(db, tenant.id))
+    assert second["embedded"] == 0 and second["skipped"] == 4
+
+    variant = db.get(ProductVariant, first_variant.id)
+    variant.attributes = {"size": "XL"}
+    db.commit()
+    third = asyncio.run(pipeline.backfill(db, tenant.id))
+    assert third["embedded"] == 1
+    assert provider.texts[-1] == "Futbolka | size: XL"
+    db.refresh(variant)
+    assert len(variant.embedding_vector) == 16
+    db.close()
+
+
+def test_query_embeddings_are_memoized():
+    """Takroriy qidiruv so'rovlari provayderga qayta yuborilmaydi."""
+    provider = CountingProvider()
+    pipeline = EmbeddingPipeline(provider)
+
+    first = asyncio.run(pipeline.embed_query("Qora choy"))
+    second = asyncio.run(pipeline.embed_query("  qora   CHOY "))
+    assert first == second
+    assert provider.texts == ["qora choy"]
+    assert pipeline.query_cache.stats()["hits"] == 1
+
+
+def test_backfill_endpoint_runs_as_job(client, auth_headers, monkeypatch, tenant, make_variant):
+    """Endpoint ish yaratadi va darhol qaytadi; progress GET orqali kuzatiladi."""
+    tenant_id = tenant.id
+    product_id = None
+    for i in range(1, 4):
+        product_id = make_variant(
+            tenant_id, f"JOB-{i}", product_id=product_id, product={"name": "Choy"}, attributes={"weight": f"{i}00g"}
+        ).product_id
+
+    pipeline = EmbeddingPipeline(CountingProvider(), batch_size=2)
+
+    def run_job(job_id):
+        session = TestingSessionLocal()
+        try:
+            embedding_pipeline.run_backfill(session, job_id, pipeline)
+        finally:
+            session.close()
+
+    monkeypatch.setattr(embedding_pipeline, "BACKFILL_PAGE", 2)
+    monkeypatch.setattr(embedding_pipeline, "run_backfill_job", run_job)
+
+    response = client.post("/api/v1/analytics/ai/embeddings/backfill", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    job = response.json()
+    assert (job["status"], job["total"], job["scanned"]) == ("pending", 3, 0)
+
+    job = client.get(f"/api/v1/analytics/ai/embeddings/backfill/{job['job_id']}", headers=auth_headers).json()
+    assert (job["status"], job["scanned"], job["embedded"]) == ("completed", 3, 3)
+
+    # Tirik ish bo'lsa yangisi boshlanmaydi; to'xtab qolgani FAILED qilinadi
+    db = TestingSessionLocal()
+    running = EmbeddingBackfill(tenant_id=tenant_id, status=ImportStatus.RUNNING, heartbeat_at=datetime.utcnow())
+    db.add(running)
+    db.commit()
+    response = client.post("/api/v1/analytics/ai/embeddings/backfill", headers=auth_headers)
+    assert response.status_code == 409
+
+    running.heartbeat_at = datetime.utcnow() - timedelta(hours=2)
+    db.commit()
+    response = client.post("/api/v1/analytics/ai/embeddings/backfill", headers=auth_headers)
+    assert response.status_code == 200
+    db.refresh(running)
+    assert running.status == ImportStatus.FAILED
+    db.close()
+
+    response = client.get("/api/v1/analytics/ai/embeddings/backfill/999999", headers=auth_headers)
+    assert response.status_code == 404
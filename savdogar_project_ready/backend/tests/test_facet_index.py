@@ -0,0 +1,60 @@
+"""Faceted attribute filtering tests."""
+from app.services.facet_index import TenantFacets, facet_index
+
+
+def test_disjunctive_counts_and_incremental_updates():
+    """Tanlangan atribut boshqa qiymatlari sonini ko'rsatadi; yozuvlar keshni yangilaydi."""
+    facets = TenantFacets()
+    facets.upsert(1, {"size": "XL", "color": "Red"})
+    facets.upsert(2, {"size": "L", "color": "Red"})
+    facets.upsert(3, {"size": "XL", "color": "Blue", "pack_size": 50})
+    facets.upsert(4, {"size": "M", "color": "Red", "extra": {"nested": True}})
+
+    counts = facets.counts({"size": ("XL",), "color": ("Red",)})
+    assert counts["total"] == 1
+    assert counts["facets"]["size"] == [("L", 1), ("M", 1), ("XL", 1)]
+    assert counts["facets"]["color"] == [("Blue", 1), ("Red", 1)]
+    assert "extra" not in counts["facets"]
+    assert facets.counts({"size": ("XL",), "color": ("Red",)}) is counts
+
+    facets.upsert(2, {"size": "XL", "color": "Red"})
+    counts = facets.counts({"size": ("XL",), "color": ("Red",)})
+    assert counts["total"] == 2
+    assert facets.count_hits == 1 and facets.count_misses == 2
+
+    facets.remove(1)
+    assert facets.matching({"size": ("XL", "M")}) == {2, 3, 4}
+    assert facets.counts({})["facets"]["pack_size"] == [("50", 1)]
+
+
+def test_facet_endpoint(client, auth_headers, tenant, make_variant):
+    """Endpoint filtrga mos variantlar va sanoqlarni qaytaradi."""
+    facet_index.clear()
+    product_id = None
+    for i, (size, color) in enumerate([("XL", "Red"), ("L", "Red"), ("XL", "Blue")]):
+        product_id = make_variant(
+            tenant.id, f"TS-{i}", product_id=product_id, product={"name": "Futbolka"},
+            attributes={"size": size, "color": color},
+        ).product_id
+
+    response = client.get(
+        "/api/v1/v2/products/facets", params=[("attr", "size:XL"), ("attr", "color:Red")], headers=auth_headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["sku"] for item in body["items"]] == ["TS-0"]
+    assert body["total"] == 1
+    assert {f["value"]: f["count"] for f in body["facets"]["size"]} == {"XL": 1, "L": 1}
+
+    # Filtrlangan sahifalash: kursor indeksdagi ID lar bo'yicha
+    pages, cursor = [], None
+    while True:
+        params = [("attr", "size:XL"), ("limit", "1")] + ([("cursor", cursor)] if cursor else [])
+        body = client.get("/api/v1/v2/products/facets", params=params, headers=auth_headers).json()
+        pages.append([item["sku"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert pages == [["TS-0"], ["TS-2"]]
+
+    assert client.get("/api/v1/v2/products/facets", params={"attr": "size"}, headers=auth_headers).status_code == 400
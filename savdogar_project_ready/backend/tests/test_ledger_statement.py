@@ -0,0 +1,84 @@
+"""Customer ledger statement tests."""
+import csv
+import io
+from datetime import datetime, timedelta
+
+from conftest import TestingSessionLocal
+from app.models import CustomerV2, CustomerLedger
+from app.services import customer_ledger
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+def _seed(tenant_id, monkeypatch):
+    """10 kun: toq kunlari 100 qarz, juft kunlari 30 to'lov"""
+    monkeypatch.setattr(customer_ledger, "CHECKPOINT_INTERVAL", 3)
+    db = TestingSessionLocal()
+    customer = CustomerV2(tenant_id=tenant_id, name="Opt mijoz")
+    db.add(customer)
+    db.flush()
+
+    balance, deltas = 0.0, []
+    for day in range(10):
+        debit, credit = (100.0, 0.0) if day % 2 == 0 else (0.0, 30.0)
+        balance += credit - debit
+        deltas.append(credit - debit)
+        db.add(CustomerLedger(
+            customer_id=customer.id, debit=debit, credit=credit, balance_after=balance,
+            description=f"Kun {day + 1}", created_at=START + timedelta(days=day),
+        ))
+    db.commit()
+    customer_ledger.backfill_checkpoints(db, customer.id)
+    db.commit()
+    customer_id = customer.id
+    db.close()
+    return customer_id, deltas
+
+
+def test_statement_pages_with_running_balance(client, auth_headers, monkeypatch, tenant):
+    """Oyna, sahifalar bo'ylab yig'ma balans va davr jami."""
+    customer_id, deltas = _seed(tenant.id, monkeypatch)
+    params = {
+        "date_from": (START + timedelta(days=4)).isoformat(),
+        "date_to": (START + timedelta(days=10)).isoformat(),
+        "limit": 4,
+    }
+    url = f"/api/v1/v2/customers/{customer_id}/statement"
+
+    response = client.get(url, params=params, headers=auth_headers)
+    assert response.status_code == 200
+    first = response.json()
+    # Boshlang'ich balans: 3-yozuvdagi nazorat nuqtasi + 4-yozuv
+    opening = sum(deltas[:4])
+    assert (first["opening_balance"], first["entries"]) == (opening, 6)
+    assert (first["period_debit"], first["period_credit"]) == (300.0, 90.0)
+    assert first["closing_balance"] == sum(deltas)
+
+    second = client.get(url, params={**params, "cursor": first["next_cursor"]}, headers=auth_headers).json()
+    assert second["next_cursor"] is None
+
+    items = first["items"] + second["items"]
+    assert [item["description"] for item in items] == [f"Kun {day}" for day in range(5, 11)]
+    running = [sum(deltas[:day + 1]) for day in range(4, 10)]
+    assert [item["balance"] for item in items] == running
+    assert items[-1]["balance"] == first["closing_balance"]
+
+    response = client.get(url, params={"cursor": "bad"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_statement_csv_stream(client, auth_headers, monkeypatch, tenant):
+    """To'liq ko'chirma CSV: boshlang'ich, barcha yozuvlar, yakuniy balans."""
+    customer_id, deltas = _seed(tenant.id, monkeypatch)
+
+    response = client.get(f"/api/v1/v2/customers/{customer_id}/statement/csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][0] == "id"
+    assert rows[1][4] == "Boshlang'ich balans"
+    entries = rows[2:-1]
+    assert len(entries) == 10
+    assert [float(row[7]) for row in entries] == [sum(deltas[:day + 1]) for day in range(10)]
+    assert rows[-1][4:] == ["Yakuniy balans", "500.0", "150.0", str(sum(deltas))]
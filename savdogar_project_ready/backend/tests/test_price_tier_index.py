@@ -0,0 +1,78 @@
+"""Price tier index tests."""
+from conftest import TestingSessionLocal
+from app.models import PriceTier, PriceTierType, CustomerTier
+from app.services.price_tier_index import PriceTierIndex, TenantTierIndex, TierEntry
+
+
+def _tier(id, min_qty, price, max_qty=None, tier_type=PriceTierType.BULK, group=None, variant_id=1):
+    return TierEntry(id, variant_id, tier_type, min_qty, max_qty, price, group)
+
+
+def test_best_tier_binary_search():
+    """Eng katta mos min_quantity tanlanadi, max_quantity hisobga olinadi."""
+    index = TenantTierIndex(1, [
+        _tier(1, 10, 900.0),
+        _tier(2, 50, 800.0, max_qty=99),
+        _tier(3, 100, 700.0),
+    ])
+
+    assert index.best_tier(1, 5) is None
+    assert index.best_tier(1, 10).id == 1
+    assert index.best_tier(1, 75).id == 2
+    assert index.best_tier(1, 500).id == 3
+    assert index.best_tier(2, 500) is None
+
+
+def test_best_tier_respects_customer_group():
+    """VIP darajasi optom mijozga ko'rinmaydi, oddiy mijozga ko'rinadi."""
+    index = TenantTierIndex(1, [
+        _tier(1, 1, 950.0, tier_type=PriceTierType.VIP, group="vip"),
+        _tier(2, 1, 900.0, tier_type=PriceTierType.WHOLESALER, group="wholesale"),
+    ])
+
+    assert index.best_tier(1, 1, CustomerTier.VIP).id == 1
+    assert index.best_tier(1, 1, CustomerTier.WHOLESALER).id == 2
+    assert index.best_tier(1, 1, CustomerTier.RETAIL) is not None
+
+
+def test_invalidate_bumps_version_and_counts(tenant):
+    """invalidate() indeksni eskirtiradi, bazadagi versiyani oshiradi va hisoblagichlar yuritiladi."""
+    registry = PriceTierIndex()
+    db = TestingSessionLocal()
+    try:
+        registry.put(db, tenant.id, TenantTierIndex(tenant.id, [_tier(1, 1, 100.0)]))
+
+        assert registry.peek(tenant.id) is not None
+        assert registry.stats()["tiers"] == 1
+        registry.invalidate(db, tenant.id)
+
+        assert registry.version(tenant.id) == 1
+        assert registry.shared_version(db, tenant.id) == 1
+        assert registry.peek(tenant.id) is None
+        assert registry.stats()["invalidations"] == 1
+    finally:
+        db.close()
+
+
+def test_invalidate_reaches_other_workers(tenant, make_variant):
+    """Boshqa worker dagi invalidate() bazadagi versiya orqali bu jarayonda ham qayta qurdiradi."""
+    variant = make_variant(tenant.id, "TIER-1")
+    worker_a, worker_b = PriceTierIndex(), PriceTierIndex()
+    db = TestingSessionLocal()
+    try:
+        assert worker_a.best_tier(db, tenant.id, variant.id, 10) is None
+        assert worker_a.best_tier(db, tenant.id, variant.id, 10) is None
+        assert worker_a.stats()["rebuilds"] == 1
+
+        db.add(PriceTier(
+            tenant_id=tenant.id, variant_id=variant.id, tier_type=PriceTierType.BULK,
+            min_quantity=10, price=90.0
+        ))
+        db.commit()
+        worker_b.invalidate(db, tenant.id)
+
+        db.expire_all()
+        assert worker_a.best_tier(db, tenant.id, variant.id, 10).price == 90.0
+        assert worker_a.stats()["rebuilds"] == 2
+    finally:
+        db.close()
@@ -0,0 +1,128 @@
+"""Bulk product import tests."""
+import io
+
+import openpyxl
+import pytest
+
+from conftest import TestingSessionLocal
+from app.core.config import settings
+from app.models import ProductV2, ProductVariant, PriceTier, ProductType
+from app.services import catalog_sync, product_import
+
+CSV = (
+    "name;sku;price;cost_price;stock_quantity;barcode;attr:size;attr:color;tier:10\n"
+    "Futbolka;TSH-S;50000;30000;10;4780000000011;S;Red;45000\n"
+    "Futbolka;TSH-M;50000;30000;5;4780000000028;M;Red;\n"
+    "Choy;TEA-1;12 500,50;9000;100;4780000000035;;;11000\n"
+    "Choy;TEA-1;12500;9000;100;;;;\n"
+    "Qahva;COF-1;abc;;;;;;\n"
+    ";;;;;;;;\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def inline_import_job(monkeypatch):
+    """Fon ishi so'rov ichida, kichik bo'laklar bilan"""
+
+    def run_job(import_id, path):
+        session = TestingSessionLocal()
+        try:
+            product_import.run_import(session, import_id, path, chunk_size=2)
+        finally:
+            session.close()
+
+    monkeypatch.setattr(product_import, "run_import_job", run_job)
+
+
+def _upload(client, auth_headers, filename, content, mode="upsert"):
+    response = client.post(
+        "/api/v1/v2/products/import", params={"mode": mode},
+        files={"file": (filename, content)}, headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    job = client.get(f"/api/v1/v2/products/imports/{response.json()['id']}", headers=auth_headers)
+    return job.json()
+
+
+def test_csv_import_upserts_in_chunks(client, auth_headers, monkeypatch, tmp_path, tenant):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    tenant_id = tenant.id
+
+    job = _upload(client, auth_headers, "katalog.csv", CSV.encode())
+    assert job["status"] == "completed"
+    assert (job["processed_rows"], job["created"], job["updated"], job["failed"]) == (5, 3, 0, 2)
+    assert [(e["row"], e["sku"]) for e in job["errors"]] == [(5, "TEA-1"), (6, "COF-1")]
+
+    db = TestingSessionLocal()
+    variants = {v.sku: v for v in db.query(ProductVariant).filter(ProductVariant.tenant_id == tenant_id)}
+    assert variants["TSH-S"].attributes == {"size": "S", "color": "Red"}
+    assert variants["TSH-S"].barcode_aliases == ["4780000000011"]
+    assert variants["TEA-1"].price == 12500.5
+    assert variants["TSH-S"].product_id == variants["TSH-M"].product_id
+    products = {p.name: p for p in db.query(ProductV2).filter(ProductV2.tenant_id == tenant_id)}
+    assert products["Futbolka"].type == ProductType.VARIABLE
+    assert products["Choy"].type == ProductType.SIMPLE
+    tiers = db.query(PriceTier.variant_id, PriceTier.min_quantity, PriceTier.price).filter(PriceTier.tenant_id == tenant_id)
+    assert sorted(tiers) == sorted([(variants["TSH-S"].id, 10.0, 45000.0), (variants["TEA-1"].id, 10.0, 11000.0)])
+    changes = catalog_sync.load_changes(db, tenant_id, since=0)
+    assert {v["sku"] for v in changes["variants"]} == {"TSH-S", "TSH-M", "TEA-1"}
+    db.close()
+
+    # Qayta import: narx yangilanadi, yangi mahsulot yaratilmaydi
+    job = _upload(client, auth_headers, "katalog.csv", b"sku,name,price\nTSH-S,Futbolka,55000\n")
+    assert (job["created"], job["updated"]) == (0, 1)
+    db = TestingSessionLocal()
+    variant = db.query(ProductVariant).filter(ProductVariant.tenant_id == tenant_id, ProductVariant.sku == "TSH-S").one()
+    assert variant.price == 55000 and variant.stock_quantity == 10
+    assert db.query(ProductV2).filter(ProductV2.tenant_id == tenant_id).count() == 2
+    db.close()
+
+    job = _upload(client, auth_headers, "katalog.csv", b"sku,name,price\nTSH-S,Futbolka,1\n", mode="insert")
+    assert job["failed"] == 1 and job["errors"][0]["error"] == "SKU allaqachon mavjud"
+
+
+def test_xlsx_import_and_missing_columns(client, auth_headers, monkeypatch, tmp_path, tenant):
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Name", "SKU", "Price", "Stock"])
+    for i in range(5):
+        sheet.append([f"Mahsulot {i}", 1000 + i, 1500.0, 3])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    job = _upload(client, auth_headers, "katalog.xlsx", buffer.getvalue())
+    assert (job["status"], job["created"], job["failed"]) == ("completed", 5, 0)
+
+    job = _upload(client, auth_headers, "bad.csv", b"name,price\nA,1\n")
+    assert job["status"] == "failed"
+    assert "sku" in job["error"]
+
+
+def test_import_reactivates_deleted_sku_and_skips_deleted_names(client, auth_headers, monkeypatch, tmp_path,
+                                                                tenant, make_variant):
+    """O'chirilgan SKU qayta kelsa mahsuloti ham faollashadi; yangi SKU o'chirilgan nomga biriktirilmaydi."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    tenant_id = tenant.id
+    tea_id = make_variant(tenant_id, "TEA-1", product={"name": "Choy", "is_active": False}, is_active=False).product_id
+    db = TestingSessionLocal()
+    bread = ProductV2(tenant_id=tenant_id, name="Non", recipe={}, is_active=False)
+    db.add(bread)
+    db.commit()
+    bread_id = bread.id
+    db.close()
+
+    job = _upload(client, auth_headers, "katalog.csv", b"sku,name,price\nTEA-1,Choy,120\nBRD-1,Non,50\n")
+    assert (job["created"], job["updated"], job["failed"]) == (1, 1, 0)
+
+    db = TestingSessionLocal()
+    variants = {v.sku: v for v in db.query(ProductVariant).filter(ProductVariant.tenant_id == tenant_id)}
+    assert variants["TEA-1"].is_active and variants["TEA-1"].product_id == tea_id
+    assert db.get(ProductV2, tea_id).is_active
+    assert variants["BRD-1"].product_id != bread_id
+    assert not db.get(ProductV2, bread_id).is_active
+    changes = catalog_sync.load_changes(db, tenant_id, since=0)
+    assert {p["id"] for p in changes["products"]} == {tea_id, variants["BRD-1"].product_id}
+    db.close()
@@ -0,0 +1,151 @@
+"""Promotion engine tests."""
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from conftest import TestingSessionLocal
+from test_cart_pricing import _count_queries, _seed_catalog
+from app.api.v1.endpoints.sales_v2 import calculate_cart_total
+from app.core.config import settings
+from app.models import BusinessType, Category, ProductV2, ProductVariant, Promotion, PromotionType
+from app.schemas.sale_v2 import CartItem
+from app.services.price_tier_index import price_tier_index
+from app.services.promotion_engine import PromotionRule, TenantPromotions, promotion_engine
+
+
+@pytest.fixture(autouse=True)
+def fresh_engine():
+    price_tier_index.clear()
+    promotion_engine.clear()
+    yield
+    price_tier_index.clear()
+    promotion_engine.clear()
+
+
+def test_happy_hour_window_recompiles_only_at_boundaries(monkeypatch):
+    monkeypatch.setattr(settings, "LOCAL_TIMEZONE", "UTC")
+    happy_hour = PromotionRule(1, "Happy hour", PromotionType.PERCENT_OFF, percent=20,
+                               daily_start=time(17, 0), daily_end=time(19, 0))
+    always = PromotionRule(2, "Doimiy", PromotionType.PERCENT_OFF, category_id=5, percent=5)
+    promotions = TenantPromotions([happy_hour, always])
+
+    day = datetime(2026, 10, 17)
+    before = promotions.active(day.replace(hour=16, minute=30))
+    assert before.global_rules == [] and before.valid_until == day.replace(hour=17)
+    assert promotions.active(day.replace(hour=16, minute=59)) is before
+    assert promotions.compilations == 1
+
+    during = promotions.active(day.replace(hour=17, minute=0))
+    assert during.global_rules == [happy_hour]
+    assert during.valid_until == day.replace(hour=19)
+    assert promotions.active(day.replace(hour=18, minute=59)) is during
+
+    after = promotions.active(day.replace(hour=19, minute=1))
+    assert after.global_rules == []
+    assert after.valid_until == day.replace(hour=17) + timedelta(days=1)
+    assert promotions.compilations == 3
+
+    # Kechikkan so'rov (to'plam qurilgandan biroz oldingi payt) joriy to'plamni oladi
+    assert after.valid_from == day.replace(hour=19)
+    assert promotions.active(day.replace(hour=19, minute=0, second=30)) is after
+    # Oldingi oynadagi payt - bir martalik to'plam, joriy to'plam o'zgarmaydi
+    earlier = promotions.active(day.replace(hour=18))
+    assert earlier.global_rules == [happy_hour] and earlier is not after
+    assert promotions.active(day.replace(hour=20)) is after
+    assert promotions.compilations == 4
+
+
+def test_buy_x_get_y_and_priority():
+    rule = PromotionRule(1, "2+1", PromotionType.BUY_X_GET_Y, variant_id=7, buy_quantity=2, get_quantity=1)
+    assert rule.discount(100.0, 2) == 0.0
+    assert rule.discount(100.0, 7) == 200.0
+
+    cheap = PromotionRule(2, "Kichik", PromotionType.PERCENT_OFF, variant_id=7, percent=5, priority=1)
+    promotions = TenantPromotions([rule, cheap])
+    best_rule, amount = promotions.active().best(7, None, 100.0, 7)
+    assert best_rule is cheap and amount == pytest.approx(35.0)
+
+
+def _setup_cart(make_tenant, make_variant):
+    tenant_id = make_tenant(business_type=BusinessType.WHOLESALE).id
+    db = TestingSessionLocal()
+    _, variant_ids = _seed_catalog(db, tenant_id, make_variant, count=60)
+    category = Category(name="Ichimliklar")
+    db.add(category)
+    db.flush()
+    # Birinchi 30 ta mahsulot - ichimliklar
+    product_ids = [pid for (pid,) in db.query(ProductVariant.product_id).filter(ProductVariant.id.in_(variant_ids[:30]))]
+    db.query(ProductV2).filter(ProductV2.id.in_(product_ids)).update({"category_id": category.id})
+    db.commit()
+    return db, tenant_id, category.id, variant_ids
+
+
+def test_cart_applies_promotions_without_extra_queries(client, auth_headers, make_tenant, make_variant):
+    db, tenant_id, category_id, variant_ids = _setup_cart(make_tenant, make_variant)
+    try:
+        response = client.post("/api/v1/v2/promotions/", json={
+            "name": "Ichimliklar -10%", "promo_type": "percent_off", "category_id": category_id, "percent": 10,
+        }, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        category_promo = response.json()["id"]
+        response = client.post("/api/v1/v2/promotions/", json={
+            "name": "3+1", "promo_type": "buy_x_get_y", "variant_id": variant_ids[40],
+            "buy_quantity": 3, "get_quantity": 1,
+        }, headers=auth_headers)
+        bxgy_promo = response.json()["id"]
+        client.post("/api/v1/v2/promotions/", json={
+            "name": "Tugagan", "promo_type": "percent_off", "percent": 50,
+            "starts_at": "2020-01-01T00:00:00", "ends_at": "2020-02-01T00:00:00",
+        }, headers=auth_headers)
+
+        result = calculate_cart_total(db, tenant_id, [
+            CartItem(variant_id=variant_ids[0], quantity=2),
+            CartItem(variant_id=variant_ids[40], quantity=4),
+            CartItem(variant_id=variant_ids[50], quantity=1),
+        ])
+        first, second, third = result.items
+        # Aksiya narx darajasidan keyingi narxga qo'llanadi (950)
+        assert first["promotion_id"] == category_promo and first["discount_amount"] == pytest.approx(190.0)
+        assert second["promotion_id"] == bxgy_promo and second["discount_amount"] == pytest.approx(950.0)
+        assert third["promotion_id"] is None
+        assert result.discount_amount == pytest.approx(1140.0)
+        assert [p["promotion_id"] for p in result.applied_promotions] == [category_promo, bxgy_promo]
+
+        def price(n):
+            db.expire_all()
+            items = [CartItem(variant_id=v, quantity=4) for v in variant_ids[:n]]
+            return calculate_cart_total(db, tenant_id, items)
+
+        price(1)
+        _, small = _count_queries(lambda: price(2))
+        _, large = _count_queries(lambda: price(60))
+        assert small == large <= 3
+
+        # To'xtatilgan aksiya darhol qo'llanmaydi
+        client.delete(f"/api/v1/v2/promotions/{category_promo}", headers=auth_headers)
+        result = calculate_cart_total(db, tenant_id, [CartItem(variant_id=variant_ids[0], quantity=2)])
+        assert result.applied_promotions == []
+
+        active = client.get("/api/v1/v2/promotions/active", headers=auth_headers).json()
+        assert active["promotion_ids"] == [bxgy_promo]
+    finally:
+        db.close()
+
+
+def test_promotion_validation(client, auth_headers, make_tenant, make_variant):
+    response = client.post("/api/v1/v2/promotions/", json={
+        "name": "Xato", "promo_type": "buy_x_get_y", "buy_quantity": 2,
+    }, headers=auth_headers)
+    assert response.status_code == 422
+
+    db, _, category_id, _ = _setup_cart(make_tenant, make_variant)
+    foreign = Category(name="Boshqa tenant kategoriyasi")
+    db.add(foreign)
+    db.commit()
+    foreign_id = foreign.id
+    db.close()
+    for category, expected in ((category_id, 200), (foreign_id, 404), (10 ** 6, 404)):
+        response = client.post("/api/v1/v2/promotions/", json={
+            "name": "Kategoriya", "promo_type": "percent_off", "category_id": category, "percent": 5,
+        }, headers=auth_headers)
+        assert response.status_code == expected
@@ -0,0 +1,33 @@
+"""Receipt number allocator tests."""
+from conftest import TestingSessionLocal
+from app.services.receipt_numbers import ReceiptNumberAllocator
+
+
+def test_workers_get_disjoint_blocks(client, tenant):
+    """Ikki jarayon bir-birini takrorlamaydigan bloklar oladi."""
+    tenant_id = tenant.id
+    db = TestingSessionLocal()
+    try:
+        first = ReceiptNumberAllocator(block_size=3)
+        second = ReceiptNumberAllocator(block_size=3)
+
+        assert first.next_numbers(db, tenant_id, None, 2) == ["000001", "000002"]
+        assert second.next_number(db, tenant_id) == "000004"
+        assert first.next_numbers(db, tenant_id, None, 3) == ["000003", "000007", "000008"]
+        assert first.blocks_reserved == 2
+    finally:
+        db.close()
+
+
+def test_branches_have_own_sequences(client, tenant):
+    """Har bir filial raqamlari alohida va filial prefiksi bilan."""
+    tenant_id = tenant.id
+    db = TestingSessionLocal()
+    try:
+        allocator = ReceiptNumberAllocator(block_size=10)
+
+        assert allocator.next_number(db, tenant_id, 3) == "3-000001"
+        assert allocator.next_number(db, tenant_id, 5) == "5-000001"
+        assert allocator.next_numbers(db, tenant_id, 3, 12)[-1] == "3-000013"
+    finally:
+        db.close()
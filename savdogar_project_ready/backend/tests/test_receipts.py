@@ -0,0 +1,60 @@
+"""Public receipt verification tests."""
+import hashlib
+
+from conftest import TestingSessionLocal
+from app.core.config import settings
+from app.models import Organization, Product, Sale, SaleItem
+from app.services.cache import clear_cache
+from app.services.qr_service import generate_receipt_id, parse_receipt_id
+
+
+def _sale():
+    db = TestingSessionLocal()
+    org = Organization(name="Verify Org")
+    db.add(org)
+    db.flush()
+    product = Product(name="<b>Non</b>", price=5000.0, organization_id=org.id)
+    sale = Sale(organization_id=org.id, total_amount=10000.0)
+    db.add_all([product, sale])
+    db.flush()
+    db.add(SaleItem(sale_id=sale.id, product_id=product.id, quantity=2, price=5000.0, total=10000.0))
+    db.commit()
+    sale_id = sale.id
+    db.close()
+    return sale_id
+
+
+def test_receipt_id_round_trip(monkeypatch):
+    """Receipt ID decodes to its sale; tampered IDs are rejected."""
+    receipt_id = generate_receipt_id(42)
+    assert parse_receipt_id(receipt_id) == 42
+    assert parse_receipt_id(receipt_id.replace("REC-42-", "REC-43-")) is None
+    assert parse_receipt_id("REC-42") is None
+    assert parse_receipt_id("REC-4²-" + receipt_id.split("-")[2]) is None
+    assert parse_receipt_id("REC-42-ÄBC") is None
+
+    assert parse_receipt_id(f"REC-{2 ** 31}-{receipt_id.split('-')[2]}") is None
+    assert parse_receipt_id("REC-" + "9" * 5000 + "-ABC") is None
+
+    # Legacy MD5 IDs are off by default, and only accepted up to the cutoff
+    legacy = "REC-42-" + hashlib.md5(b"SALE_42").hexdigest()[:8].upper()
+    assert parse_receipt_id(legacy) is None
+    monkeypatch.setattr(settings, "RECEIPT_LEGACY_MAX_SALE_ID", 42)
+    assert parse_receipt_id(legacy) == 42
+    assert parse_receipt_id("REC-43-" + hashlib.md5(b"SALE_43").hexdigest()[:8].upper()) is None
+
+
+def test_verify_page(client):
+    """Valid receipt renders once and is served from cache afterwards."""
+    clear_cache()
+    sale_id = _sale()
+
+    response = client.get(f"/verify/{generate_receipt_id(sale_id)}")
+    assert response.status_code == 200
+    assert "&lt;b&gt;Non&lt;/b&gt;" in response.text
+    assert "public" in response.headers["cache-control"]
+
+    assert client.get(f"/verify/REC-{sale_id}-000000000000").status_code == 404
+    assert client.get(f"/verify/{generate_receipt_id(sale_id + 1)}").status_code == 404
+    assert client.get("/verify/REC-²-ABCDEF").status_code == 404
+    assert client.get("/verify/REC-" + "9" * 30 + "-ABCDEF").status_code == 404
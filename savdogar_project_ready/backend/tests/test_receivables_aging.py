@@ -0,0 +1,99 @@
+"""Receivables aging tests."""
+from datetime import datetime, timedelta
+
+from conftest import TestingSessionLocal
+from app.models import CustomerV2, CustomerAging, ReceivableLot
+from app.services import customer_ledger, receivables_aging
+
+
+def _customers(db, tenant_id, names=("Opt mijoz",)):
+    customers = [CustomerV2(tenant_id=tenant_id, name=name, max_debt_allowed=10000.0) for name in names]
+    db.add_all(customers)
+    db.commit()
+    return [customer.id for customer in customers]
+
+
+def _post(db, tenant_id, customer_id, debit=0.0, credit=0.0):
+    customer_ledger.post_entries(db, tenant_id, [dict(customer_id=customer_id, debit=debit, credit=credit)])
+    db.commit()
+
+
+def _lots(db, customer_id):
+    return [(lot.amount, lot.remaining) for lot in db.query(ReceivableLot).filter(
+        ReceivableLot.customer_id == customer_id
+    ).order_by(ReceivableLot.id)]
+
+
+def test_fifo_matching_and_daily_rollover(client, tenant):
+    """To'lovlar eng eski qarzni yopadi, kun o'tganda qarz keyingi guruhga o'tadi."""
+    tenant_id = tenant.id
+    db = TestingSessionLocal()
+    try:
+        (customer_id,) = _customers(db, tenant_id)
+        _post(db, tenant_id, customer_id, debit=100.0)
+        _post(db, tenant_id, customer_id, debit=200.0)
+        _post(db, tenant_id, customer_id, credit=150.0)
+        assert _lots(db, customer_id) == [(200.0, 150.0)]
+
+        aging = db.query(CustomerAging).filter(CustomerAging.customer_id == customer_id).one()
+        assert (aging.current, aging.total) == (150.0, 150.0)
+
+        # 45 kundan keyin - bir marta qayta taqsimlanadi
+        later = datetime.utcnow().date() + timedelta(days=45)
+        assert receivables_aging.refresh(db, tenant_id, today=later) == 1
+        assert receivables_aging.refresh(db, tenant_id, today=later) == 0
+        db.refresh(aging)
+        assert (aging.current, aging.days_31_60, aging.aged_on) == (0.0, 150.0, later)
+
+        # Ortiqcha to'lov oldindan to'lov bo'ladi va keyingi qarzni kamaytiradi
+        _post(db, tenant_id, customer_id, credit=200.0)
+        assert _lots(db, customer_id) == []
+        assert db.query(CustomerAging).count() == 0
+        _post(db, tenant_id, customer_id, debit=80.0)
+        assert _lots(db, customer_id) == [(30.0, 30.0)]
+
+        # Butun tarixdan qayta qurish bir xil natija beradi
+        receivables_aging.rebuild_customer(db, tenant_id, customer_id)
+        db.commit()
+        assert _lots(db, customer_id) == [(30.0, 30.0)]
+        assert receivables_aging.summary(db, tenant_id)["total"] == 30.0
+    finally:
+        db.close()
+
+
+def test_aging_report_pages_and_summary(client, auth_headers, tenant):
+    """Hisobot tanlangan guruh bo'yicha saralanadi va cursor bilan sahifalanadi."""
+    tenant_id = tenant.id
+    db = TestingSessionLocal()
+    a, b, c = _customers(db, tenant_id, names=("A", "B", "C"))
+    _post(db, tenant_id, a, debit=300.0)
+    _post(db, tenant_id, b, debit=500.0)
+    _post(db, tenant_id, c, debit=100.0)
+    _post(db, tenant_id, c, credit=100.0)
+
+    # A ning qarzi 100 kun oldin paydo bo'lgan
+    old = datetime.utcnow() - timedelta(days=100)
+    db.query(ReceivableLot).filter(ReceivableLot.customer_id == a).update({"debit_at": old})
+    db.query(CustomerAging).update({"aged_on": (old - timedelta(days=1)).date()})
+    db.commit()
+    db.close()
+
+    response = client.get("/api/v1/v2/customers/aging", params={"limit": 1}, headers=auth_headers)
+    assert response.status_code == 200
+    page = response.json()
+    assert [row["name"] for row in page["items"]] == ["B"]
+
+    response = client.get(
+        "/api/v1/v2/customers/aging", params={"limit": 1, "cursor": page["next_cursor"]}, headers=auth_headers
+    )
+    page = response.json()
+    assert [(row["name"], row["days_over_90"]) for row in page["items"]] == [("A", 300.0)]
+    assert page["next_cursor"] is None
+
+    response = client.get("/api/v1/v2/customers/aging", params={"sort": "days_over_90"}, headers=auth_headers)
+    assert [row["name"] for row in response.json()["items"]] == ["A", "B"]
+
+    response = client.get("/api/v1/v2/customers/aging/summary", headers=auth_headers)
+    assert response.json() == {
+        "customers": 2, "current": 500.0, "days_31_60": 0.0, "days_61_90": 0.0, "days_over_90": 300.0, "total": 800.0
+    }
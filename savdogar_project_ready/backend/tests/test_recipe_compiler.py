@@ -0,0 +1,42 @@
+"""Recipe compiler tests."""
+import pytest
+
+from app.services.recipe_compiler import RecipeBook, RecipeCycleError, flatten_recipes
+
+
+def test_nested_recipes_are_flattened():
+    """Ichki retsept xom ingredientlarga yoyiladi va miqdorlar ko'paytiriladi."""
+    # 10 = latte (2 x espresso + 200 sut), 11 = espresso (18 kofe + 30 suv)
+    compiled, cycles = flatten_recipes({
+        10: [(11, 2.0), (20, 200.0)],
+        11: [(21, 18.0), (22, 30.0)],
+    })
+
+    assert cycles == {}
+    assert compiled[10] == {21: 36.0, 22: 60.0, 20: 200.0}
+
+
+def test_cycles_are_rejected():
+    """Sikldagi va siklga tayangan variantlar sotilmaydi."""
+    compiled, cycles = flatten_recipes({
+        1: [(2, 1.0)],
+        2: [(1, 1.0)],
+        3: [(1, 1.0)],
+        4: [(50, 1.0)],
+    })
+
+    assert set(cycles) == {1, 2, 3}
+    assert compiled[4] == {50: 1.0}
+    with pytest.raises(RecipeCycleError):
+        RecipeBook(compiled, cycles).ingredients(3)
+
+
+def test_order_demand_is_aggregated():
+    """Butun buyurtma bo'yicha ingredientlar bitta vektorga yig'iladi."""
+    compiled, cycles = flatten_recipes({10: [(20, 200.0), (21, 18.0)]})
+    book = RecipeBook(compiled, cycles)
+
+    totals, line_variants = book.demand([(10, 3), (10, 1), (30, 2)])
+
+    assert totals == {20: 800.0, 21: 72.0, 30: 2}
+    assert line_variants == [[20, 21], [20, 21], [30]]
@@ -0,0 +1,171 @@
+"""Exchange-rate bulk repricing tests."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import TestingSessionLocal
+from app.models import Tenant, ProductVariant, ExchangeRateChange, RepricingStatus
+from app.services import inflation_service
+from app.services.inflation_service import InflationShieldService, parse_price_usd
+
+
+@pytest.fixture
+def tenant_id(make_tenant, make_variant):
+    """Kursi 12000 bo'lgan tenant va 25 variantli "Telefon" mahsuloti"""
+    rate = 12000.0
+    tenant_id = make_tenant(usd_to_uzs_rate=rate).id
+    product_id = None
+    for i in range(25):
+        # Har uchinchi variant so'mda narxlangan - kurs unga ta'sir qilmaydi
+        attributes = {"color": "Red"} if i % 3 == 0 else {"price_usd": 10 + i}
+        price = 5000 if i % 3 == 0 else (10 + i) * rate
+        product_id = make_variant(
+            tenant_id, f"TEL-{i:03d}", product_id=product_id, product={"name": "Telefon", "base_price": 0},
+            price=price, attributes=attributes,
+        ).product_id
+    return tenant_id
+
+
+def _prices(tenant_id):
+    db = TestingSessionLocal()
+    prices = dict(db.query(ProductVariant.sku, ProductVariant.price).filter(ProductVariant.tenant_id == tenant_id))
+    db.close()
+    return prices
+
+
+def _run_job(change_id):
+    db = TestingSessionLocal()
+    try:
+        InflationShieldService.run_repricing(db, change_id, chunk_size=4)
+    finally:
+        db.close()
+
+
+def test_preview_does_not_write(client, auth_headers, tenant_id):
+    before = _prices(tenant_id)
+
+    response = client.post(
+        "/api/v1/analytics/inflation/update-usd-rate",
+        params={"new_rate": 12500, "dry_run": True}, headers=auth_headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["current_rate"] == 12000
+    assert body["total"] == 16
+    assert body["changed"] == 16
+    first = body["sample"][0]
+    assert first["new_price"] == first["price_usd"] * 12500
+    assert _prices(tenant_id) == before
+
+
+def test_repricing_job_rollback_and_history(client, auth_headers, monkeypatch, tenant_id):
+    monkeypatch.setattr(InflationShieldService, "run_repricing_job", staticmethod(_run_job))
+
+    response = client.post(
+        "/api/v1/analytics/inflation/update-usd-rate", params={"new_rate": 12500}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    job = client.get(f"/api/v1/analytics/inflation/jobs/{job_id}", headers=auth_headers).json()
+    assert job["status"] == "completed"
+    assert job["total"] == job["processed"] == 16
+    prices = _prices(tenant_id)
+    assert prices["TEL-001"] == 11 * 12500
+    assert prices["TEL-000"] == 5000
+
+    # Qaytarish - eski kurs bilan yangi ish
+    response = client.post(f"/api/v1/analytics/inflation/rate-history/{job_id}/rollback", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["new_rate"] == 12000
+    assert _prices(tenant_id)["TEL-001"] == 11 * 12000
+
+    history = client.get("/api/v1/analytics/inflation/rate-history", headers=auth_headers).json()
+    assert [item["reverts_id"] for item in history] == [job_id, None]
+
+    db = TestingSessionLocal()
+    assert db.query(Tenant.usd_to_uzs_rate).filter(Tenant.id == tenant_id).scalar() == 12000
+    db.close()
+
+
+def test_second_job_conflicts_while_running(client, auth_headers, tenant_id):
+    db = TestingSessionLocal()
+    change = InflationShieldService.start_repricing(db, tenant_id, 12600)
+    assert change.status == RepricingStatus.PENDING
+    db.close()
+
+    response = client.post(
+        "/api/v1/analytics/inflation/update-usd-rate", params={"new_rate": 12700}, headers=auth_headers
+    )
+    assert response.status_code == 409
+
+
+def test_stale_job_does_not_block_new_repricing(client, auth_headers, tenant_id):
+    """Progress yozmay qolgan (worker o'lgan) ish FAILED qilinadi, yangi ish boshlanadi."""
+    db = TestingSessionLocal()
+    change = InflationShieldService.start_repricing(db, tenant_id, 12600)
+    change.status = RepricingStatus.RUNNING
+    change.started_at = change.heartbeat_at = datetime.utcnow() - timedelta(hours=3)
+    db.commit()
+
+    fresh = InflationShieldService.start_repricing(db, tenant_id, 12700)
+    assert fresh.status == RepricingStatus.PENDING
+    db.refresh(change)
+    assert change.status == RepricingStatus.FAILED
+    assert change.finished_at is not None
+    db.close()
+
+
+def test_failed_job_keeps_old_rate_and_can_be_rerun(client, monkeypatch, tenant_id):
+    """Bo'lak yiqilsa kurs yozilmaydi; shu kurs bilan qayta ish hamma narxni yangilaydi."""
+    record_changes = inflation_service.catalog_sync.record_changes
+    calls = []
+
+    def fail_on_second_chunk(db, tenant_id, changes):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("bo'lak yiqildi")
+        return record_changes(db, tenant_id, changes)
+
+    monkeypatch.setattr(inflation_service.catalog_sync, "record_changes", fail_on_second_chunk)
+    db = TestingSessionLocal()
+    change = InflationShieldService.start_repricing(db, tenant_id, 12500)
+    change = InflationShieldService.run_repricing(db, change.id, chunk_size=4)
+    assert change.status == RepricingStatus.FAILED
+    assert db.query(Tenant.usd_to_uzs_rate).filter(Tenant.id == tenant_id).scalar() == 12000
+
+    change = InflationShieldService.start_repricing(db, tenant_id, 12500)
+    assert change.old_rate == 12000
+    change = InflationShieldService.run_repricing(db, change.id, chunk_size=4)
+    assert change.status == RepricingStatus.COMPLETED
+    assert db.query(Tenant.usd_to_uzs_rate).filter(Tenant.id == tenant_id).scalar() == 12500
+    db.close()
+
+    prices = _prices(tenant_id)
+    assert all(prices[f"TEL-{i:03d}"] == (10 + i) * 12500 for i in range(25) if i % 3)
+
+
+def test_non_numeric_price_usd_is_skipped(client, tenant_id, make_variant):
+    """Noto'g'ri price_usd qiymati ishni yiqitmaydi, raqamli matn qayta narxlanadi."""
+    make_variant(tenant_id, "TEL-BAD", price=7000, attributes={"price_usd": "abc"})
+    make_variant(tenant_id, "TEL-TXT", price=7000, attributes={"price_usd": "2.5"})
+    db = TestingSessionLocal()
+
+    change = InflationShieldService.start_repricing(db, tenant_id, 12500)
+    assert change.total == 17
+    change = InflationShieldService.run_repricing(db, change.id, chunk_size=4)
+    assert change.status == RepricingStatus.COMPLETED
+    db.close()
+
+    prices = _prices(tenant_id)
+    assert prices["TEL-BAD"] == 7000
+    assert prices["TEL-TXT"] == 2.5 * 12500
+
+
+def test_parse_price_usd():
+    """Faqat musbat JSON raqam yoki raqamli matn narx sifatida o'qiladi."""
+    assert parse_price_usd(12) == 12.0
+    assert parse_price_usd(" 2.5 ") == 2.5
+    assert parse_price_usd(".5") == 0.5
+    for value in (None, "abc", "1e3x", True, 0, -3, "-1", [1], {"usd": 1}):
+        assert parse_price_usd(value) is None
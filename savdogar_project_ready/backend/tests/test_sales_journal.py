@@ -0,0 +1,58 @@
+"""Keyset sales journal tests."""
+from datetime import datetime, timedelta
+
+from conftest import TestingSessionLocal
+from app.models.sale_v2 import SaleV2, SaleItemV2, PaymentMethod
+
+
+def _seed(tenant_id, count):
+    db = TestingSessionLocal()
+    base = datetime(2026, 3, 1, 9, 0)
+    for i in range(count):
+        # Har ikki sotuv bir xil vaqtda - tartib id bo'yicha aniqlanadi
+        sale = SaleV2(
+            tenant_id=tenant_id,
+            total_amount=100.0,
+            payment_method=PaymentMethod.CARD if i % 3 == 0 else PaymentMethod.CASH,
+            created_at=base + timedelta(minutes=i // 2),
+        )
+        db.add(sale)
+        db.flush()
+        db.add(SaleItemV2(sale_id=sale.id, variant_id=1, quantity=1, unit_price=100.0, total=100.0))
+    db.commit()
+    db.close()
+
+
+def test_journal_pages_cover_all_sales_once(client, auth_headers, tenant):
+    """Cursor bo'yicha sahifalar takrorsiz va bo'shliqsiz, yangilari birinchi."""
+    _seed(tenant.id, 7)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/v2/sales/journal", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert all(len(sale["items"]) == 1 for sale in page["items"])
+        seen.extend((sale["created_at"], sale["id"]) for sale in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_journal_filters_and_bad_cursor(client, auth_headers, tenant):
+    """To'lov usuli filtri va noto'g'ri cursor."""
+    _seed(tenant.id, 7)
+
+    response = client.get(
+        "/api/v1/v2/sales/journal", params={"payment_method": "card"}, headers=auth_headers
+    )
+    assert [s["payment_method"] for s in response.json()["items"]] == ["card"] * 3
+
+    response = client.get("/api/v1/v2/sales/journal", params={"cursor": "xyz"}, headers=auth_headers)
+    assert response.status_code == 400
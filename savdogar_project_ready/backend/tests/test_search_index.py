@@ -0,0 +1,52 @@
+"""Product name search index tests."""
+from conftest import TestingSessionLocal
+from app.models import ProductV2
+from app.services.search_index import NgramIndex, normalize, product_search_index
+
+
+def test_normalize_folds_scripts():
+    """Kirill va lotin yozuvlari, apostroflar bir xil ko'rinishga keladi."""
+    assert normalize("Ўзбек Чойи") == "ozbek choyi"
+    assert normalize("O‘zbek choyi 100g") == "ozbek choyi 100g"
+
+
+def test_typo_tolerant_ranking():
+    """Xatoli va kirillcha so'rovlar ham to'g'ri mahsulotni birinchi qaytaradi."""
+    index = NgramIndex([(1, "Coca-Cola 1L"), (2, "Pepsi 1.5L"), (3, "Ко́фе Nescafe Gold"), (4, "Shokolad Alpen Gold")])
+
+    assert index.search("coca")[0][0] == 1
+    assert index.search("koka kola")[0][0] == 1
+    assert index.search("Кока-кола")[0][0] == 1
+    assert index.search("pepsy")[0][0] == 2
+    assert {doc_id for doc_id, _ in index.search("gold", limit=2)} == {3, 4}
+    assert index.search("kofe")[0][0] == 3
+
+    index.upsert(5, "Pepsi Max")
+    index.remove(2)
+    assert [doc_id for doc_id, _ in index.search("pepsi")] == [5]
+
+
+def test_find_containing_matches_substrings():
+    """ILIKE '%...%' bilan bir xil: so'z ichidagi qism ham topiladi, eng qisqa nom ustun."""
+    index = NgramIndex([(1, "Coca-Cola 1L"), (2, "Coca-Cola 1L Zero"), (3, "Cola")])
+
+    assert index.find_containing("cola 1l") == 1
+    assert index.find_containing("oca-co") == 1
+    assert index.find_containing("1l") == 1
+    assert index.find_containing("fanta") is None
+
+
+def test_typeahead_endpoint(client, auth_headers, tenant):
+    """Endpoint tenant mahsulotlarini ball bo'yicha qaytaradi."""
+    product_search_index.clear()
+    db = TestingSessionLocal()
+    db.add_all([
+        ProductV2(tenant_id=tenant.id, name="Non (patir)", recipe={}),
+        ProductV2(tenant_id=tenant.id, name="Qatiq", recipe={}),
+    ])
+    db.commit()
+    db.close()
+
+    response = client.get("/api/v1/v2/products/search", params={"q": "патир"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Non (patir)"
@@ -0,0 +1,123 @@
+"""Atomic stock decrement tests."""
+from sqlalchemy import event
+
+from conftest import TestingSessionLocal, engine
+from app.models import BusinessType
+from app.services import stock_service
+
+
+def _variants(make_variant, tenant_id, stocks):
+    product_id, variant_ids = None, []
+    for i, stock in enumerate(stocks):
+        variant = make_variant(
+            tenant_id, f"SKU-{i}", product_id=product_id, product={"name": "Kofe"}, stock_quantity=stock
+        )
+        product_id = variant.product_id
+        variant_ids.append(variant.id)
+    return variant_ids
+
+
+def test_decrement_stock_updates_all_rows(client, tenant, make_variant):
+    """Yetarli qoldiq bo'lsa barcha qatorlar bitta so'rovda kamayadi."""
+    tenant_id = tenant.id
+    a, b = _variants(make_variant, tenant_id, [10.0, 5.0])
+    db = TestingSessionLocal()
+    try:
+        failed = stock_service.decrement_stock(db, tenant_id, {a: 3.0, b: 5.0})
+        db.commit()
+
+        assert failed == []
+        assert stock_service.get_stock_levels(db, tenant_id, [a, b]) == {a: 7.0, b: 0.0}
+    finally:
+        db.close()
+
+
+def test_decrement_stock_reports_short_rows(client, tenant, make_variant):
+    """Qoldig'i yetmagan va boshqa tenant variantlari qaytariladi, ular kamaymaydi."""
+    tenant_id = tenant.id
+    a, b = _variants(make_variant, tenant_id, [10.0, 1.0])
+    db = TestingSessionLocal()
+    try:
+        failed = stock_service.decrement_stock(db, tenant_id, {a: 2.0, b: 4.0})
+        assert failed == [b]
+        assert stock_service.get_stock_levels(db, tenant_id, [b]) == {b: 1.0}
+
+        assert stock_service.decrement_stock(db, tenant_id + 1, {a: 1.0}) == [a]
+        db.rollback()
+    finally:
+        db.close()
+
+
+def test_decrement_stock_locks_rows_in_id_order(client, tenant, make_variant):
+    """Qatorlar so'rov tartibidan qat'i nazar id bo'yicha qulflanadi (parallel kassalarda deadlock yo'q)."""
+    tenant_id = tenant.id
+    a, b = _variants(make_variant, tenant_id, [10.0, 10.0])
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    db = TestingSessionLocal()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert stock_service.decrement_stock(db, tenant_id, {b: 1.0, a: 1.0}) == []
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        db.rollback()
+        db.close()
+
+    (lock, lock_params), (update, update_params) = statements
+    assert lock.lstrip().startswith("SELECT") and "ORDER BY product_variants.id" in lock
+    assert "UPDATE product_variants" in update
+    assert update_params[:2] == (a, 1.0) and update_params[2:4] == (b, 1.0)
+
+
+def _checkout(client, auth_headers, lines):
+    return client.post("/api/v1/v2/sales/checkout", headers=auth_headers, json={
+        "items": [{"variant_id": variant_id, "quantity": quantity} for variant_id, quantity in lines],
+        "payment_method": "cash",
+    })
+
+
+def test_checkout_reports_short_lines(client, auth_headers, tenant, make_variant):
+    """Checkout 400 qaytaradi: qaysi qator, qaysi variant, qancha so'ralgan va qancha bor."""
+    a, b = _variants(make_variant, tenant.id, [10.0, 1.0])
+
+    response = _checkout(client, auth_headers, [(a, 2), (b, 3)])
+    assert response.status_code == 400
+    assert response.json()["detail"] == {
+        "message": "Omborda yetarli mahsulot yo'q",
+        "failed_lines": [{
+            "line": 1,
+            "variant_id": b,
+            "sku": "SKU-1",
+            "shortages": [{"variant_id": b, "requested": 3.0, "available": 1.0}],
+        }],
+    }
+
+
+def test_checkout_reports_short_recipe_ingredient(client, auth_headers, make_tenant, make_variant):
+    """Kafe: retsept ingredienti yetmasa, xato sotilgan taom qatoriga bog'lanadi."""
+    tenant_id = make_tenant(business_type=BusinessType.CAFE).id
+    milk, beans = _variants(make_variant, tenant_id, [1000.0, 30.0])
+    latte_id = make_variant(tenant_id, "LATTE", product={"name": "Latte", "recipe": {
+        "ingredients": [{"id": milk, "qty": 200}, {"id": beans, "qty": 18}],
+    }}, stock_quantity=0).id
+
+    response = _checkout(client, auth_headers, [(latte_id, 1), (latte_id, 1)])
+    assert response.status_code == 400
+    shortage = {"variant_id": beans, "requested": 36.0, "available": 30.0}
+    assert response.json()["detail"]["failed_lines"] == [
+        {"line": line, "variant_id": latte_id, "sku": "LATTE", "shortages": [shortage]}
+        for line in (0, 1)
+    ]
+
+    # Taomning o'z qoldig'i (0) emas, ingredientlar kamayadi
+    db = TestingSessionLocal()
+    before = stock_service.get_stock_levels(db, tenant_id, [milk, beans])
+    response = _checkout(client, auth_headers, [(latte_id, 1)])
+    assert response.status_code == 200
+    db.expire_all()
+    after = stock_service.get_stock_levels(db, tenant_id, [milk, beans])
+    assert (before[milk] - after[milk], before[beans] - after[beans]) == (200.0, 18.0)
+    db.close()
@@ -0,0 +1,111 @@
+"""Semantic vector index tests."""
+import os
+
+import numpy as np
+
+from conftest import TestingSessionLocal
+from app.models import ProductVariant
+from app.services import vector_index
+from app.services.vector_index import IVFIndex, VectorIndex, normalize_rows
+
+
+def clustered(rng, count, dim=32, clusters=64):
+    centers = rng.normal(size=(clusters, dim))
+    return centers[rng.integers(0, clusters, count)] + 0.3 * rng.normal(size=(count, dim))
+
+
+def brute_force(vectors, query, k):
+    scores = normalize_rows(vectors) @ normalize_rows(query)
+    return set(np.argsort(-scores)[:k].tolist())
+
+
+def test_ivf_recall_and_incremental_updates(tmp_path):
+    """IVF natijalari aniq qidiruvga yaqin; upsert/remove va disk nusxasi ishlaydi."""
+    rng = np.random.default_rng(7)
+    vectors = clustered(rng, 8000)
+    index = IVFIndex.build(range(len(vectors)), vectors)
+    assert index.nlist > 1
+
+    queries = clustered(rng, 50)
+    recall = np.mean([
+        len({doc_id for doc_id, _ in index.search(q, 10)} & brute_force(vectors, q, 10)) / 10
+        for q in queries
+    ])
+    assert recall >= 0.9
+
+    query = queries[0]
+    index.upsert(100_000, query)
+    assert index.search(query, 1)[0][0] == 100_000
+    index.remove(100_000)
+    best = index.search(query, 1)[0][0]
+    index.remove(best)
+    assert best not in {doc_id for doc_id, _ in index.search(query, 10)}
+
+    index.save(str(tmp_path))
+    loaded = IVFIndex.load(str(tmp_path))
+    assert isinstance(loaded.search(query, 1)[0][0], int)
+    assert len(loaded) == len(vectors) - 1
+    assert loaded.search(query, 10) == index.search(query, 10)
+
+
+def test_snapshot_saves_never_mix_builds(tmp_path, monkeypatch):
+    """Har bir saqlash alohida papkada: yarim yozilgan nusxa o'qilmaydi, eskilari tozalanadi."""
+    rng = np.random.default_rng(3)
+    first = IVFIndex.build(range(10), rng.normal(size=(10, 8)))
+    second = IVFIndex.build(range(100, 120), rng.normal(size=(20, 8)))
+
+    first.save(str(tmp_path))
+    # Boshqa worker ning tugallanmagan saqlashi (CURRENT hali unga ko'rsatmaydi)
+    os.makedirs(tmp_path / "build-1-1-1")
+    np.save(tmp_path / "build-1-1-1" / "ids.npy", np.arange(3))
+    assert len(IVFIndex.load(str(tmp_path))) == 10
+
+    monkeypatch.setattr(vector_index, "STALE_BUILD_SECONDS", 0)
+    second.save(str(tmp_path))
+    loaded = IVFIndex.load(str(tmp_path))
+    assert sorted(loaded.keys()) == list(range(100, 120))
+    assert [name for name in os.listdir(tmp_path) if name.startswith("build-")] == [
+        "build-" + (tmp_path / "CURRENT").read_text()
+    ]
+
+
+def test_cache_syncs_snapshot_with_database(client, tmp_path, tenant, make_variant):
+    """Diskdagi nusxa ochilganda bazadagi yangi va o'chirilgan variantlar hisobga olinadi."""
+    product_id, variant_ids = None, []
+    for i in range(3):
+        variant = make_variant(
+            tenant.id, f"VEC-{i}", product_id=product_id, product={"name": "Choy"},
+            embedding_vector=[1.0 if j == i else 0.0 for j in range(4)],
+        )
+        product_id = variant.product_id
+        variant_ids.append(variant.id)
+    db = TestingSessionLocal()
+    variants = [db.get(ProductVariant, variant_id) for variant_id in variant_ids]
+
+    cache = VectorIndex(directory=str(tmp_path))
+    assert cache.search(db, tenant.id, [0, 1, 0, 0], 1)[0][0] == variants[1].id
+
+    # Boshqa jarayon: bitta variant o'chirildi, yangisi qo'shildi, bittasi qayta embed qilindi
+    variants[1].is_active = False
+    db.add(ProductVariant(
+        tenant_id=tenant.id, product_id=product_id, sku="VEC-3", price=1000,
+        embedding_vector=[0.0, 0.9, 0.1, 0.0]
+    ))
+    variants[0].embedding_vector = [0.0, 0.0, 0.0, 1.0]
+    variants[0].embedding_hash = "ab" * 32
+    db.commit()
+
+    fresh = VectorIndex(directory=str(tmp_path))
+    matches = fresh.search(db, tenant.id, [0, 1, 0, 0], 3)
+    assert fresh.snapshot_loads == 1
+    assert matches[0][0] not in {v.id for v in variants}
+    assert variants[1].id not in {doc_id for doc_id, _ in matches}
+    assert fresh.search(db, tenant.id, [0, 0, 0, 1], 1)[0] == (variants[0].id, 1.0)
+    # Faqat yangi va o'zgargan variantlar bazadan qayta o'qildi
+    assert len(fresh.peek(tenant.id)._pending) == 2
+
+    # Muddati o'tgan nusxaga kelgan upsert uni tashlab yuboradi
+    fresh.max_age_seconds = 0
+    fresh.upsert(tenant.id, variants[2].id, [1, 0, 0, 0])
+    assert tenant.id not in fresh._entries
+    db.close()